@@ -181,6 +181,48 @@ class Settings(BaseSettings):
         default=True,
         description="自动检测Tushare rt_k接口权限，付费用户自动切换到高频模式（5秒）"
     )
+    # 盘中增量技术指标（基于实时行情逐笔更新，无需重新拉取历史K线）
+    QUOTES_STREAMING_INDICATORS_ENABLED: bool = Field(
+        default=False,
+        description="行情入库后增量更新全市场技术指标（MA/EMA/MACD/RSI/BOLL/ATR/KDJ），写入 market_quotes.indicators"
+    )
+    QUOTES_INDICATOR_BOOTSTRAP_BARS: int = Field(
+        default=120,
+        description="指标状态缺失时，从 stock_daily_quotes 读取用于初始化的历史K线数量"
+    )
+
+    # 每日技术因子预计算（收盘后写入 stock_technical_factors，供数据库选股使用）
+    TECHNICAL_FACTORS_ENABLED: bool = Field(default=True, description="启用每日技术因子预计算")
+    TECHNICAL_FACTORS_CRON: str = Field(default="30 18 * * 1-5", description="技术因子计算CRON表达式")  # 工作日18:30
+    TECHNICAL_FACTORS_REFRESH_AFTER_SYNC: bool = Field(
+        default=True,
+        description="历史数据同步任务完成后立即刷新技术因子"
+    )
+    TECHNICAL_FACTORS_LOOKBACK_DAYS: int = Field(
+        default=220, ge=60, le=1000,
+        description="计算技术因子时读取的日K线回看自然日数"
+    )
+
+    # 历史K线存储布局：rows=逐行文档(stock_daily_quotes)；buckets=按年分桶列存(stock_daily_quote_buckets)；
+    # dual=两种布局同时写入、读取仍走逐行布局（迁移过渡期使用，其他模块仍读取 stock_daily_quotes）
+    HISTORICAL_DATA_LAYOUT: str = Field(default="rows", description="历史K线存储布局 rows/buckets/dual")
+    # 历史K线批量写入：批大小按实际写入耗时在 [MIN, MAX] 之间自适应，多只股票的批次并发写入
+    HISTORICAL_WRITE_BATCH_MIN: int = Field(default=100, ge=10, description="历史K线写入最小批大小")
+    HISTORICAL_WRITE_BATCH_MAX: int = Field(default=5000, ge=100, description="历史K线写入最大批大小")
+    HISTORICAL_WRITE_TARGET_SECONDS: float = Field(default=1.0, gt=0, description="单批写入的目标耗时（秒）")
+    HISTORICAL_WRITE_CONCURRENCY: int = Field(default=4, ge=1, le=32, description="同时进行的批量写入数")
+
+    # 逐只同步流水线（获取与保存并发、队列有界；获取并发仍受各数据源限流器约束）
+    SYNC_PIPELINE_FETCH_WORKERS: int = Field(default=4, ge=1, le=32, description="同步流水线获取协程数")
+    SYNC_PIPELINE_SAVE_WORKERS: int = Field(default=2, ge=1, le=16, description="同步流水线保存协程数")
+    SYNC_PIPELINE_QUEUE_SIZE: int = Field(default=32, ge=1, le=1000, description="同步流水线各阶段队列容量")
+    SYNC_PIPELINE_PROGRESS_INTERVAL: float = Field(default=5.0, gt=0, description="同步流水线进度上报间隔（秒）")
+
+    # 数据源限流（redis=多进程/多副本共享配额，Redis 不可用时自动降级为进程内限流；local=仅进程内）
+    RATE_LIMIT_BACKEND: str = Field(default="redis", description="数据源限流后端 redis/local")
+    RATE_LIMIT_REDIS_TIMEOUT: float = Field(default=1.0, gt=0, description="限流Redis调用超时（秒）")
+    RATE_LIMIT_REDIS_RETRY_SECONDS: float = Field(default=30.0, gt=0, description="Redis不可用后重试间隔（秒）")
+    RATE_LIMIT_FALLBACK_DIVISOR: int = Field(default=1, ge=1, le=64, description="降级为进程内限流时配额除数（约等于进程数）")
 
     # Tushare基础配置
     TUSHARE_TOKEN: str = Field(default="", description="Tushare API Token")
@@ -196,6 +238,9 @@ class Settings(BaseSettings):
     TUSHARE_QUOTES_SYNC_CRON: str = Field(default="*/5 9-15 * * 1-5")  # 交易时间每5分钟
     TUSHARE_HISTORICAL_SYNC_ENABLED: bool = Field(default=True)
     TUSHARE_HISTORICAL_SYNC_CRON: str = Field(default="0 16 * * 1-5")  # 工作日16点
+    # 增量同步模式：date=按交易日拉取全市场日线（每个交易日2次调用），新股/缺口/除权股票走逐只同步；symbol=逐只同步
+    TUSHARE_HISTORICAL_SYNC_MODE: str = Field(default="date", description="Tushare增量历史同步模式 date/symbol")
+    TUSHARE_DATEWISE_MAX_DATES: int = Field(default=20, ge=1, le=250, description="按交易日同步的最大交易日数，超过时改为逐只同步")
     TUSHARE_FINANCIAL_SYNC_ENABLED: bool = Field(default=True)
     TUSHARE_FINANCIAL_SYNC_CRON: str = Field(default="0 3 * * 0")  # 周日凌晨3点
     TUSHARE_STATUS_CHECK_ENABLED: bool = Field(default=True)
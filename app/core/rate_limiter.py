@@ -1,12 +1,23 @@
 """
 速率限制器
 用于控制API调用频率，避免超过数据源的限流限制
+
+- RateLimiter: 进程内滑动窗口
+- DistributedRateLimiter: Redis 滑动窗口（Lua 原子预约），多个 API 副本和 worker 进程共享同一份配额，
+  Redis 不可用时自动降级为进程内限流
 """
 import asyncio
+import contextlib
+import itertools
 import time
 import logging
+import uuid
+import weakref
 from collections import deque
-from typing import Optional
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.redis_client import RedisKeys
 
 logger = logging.getLogger(__name__)
 
@@ -40,10 +51,21 @@ class RateLimiter:
         
         logger.info(f"🔧 {self.name} 初始化: {max_calls}次/{time_window}秒")
     
-    async def acquire(self):
+    def _prune(self, now: float):
+        """移除时间窗口外的旧调用记录"""
+        while self.calls and self.calls[0] <= now - self.time_window:
+            self.calls.popleft()
+
+    async def acquire(self, endpoint: Optional[str] = None) -> float:
         """
         获取调用许可
         如果超过速率限制，会等待直到可以调用
+
+        Args:
+            endpoint: 接口名称（进程内限流器忽略，与分布式限流器保持相同签名）
+
+        Returns:
+            本次调用记录的时间戳
         """
         async with self.lock:
             now = time.time()
@@ -75,7 +97,24 @@ class RateLimiter:
             # 记录本次调用
             self.calls.append(now)
             self.total_calls += 1
+            return now
     
+    async def try_acquire(self, endpoint: Optional[str] = None) -> bool:
+        """
+        尝试获取调用许可，不等待
+
+        Returns:
+            True: 已获取许可；False: 当前窗口已满
+        """
+        async with self.lock:
+            now = time.time()
+            self._prune(now)
+            if len(self.calls) >= self.max_calls:
+                return False
+            self.calls.append(now)
+            self.total_calls += 1
+            return True
+
     def get_stats(self) -> dict:
         """获取统计信息"""
         return {
@@ -97,7 +136,287 @@ class RateLimiter:
         logger.info(f"🔄 {self.name} 统计信息已重置")
 
 
-class TushareRateLimiter(RateLimiter):
+# 滑动窗口预约脚本（KEYS: 限流键；ARGV: max_wait_ms, token, 然后每个键的 max_calls, window_ms）
+# 每次调用在有序集合中记录一个放行时间点。窗口已满时预约到最早腾出名额的时刻，
+# 调用方按到达 Redis 的顺序依次放行；max_wait_ms >= 0 且需要等待更久时不预约。
+# 使用 Redis 服务器时间，各副本之间不受本地时钟偏差影响。
+_RESERVE_SCRIPT = """
+if redis.replicate_commands then redis.replicate_commands() end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local max_wait = tonumber(ARGV[1])
+local allow_at = now
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[1 + 2 * i])
+    local window = tonumber(ARGV[2 + 2 * i])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    local n = redis.call('ZCARD', key)
+    if n >= limit then
+        local edge = redis.call('ZRANGE', key, n - limit, n - limit, 'WITHSCORES')
+        local at = tonumber(edge[2]) + window
+        if at > allow_at then allow_at = at end
+    end
+end
+local wait = allow_at - now
+if max_wait >= 0 and wait > max_wait then
+    return {0, wait}
+end
+for i, key in ipairs(KEYS) do
+    local window = tonumber(ARGV[2 + 2 * i])
+    redis.call('ZADD', key, allow_at, ARGV[2])
+    local ttl = wait + window + 1000
+    if redis.call('PTTL', key) < ttl then
+        redis.call('PEXPIRE', key, ttl)
+    end
+end
+return {1, wait}
+"""
+
+
+def _default_redis_factory():
+    """为当前事件循环创建独立的 Redis 客户端（asyncio 连接不能跨事件循环复用）"""
+    import redis.asyncio as redis
+
+    timeout = settings.RATE_LIMIT_REDIS_TIMEOUT
+    return redis.Redis.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        max_connections=4,
+        socket_connect_timeout=timeout,
+        socket_timeout=timeout,
+    )
+
+
+class DistributedRateLimiter(RateLimiter):
+    """
+    Redis 分布式速率限制器
+
+    与 RateLimiter 接口相同（acquire / try_acquire / get_stats），配额保存在 Redis 中，
+    所有进程共享：
+    - 键: rate_limit:provider:{provider}，可为单个接口额外配置限额（rate_limit:provider:{provider}:{endpoint}），
+      带 endpoint 的调用同时占用数据源和接口两份配额
+    - 公平排队: 配额已满时按到达顺序预约放行时间，先到先得，不会出现多个进程同时醒来争抢
+    - 降级: Redis 未配置或不可用时使用进程内滑动窗口（配额除以 RATE_LIMIT_FALLBACK_DIVISOR），
+      每隔 RATE_LIMIT_REDIS_RETRY_SECONDS 秒重试 Redis
+    - 退还: 调用失败或未返回数据时可通过 release() 退还本实例最近占用的配额
+    """
+
+    def __init__(
+        self,
+        max_calls: int,
+        time_window: float,
+        name: str = "RateLimiter",
+        provider: Optional[str] = None,
+        backend: Optional[str] = None,
+        redis_factory=None,
+    ):
+        """
+        Args:
+            max_calls: 时间窗口内最大调用次数（所有进程合计）
+            time_window: 时间窗口大小（秒）
+            name: 限制器名称（用于日志）
+            provider: 数据源名称（Redis 键的一部分），默认使用 name
+            backend: redis/local，默认读取 RATE_LIMIT_BACKEND
+            redis_factory: 创建 Redis 客户端的函数，默认按 REDIS_URL 创建
+        """
+        super().__init__(max_calls=max_calls, time_window=time_window, name=name)
+        self.provider = provider or name
+        self.backend = (backend or settings.RATE_LIMIT_BACKEND).lower()
+        self._redis_factory = redis_factory or _default_redis_factory
+        self._clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()  # 事件循环 -> (客户端, 脚本)
+        self._redis_retry_at = 0.0
+        self._endpoint_limits: Dict[str, Tuple[int, float]] = {}
+        self._fallbacks: Dict[Optional[str], RateLimiter] = {}
+        self._token_prefix = uuid.uuid4().hex
+        self._token_seq = itertools.count()
+        # 最近占用的配额（endpoint -> token），供 release() 退还；
+        # Redis 为预约 token，进程内窗口为 ((接口, 调用时间戳), ...)
+        self._granted: Dict[Optional[str], deque] = {}
+
+        self.redis_errors = 0
+        self.fallback_calls = 0
+        self.released = 0
+
+    def set_endpoint_limit(self, endpoint: str, max_calls: int, time_window: float):
+        """为单个接口配置额外限额（例如 Tushare 免费用户 rt_k 每小时 2 次）"""
+        self._endpoint_limits[endpoint] = (max_calls, time_window)
+        self._fallbacks.pop(endpoint, None)
+
+    @property
+    def using_redis(self) -> bool:
+        return self.backend == "redis" and time.monotonic() >= self._redis_retry_at
+
+    def _limits(self, endpoint: Optional[str]) -> Dict[Optional[str], Tuple[int, float]]:
+        limits = {None: (self.max_calls, self.time_window)}
+        if endpoint is not None and endpoint in self._endpoint_limits:
+            limits[endpoint] = self._endpoint_limits[endpoint]
+        return limits
+
+    def _key(self, endpoint: Optional[str]) -> str:
+        if endpoint is None:
+            return RedisKeys.PROVIDER_RATE_LIMIT.format(provider=self.provider)
+        return RedisKeys.PROVIDER_ENDPOINT_RATE_LIMIT.format(provider=self.provider, endpoint=endpoint)
+
+    def _get_client(self):
+        """返回当前事件循环的 (Redis 客户端, 预约脚本)"""
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(loop)
+        if entry is None:
+            client = self._redis_factory()
+            entry = (client, client.register_script(_RESERVE_SCRIPT))
+            self._clients[loop] = entry
+        return entry
+
+    def _record_grant(self, endpoint: Optional[str], token):
+        self._granted.setdefault(endpoint, deque(maxlen=64)).append(token)
+
+    async def _reserve(self, endpoint: Optional[str], max_wait: Optional[float]) -> Optional[Tuple[bool, float]]:
+        """
+        在 Redis 中预约一次调用，预约成功时记录 token 供 release() 退还
+
+        Returns:
+            (是否预约成功, 需要等待的秒数)；Redis 不可用时返回 None
+        """
+        if not self.using_redis:
+            return None
+        keys, args = [], []
+        for key_endpoint, (max_calls, window) in self._limits(endpoint).items():
+            keys.append(self._key(key_endpoint))
+            args.extend([max_calls, int(window * 1000)])
+        max_wait_ms = -1 if max_wait is None else int(max_wait * 1000)
+        token = f"{self._token_prefix}:{next(self._token_seq)}"
+        try:
+            _, script = self._get_client()
+            granted, wait_ms = await asyncio.wait_for(
+                script(keys=keys, args=[max_wait_ms, token, *args]),
+                timeout=settings.RATE_LIMIT_REDIS_TIMEOUT,
+            )
+        except Exception as e:
+            self.redis_errors += 1
+            self._redis_retry_at = time.monotonic() + settings.RATE_LIMIT_REDIS_RETRY_SECONDS
+            self._clients.pop(asyncio.get_running_loop(), None)
+            logger.warning(f"⚠️ {self.name} Redis限流不可用，降级为进程内限流 "
+                           f"({settings.RATE_LIMIT_REDIS_RETRY_SECONDS:.0f}秒后重试): {e}")
+            return None
+        if int(granted):
+            self._record_grant(endpoint, token)
+        return bool(int(granted)), int(wait_ms) / 1000
+
+    def _fallback(self, endpoint: Optional[str]) -> RateLimiter:
+        limiter = self._fallbacks.get(endpoint)
+        if limiter is None:
+            max_calls, window = self._limits(endpoint)[endpoint]
+            divisor = settings.RATE_LIMIT_FALLBACK_DIVISOR if self.backend == "redis" else 1
+            limiter = RateLimiter(max(1, max_calls // divisor), window, name=f"{self.name}[{endpoint or 'local'}]")
+            self._fallbacks[endpoint] = limiter
+        return limiter
+
+    async def acquire(self, endpoint: Optional[str] = None):
+        """
+        获取调用许可，配额已满时按排队顺序等待
+
+        Args:
+            endpoint: 接口名称；已通过 set_endpoint_limit 配置限额时同时占用接口配额
+        """
+        reserved = await self._reserve(endpoint, max_wait=None)
+        if reserved is None:
+            self.fallback_calls += 1
+            token = []
+            for key_endpoint in reversed(list(self._limits(endpoint))):
+                token.append((key_endpoint, await self._fallback(key_endpoint).acquire()))
+            self._record_grant(endpoint, tuple(token))
+            self.total_calls += 1
+            return
+
+        _, wait = reserved
+        self.total_calls += 1
+        if wait > 0:
+            self.total_waits += 1
+            self.total_wait_time += wait
+            logger.debug(f"⏳ {self.name} 达到速率限制，排队等待 {wait:.2f}秒")
+            await asyncio.sleep(wait)
+
+    async def try_acquire(self, endpoint: Optional[str] = None) -> bool:
+        """尝试获取调用许可，不等待；配额已满时返回 False 且不占用配额"""
+        reserved = await self._reserve(endpoint, max_wait=0)
+        if reserved is None:
+            self.fallback_calls += 1
+            return await self._try_acquire_local(endpoint)
+
+        granted, _ = reserved
+        if granted:
+            self.total_calls += 1
+        return granted
+
+    async def _try_acquire_local(self, endpoint: Optional[str]) -> bool:
+        """进程内窗口：所有窗口（接口 + 数据源）都有余量时才同时占用，任一已满则都不占用"""
+        limiters = [(key_endpoint, self._fallback(key_endpoint)) for key_endpoint in reversed(list(self._limits(endpoint)))]
+        async with contextlib.AsyncExitStack() as stack:
+            for _, limiter in limiters:
+                await stack.enter_async_context(limiter.lock)
+            now = time.time()
+            for _, limiter in limiters:
+                limiter._prune(now)
+                if len(limiter.calls) >= limiter.max_calls:
+                    return False
+            for _, limiter in limiters:
+                limiter.calls.append(now)
+                limiter.total_calls += 1
+        self._record_grant(endpoint, tuple((key_endpoint, now) for key_endpoint, _ in limiters))
+        self.total_calls += 1
+        return True
+
+    async def release(self, endpoint: Optional[str] = None) -> bool:
+        """
+        退还本实例最近一次占用的配额（调用失败或未返回数据时，不计入限额）
+
+        Args:
+            endpoint: 与 acquire/try_acquire 时相同的接口名称
+
+        Returns:
+            True: 已退还；False: 没有可退还的配额或 Redis 不可用
+        """
+        granted = self._granted.get(endpoint)
+        if not granted:
+            return False
+        token = granted.pop()
+        if isinstance(token, tuple):
+            # 进程内窗口：只移除本次占用的调用记录（已滑出窗口的无需处理）
+            for key_endpoint, ts in token:
+                with contextlib.suppress(ValueError):
+                    self._fallback(key_endpoint).calls.remove(ts)
+        else:
+            try:
+                client, _ = self._get_client()
+                for key_endpoint in self._limits(endpoint):
+                    await asyncio.wait_for(client.zrem(self._key(key_endpoint), token),
+                                           timeout=settings.RATE_LIMIT_REDIS_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"⚠️ {self.name} 退还配额失败: {e}")
+                return False
+        self.released += 1
+        return True
+
+    def get_stats(self) -> dict:
+        """获取统计信息"""
+        stats = super().get_stats()
+        local = self._fallbacks.get(None)
+        stats.update({
+            "provider": self.provider,
+            "backend": "redis" if self.using_redis else "local",
+            "current_calls": len(local.calls) if local else 0,
+            "redis_errors": self.redis_errors,
+            "fallback_calls": self.fallback_calls,
+            "released": self.released,
+            "endpoint_limits": {
+                endpoint: {"max_calls": max_calls, "time_window": window}
+                for endpoint, (max_calls, window) in self._endpoint_limits.items()
+            },
+        })
+        return stats
+
+
+class TushareRateLimiter(DistributedRateLimiter):
     """
     Tushare专用速率限制器
     
@@ -134,7 +453,8 @@ class TushareRateLimiter(RateLimiter):
         super().__init__(
             max_calls=max_calls,
             time_window=time_window,
-            name=f"TushareRateLimiter({tier})"
+            name=f"TushareRateLimiter({tier})",
+            provider="tushare",
         )
         
         self.tier = tier
@@ -144,7 +464,7 @@ class TushareRateLimiter(RateLimiter):
                    f"{max_calls}次/{time_window}秒 (安全边际: {safety_margin*100:.0f}%)")
 
 
-class AKShareRateLimiter(RateLimiter):
+class AKShareRateLimiter(DistributedRateLimiter):
     """
     AKShare专用速率限制器
     
@@ -162,11 +482,12 @@ class AKShareRateLimiter(RateLimiter):
         super().__init__(
             max_calls=max_calls,
             time_window=time_window,
-            name="AKShareRateLimiter"
+            name="AKShareRateLimiter",
+            provider="akshare",
         )
 
 
-class BaoStockRateLimiter(RateLimiter):
+class BaoStockRateLimiter(DistributedRateLimiter):
     """
     BaoStock专用速率限制器
     
@@ -184,7 +505,8 @@ class BaoStockRateLimiter(RateLimiter):
         super().__init__(
             max_calls=max_calls,
             time_window=time_window,
-            name="BaoStockRateLimiter"
+            name="BaoStockRateLimiter",
+            provider="baostock",
         )
 
 
@@ -90,6 +90,8 @@ class RedisKeys:
     USER_SESSION = "session:{session_id}"
     USER_RATE_LIMIT = "rate_limit:{user_id}:{endpoint}"
     USER_DAILY_QUOTA = "quota:{user_id}:{date}"
+    PROVIDER_RATE_LIMIT = "rate_limit:provider:{provider}"
+    PROVIDER_ENDPOINT_RATE_LIMIT = "rate_limit:provider:{provider}:{endpoint}"
     
     # 系统相关
     QUEUE_STATS = "queue:stats"
@@ -60,6 +60,7 @@ from app.worker.baostock_sync_service import (
     run_baostock_historical_sync,
     run_baostock_status_check
 )
+from app.services.technical_factors_service import run_technical_factors_compute
 # 港股和美股改为按需获取+缓存模式，不再需要定时同步任务
 # from app.worker.hk_sync_service import ...
 # from app.worker.us_sync_service import ...
@@ -526,6 +527,19 @@ async def lifespan(app: FastAPI):
         else:
             logger.info(f"🔍 BaoStock状态检查已配置: {settings.BAOSTOCK_STATUS_CHECK_CRON}")
 
+        # 每日技术因子预计算任务（收盘后，全市场一次性计算）
+        scheduler.add_job(
+            run_technical_factors_compute,
+            CronTrigger.from_crontab(settings.TECHNICAL_FACTORS_CRON, timezone=settings.TIMEZONE),
+            id="technical_factors_compute",
+            name="技术因子预计算"
+        )
+        if not settings.TECHNICAL_FACTORS_ENABLED:
+            scheduler.pause_job("technical_factors_compute")
+            logger.info(f"⏸️ 技术因子预计算已添加但暂停: {settings.TECHNICAL_FACTORS_CRON}")
+        else:
+            logger.info(f"📈 技术因子预计算已配置: {settings.TECHNICAL_FACTORS_CRON}")
+
         # 新闻数据同步任务配置（使用AKShare同步所有股票新闻）
         logger.info("🔄 配置新闻数据同步任务...")
 
@@ -207,10 +207,8 @@ async def _get_last_price(code: str, market: str) -> Optional[float]:
     # A股：从数据库获取
     if market == "CN":
         # 1. 尝试从 market_quotes 获取
-        q = await db["market_quotes"].find_one(
-            {"$or": [{"code": code}, {"symbol": code}]},
-            {"_id": 0, "close": 1}
-        )
+        from app.services.market_data_repository import get_market_data_repository
+        q = await get_market_data_repository().get_quote(code, fields=["close"], match_symbol=True)
         if q and q.get("close") is not None:
             try:
                 price = float(q["close"])
@@ -112,7 +112,8 @@ async def get_quote(
     code6 = normalized_code
 
     # 行情
-    q = await db["market_quotes"].find_one({"code": code6}, {"_id": 0})
+    from app.services.market_data_repository import get_market_data_repository
+    q = await get_market_data_repository().get_quote(code6)
 
     # 🔥 调试日志：查看查询结果
     logger.info(f"🔍 查询 market_quotes: code={code6}")
@@ -322,16 +323,23 @@ async def get_fundamentals(
     except Exception as e:
         logger.error(f"获取财务数据失败: {e}")
 
-    # 3. 获取实时PE/PB（优先使用实时计算）
+    # 3. 获取实时PE/PB（优先使用按行情批次缓存的全市场实时估值）
+    from app.services.realtime_valuation_service import get_realtime_valuation_service
     from tradingagents.dataflows.realtime_metrics import get_pe_pb_with_fallback
     import asyncio
 
-    # 在线程池中执行同步的实时计算
-    realtime_metrics = await asyncio.to_thread(
-        get_pe_pb_with_fallback,
-        code6,
-        db.client
-    )
+    realtime_metrics = None
+    try:
+        realtime_metrics = await get_realtime_valuation_service().get_metric(code6)
+    except Exception as e:
+        logger.warning(f"读取实时估值缓存失败: {e}")
+    if not realtime_metrics:
+        # 在线程池中执行同步的实时计算（含静态PE降级）
+        realtime_metrics = await asyncio.to_thread(
+            get_pe_pb_with_fallback,
+            code6,
+            db.client
+        )
 
     # 4. 构建返回数据
     # 🔥 优先使用实时市值，降级到 stock_basic_info 的静态市值
@@ -425,6 +433,7 @@ async def get_kline(
     limit: int = 120,
     adj: str = "none",
     force_refresh: bool = Query(False, description="是否强制刷新（跳过缓存）"),
+    layout: str = Query("rows", description="返回格式: rows(逐条) / columns(列数组)"),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -433,6 +442,7 @@ async def get_kline(
     period: day/week/month/5m/15m/30m/60m
     adj: none/qfq/hfq
     force_refresh: 是否强制刷新（跳过缓存）
+    layout: columns 时以列数组返回（columns 字段），数据量更小
 
     🔥 新增功能：当天实时K线数据
     - 交易时间内（09:30-15:00）：从 market_quotes 获取实时数据
@@ -497,33 +507,18 @@ async def get_kline(
     today_str_yyyymmdd = now.strftime("%Y%m%d")  # 格式：20251028（用于查询）
     today_str_formatted = now.strftime("%Y-%m-%d")  # 格式：2025-10-28（用于返回）
 
-    # 1. 优先从 MongoDB 缓存获取
+    # 1. 优先从 MongoDB 缓存获取（Motor 异步读取，排序/limit 下推到数据库）
     try:
-        from tradingagents.dataflows.cache.mongodb_cache_adapter import get_mongodb_cache_adapter
-        adapter = get_mongodb_cache_adapter()
-
-        # 计算日期范围
-        end_date = now.strftime("%Y-%m-%d")
-        start_date = (now - timedelta(days=limit * 2)).strftime("%Y-%m-%d")
+        from app.services.market_data_repository import get_market_data_repository, columns_to_items
+        repo = get_market_data_repository()
 
         logger.info(f"🔍 尝试从 MongoDB 获取 K 线数据: {code_padded}, period={period} (MongoDB: {mongodb_period}), limit={limit}")
-        df = adapter.get_historical_data(code_padded, start_date, end_date, period=mongodb_period)
+        bars = await repo.get_bars(code_padded, period=mongodb_period, limit=limit, end_date=now.strftime("%Y-%m-%d"))
 
-        if df is not None and not df.empty:
-            # 转换 DataFrame 为列表格式
-            items = []
-            for _, row in df.tail(limit).iterrows():
-                items.append({
-                    "time": row.get("trade_date", row.get("date", "")),  # 前端期望 time 字段
-                    "open": float(row.get("open", 0)),
-                    "high": float(row.get("high", 0)),
-                    "low": float(row.get("low", 0)),
-                    "close": float(row.get("close", 0)),
-                    "volume": float(row.get("volume", row.get("vol", 0))),
-                    "amount": float(row.get("amount", 0)) if "amount" in row else None,
-                })
+        if bars:
+            items = columns_to_items(bars["columns"])
             source = "mongodb"
-            logger.info(f"✅ 从 MongoDB 获取到 {len(items)} 条 K 线数据")
+            logger.info(f"✅ 从 MongoDB 获取到 {len(items)} 条 K 线数据 (数据源: {bars['source']})")
     except Exception as e:
         logger.warning(f"⚠️ MongoDB 获取 K 线失败: {e}")
 
@@ -576,11 +571,12 @@ async def get_kline(
             if should_fetch_realtime:
                 logger.info(f"🔥 尝试从 market_quotes 获取当天实时数据: {code_padded} (交易时间: {is_trading_time}, 已有当天数据: {has_today_data})")
 
-                db = get_mongo_db()
-                market_quotes_coll = db["market_quotes"]
+                from app.services.market_data_repository import get_market_data_repository
 
                 # 查询当天的实时行情
-                realtime_quote = await market_quotes_coll.find_one({"code": code_padded})
+                realtime_quote = await get_market_data_repository().get_quote(
+                    code_padded, fields=["open", "high", "low", "close", "volume", "amount"]
+                )
 
                 if realtime_quote:
                     # 🔥 构造当天的K线数据（使用统一的日期格式 YYYY-MM-DD）
@@ -616,8 +612,12 @@ async def get_kline(
         "limit": limit,
         "adj": adj if adj else "none",
         "source": source,
-        "items": items or []
     }
+    if layout == "columns":
+        from app.services.market_data_repository import BAR_COLUMNS
+        data["columns"] = {c: [it.get(c) for it in (items or [])] for c in BAR_COLUMNS}
+    else:
+        data["items"] = items or []
     return ok(data)
 
 
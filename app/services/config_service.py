@@ -39,6 +39,18 @@ class ConfigService:
                 self.db = get_mongo_db()
         return self.db
 
+    async def _notify_config_changed(self, version: Optional[int] = None) -> None:
+        """system_configs 写入后：失效本进程的配置快照，并通过 Redis 广播给其他进程/worker"""
+        from tradingagents.config.config_snapshot import CONFIG_INVALIDATION_CHANNEL, invalidate_config_snapshot
+
+        invalidate_config_snapshot(version)
+        try:
+            from app.core.redis_client import get_redis
+            await get_redis().publish(CONFIG_INVALIDATION_CHANNEL, "" if version is None else str(version))
+        except Exception as e:
+            # 订阅方在 Redis 不可用时按间隔探测配置版本，仍会在短时间内生效
+            logger.warning(f"⚠️ 广播配置变更失败: {e}")
+
     # ==================== 市场分类管理 ====================
 
     async def get_market_categories(self) -> List[MarketCategory]:
@@ -277,6 +289,7 @@ class ConfigService:
                             }
                         )
                         logger.info(f"✅ [优先级同步] system_configs 版本更新: {version} -> {version + 1}")
+                        await self._notify_config_changed(version + 1)
                     else:
                         logger.warning(f"⚠️ [优先级同步] 未找到匹配的数据源配置: {data_source_name}")
 
@@ -347,6 +360,7 @@ class ConfigService:
                         }
                     )
                     print(f"✅ [优先级同步] 已同步更新 system_configs 集合，新版本: {config_data.get('version', 0) + 1}")
+                    await self._notify_config_changed(config_data.get("version", 0) + 1)
                 else:
                     print(f"⚠️ [优先级同步] 没有找到需要更新的数据源配置")
             else:
@@ -552,6 +566,7 @@ class ConfigService:
 
             insert_result = await config_collection.insert_one(config_dict)
             print(f"📝 新配置ID: {insert_result.inserted_id}")
+            await self._notify_config_changed(config.version)
 
             # 验证保存结果
             saved_config = await config_collection.find_one({"_id": insert_result.inserted_id})
@@ -1335,53 +1350,29 @@ class ConfigService:
                     }
 
             elif ds_type == "baostock":
-                # BaoStock 不需要 API Key，直接测试登录
+                # BaoStock 不需要 API Key，通过进程内共享会话检查（不额外登录/登出，避免打断同步任务的会话）
                 try:
-                    import baostock as bs
-                    # 测试登录
-                    lg = bs.login()
-
-                    if lg.error_code == '0':
-                        # 登录成功，测试获取数据
-                        try:
-                            # 获取交易日历（轻量级测试）
-                            rs = bs.query_trade_dates(start_date="2024-01-01", end_date="2024-01-01")
-
-                            if rs.error_code == '0':
-                                response_time = time.time() - start_time
-                                bs.logout()
-                                return {
-                                    "success": True,
-                                    "message": f"成功连接到 BaoStock 数据源",
-                                    "response_time": response_time,
-                                    "details": {
-                                        "type": ds_type,
-                                        "test_result": "登录成功，获取交易日历成功"
-                                    }
-                                }
-                            else:
-                                bs.logout()
-                                return {
-                                    "success": False,
-                                    "message": f"BaoStock 数据获取失败: {rs.error_msg}",
-                                    "response_time": time.time() - start_time,
-                                    "details": None
-                                }
-                        except Exception as e:
-                            bs.logout()
-                            return {
-                                "success": False,
-                                "message": f"BaoStock 数据获取异常: {str(e)}",
-                                "response_time": time.time() - start_time,
-                                "details": None
-                            }
-                    else:
+                    from tradingagents.dataflows.providers.china.baostock_session import get_baostock_session
+                    session = get_baostock_session()
+                    # 会话被同步任务占用时需要排队，放到线程池中执行，不阻塞事件循环
+                    healthy = await asyncio.get_event_loop().run_in_executor(None, session.health_check)
+
+                    if healthy:
                         return {
-                            "success": False,
-                            "message": f"BaoStock 登录失败: {lg.error_msg}",
+                            "success": True,
+                            "message": f"成功连接到 BaoStock 数据源",
                             "response_time": time.time() - start_time,
-                            "details": None
+                            "details": {
+                                "type": ds_type,
+                                "test_result": "会话可用，获取交易日历成功"
+                            }
                         }
+                    return {
+                        "success": False,
+                        "message": f"BaoStock 连接失败: {session.last_error}",
+                        "response_time": time.time() - start_time,
+                        "details": None
+                    }
                 except ImportError:
                     return {
                         "success": False,
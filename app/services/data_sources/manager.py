@@ -10,6 +10,7 @@ from .base import DataSourceAdapter
 from .tushare_adapter import TushareAdapter
 from .akshare_adapter import AKShareAdapter
 from .baostock_adapter import BaoStockAdapter
+from tradingagents.dataflows.hedged_fetch import HedgedFetcher
 
 logger = logging.getLogger(__name__)
 
@@ -280,17 +281,28 @@ class DataSourceManager:
 
 
     def get_kline_with_fallback(self, code: str, period: str = "day", limit: int = 120, adj: Optional[str] = None) -> Tuple[Optional[List[Dict]], Optional[str]]:
-        """按优先级尝试获取K线，返回(items, source)"""
-        available_adapters = self.get_available_adapters()
-        for adapter in available_adapters:
-            try:
-                logger.info(f"Trying to fetch kline from {adapter.name}")
-                items = adapter.get_kline(code=code, period=period, limit=limit, adj=adj)
-                if items:
-                    return items, adapter.name
-            except Exception as e:
-                logger.error(f"Failed to fetch kline from {adapter.name}: {e}")
-                continue
+        """
+        按优先级获取K线，返回(items, source)
+
+        高优先级数据源失败时立即尝试下一个；超过其 p95 延迟仍未返回时投机启动下一个，先返回数据者胜出。
+        连续失败的数据源会被熔断跳过（统计与 tradingagents 的数据源管理器共享）。
+        """
+        adapters = {adapter.name: adapter for adapter in self.get_available_adapters()}
+        if not adapters:
+            return None, None
+
+        def fetch(name: str):
+            logger.info(f"Trying to fetch kline from {name}")
+            return adapters[name].get_kline(code=code, period=period, limit=limit, adj=adj)
+
+        fetcher = HedgedFetcher()
+        outcome = fetcher.fetch(list(adapters), fetch, market="a_shares", label=f"kline {code} {period}",
+                                timeout=fetcher.default_timeout)
+        for attempt in outcome.attempts:
+            if attempt["status"] == "error":
+                logger.error(f"Failed to fetch kline from {attempt['source']}: {attempt.get('error')}")
+        if outcome.ok:
+            return outcome.result, outcome.source
         return None, None
 
     def get_news_with_fallback(self, code: str, days: int = 2, limit: int = 50, include_announcements: bool = True) -> Tuple[Optional[List[Dict]], Optional[str]]:
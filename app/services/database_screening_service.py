@@ -7,7 +7,11 @@ import logging
 from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
+import numpy as np
+
 from app.core.database import get_mongo_db
+from app.services.screening.panel_engine import order_indices
+from app.services.technical_factors_service import TECHNICAL_FACTOR_FIELDS, get_technical_factors_service
 # from app.models.screening import ScreeningCondition  # 避免循环导入
 
 logger = logging.getLogger(__name__)
@@ -52,6 +56,9 @@ class DatabaseScreeningService:
             "close": "close",                  # 收盘价
             "volume": "volume",                # 成交量
         }
+
+        # 技术指标字段（来自收盘后预计算的 stock_technical_factors）
+        self.technical_fields = {f: f for f in TECHNICAL_FACTOR_FIELDS}
         
         # 支持的操作符
         self.operators = {
@@ -82,7 +89,7 @@ class DatabaseScreeningService:
             operator = condition.get("operator") if isinstance(condition, dict) else condition.operator
             
             # 检查字段是否支持
-            if field not in self.basic_fields:
+            if field not in self.basic_fields and field not in self.technical_fields:
                 logger.debug(f"字段 {field} 不支持数据库筛选")
                 return False
             
@@ -90,8 +97,30 @@ class DatabaseScreeningService:
             if operator not in self.operators:
                 logger.debug(f"操作符 {operator} 不支持数据库筛选")
                 return False
-        
+
+        # 技术指标条件依赖预计算的因子表
+        _, tech_conditions = self._split_technical_conditions(conditions)
+        if tech_conditions:
+            latest = await get_technical_factors_service().get_latest_trade_date()
+            if not latest:
+                logger.debug("技术因子表暂无数据，技术指标条件不支持数据库筛选")
+                return False
+
         return True
+
+    def _split_technical_conditions(
+        self, conditions: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """分离视图字段条件与技术指标条件"""
+        view_conditions = []
+        tech_conditions = []
+        for condition in conditions:
+            field = condition.get("field") if isinstance(condition, dict) else condition.field
+            if field in self.technical_fields and field not in self.basic_fields:
+                tech_conditions.append(condition)
+            else:
+                view_conditions.append(condition)
+        return view_conditions, tech_conditions
     
     async def screen_stocks(
         self,
@@ -144,37 +173,61 @@ class DatabaseScreeningService:
                 logger.info(f"✅ [database_screening] 最终使用的数据源: {source}")
 
             # 构建查询条件（现在视图已包含实时行情数据，可以直接查询所有字段）
-            query = await self._build_query(conditions)
+            view_conditions, tech_conditions = self._split_technical_conditions(conditions)
+            query = await self._build_query(view_conditions)
 
             # 🔥 添加数据源筛选
             query["source"] = source
 
-            logger.info(f"📋 数据库查询条件: {query}")
+            # 技术指标条件：先在因子表上用索引筛出股票代码，再与视图条件合并
+            factors_map: Optional[Dict[str, Dict[str, Any]]] = None
+            if tech_conditions:
+                tech_query = await self._build_query(tech_conditions, field_map=self.technical_fields)
+                factors_map = await get_technical_factors_service().find_factors(tech_query)
+                query["code"] = {"$in": list(factors_map.keys())}
+                logger.info(f"📈 技术因子筛选: 条件={tech_query}, 命中={len(factors_map)}")
 
-            # 构建排序条件
-            sort_conditions = self._build_sort_conditions(order_by)
+            logger.info(f"📋 数据库查询条件: {query}")
 
             # 获取总数
             total_count = await collection.count_documents(query)
 
-            # 执行查询
-            cursor = collection.find(query)
+            sort_by_technical = any(
+                o.get("field") in self.technical_fields and o.get("field") not in self.basic_fields
+                for o in (order_by or [])
+            )
+            if sort_by_technical:
+                # 按技术指标排序：取全部命中记录，合并因子后在内存中排序分页
+                results = [self._format_result(doc) async for doc in collection.find(query)]
+                await self._attach_technical_factors(results, factors_map)
+                columns = {
+                    o["field"]: np.array(
+                        [r.get(o["field"]) if r.get(o["field"]) is not None else np.nan for r in results],
+                        dtype=float,
+                    )
+                    for o in order_by if o.get("field")
+                }
+                idx = order_indices(columns, order_by, len(results))
+                results = [results[i] for i in idx[offset:offset + limit]]
+            else:
+                # 构建排序条件
+                sort_conditions = self._build_sort_conditions(order_by)
+
+                # 执行查询
+                cursor = collection.find(query)
 
-            # 应用排序
-            if sort_conditions:
-                cursor = cursor.sort(sort_conditions)
+                # 应用排序
+                if sort_conditions:
+                    cursor = cursor.sort(sort_conditions)
 
-            # 应用分页
-            cursor = cursor.skip(offset).limit(limit)
+                # 应用分页
+                cursor = cursor.skip(offset).limit(limit)
 
-            # 获取结果
-            results = []
-            codes = []
-            async for doc in cursor:
-                # 转换结果格式
-                result = self._format_result(doc)
-                results.append(result)
-                codes.append(doc.get("code"))
+                # 获取结果（转换结果格式）
+                results = [self._format_result(doc) async for doc in cursor]
+                await self._attach_technical_factors(results, factors_map)
+
+            codes = [r.get("code") for r in results]
 
             # 批量查询财务数据（ROE等）- 如果视图中没有包含
             if codes:
@@ -188,9 +241,39 @@ class DatabaseScreeningService:
             logger.error(f"❌ 数据库筛选失败: {e}")
             raise Exception(f"数据库筛选失败: {str(e)}")
     
-    async def _build_query(self, conditions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def _attach_technical_factors(
+        self,
+        results: List[Dict[str, Any]],
+        factors_map: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> None:
+        """
+        将最新交易日的技术因子填充到结果中
+
+        Args:
+            results: 筛选结果列表
+            factors_map: 已查询到的因子 {code: {field: value}}，None 时按结果代码查询
+        """
+        if not results:
+            return
+        try:
+            if factors_map is None:
+                codes = [r.get("code") for r in results if r.get("code")]
+                factors_map = await get_technical_factors_service().find_factors({"code": {"$in": codes}})
+            for result in results:
+                factors = factors_map.get(result.get("code"))
+                if factors:
+                    result.update({k: v for k, v in factors.items() if v is not None})
+        except Exception as e:
+            logger.warning(f"⚠️ 填充技术因子失败: {e}")
+
+    async def _build_query(
+        self,
+        conditions: List[Dict[str, Any]],
+        field_map: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
         """构建MongoDB查询条件"""
         query = {}
+        field_map = field_map if field_map is not None else self.basic_fields
 
         for condition in conditions:
             field = condition.get("field") if isinstance(condition, dict) else condition.field
@@ -200,9 +283,9 @@ class DatabaseScreeningService:
             logger.info(f"🔍 [_build_query] 处理条件: field={field}, operator={operator}, value={value}")
 
             # 映射字段名
-            db_field = self.basic_fields.get(field)
+            db_field = field_map.get(field)
             if not db_field:
-                logger.warning(f"⚠️ [_build_query] 字段 {field} 不在 basic_fields 映射中，跳过")
+                logger.warning(f"⚠️ [_build_query] 字段 {field} 不在字段映射中，跳过")
                 continue
 
             logger.info(f"✅ [_build_query] 字段映射: {field} -> {db_field}")
@@ -369,7 +452,7 @@ class DatabaseScreeningService:
             "high": doc.get("high"),                # 最高价
             "low": doc.get("low"),                  # 最低价
 
-            # 技术指标（基础信息筛选时为None）
+            # 技术指标（由 _attach_technical_factors 从因子表填充）
             "ma20": None,
             "rsi14": None,
             "kdj_k": None,
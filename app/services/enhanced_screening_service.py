@@ -11,6 +11,7 @@ from datetime import datetime
 from app.models.screening import ScreeningCondition, FieldType, BASIC_FIELDS_INFO
 from app.services.database_screening_service import get_database_screening_service
 from app.services.screening_service import ScreeningService, ScreeningParams
+from app.services.realtime_valuation_service import get_realtime_valuation_service
 
 logger = logging.getLogger(__name__)
 
@@ -64,10 +65,13 @@ class EnhancedScreeningService:
             # 分析筛选条件
             analysis = self._analyze_conditions(conditions)
 
-            # 决定使用哪种筛选方式
-            if (use_database_optimization and
-                analysis["can_use_database"] and
-                not analysis["needs_technical_indicators"]):
+            # 决定使用哪种筛选方式（技术指标条件在因子表可用时同样走数据库）
+            use_database = use_database_optimization and analysis["can_use_database"]
+            if use_database and analysis["needs_technical_indicators"]:
+                use_database = await self.db_service.can_handle_conditions(conditions)
+            analysis["technical_factors_used"] = use_database and analysis["needs_technical_indicators"]
+
+            if use_database:
 
                 # 使用数据库优化筛选
                 result = await self._screen_with_database(
@@ -211,7 +215,11 @@ class EnhancedScreeningService:
 
     async def _enrich_results_with_realtime_metrics(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        为筛选结果添加PE/PB（使用静态数据，避免性能问题）
+        为筛选结果添加实时PE/PB和实时市值
+
+        全市场估值按行情入库批次批量计算并缓存（RealtimeValuationService），这里只按代码取结果。
+        筛选条件作用于 stock_basic_info 的静态字段，pe/pe_ttm/pb/total_mv 保持静态值与筛选口径一致，
+        实时值写入 pe_realtime/pe_ttm_realtime/pb_realtime/total_mv_realtime。
 
         Args:
             items: 筛选结果列表
@@ -219,15 +227,21 @@ class EnhancedScreeningService:
         Returns:
             List[Dict]: 富集后的结果列表
         """
-        # 🔥 股票筛选场景：直接使用 stock_basic_info 中的静态 PE/PB
-        # 原因：批量计算动态 PE 会导致严重的性能问题（每个股票都要查询多个集合）
-        # 静态 PE 基于最近一个交易日的收盘价，对于筛选场景已经足够准确
-
-        logger.info(f"📊 [筛选结果富集] 使用静态PE/PB（避免性能问题），共 {len(items)} 只股票")
-
-        # 注意：items 中的 PE/PB 已经来自 stock_basic_info，这里不需要额外处理
-        # 如果未来需要实时 PE，可以在单个股票详情页面单独计算
+        codes = [str(it.get("code")).zfill(6) for it in items if it.get("code")]
+        if not codes:
+            return items
+
+        metrics_map = await get_realtime_valuation_service().get_metrics(codes)
+        for it in items:
+            metrics = metrics_map.get(str(it.get("code")).zfill(6))
+            if not metrics:
+                continue
+            for field, key in (("pe", "pe"), ("pe_ttm", "pe_ttm"), ("pb", "pb"), ("total_mv", "market_cap")):
+                if metrics.get(key) is not None:
+                    it[f"{field}_realtime"] = metrics[key]
+            it["pe_is_realtime"] = metrics.get("is_realtime", False)
 
+        logger.info(f"📊 [筛选结果富集] 实时PE/PB {len(metrics_map)}/{len(items)} 只股票")
         return items
 
     async def get_field_info(self, field: str) -> Optional[Dict[str, Any]]:
@@ -9,6 +9,7 @@ from bson import ObjectId
 from app.core.database import get_mongo_db
 from app.models.user import FavoriteStock
 from app.services.quotes_service import get_quotes_service
+from app.services.market_data_repository import get_market_data_repository
 
 
 class FavoritesService:
@@ -122,10 +123,7 @@ class FavoritesService:
         # 批量获取行情（优先使用入库的 market_quotes，30秒更新）
         if codes:
             try:
-                coll = db["market_quotes"]
-                cursor = coll.find({"code": {"$in": codes}}, {"code": 1, "close": 1, "pct_chg": 1, "amount": 1})
-                docs = await cursor.to_list(length=None)
-                quotes_map = {str(d.get("code")).zfill(6): d for d in (docs or [])}
+                quotes_map = await get_market_data_repository().get_quotes(codes, fields=["close", "pct_chg", "amount"])
                 for it in items:
                     code = it.get("stock_code")
                     q = quotes_map.get(code)
@@ -0,0 +1,182 @@
+"""
+历史K线分桶存储
+
+stock_daily_quotes 按 (symbol, trade_date, data_source, period) 每行一个文档，
+读取一只股票 10 年日线需要扫描约 2500 个文档和索引项。
+
+分桶布局把同一 (symbol, data_source, period) 的一年数据打包成一个文档，
+各字段以列数组存储（trade_date/open/high/.../pct_chg 按日期对齐）：
+
+    {
+        "_id": "000001|tushare|daily|2024",
+        "symbol": "000001", "data_source": "tushare", "period": "daily", "year": 2024,
+        "first_date": "2024-01-02", "last_date": "2024-12-31", "count": 242,
+        "columns": {"trade_date": [...], "open": [...], ...}
+    }
+
+10 年历史只需读取 10 个文档。由 HISTORICAL_DATA_LAYOUT 控制是否启用。
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ReplaceOne
+
+logger = logging.getLogger(__name__)
+
+BUCKET_COLLECTION = "stock_daily_quote_buckets"
+
+# 桶级别的公共字段（同一桶内取值相同）
+BUCKET_META_FIELDS = ("symbol", "code", "full_symbol", "market", "data_source", "period")
+# 按日期对齐的列
+BUCKET_CORE_COLUMNS = ("trade_date", "open", "high", "low", "close", "pre_close", "volume", "amount", "change", "pct_chg")
+BUCKET_OPTIONAL_COLUMNS = ("turnover_rate", "volume_ratio", "pe", "pb", "ps", "adjustflag", "tradestatus", "isST")
+BUCKET_COLUMNS = BUCKET_CORE_COLUMNS + BUCKET_OPTIONAL_COLUMNS
+
+LAYOUT_ROWS = "rows"
+LAYOUT_BUCKETS = "buckets"
+LAYOUT_DUAL = "dual"
+
+
+def bucket_id(symbol: str, data_source: str, period: str, year: int) -> str:
+    return f"{symbol}|{data_source}|{period}|{year}"
+
+
+def pack_bucket(meta: Dict[str, Any], year: int, records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """将同一年的逐行记录打包为桶文档（按日期去重，后出现的记录覆盖先前的）"""
+    by_date = {r["trade_date"]: r for r in records}
+    dates = sorted(by_date)
+    columns = {col: [by_date[d].get(col) for d in dates] for col in BUCKET_COLUMNS}
+    # 全空的可选列不存储
+    for col in BUCKET_OPTIONAL_COLUMNS:
+        if all(v is None for v in columns[col]):
+            del columns[col]
+    doc = {field: meta.get(field) for field in BUCKET_META_FIELDS}
+    doc.update({
+        "_id": bucket_id(meta["symbol"], meta["data_source"], meta["period"], year),
+        "year": year,
+        "first_date": dates[0] if dates else None,
+        "last_date": dates[-1] if dates else None,
+        "count": len(dates),
+        "columns": columns,
+        "updated_at": datetime.utcnow(),
+    })
+    return doc
+
+
+def unpack_bucket(bucket: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """桶文档 -> 与逐行布局字段一致的记录列表（按日期升序）"""
+    columns = bucket.get("columns") or {}
+    dates = columns.get("trade_date") or []
+    meta = {field: bucket.get(field) for field in BUCKET_META_FIELDS}
+    records = []
+    for i, trade_date in enumerate(dates):
+        record = dict(meta)
+        record["trade_date"] = trade_date
+        for col in BUCKET_COLUMNS[1:]:
+            values = columns.get(col)
+            value = values[i] if values is not None and i < len(values) else None
+            if value is not None or col in BUCKET_CORE_COLUMNS:
+                record[col] = value
+        record["updated_at"] = bucket.get("updated_at")
+        records.append(record)
+    return records
+
+
+def group_by_year(records: Iterable[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
+    groups: Dict[int, List[Dict[str, Any]]] = {}
+    for record in records:
+        groups.setdefault(int(str(record["trade_date"])[:4]), []).append(record)
+    return groups
+
+
+def split_series_key(record: Dict[str, Any]) -> Tuple[str, str, str]:
+    """逐行记录所属的时间序列 (symbol, data_source, period)"""
+    return record["symbol"], record["data_source"], record["period"]
+
+
+class HistoricalBucketStore:
+    """分桶布局的读写"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_indexes(self):
+        await self.collection.create_index(
+            [("symbol", 1), ("period", 1), ("data_source", 1), ("year", -1)],
+            name="symbol_period_source_year", background=True,
+        )
+
+    async def upsert_records(self, records: List[Dict[str, Any]]) -> int:
+        """
+        合并写入逐行记录（记录需来自同一 symbol/data_source/period）
+
+        只读取并重写受影响年份的桶。
+        """
+        if not records:
+            return 0
+        meta = records[0]
+        groups = group_by_year(records)
+        ids = [bucket_id(meta["symbol"], meta["data_source"], meta["period"], year) for year in groups]
+        existing = {b["year"]: b async for b in self.collection.find({"_id": {"$in": ids}})}
+
+        operations = []
+        for year, new_records in groups.items():
+            merged = unpack_bucket(existing[year]) if year in existing else []
+            doc = pack_bucket(meta, year, merged + new_records)
+            operations.append(ReplaceOne({"_id": doc["_id"]}, doc, upsert=True))
+        await self.collection.bulk_write(operations, ordered=False)
+        return len(records)
+
+    def _query(self, symbol: str, start_date: Optional[str], end_date: Optional[str],
+               data_source: Optional[str], period: Optional[str]) -> Dict[str, Any]:
+        query: Dict[str, Any] = {"symbol": symbol}
+        if data_source:
+            query["data_source"] = data_source
+        if period:
+            query["period"] = period
+        years = {}
+        if start_date:
+            years["$gte"] = int(start_date[:4])
+        if end_date:
+            years["$lte"] = int(end_date[:4])
+        if years:
+            query["year"] = years
+        return query
+
+    async def find(self, symbol: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                   data_source: Optional[str] = None, period: Optional[str] = None,
+                   limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """按日期倒序返回记录；有 limit 时读够即停止"""
+        cursor = self.collection.find(self._query(symbol, start_date, end_date, data_source, period)).sort("year", -1)
+        results: List[Dict[str, Any]] = []
+        current_year: Optional[int] = None
+        year_rows: List[Dict[str, Any]] = []
+
+        def flush():
+            year_rows.sort(key=lambda r: r["trade_date"], reverse=True)
+            results.extend(year_rows)
+            year_rows.clear()
+
+        async for bucket in cursor:
+            if current_year is not None and bucket["year"] != current_year:
+                flush()
+                if limit and len(results) >= limit:
+                    break
+            current_year = bucket["year"]
+            for record in unpack_bucket(bucket):
+                if start_date and record["trade_date"] < start_date:
+                    continue
+                if end_date and record["trade_date"] > end_date:
+                    continue
+                year_rows.append(record)
+        flush()
+        return results[:limit] if limit else results
+
+    async def latest_date(self, symbol: str, data_source: str) -> Optional[str]:
+        bucket = await self.collection.find_one(
+            {"symbol": symbol, "data_source": data_source},
+            {"last_date": 1},
+            sort=[("year", -1), ("last_date", -1)],
+        )
+        return bucket.get("last_date") if bucket else None
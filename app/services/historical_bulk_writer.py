@@ -0,0 +1,176 @@
+"""
+历史K线列式转换与批量写入
+
+save_historical_data 原先对每行 iterrows + _standardize_record，
+全市场初始化时大部分时间花在 Python 逐行转换上。这里改为：
+- 单位换算、日期标准化、涨跌计算等在整列上完成（pandas/NumPy 向量化）
+- 由列数组直接拼出文档和 UpdateOne 操作（不再构造 pd.Series）
+- 新股票（库中没有该序列）直接 insert_many
+- 批大小按实际写入耗时自适应
+"""
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# 文档字段 -> DataFrame 中的候选列名（按优先级）
+PRICE_FIELDS = {
+    "open": ("open",),
+    "high": ("high",),
+    "low": ("low",),
+    "close": ("close",),
+    "pre_close": ("pre_close", "preclose"),
+    "volume": ("volume", "vol"),
+    "amount": ("amount", "turnover"),
+}
+OPTIONAL_FIELDS = {
+    "turnover_rate": ("turnover_rate", "turn"),
+    "volume_ratio": ("volume_ratio",),
+    "pe": ("pe",),
+    "pb": ("pb",),
+    "ps": ("ps",),
+    "adjustflag": ("adjustflag", "adj_factor"),
+    "tradestatus": ("tradestatus",),
+    "isST": ("isST",),
+}
+SERIES_KEY_FIELDS = ("symbol", "trade_date", "data_source", "period")
+
+
+def _numeric(data: pd.DataFrame, names: Sequence[str]) -> Optional[pd.Series]:
+    """按候选列名取数值列，前一列缺失的值用后一列补齐；都不存在时返回 None"""
+    result = None
+    for name in names:
+        if name not in data.columns:
+            continue
+        col = pd.to_numeric(data[name], errors="coerce")
+        result = col if result is None else result.fillna(col)
+    return result
+
+
+def _to_list(values: Optional[pd.Series], length: int) -> List[Optional[float]]:
+    """数值列 -> Python 列表，NaN 转为 None"""
+    if values is None:
+        return [None] * length
+    arr = values.to_numpy(dtype=float, na_value=np.nan)
+    return np.where(np.isnan(arr), None, arr).tolist()
+
+
+def _format_date_value(value) -> str:
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return datetime.now().strftime('%Y-%m-%d')
+    if isinstance(value, str):
+        return f"{value[:4]}-{value[4:6]}-{value[6:8]}" if len(value) == 8 else value
+    if isinstance(value, (date, datetime)):
+        return value.strftime('%Y-%m-%d')
+    return str(value)
+
+
+def normalize_trade_dates(data: pd.DataFrame) -> List[str]:
+    """整列标准化交易日期为 YYYY-MM-DD；优先 date/trade_date 列，其次日期索引"""
+    source = None
+    for name in ("date", "trade_date"):
+        if name in data.columns:
+            source = data[name] if source is None else source.fillna(data[name])
+    if source is None:
+        if isinstance(data.index, pd.DatetimeIndex):
+            return data.index.strftime('%Y-%m-%d').tolist()
+        return [datetime.now().strftime('%Y-%m-%d')] * len(data)
+
+    if pd.api.types.is_datetime64_any_dtype(source):
+        return source.dt.strftime('%Y-%m-%d').tolist()
+    if pd.api.types.infer_dtype(source, skipna=False) == "string":
+        compact = source.str.len() == 8
+        if compact.any():
+            source = source.where(~compact, source.str[:4] + "-" + source.str[4:6] + "-" + source.str[6:8])
+        return source.tolist()
+    return [_format_date_value(v) for v in source.tolist()]
+
+
+def frame_to_columns(data: pd.DataFrame, data_source: str, market: str) -> Dict[str, List[Any]]:
+    """
+    DataFrame -> 按文档字段组织的列数组（不修改传入的 DataFrame）
+
+    与 HistoricalDataService._standardize_record 的字段一致：
+    tushare 的成交额(千元)/成交量(手)换算为元/股，港美股缺失 pre_close 时用前一日收盘价，
+    close/pre_close 都有效时重新计算涨跌额和涨跌幅。
+    """
+    n = len(data)
+    values = {field: _numeric(data, names) for field, names in PRICE_FIELDS.items()}
+
+    if data_source == "tushare":
+        if values["amount"] is not None:
+            values["amount"] = values["amount"] * 1000
+        if values["volume"] is not None:
+            values["volume"] = values["volume"] * 100
+
+    if market in ("HK", "US") and values["pre_close"] is None and values["close"] is not None:
+        values["pre_close"] = values["close"].shift(1)
+
+    close, pre_close = values["close"], values["pre_close"]
+    change = _numeric(data, ("change",))
+    pct_chg = _numeric(data, ("pct_chg", "change_percent"))
+    if close is not None and pre_close is not None:
+        valid = close.notna() & pre_close.notna() & (close != 0) & (pre_close != 0)
+        computed = (close - pre_close).round(4)
+        change = computed.where(valid, change if change is not None else np.nan)
+        pct = (computed / pre_close * 100).round(4)
+        pct_chg = pct.where(valid, pct_chg if pct_chg is not None else np.nan)
+    values["change"] = change
+    values["pct_chg"] = pct_chg
+
+    columns: Dict[str, List[Any]] = {"trade_date": normalize_trade_dates(data)}
+    for field, series in values.items():
+        columns[field] = _to_list(series, n)
+    # 可选字段：只有 DataFrame 中存在对应列时才写入
+    for field, names in OPTIONAL_FIELDS.items():
+        series = _numeric(data, names)
+        if series is not None:
+            columns[field] = _to_list(series, n)
+    return columns
+
+
+def columns_to_documents(columns: Dict[str, List[Any]], meta: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """列数组 + 公共字段 -> 文档列表"""
+    keys = list(columns)
+    return [{**meta, **dict(zip(keys, row))} for row in zip(*(columns[k] for k in keys))]
+
+
+def build_upsert_operations(documents: List[Dict[str, Any]]) -> List[UpdateOne]:
+    """按 (symbol, trade_date, data_source, period) upsert；created_at 只在新增时写入"""
+    operations = []
+    for doc in documents:
+        fields = dict(doc)
+        created_at = fields.pop("created_at", None)
+        operations.append(UpdateOne(
+            {key: doc[key] for key in SERIES_KEY_FIELDS},
+            {"$set": fields, "$setOnInsert": {"created_at": created_at}},
+            upsert=True,
+        ))
+    return operations
+
+
+class AdaptiveBatchSizer:
+    """
+    按观测到的写入耗时调整批大小
+
+    单批耗时低于目标一半时放大 1.5 倍，超过目标 1.5 倍或写入失败时减半。
+    """
+
+    def __init__(self, initial: int = 500, min_size: int = 100, max_size: int = 5000,
+                 target_seconds: float = 1.0):
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size)
+        self.target_seconds = target_seconds
+        self.size = min(max(initial, self.min_size), self.max_size)
+
+    def observe(self, count: int, seconds: float, ok: bool = True) -> int:
+        if not ok or seconds > self.target_seconds * 1.5:
+            self.size = max(self.min_size, self.size // 2)
+        elif count >= self.size and seconds < self.target_seconds / 2:
+            self.size = min(self.max_size, int(self.size * 1.5))
+        return self.size
@@ -5,12 +5,20 @@
 """
 import asyncio
 import logging
+import time
 from datetime import datetime, date
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
 import pandas as pd
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError
 
 from app.core.database import get_database
+from app.services.historical_buckets import (
+    BUCKET_COLLECTION, LAYOUT_BUCKETS, LAYOUT_DUAL, LAYOUT_ROWS, HistoricalBucketStore,
+)
+from app.services.historical_bulk_writer import (
+    AdaptiveBatchSizer, build_upsert_operations, columns_to_documents, frame_to_columns,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,11 +26,43 @@ logger = logging.getLogger(__name__)
 class HistoricalDataService:
     """统一历史数据管理服务"""
     
-    def __init__(self):
-        """初始化服务"""
+    def __init__(self, layout: Optional[str] = None):
+        """
+        初始化服务
+
+        Args:
+            layout: 存储布局 rows/buckets/dual，默认读取 HISTORICAL_DATA_LAYOUT
+        """
         self.db = None
         self.collection = None
-        
+        self.bucket_store: Optional[HistoricalBucketStore] = None
+        from app.core.config import settings
+        if layout is None:
+            layout = getattr(settings, "HISTORICAL_DATA_LAYOUT", LAYOUT_ROWS)
+        self.layout = (layout or LAYOUT_ROWS).lower()
+
+        # 批量写入：批大小随写入耗时自适应，在途写入数受限
+        self.batch_sizer = AdaptiveBatchSizer(
+            min_size=settings.HISTORICAL_WRITE_BATCH_MIN,
+            max_size=settings.HISTORICAL_WRITE_BATCH_MAX,
+            target_seconds=settings.HISTORICAL_WRITE_TARGET_SECONDS,
+        )
+        self.write_concurrency = settings.HISTORICAL_WRITE_CONCURRENCY
+        self._write_slots: Optional[asyncio.Semaphore] = None
+
+    @property
+    def writes_rows(self) -> bool:
+        return self.layout in (LAYOUT_ROWS, LAYOUT_DUAL)
+
+    @property
+    def uses_buckets(self) -> bool:
+        return self.layout in (LAYOUT_BUCKETS, LAYOUT_DUAL)
+
+    @property
+    def reads_buckets(self) -> bool:
+        # dual 为迁移过渡期：双写，读取仍走逐行布局
+        return self.layout == LAYOUT_BUCKETS
+
     async def initialize(self):
         """初始化数据库连接"""
         try:
@@ -32,6 +72,11 @@ class HistoricalDataService:
             # 🔥 确保索引存在（提升查询和 upsert 性能）
             await self._ensure_indexes()
 
+            if self.uses_buckets:
+                self.bucket_store = HistoricalBucketStore(self.db[BUCKET_COLLECTION])
+                await self.bucket_store.ensure_indexes()
+                logger.info(f"📦 历史数据存储布局: {self.layout}")
+
             logger.info("✅ 历史数据服务初始化成功")
         except Exception as e:
             logger.error(f"❌ 历史数据服务初始化失败: {e}")
@@ -96,93 +141,43 @@ class HistoricalDataService:
                 logger.warning(f"⚠️ {symbol} 历史数据为空，跳过保存")
                 return 0
 
-            from datetime import datetime
-            total_start = datetime.now()
+            total_start = time.perf_counter()
 
             logger.info(f"💾 开始保存 {symbol} 历史数据: {len(data)}条记录 (数据源: {data_source})")
 
-            # ⏱️ 性能监控：单位转换
-            convert_start = datetime.now()
-            # 🔥 在 DataFrame 层面做单位转换（向量化操作，比逐行快得多）
-            if data_source == "tushare":
-                # 成交额：千元 -> 元
-                if 'amount' in data.columns:
-                    data['amount'] = data['amount'] * 1000
-                elif 'turnover' in data.columns:
-                    data['turnover'] = data['turnover'] * 1000
-
-                # 成交量：手 -> 股
-                if 'volume' in data.columns:
-                    data['volume'] = data['volume'] * 100
-                elif 'vol' in data.columns:
-                    data['vol'] = data['vol'] * 100
-
-            # 🔥 港股/美股数据：添加 pre_close 字段（从前一天的 close 获取）
-            if market in ["HK", "US"] and 'pre_close' not in data.columns and 'close' in data.columns:
-                # 使用 shift(1) 将 close 列向下移动一行，得到前一天的收盘价
-                data['pre_close'] = data['close'].shift(1)
-                logger.debug(f"✅ {symbol} 添加 pre_close 字段（从前一天的 close 获取）")
-
-            convert_duration = (datetime.now() - convert_start).total_seconds()
-
-            # ⏱️ 性能监控：构建操作列表
-            prepare_start = datetime.now()
-            # 准备批量操作
-            operations = []
+            # ⏱️ 性能监控：列式转换（单位换算、日期标准化、涨跌计算都在整列上完成）
+            convert_start = time.perf_counter()
+            now = datetime.utcnow()
+            columns = frame_to_columns(data, data_source, market)
+            documents = columns_to_documents(columns, {
+                "symbol": symbol,
+                "code": symbol,  # 添加 code 字段，与 symbol 保持一致（向后兼容）
+                "full_symbol": self._get_full_symbol(symbol, market),
+                "market": market,
+                "period": period,
+                "data_source": data_source,
+                "created_at": now,
+                "updated_at": now,
+                "version": 1,
+            })
+            convert_duration = time.perf_counter() - convert_start
+
+            # ⏱️ 性能监控：写入
+            write_start = time.perf_counter()
             saved_count = 0
-            batch_size = 200  # 进一步减小批量大小，避免超时（从500改为200）
-
-            for date_index, row in data.iterrows():
-                try:
-                    # 标准化数据（传递日期索引）
-                    doc = self._standardize_record(symbol, row, data_source, market, period, date_index)
-
-                    # 创建upsert操作
-                    filter_doc = {
-                        "symbol": doc["symbol"],
-                        "trade_date": doc["trade_date"],
-                        "data_source": doc["data_source"],
-                        "period": doc["period"]
-                    }
-
-                    from pymongo import ReplaceOne
-                    operations.append(ReplaceOne(
-                        filter=filter_doc,
-                        replacement=doc,
-                        upsert=True
-                    ))
-
-                    # 批量执行（每200条）
-                    if len(operations) >= batch_size:
-                        batch_write_start = datetime.now()
-                        batch_saved = await self._execute_bulk_write_with_retry(symbol, operations)
-                        batch_write_duration = (datetime.now() - batch_write_start).total_seconds()
-                        logger.debug(f"   批量写入 {len(operations)} 条，耗时 {batch_write_duration:.2f}秒")
-                        saved_count += batch_saved
-                        operations = []
-
-                except Exception as e:
-                    # 获取日期信息用于错误日志
-                    date_str = str(date_index) if hasattr(date_index, '__str__') else 'unknown'
-                    logger.error(f"❌ 处理记录失败 {symbol} {date_str}: {e}")
-                    continue
-
-            prepare_duration = (datetime.now() - prepare_start).total_seconds()
-
-            # ⏱️ 性能监控：最后一批写入
-            final_write_start = datetime.now()
-            # 执行剩余操作
-            if operations:
-                saved_count += await self._execute_bulk_write_with_retry(
-                    symbol, operations
-                )
-            final_write_duration = (datetime.now() - final_write_start).total_seconds()
-
-            total_duration = (datetime.now() - total_start).total_seconds()
+            if self.writes_rows:
+                saved_count = await self._write_documents(symbol, data_source, period, documents)
+            if self.uses_buckets:
+                bucket_saved = await self.bucket_store.upsert_records(documents)
+                if not self.writes_rows:
+                    saved_count = bucket_saved
+            write_duration = time.perf_counter() - write_start
+
+            total_duration = time.perf_counter() - total_start
             logger.info(
                 f"✅ {symbol} 历史数据保存完成: {saved_count}条记录，"
                 f"总耗时 {total_duration:.2f}秒 "
-                f"(转换: {convert_duration:.3f}秒, 准备: {prepare_duration:.2f}秒, 最后写入: {final_write_duration:.2f}秒)"
+                f"(转换: {convert_duration:.3f}秒, 写入: {write_duration:.2f}秒, 批大小: {self.batch_sizer.size})"
             )
             return saved_count
             
@@ -190,6 +185,151 @@ class HistoricalDataService:
             logger.error(f"❌ 保存历史数据失败 {symbol}: {e}")
             return 0
 
+    async def save_historical_data_many(
+        self,
+        items: Iterable[Tuple[str, pd.DataFrame]],
+        data_source: str,
+        market: str = "CN",
+        period: str = "daily",
+        concurrency: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        批量保存多只股票的历史数据
+
+        多只股票并发处理：一只股票在做列式转换时，其他股票的批次可以同时写入；
+        实际在途的 bulk_write 数量受 HISTORICAL_WRITE_CONCURRENCY 限制。
+
+        Returns:
+            {股票代码: 保存的记录数量}
+        """
+        sem = asyncio.Semaphore(concurrency or self.write_concurrency * 2)
+        results: Dict[str, int] = {}
+
+        async def save_one(symbol: str, df: pd.DataFrame):
+            async with sem:
+                results[symbol] = await self.save_historical_data(symbol, df, data_source, market, period)
+
+        await asyncio.gather(*(save_one(symbol, df) for symbol, df in items))
+        return results
+
+    async def save_cross_section(
+        self,
+        data: pd.DataFrame,
+        data_source: str,
+        market: str = "CN",
+        period: str = "daily",
+        symbol_column: str = "symbol"
+    ) -> int:
+        """
+        保存截面数据（多只股票、少量交易日，例如按交易日拉取的全市场日线）
+
+        所有股票的记录合并为跨股票的 upsert 批次写入，而不是每只股票一次 bulk_write。
+        data 需要包含 pre_close（不会跨股票做 shift）。
+
+        Returns:
+            保存的记录数量
+        """
+        if self.collection is None:
+            await self.initialize()
+
+        try:
+            if data is None or data.empty:
+                return 0
+
+            start = time.perf_counter()
+            now = datetime.utcnow()
+            symbols = data[symbol_column].astype(str).tolist()
+            full_symbols = {s: self._get_full_symbol(s, market) for s in set(symbols)}
+            columns = {
+                "symbol": symbols,
+                "code": symbols,
+                "full_symbol": [full_symbols[s] for s in symbols],
+                **frame_to_columns(data, data_source, market),
+            }
+            documents = columns_to_documents(columns, {
+                "market": market,
+                "period": period,
+                "data_source": data_source,
+                "created_at": now,
+                "updated_at": now,
+                "version": 1,
+            })
+
+            saved_count = 0
+            if self.writes_rows:
+                saved_count = await self._write_documents(
+                    f"截面({len(full_symbols)}只)", data_source, period, documents, fresh=False
+                )
+            if self.uses_buckets:
+                by_symbol: Dict[str, List[Dict[str, Any]]] = {}
+                for doc in documents:
+                    by_symbol.setdefault(doc["symbol"], []).append(doc)
+                bucket_saved = 0
+                for records in by_symbol.values():
+                    bucket_saved += await self.bucket_store.upsert_records(records)
+                if not self.writes_rows:
+                    saved_count = bucket_saved
+
+            logger.info(
+                f"✅ 截面数据保存完成: {len(full_symbols)}只股票 {saved_count}条记录，"
+                f"耗时 {time.perf_counter() - start:.2f}秒"
+            )
+            return saved_count
+
+        except Exception as e:
+            logger.error(f"❌ 保存截面数据失败: {e}")
+            return 0
+
+    async def _write_documents(self, symbol: str, data_source: str, period: str,
+                               documents: List[Dict[str, Any]], fresh: Optional[bool] = None) -> int:
+        """
+        写入逐行布局
+
+        库中还没有该序列时直接 insert_many（无需逐条匹配唯一索引），
+        否则按自适应批大小发送 UpdateOne upsert。
+        """
+        if fresh is None:
+            fresh = await self.collection.find_one(
+                {"symbol": symbol, "data_source": data_source, "period": period}, {"_id": 1}
+            ) is None
+        saved_count = 0
+        offset = 0
+        while offset < len(documents):
+            batch = documents[offset:offset + self.batch_sizer.size]
+            offset += len(batch)
+            batch_start = time.perf_counter()
+            async with self._get_write_slots():
+                if fresh:
+                    batch_saved = await self._insert_batch(symbol, batch)
+                else:
+                    batch_saved = await self._execute_bulk_write_with_retry(symbol, build_upsert_operations(batch))
+            elapsed = time.perf_counter() - batch_start
+            self.batch_sizer.observe(len(batch), elapsed)
+            logger.debug(f"   批量写入 {len(batch)} 条，耗时 {elapsed:.2f}秒")
+            saved_count += batch_saved
+        return saved_count
+
+    async def _insert_batch(self, symbol: str, documents: List[Dict[str, Any]]) -> int:
+        """新序列直接插入；重复键（并发写入、同日重复记录）或超时时退回幂等的 upsert"""
+        inserted = 0
+        try:
+            result = await self.collection.insert_many(documents, ordered=False)
+            return len(result.inserted_ids)
+        except BulkWriteError as e:
+            inserted = e.details.get("nInserted", 0)
+            logger.debug(f"🔄 {symbol} 插入存在重复键（已插入 {inserted} 条），改用 upsert")
+        except Exception as e:
+            logger.warning(f"⚠️ {symbol} 批量插入失败，改用 upsert: {e}")
+        for doc in documents:
+            doc.pop("_id", None)
+        upserted = await self._execute_bulk_write_with_retry(symbol, build_upsert_operations(documents))
+        return max(upserted, inserted)
+
+    def _get_write_slots(self) -> asyncio.Semaphore:
+        if self._write_slots is None:
+            self._write_slots = asyncio.Semaphore(self.write_concurrency)
+        return self._write_slots
+
     async def _execute_bulk_write_with_retry(
         self,
         symbol: str,
@@ -254,7 +394,7 @@ class HistoricalDataService:
         period: str = "daily",
         date_index = None
     ) -> Dict[str, Any]:
-        """标准化单条记录"""
+        """标准化单条记录（逐行版本；批量保存使用 historical_bulk_writer.frame_to_columns 的列式转换）"""
         now = datetime.utcnow()
 
         # 获取日期 - 优先从列中获取，如果索引是日期类型才使用索引
@@ -397,6 +537,11 @@ class HistoricalDataService:
             await self.initialize()
         
         try:
+            if self.reads_buckets:
+                results = await self.bucket_store.find(symbol, start_date, end_date, data_source, period, limit)
+                logger.info(f"📊 查询历史数据(分桶): {symbol} 返回 {len(results)} 条记录")
+                return results
+
             # 构建查询条件
             query = {"symbol": symbol}
             
@@ -435,6 +580,9 @@ class HistoricalDataService:
             await self.initialize()
         
         try:
+            if self.reads_buckets:
+                return await self.bucket_store.latest_date(symbol, data_source)
+
             result = await self.collection.find_one(
                 {"symbol": symbol, "data_source": data_source},
                 sort=[("trade_date", -1)]
@@ -448,6 +596,31 @@ class HistoricalDataService:
             logger.error(f"❌ 获取最新日期失败 {symbol}: {e}")
             return None
     
+    async def get_latest_dates(self, data_source: str, since: str, period: str = "daily") -> Dict[str, str]:
+        """
+        一次聚合查询获取各股票在 since 之后的最新数据日期
+
+        Returns:
+            {股票代码: 最新日期}；since 之后没有数据的股票不在结果中
+        """
+        if self.collection is None:
+            await self.initialize()
+
+        try:
+            if self.reads_buckets:
+                collection, date_field = self.bucket_store.collection, "last_date"
+            else:
+                collection, date_field = self.collection, "trade_date"
+            pipeline = [
+                {"$match": {"data_source": data_source, "period": period, date_field: {"$gte": since}}},
+                {"$group": {"_id": "$symbol", "last_date": {"$max": f"${date_field}"}}},
+            ]
+            return {doc["_id"]: doc["last_date"] async for doc in collection.aggregate(pipeline)}
+
+        except Exception as e:
+            logger.error(f"❌ 批量获取最新日期失败 {data_source}: {e}")
+            return {}
+
     async def get_data_statistics(self) -> Dict[str, Any]:
         """获取数据统计信息"""
         if self.collection is None:
@@ -0,0 +1,162 @@
+"""
+异步行情读取仓储
+
+K线、行情、模拟交易、自选股等 async 路由统一通过 Motor 读取
+stock_daily_quotes / market_quotes：
+- 投影、排序、limit 都下推到 MongoDB，只传输需要的字段和条数
+- 结果直接组织为列数组（time/open/high/low/close/volume/amount），不经过 DataFrame
+- 不再在事件循环中调用同步 pymongo 适配器
+"""
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.database import get_mongo_db
+
+logger = logging.getLogger(__name__)
+
+DAILY_QUOTES_COLLECTION = "stock_daily_quotes"
+MARKET_QUOTES_COLLECTION = "market_quotes"
+
+BAR_COLUMNS = ("time", "open", "high", "low", "close", "volume", "amount")
+BAR_PROJECTION = {
+    "_id": 0, "trade_date": 1, "date": 1,
+    "open": 1, "high": 1, "low": 1, "close": 1,
+    "volume": 1, "vol": 1, "amount": 1,
+}
+DEFAULT_SOURCE_PRIORITY = ["tushare", "akshare", "baostock"]
+SOURCE_PRIORITY_TTL = 30.0
+
+
+def market_category_of(symbol: str) -> Optional[str]:
+    """股票代码 -> 数据源配置中的市场分类（与 MongoDBCacheAdapter 一致）"""
+    from tradingagents.utils.stock_utils import StockUtils, StockMarket
+    return {
+        StockMarket.CHINA_A: "a_shares",
+        StockMarket.US: "us_stocks",
+        StockMarket.HONG_KONG: "hk_stocks",
+    }.get(StockUtils.identify_stock_market(symbol))
+
+
+def _num(value: Any, default: Optional[float] = 0.0) -> Optional[float]:
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def bars_to_columns(docs: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """按时间升序的K线文档 -> 列数组"""
+    return {
+        "time": [d.get("trade_date", d.get("date", "")) for d in docs],
+        "open": [_num(d.get("open")) for d in docs],
+        "high": [_num(d.get("high")) for d in docs],
+        "low": [_num(d.get("low")) for d in docs],
+        "close": [_num(d.get("close")) for d in docs],
+        "volume": [_num(d.get("volume", d.get("vol"))) for d in docs],
+        "amount": [_num(d.get("amount"), None) for d in docs],
+    }
+
+
+def columns_to_items(columns: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """列数组 -> 前端使用的逐条K线格式"""
+    return [dict(zip(BAR_COLUMNS, row)) for row in zip(*(columns[c] for c in BAR_COLUMNS))]
+
+
+class MarketDataRepository:
+    """基于 Motor 的历史K线与实时行情读取"""
+
+    def __init__(self, db=None):
+        self._db = db
+        # 市场分类 -> (数据源优先级, 读取时间)
+        self._source_priority: Dict[Optional[str], Tuple[List[str], float]] = {}
+
+    @property
+    def db(self):
+        return self._db if self._db is not None else get_mongo_db()
+
+    async def get_source_priority(self, market_category: Optional[str] = None) -> List[str]:
+        """
+        启用且支持该市场的数据源按优先级排序（按市场短时缓存，避免每次请求都读取系统配置）
+
+        Args:
+            market_category: 市场分类（a_shares/us_stocks/hk_stocks）；数据源配置了
+                market_categories 时需包含该分类，不传则不按市场过滤
+        """
+        now = time.monotonic()
+        cached = self._source_priority.get(market_category)
+        if cached is not None and now - cached[1] < SOURCE_PRIORITY_TTL:
+            return cached[0]
+        sources: List[str] = []
+        try:
+            from app.core.unified_config import UnifiedConfigManager
+            configs = await UnifiedConfigManager().get_data_source_configs_async()
+            sources = [
+                ds.type.lower() for ds in configs
+                if ds.enabled and ds.type.lower() in DEFAULT_SOURCE_PRIORITY
+                and (not market_category or not ds.market_categories or market_category in ds.market_categories)
+            ]
+        except Exception as e:
+            logger.warning(f"⚠️ 读取数据源优先级失败，使用默认顺序: {e}")
+        sources = sources or list(DEFAULT_SOURCE_PRIORITY)
+        self._source_priority[market_category] = (sources, now)
+        return sources
+
+    async def get_bars(
+        self,
+        symbol: str,
+        period: str = "daily",
+        limit: int = 120,
+        end_date: Optional[str] = None,
+        sources: Optional[Iterable[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        按数据源优先级读取最近 limit 根K线
+
+        Returns:
+            {"source": 数据源, "columns": {列名: [值...]}}，按时间升序；都没有数据时返回 None
+        """
+        code6 = str(symbol).zfill(6)
+        coll = self.db[DAILY_QUOTES_COLLECTION]
+        for source in (sources or await self.get_source_priority(market_category_of(code6))):
+            query: Dict[str, Any] = {"symbol": code6, "period": period, "data_source": source}
+            if end_date:
+                query["trade_date"] = {"$lte": end_date}
+            cursor = coll.find(query, BAR_PROJECTION).sort("trade_date", -1).limit(int(limit))
+            docs = await cursor.to_list(length=int(limit))
+            if docs:
+                docs.reverse()
+                logger.debug(f"✅ [MongoDB-{source}] {code6} {period} K线 {len(docs)} 条")
+                return {"source": source, "columns": bars_to_columns(docs)}
+        return None
+
+    async def get_quote(self, code: str, fields: Optional[Iterable[str]] = None,
+                        match_symbol: bool = False) -> Optional[Dict[str, Any]]:
+        """读取单只股票的实时行情；fields 为空时返回全部字段"""
+        query = {"$or": [{"code": code}, {"symbol": code}]} if match_symbol else {"code": code}
+        projection = {"_id": 0, **{f: 1 for f in fields}} if fields else {"_id": 0}
+        return await self.db[MARKET_QUOTES_COLLECTION].find_one(query, projection)
+
+    async def get_quotes(self, codes: Iterable[str],
+                         fields: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """批量读取实时行情，返回 {6位代码: 行情}"""
+        codes = list(codes)
+        if not codes:
+            return {}
+        projection = {"_id": 0, "code": 1, **{f: 1 for f in (fields or [])}} if fields else {"_id": 0}
+        cursor = self.db[MARKET_QUOTES_COLLECTION].find({"code": {"$in": codes}}, projection)
+        docs = await cursor.to_list(length=len(codes))
+        return {str(d.get("code")).zfill(6): d for d in docs}
+
+
+_repository: Optional[MarketDataRepository] = None
+
+
+def get_market_data_repository() -> MarketDataRepository:
+    """获取全局行情仓储实例"""
+    global _repository
+    if _repository is None:
+        _repository = MarketDataRepository()
+    return _repository
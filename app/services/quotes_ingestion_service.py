@@ -2,13 +2,14 @@ import logging
 from datetime import datetime, time as dtime, timedelta
 from typing import Dict, Optional, Tuple, List
 from zoneinfo import ZoneInfo
-from collections import deque
 
 from pymongo import UpdateOne
 
 from app.core.config import settings
 from app.core.database import get_mongo_db
+from app.core.rate_limiter import get_tushare_rate_limiter
 from app.services.data_sources.manager import DataSourceManager
+from tradingagents.tools.analysis.streaming_indicators import StreamingIndicators
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +27,6 @@ class QuotesIngestionService:
     """
 
     def __init__(self, collection_name: str = "market_quotes") -> None:
-        from collections import deque
-
         self.collection_name = collection_name
         self.status_collection_name = "quotes_ingestion_status"  # 状态记录集合
         self.tz = ZoneInfo(settings.TIMEZONE)
@@ -35,15 +34,22 @@ class QuotesIngestionService:
         # Tushare 权限检测相关属性
         self._tushare_permission_checked = False  # 是否已检测过权限
         self._tushare_has_premium = False  # 是否有付费权限
-        self._tushare_last_call_time = None  # 上次调用时间（用于免费用户限流）
         self._tushare_hourly_limit = 2  # 免费用户每小时最多调用次数
-        self._tushare_call_count = 0  # 当前小时内调用次数
-        self._tushare_call_times = deque()  # 记录调用时间的队列（用于限流）
+
+        # rt_k 调用计入 Tushare 全局配额（多进程共享），免费用户另有 rt_k 接口每小时限额
+        self._tushare_limiter = get_tushare_rate_limiter(
+            tier=settings.TUSHARE_TIER, safety_margin=settings.TUSHARE_RATE_LIMIT_SAFETY_MARGIN
+        )
+        self._tushare_limiter.set_endpoint_limit("rt_k", self._tushare_hourly_limit, 3600)
 
         # 接口轮换相关属性
         self._rotation_sources = ["tushare", "akshare_eastmoney", "akshare_sina"]
         self._rotation_index = 0  # 当前轮换索引
 
+        # 增量技术指标状态（code -> StreamingIndicators），跨多次 run_once 复用
+        self.indicator_state_collection_name = "stock_indicator_states"
+        self._indicator_states: Dict[str, StreamingIndicators] = {}
+
     @staticmethod
     def _normalize_stock_code(code: str) -> str:
         """
@@ -90,6 +96,7 @@ class QuotesIngestionService:
         try:
             await coll.create_index("code", unique=True)
             await coll.create_index("updated_at")
+            await db[self.indicator_state_collection_name].create_index("code", unique=True)
         except Exception as e:
             logger.warning(f"创建行情表索引失败（忽略）: {e}")
 
@@ -252,28 +259,21 @@ class QuotesIngestionService:
             self._tushare_permission_checked = True
             return False
 
-    def _can_call_tushare(self) -> bool:
+    async def _can_call_tushare(self) -> bool:
         """
-        判断是否可以调用 Tushare rt_k 接口
+        判断是否可以调用 Tushare rt_k 接口，可以调用时占用一次配额
 
         Returns:
             True: 可以调用
             False: 超过限制，不能调用
         """
-        # 如果是付费用户，不限制调用次数
+        # 付费用户不限 rt_k 次数，只受 Tushare 全局配额约束
         if self._tushare_has_premium:
+            await self._tushare_limiter.acquire()
             return True
 
-        # 免费用户：检查每小时调用次数
-        now = datetime.now(self.tz)
-        one_hour_ago = now - timedelta(hours=1)
-
-        # 清理1小时前的记录
-        while self._tushare_call_times and self._tushare_call_times[0] < one_hour_ago:
-            self._tushare_call_times.popleft()
-
-        # 检查是否超过限制
-        if len(self._tushare_call_times) >= self._tushare_hourly_limit:
+        # 免费用户：rt_k 每小时限额由所有进程共享
+        if not await self._tushare_limiter.try_acquire(endpoint="rt_k"):
             logger.warning(
                 f"⚠️ Tushare rt_k 接口已达到每小时调用限制 ({self._tushare_hourly_limit}次)，"
                 f"跳过本次调用，使用 AKShare 备用接口"
@@ -282,9 +282,12 @@ class QuotesIngestionService:
 
         return True
 
-    def _record_tushare_call(self) -> None:
-        """记录 Tushare 调用时间"""
-        self._tushare_call_times.append(datetime.now(self.tz))
+    async def _release_tushare_call(self) -> None:
+        """rt_k 调用失败或返回空数据时退还免费用户的每小时配额（只统计成功的调用）"""
+        if self._tushare_has_premium:
+            return
+        if await self._tushare_limiter.release(endpoint="rt_k"):
+            logger.info("↩️ Tushare rt_k 未获取到数据，已退还本次调用配额")
 
     def _get_next_source(self) -> Tuple[str, Optional[str]]:
         """
@@ -410,6 +413,121 @@ class QuotesIngestionService:
             f"✅ 行情入库完成 source={source}, matched={result.matched_count}, upserted={len(result.upserted_ids) if result.upserted_ids else 0}, modified={result.modified_count}"
         )
 
+    @staticmethod
+    def _to_iso_date(trade_date: str) -> str:
+        """YYYYMMDD / YYYY-MM-DD -> YYYY-MM-DD（与 stock_daily_quotes.trade_date 一致）"""
+        td = str(trade_date).strip()
+        if len(td) == 8 and td.isdigit():
+            return f"{td[:4]}-{td[4:6]}-{td[6:]}"
+        return td[:10]
+
+    async def _daily_bars(self, codes: List[str], start: str, end: str) -> Dict[str, Dict[str, Dict]]:
+        """按股票读取 stock_daily_quotes 中 [start, end) 的日K线：{code: {trade_date: bar}}"""
+        daily = get_mongo_db()["stock_daily_quotes"]
+        history: Dict[str, Dict[str, Dict]] = {code: {} for code in codes}
+        cursor = daily.find(
+            {"symbol": {"$in": codes}, "period": "daily", "trade_date": {"$gte": start, "$lt": end}},
+            {"_id": 0, "symbol": 1, "trade_date": 1, "high": 1, "low": 1, "close": 1},
+        )
+        for doc in await cursor.to_list(length=None):
+            # 多数据源重复的交易日只保留一条
+            history.setdefault(doc.get("symbol"), {}).setdefault(doc.get("trade_date"), doc)
+        return history
+
+    async def _load_indicator_states(self, codes: List[str], trade_date: str) -> None:
+        """
+        准备指标状态：
+        - 缺失的先读 stock_indicator_states，仍缺失的再用 stock_daily_quotes 历史K线初始化
+        - 状态停在更早的交易日时（服务停机、采集中断），先用 stock_daily_quotes 补齐中间的日K线；
+          落后超过初始化窗口的直接重新初始化
+        """
+        missing = [c for c in codes if c not in self._indicator_states]
+        if missing:
+            state_coll = get_mongo_db()[self.indicator_state_collection_name]
+            cursor = state_coll.find({"code": {"$in": missing}}, {"_id": 0, "code": 1, "state": 1})
+            for doc in await cursor.to_list(length=None):
+                try:
+                    self._indicator_states[doc["code"]] = StreamingIndicators.from_dict(doc["state"])
+                except Exception as e:
+                    logger.debug(f"指标状态反序列化失败，将重新初始化 {doc.get('code')}: {e}")
+
+        # 按自然日估算窗口，覆盖 N 个交易日
+        bars = max(int(settings.QUOTES_INDICATOR_BOOTSTRAP_BARS), 1)
+        end = datetime.strptime(trade_date, "%Y-%m-%d")
+        start = (end - timedelta(days=int(bars * 1.5) + 10)).strftime("%Y-%m-%d")
+        batch_size = 200
+
+        # 每个交易日首次更新时检查状态是否落后（之后 last_date 等于当日，不再查询）
+        lagging: Dict[str, str] = {}
+        for code in codes:
+            state = self._indicator_states.get(code)
+            if state is None or state.last_date == trade_date:
+                continue
+            if state.last_date and start <= state.last_date < trade_date:
+                lagging[code] = state.last_date
+            else:
+                del self._indicator_states[code]
+
+        lagging_codes = list(lagging)
+        replayed = 0
+        for i in range(0, len(lagging_codes), batch_size):
+            batch = lagging_codes[i:i + batch_size]
+            history = await self._daily_bars(batch, min(lagging[c] for c in batch), trade_date)
+            for code in batch:
+                rows = history.get(code) or {}
+                # 包含状态最后一天：用当日收盘K线修正盘中写入的状态
+                dates = [d for d in sorted(rows) if d >= lagging[code]]
+                if any(d > lagging[code] for d in dates):
+                    replayed += 1
+                self._indicator_states[code].update_many(rows[d] for d in dates)
+        if replayed:
+            logger.info(f"📈 已补齐 {replayed} 只股票落后的增量指标状态")
+
+        missing = [c for c in codes if c not in self._indicator_states]
+        if not missing:
+            return
+
+        for i in range(0, len(missing), batch_size):
+            batch = missing[i:i + batch_size]
+            history = await self._daily_bars(batch, start, trade_date)
+            for code in batch:
+                state = StreamingIndicators()
+                rows = history.get(code) or {}
+                state.update_many(rows[d] for d in sorted(rows)[-bars:])
+                self._indicator_states[code] = state
+        logger.info(f"📈 已初始化 {len(missing)} 只股票的增量指标状态")
+
+    async def _update_streaming_indicators(self, quotes_map: Dict[str, Dict], trade_date: str) -> None:
+        """用最新行情增量更新技术指标，并写回 market_quotes.indicators 与状态集合"""
+        iso_date = self._to_iso_date(trade_date)
+        bars = {}
+        for code, q in quotes_map.items():
+            code6 = self._normalize_stock_code(code)
+            if code6 and q.get("close") is not None:
+                bars[code6] = q
+        if not bars:
+            return
+
+        await self._load_indicator_states(list(bars.keys()), iso_date)
+
+        now = datetime.now(self.tz)
+        quote_ops = []
+        state_ops = []
+        for code6, q in bars.items():
+            state = self._indicator_states[code6]
+            values = state.update({"trade_date": iso_date, "high": q.get("high"), "low": q.get("low"), "close": q.get("close")})
+            quote_ops.append(UpdateOne({"code": code6}, {"$set": {"indicators": values, "indicators_updated_at": now}}))
+            state_ops.append(UpdateOne(
+                {"code": code6},
+                {"$set": {"code": code6, "trade_date": iso_date, "state": state.to_dict(), "updated_at": now}},
+                upsert=True,
+            ))
+
+        db = get_mongo_db()
+        await db[self.collection_name].bulk_write(quote_ops, ordered=False)
+        await db[self.indicator_state_collection_name].bulk_write(state_ops, ordered=False)
+        logger.info(f"📈 增量指标更新完成: {len(quote_ops)} 只股票, trade_date={iso_date}")
+
     async def backfill_from_historical_data(self) -> None:
         """
         从历史数据集合导入前一天的收盘数据到 market_quotes
@@ -547,10 +665,6 @@ class QuotesIngestionService:
         """
         try:
             if source_type == "tushare":
-                # 检查是否可以调用 Tushare
-                if not self._can_call_tushare():
-                    return None, None
-
                 from app.services.data_sources.tushare_adapter import TushareAdapter
                 adapter = TushareAdapter()
 
@@ -562,7 +676,6 @@ class QuotesIngestionService:
                 quotes_map = adapter.get_realtime_quotes()
 
                 if quotes_map:
-                    self._record_tushare_call()
                     return quotes_map, "tushare"
                 else:
                     logger.warning("Tushare rt_k 返回空数据")
@@ -630,8 +743,13 @@ class QuotesIngestionService:
             # 获取下一个数据源
             source_type, akshare_api = self._get_next_source()
 
-            # 尝试获取行情
-            quotes_map, source_name = self._fetch_quotes_from_source(source_type, akshare_api)
+            # 尝试获取行情（Tushare 需先取得调用配额）
+            if source_type == "tushare" and not await self._can_call_tushare():
+                quotes_map, source_name = None, None
+            else:
+                quotes_map, source_name = self._fetch_quotes_from_source(source_type, akshare_api)
+                if source_type == "tushare" and not quotes_map:
+                    await self._release_tushare_call()
 
             if not quotes_map:
                 logger.warning(f"⚠️ {source_name or source_type} 未获取到行情数据，跳过本次入库")
@@ -654,6 +772,13 @@ class QuotesIngestionService:
             # 入库
             await self._bulk_upsert(quotes_map, trade_date, source_name)
 
+            # 增量更新盘中技术指标（失败不影响行情入库）
+            if settings.QUOTES_STREAMING_INDICATORS_ENABLED:
+                try:
+                    await self._update_streaming_indicators(quotes_map, trade_date)
+                except Exception as e:
+                    logger.warning(f"⚠️ 增量指标更新失败（忽略）: {e}")
+
             # 记录成功状态
             await self._record_sync_status(
                 success=True,
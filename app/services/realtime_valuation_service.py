@@ -0,0 +1,124 @@
+"""
+全市场实时估值缓存
+
+按行情入库批次（market_quotes.updated_at）缓存全市场动态 PE/PB/市值：
+- 三个集合各读取一次（Motor），向量化计算全部股票（tradingagents.dataflows.realtime_metrics）
+- 行情入库产生新批次、或距上次计算超过一个采集间隔时才重新计算
+- 并发请求共享同一次计算，筛选、列表等场景按代码直接取结果
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from app.core.config import settings
+from app.core.database import get_mongo_db
+from tradingagents.dataflows.realtime_metrics import (
+    REALTIME_BASIC_PROJECTION,
+    REALTIME_QUOTE_PROJECTION,
+    compute_realtime_pe_pb_batch,
+    documents_to_frames,
+    latest_equity_pipeline,
+    metrics_frame_to_dict,
+    realtime_basic_query,
+    validate_pe_pb,
+)
+
+logger = logging.getLogger(__name__)
+
+TICK_CHECK_INTERVAL = 1.0  # 检查行情批次的最小间隔（秒）
+
+
+class RealtimeValuationService:
+    """全市场实时 PE/PB 计算与按行情批次缓存"""
+
+    def __init__(self, db=None):
+        self._db = db
+        self._lock = asyncio.Lock()
+        self._tick: Any = None
+        self._computed_at = 0.0
+        self._tick_checked_at = 0.0
+        self._seen_tick: Any = None
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def db(self):
+        return self._db if self._db is not None else get_mongo_db()
+
+    async def _current_tick(self) -> Any:
+        """最近一次行情入库批次（同一批次的 updated_at 相同），TICK_CHECK_INTERVAL 内复用上次查询结果"""
+        if self._tick_checked_at and time.monotonic() - self._tick_checked_at < TICK_CHECK_INTERVAL:
+            return self._seen_tick
+        doc = await self.db["market_quotes"].find_one(
+            {}, {"_id": 0, "updated_at": 1}, sort=[("updated_at", -1)]
+        )
+        self._seen_tick = doc.get("updated_at") if doc else None
+        self._tick_checked_at = time.monotonic()
+        return self._seen_tick
+
+    def _expired(self) -> bool:
+        return time.monotonic() - self._computed_at >= settings.QUOTES_INGEST_INTERVAL_SECONDS
+
+    async def _compute(self) -> Dict[str, Dict[str, Any]]:
+        db = self.db
+        started = time.perf_counter()
+        quotes, basic_info, financial = await asyncio.gather(
+            db["market_quotes"].find({}, REALTIME_QUOTE_PROJECTION).to_list(length=None),
+            db["stock_basic_info"].find(realtime_basic_query(), REALTIME_BASIC_PROJECTION).to_list(length=None),
+            db["stock_financial_data"].aggregate(latest_equity_pipeline(), allowDiskUse=True).to_list(length=None),
+        )
+        frames = documents_to_frames(quotes, basic_info, financial)
+        metrics = metrics_frame_to_dict(compute_realtime_pe_pb_batch(*frames))
+        logger.info(f"📊 [实时估值] 全市场计算完成: {len(metrics)}/{len(quotes)} 只股票，"
+                    f"耗时 {time.perf_counter() - started:.2f}秒")
+        return metrics
+
+    async def refresh(self, force: bool = False) -> Dict[str, Dict[str, Any]]:
+        """行情批次变化（或缓存过期）时重新计算，返回全市场结果"""
+        now = time.monotonic()
+        if not force and self._computed_at and now - self._tick_checked_at < TICK_CHECK_INTERVAL and not self._expired():
+            return self._metrics
+
+        async with self._lock:
+            tick = await self._current_tick()
+            if not force and self._computed_at and tick == self._tick and not self._expired():
+                return self._metrics
+            self._metrics = await self._compute()
+            self._tick = tick
+            self._computed_at = time.monotonic()
+            return self._metrics
+
+    async def get_metrics(self, codes: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        获取实时估值（只返回 PE/PB 在合理范围内的股票）
+
+        Args:
+            codes: 6位股票代码；为空时返回全市场
+
+        Returns:
+            {code: calculate_realtime_pe_pb 格式的结果}
+        """
+        metrics = await self.refresh()
+        if codes is None:
+            selected = metrics.items()
+        else:
+            selected = ((code, metrics.get(code)) for code in (str(c).zfill(6) for c in codes))
+        return {
+            code: m for code, m in selected
+            if m is not None and validate_pe_pb(m.get("pe"), m.get("pb"), log=False)
+        }
+
+    async def get_metric(self, code: str) -> Optional[Dict[str, Any]]:
+        """获取单只股票的实时估值"""
+        return (await self.get_metrics([code])).get(str(code).zfill(6))
+
+
+_service: Optional[RealtimeValuationService] = None
+
+
+def get_realtime_valuation_service() -> RealtimeValuationService:
+    """获取全局实时估值服务实例"""
+    global _service
+    if _service is None:
+        _service = RealtimeValuationService()
+    return _service
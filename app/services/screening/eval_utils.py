@@ -165,3 +165,92 @@ def safe_float(v: Any) -> Optional[float]:
     except Exception:
         return None
 
+
+
+def evaluate_conditions_mask(
+    last: Dict[str, np.ndarray],
+    prev: Dict[str, np.ndarray],
+    has_prev: np.ndarray,
+    node: Dict[str, Any],
+    allowed_fields: Iterable[str],
+    allowed_ops: Iterable[str],
+) -> np.ndarray:
+    """
+    evaluate_conditions 的向量化版本：对全市场截面一次性求布尔掩码。
+
+    last/prev 为 {字段: (S,) 数组}，分别对应每只股票的最近一行与上一行；
+    has_prev 标记是否存在上一行（交叉判断需要至少两行）。语义与逐只评估保持一致。
+    """
+    n = len(has_prev)
+    if not node:
+        return np.ones(n, dtype=bool)
+
+    def col(src: Dict[str, np.ndarray], name: str) -> np.ndarray:
+        arr = src.get(name)
+        return arr if arr is not None else np.full(n, np.nan)
+
+    # group 节点
+    if node.get("op") == "group" or "children" in node:
+        logic = (node.get("logic") or "AND").upper()
+        if logic not in {"AND", "OR"}:
+            logic = "AND"
+        masks = [evaluate_conditions_mask(last, prev, has_prev, c, allowed_fields, allowed_ops)
+                 for c in node.get("children", [])]
+        if not masks:
+            return np.full(n, logic == "AND")
+        return np.logical_and.reduce(masks) if logic == "AND" else np.logical_or.reduce(masks)
+
+    field = node.get("field")
+    op = node.get("op")
+    if field not in allowed_fields or op not in set(allowed_ops):
+        return np.zeros(n, dtype=bool)
+
+    # 交叉：最近两行
+    if op in {"cross_up", "cross_down"}:
+        right_field = node.get("right_field")
+        if right_field not in allowed_fields:
+            return np.zeros(n, dtype=bool)
+        a0, a1 = col(last, field), col(prev, field)
+        b0, b1 = col(last, right_field), col(prev, right_field)
+        valid = has_prev & ~(np.isnan(a0) | np.isnan(a1) | np.isnan(b0) | np.isnan(b1))
+        with np.errstate(invalid="ignore"):
+            if op == "cross_up":
+                return valid & (a1 <= b1) & (a0 > b0)
+            return valid & (a1 >= b1) & (a0 < b0)
+
+    # 普通比较：最近一行
+    left = col(last, field)
+    valid = ~np.isnan(left)
+    if node.get("right_field"):
+        rf = node.get("right_field")
+        if rf not in allowed_fields:
+            return np.zeros(n, dtype=bool)
+        right: Any = col(last, rf)
+    else:
+        right = node.get("value")
+
+    try:
+        with np.errstate(invalid="ignore"):
+            if op == "between":
+                lo_hi = right if isinstance(right, (list, tuple)) else (None, None)
+                lo, hi = lo_hi if isinstance(lo_hi, (list, tuple)) and len(lo_hi) == 2 else (None, None)
+                if lo is None or hi is None:
+                    return np.zeros(n, dtype=bool)
+                return valid & (float(lo) <= left) & (left <= float(hi))
+            if not isinstance(right, np.ndarray):
+                right = float(right)
+            if op == ">":
+                return valid & (left > right)
+            if op == "<":
+                return valid & (left < right)
+            if op == ">=":
+                return valid & (left >= right)
+            if op == "<=":
+                return valid & (left <= right)
+            if op == "==":
+                return valid & (left == right)
+            if op == "!=":
+                return valid & (left != right)
+    except Exception:
+        return np.zeros(n, dtype=bool)
+    return np.zeros(n, dtype=bool)
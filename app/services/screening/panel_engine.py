@@ -0,0 +1,221 @@
+"""
+基于全市场截面的选股引擎
+
+用一个游标从 stock_daily_quotes 读取全部A股最近的日K线，整理为按列存储的截面，
+一次性计算所有股票的技术指标，筛选条件即可作为布尔掩码整体求值。
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.tools.analysis.indicators import IndicatorSpec
+from tradingagents.tools.analysis.panel_indicators import compute_panel, panel_from_long
+
+logger = logging.getLogger("agents")
+
+# 选股使用的固定参数指标（与 TECH_FIELDS 对应）
+SCREENING_SPECS: List[IndicatorSpec] = [
+    IndicatorSpec("ma", {"n": 5}),
+    IndicatorSpec("ma", {"n": 10}),
+    IndicatorSpec("ma", {"n": 20}),
+    IndicatorSpec("ma", {"n": 60}),
+    IndicatorSpec("ema", {"n": 12}),
+    IndicatorSpec("ema", {"n": 26}),
+    IndicatorSpec("macd"),
+    IndicatorSpec("rsi", {"n": 14}),
+    IndicatorSpec("boll", {"n": 20, "k": 2}),
+    IndicatorSpec("atr", {"n": 14}),
+    IndicatorSpec("kdj", {"n": 9, "m1": 3, "m2": 3}),
+]
+
+BAR_FIELDS = ("open", "high", "low", "close", "vol", "amount")
+
+# 同一 (symbol, trade_date) 存在多个数据源时的取舍顺序
+DEFAULT_SOURCE_PRIORITY = ("tushare", "akshare", "baostock")
+
+
+@dataclass
+class ScreeningPanel:
+    """
+    全市场截面数据
+
+    Attributes:
+        codes: (S,) 股票代码
+        last: {字段: (S,)} 每只股票最近一根K线上的取值
+        prev: {字段: (S,)} 每只股票上一根K线上的取值（用于交叉判断）
+        has_prev: (S,) 是否存在上一根K线
+        trade_date: 截面中最新的交易日
+        last_dates: (S,) 每只股票最近一根K线的交易日
+    """
+    codes: np.ndarray
+    last: Dict[str, np.ndarray]
+    prev: Dict[str, np.ndarray]
+    has_prev: np.ndarray
+    trade_date: Optional[str] = None
+    last_dates: Optional[np.ndarray] = None
+    has_technical: bool = False
+    _bars: Any = field(default=None, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def ensure_technical(self) -> None:
+        """按需计算技术指标（只计算一次）"""
+        if self.has_technical or self._bars is None:
+            return
+        panel, last_idx, prev_idx = self._bars
+        cols = np.arange(len(self.codes))
+        for name, arr in compute_panel(panel, SCREENING_SPECS).items():
+            self.last[name] = arr[last_idx, cols]
+            self.prev[name] = np.where(self.has_prev, arr[prev_idx, cols], np.nan)
+        self.has_technical = True
+
+
+def load_daily_bars(
+    db,
+    end_date: Optional[str] = None,
+    lookback_days: int = 220,
+    codes: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """
+    一次性读取全市场最近 lookback_days 个自然日的日K线（长表）
+
+    Args:
+        db: 同步 pymongo Database
+        end_date: 截止日期 YYYY-MM-DD，None 表示今天
+        lookback_days: 回看自然日数
+        codes: 可选的股票代码过滤
+    """
+    end = datetime.strptime(end_date, "%Y-%m-%d") if end_date else datetime.now()
+    start_s = (end - timedelta(days=lookback_days)).strftime("%Y-%m-%d")
+    end_s = end.strftime("%Y-%m-%d")
+
+    query: Dict[str, Any] = {"period": "daily", "trade_date": {"$gte": start_s, "$lte": end_s}}
+    if codes is not None:
+        query["symbol"] = {"$in": list(codes)}
+    projection = {"_id": 0, "symbol": 1, "trade_date": 1, "data_source": 1,
+                  "open": 1, "high": 1, "low": 1, "close": 1, "volume": 1, "amount": 1}
+
+    cursor = db["stock_daily_quotes"].find(query, projection, batch_size=10000)
+    df = pd.DataFrame(list(cursor))
+    if df.empty:
+        return df
+    return df.rename(columns={"volume": "vol"})
+
+
+def build_screening_panel(
+    bars: pd.DataFrame,
+    universe: Optional[Sequence[str]] = None,
+    source_priority: Sequence[str] = DEFAULT_SOURCE_PRIORITY,
+) -> Optional[ScreeningPanel]:
+    """
+    将长表K线整理为选股截面
+
+    Args:
+        bars: load_daily_bars 返回的长表
+        universe: 可选的股票池，None 表示不过滤
+        source_priority: 多数据源去重时的优先级
+    """
+    if bars is None or bars.empty:
+        return None
+    df = bars
+    if universe:
+        df = df[df["symbol"].isin(set(universe))]
+    if df.empty:
+        return None
+
+    # 多数据源去重：每个 (symbol, trade_date) 只保留优先级最高的一条
+    rank = {s: i for i, s in enumerate(source_priority)}
+    src = df["data_source"] if "data_source" in df.columns else pd.Series("", index=df.index)
+    df = df.assign(_rank=src.map(rank).fillna(len(rank)))
+    df = df.sort_values(["symbol", "trade_date", "_rank"], kind="mergesort")
+    df = df.drop_duplicates(["symbol", "trade_date"], keep="first")
+
+    panel, _, _ = panel_from_long(df, symbol_col="symbol", date_col="trade_date", fields=BAR_FIELDS)
+    n_symbols = len(panel.symbols)
+    cols = np.arange(n_symbols)
+    last_idx = panel.lengths - 1
+    prev_idx = np.maximum(panel.lengths - 2, 0)
+    has_prev = panel.lengths >= 2
+
+    last: Dict[str, np.ndarray] = {}
+    prev: Dict[str, np.ndarray] = {}
+    for name, arr in panel.fields.items():
+        last[name] = arr[last_idx, cols]
+        prev[name] = np.where(has_prev, arr[prev_idx, cols], np.nan)
+
+    # 派生：涨跌幅（与 close.pct_change() * 100 一致）
+    close = panel.fields["close"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.full(close.shape, np.nan)
+        pct[1:] = (close[1:] / close[:-1] - 1) * 100.0
+    pct[~np.isfinite(pct)] = np.nan
+    last["pct_chg"] = pct[last_idx, cols]
+    prev["pct_chg"] = np.where(has_prev, pct[prev_idx, cols], np.nan)
+
+    return ScreeningPanel(
+        codes=np.asarray(panel.symbols, dtype=object),
+        last=last,
+        prev=prev,
+        has_prev=has_prev,
+        trade_date=str(df["trade_date"].max()),
+        # df 已按 (symbol, trade_date) 排序，与 panel.symbols 的顺序一致
+        last_dates=df.drop_duplicates("symbol", keep="last")["trade_date"].astype(str).to_numpy(),
+        _bars=(panel, last_idx, prev_idx),
+    )
+
+
+def order_indices(columns: Dict[str, np.ndarray], order_by: Optional[List[Dict[str, str]]], n: int) -> np.ndarray:
+    """
+    多字段稳定排序（第一个字段优先级最高），缺失值始终排在最后
+
+    Args:
+        columns: {字段: (n,) 数组}，不在其中的字段视为全部缺失
+        order_by: [{field, direction}]
+        n: 行数
+    """
+    keys: List[np.ndarray] = []
+    # np.lexsort 以最后一个 key 为主序，因此按优先级从低到高压入
+    for order in reversed(order_by or []):
+        vals = columns.get(order.get("field"))
+        if vals is None:
+            continue
+        desc = (order.get("direction") or "desc").lower() == "desc"
+        missing = np.isnan(vals)
+        keys.append(np.where(missing, 0.0, -vals if desc else vals))
+        keys.append(missing)
+    if not keys:
+        return np.arange(n)
+    return np.lexsort(keys)
+
+
+class PanelCache:
+    """进程内截面缓存：同一截止日期的数据在 TTL 内复用"""
+
+    def __init__(self, ttl_seconds: float = 300.0):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[Optional[str], tuple] = {}
+
+    def get(self, key: Optional[str]) -> Optional[ScreeningPanel]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+                return entry[1]
+            return None
+
+    def put(self, key: Optional[str], panel: ScreeningPanel) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), panel)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -8,7 +8,7 @@ import pandas as pd
 import numpy as np
 
 # 统一指标库
-from tradingagents.tools.analysis.indicators import IndicatorSpec, compute_many
+from tradingagents.tools.analysis.indicators import compute_many
 # 统一多数据源DF接口（按优先级降级）
 from tradingagents.dataflows.data_source_manager import get_data_source_manager
 from tradingagents.dataflows.providers.china.fundamentals_snapshot import get_cn_fund_snapshot
@@ -17,9 +17,18 @@ from tradingagents.dataflows.providers.china.fundamentals_snapshot import get_cn
 from app.services.screening.eval_utils import (
     collect_fields_from_conditions as _collect_fields_from_conditions_util,
     evaluate_conditions as _evaluate_conditions_util,
+    evaluate_conditions_mask as _evaluate_conditions_mask_util,
     evaluate_fund_conditions as _evaluate_fund_conditions_util,
     safe_float as _safe_float_util,
 )
+from app.services.screening.panel_engine import (
+    SCREENING_SPECS,
+    PanelCache,
+    ScreeningPanel,
+    build_screening_panel,
+    load_daily_bars,
+    order_indices,
+)
 
 # --- DSL 约束 ---
 ALLOWED_FIELDS = {
@@ -54,6 +63,10 @@ FUND_FIELDS = {"pe", "pb", "roe", "market_cap"}
 
 ALLOWED_OPS = {">", "<", ">=", "<=", "==", "!=", "between", "cross_up", "cross_down"}
 
+# 结果项中返回的行情/指标字段
+ITEM_BASE_FIELDS = ["close", "pct_chg", "amount"]
+ITEM_TECH_FIELDS = ["ma20", "rsi14", "kdj_k", "kdj_d", "kdj_j", "dif", "dea", "macd_hist"]
+
 
 @dataclass
 class ScreeningParams:
@@ -69,23 +82,19 @@ import logging
 logger = logging.getLogger("agents")
 
 class ScreeningService:
+    # 回看自然日数（约150个交易日，满足 MA60/MACD 等指标的预热）
+    LOOKBACK_DAYS = 220
+    # 逐只股票路径（截面不可用时）的样本上限
+    PER_SYMBOL_LIMIT = 120
+
     def __init__(self):
         # 数据源通过统一DF接口获取，不直接绑定具体源
         self.provider = None
+        # 全市场截面缓存（日K线每日收盘后才变化）
+        self._panel_cache = PanelCache(ttl_seconds=300)
 
     # --- 公共入口 ---
     def run(self, conditions: Dict[str, Any], params: ScreeningParams) -> Dict[str, Any]:
-        symbols = self._get_universe()
-        # 为控制时长，先限制样本规模（后续用批量/缓存优化）
-        symbols = symbols[:120]
-
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=220)
-        end_s = end_date.strftime("%Y-%m-%d")
-        start_s = start_date.strftime("%Y-%m-%d")
-
-        results: List[Dict[str, Any]] = []
-
         # 解析条件中涉及的字段，决定是否需要技术指标/行情
         needed_fields = self._collect_fields_from_conditions(conditions)
         order_fields = {o.get("field") for o in (params.order_by or []) if o.get("field")}
@@ -94,6 +103,96 @@ class ScreeningService:
         need_base = any(f in BASE_FIELDS for f in all_needed) or need_tech
         need_fund = any(f in FUND_FIELDS for f in all_needed)
 
+        if need_base:
+            panel = self._get_panel(params.date)
+            if panel is not None:
+                return self._run_panel(panel, conditions, params, need_tech)
+            logger.warning("⚠️ stock_daily_quotes 无可用K线，回退到逐只股票筛选")
+
+        return self._run_per_symbol(conditions, params, need_tech, need_base, need_fund)
+
+    # --- 批量截面路径 ---
+    def _get_panel(self, date: Optional[str]) -> Optional[ScreeningPanel]:
+        """读取（或复用缓存的）全市场截面"""
+        panel = self._panel_cache.get(date)
+        if panel is not None:
+            return panel
+        try:
+            from app.core.database import get_mongo_db_sync
+
+            bars = load_daily_bars(get_mongo_db_sync(), end_date=date, lookback_days=self.LOOKBACK_DAYS)
+            panel = build_screening_panel(bars, universe=self._get_universe_codes())
+        except Exception as e:
+            logger.error(f"❌ 加载全市场K线截面失败: {e}")
+            return None
+        if panel is not None:
+            logger.info(f"📊 全市场K线截面已加载: {len(panel)} 只股票, 最新交易日 {panel.trade_date}")
+            self._panel_cache.put(date, panel)
+        return panel
+
+    def _run_panel(
+        self,
+        panel: ScreeningPanel,
+        conditions: Dict[str, Any],
+        params: ScreeningParams,
+        need_tech: bool,
+    ) -> Dict[str, Any]:
+        if need_tech:
+            panel.ensure_technical()
+
+        mask = _evaluate_conditions_mask_util(
+            panel.last, panel.prev, panel.has_prev, conditions, ALLOWED_FIELDS, ALLOWED_OPS
+        )
+        idx = np.flatnonzero(mask)
+        total = int(idx.size)
+
+        item_fields = ITEM_BASE_FIELDS + (ITEM_TECH_FIELDS if need_tech else [])
+        columns = {f: panel.last[f][idx] for f in item_fields if f in panel.last}
+        sortable = {
+            o.get("field"): columns[o.get("field")]
+            for o in (params.order_by or [])
+            if o.get("field") in ALLOWED_FIELDS and o.get("field") in columns
+        }
+        order = order_indices(sortable, params.order_by, total)
+
+        # 分页
+        start = params.offset or 0
+        end = start + (params.limit or 50)
+        page_items: List[Dict[str, Any]] = []
+        for i in order[start:end]:
+            item: Dict[str, Any] = {"code": panel.codes[idx[i]]}
+            for f in ITEM_BASE_FIELDS + ITEM_TECH_FIELDS:
+                item[f] = self._safe_float(columns[f][i]) if f in columns else None
+            page_items.append(item)
+
+        return {
+            "total": total,
+            "items": page_items,
+        }
+
+    # --- 逐只股票路径（截面不可用或仅基本面条件时） ---
+    def _run_per_symbol(
+        self,
+        conditions: Dict[str, Any],
+        params: ScreeningParams,
+        need_tech: bool,
+        need_base: bool,
+        need_fund: bool,
+    ) -> Dict[str, Any]:
+        symbols = self._get_universe()
+        # 逐只获取耗时较长，限制样本规模
+        if len(symbols) > self.PER_SYMBOL_LIMIT:
+            logger.warning(f"⚠️ 逐只股票筛选仅处理前 {self.PER_SYMBOL_LIMIT} 只股票（股票池共 {len(symbols)} 只），"
+                           f"结果不完整；请确认 stock_daily_quotes 已同步以使用全市场截面")
+            symbols = symbols[:self.PER_SYMBOL_LIMIT]
+
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=self.LOOKBACK_DAYS)
+        end_s = end_date.strftime("%Y-%m-%d")
+        start_s = start_date.strftime("%Y-%m-%d")
+
+        results: List[Dict[str, Any]] = []
+
         for code in symbols:
             try:
                 dfc = None
@@ -116,19 +215,7 @@ class ScreeningService:
 
                     # 仅在需要技术指标时计算
                     if need_tech:
-                        specs = [
-                            IndicatorSpec("ma", {"n": 5}),
-                            IndicatorSpec("ma", {"n": 10}),
-                            IndicatorSpec("ma", {"n": 20}),
-                            IndicatorSpec("ema", {"n": 12}),
-                            IndicatorSpec("ema", {"n": 26}),
-                            IndicatorSpec("macd"),
-                            IndicatorSpec("rsi", {"n": 14}),
-                            IndicatorSpec("boll", {"n": 20, "k": 2}),
-                            IndicatorSpec("atr", {"n": 14}),
-                            IndicatorSpec("kdj", {"n": 9, "m1": 3, "m2": 3}),
-                        ]
-                        dfc = compute_many(dfu, specs)
+                        dfc = compute_many(dfu, SCREENING_SPECS)
                     else:
                         dfc = dfu
 
@@ -203,6 +290,26 @@ class ScreeningService:
         """Delegate numeric coercion to utils."""
         return _safe_float_util(v)
 
+    def _get_universe_codes(self) -> List[str]:
+        """从 stock_basic_info 同步读取A股代码，用于过滤截面；读取失败时返回空列表（不过滤）"""
+        try:
+            from app.core.database import get_mongo_db_sync
+
+            cursor = get_mongo_db_sync().stock_basic_info.find(
+                {
+                    "$or": [
+                        {"market_info.market": "CN"},
+                        {"category": "stock_cn"},
+                        {"market": {"$in": ["主板", "创业板", "科创板", "北交所"]}}
+                    ]
+                },
+                {"code": 1, "_id": 0}
+            )
+            return [doc.get("code") for doc in cursor if doc.get("code")]
+        except Exception as e:
+            logger.warning(f"⚠️ 读取A股股票池失败，不过滤截面: {e}")
+            return []
+
     def _get_universe(self) -> List[str]:
         """获取A股代码集合：从 MongoDB stock_basic_info 集合获取所有A股股票代码"""
         try:
@@ -20,6 +20,7 @@ from tradingagents.utils.logging_init import init_logging
 init_logging()
 
 from tradingagents.graph.trading_graph import TradingAgentsGraph
+from tradingagents.graph.graph_pool import GraphLease, get_trading_graph_pool
 from tradingagents.default_config import DEFAULT_CONFIG
 from app.models.analysis import (
     AnalysisTask, AnalysisStatus, SingleAnalysisRequest, AnalysisParameters
@@ -596,7 +597,6 @@ class SimpleAnalysisService:
     """简化的股票分析服务类"""
 
     def __init__(self):
-        self._trading_graph_cache = {}
         self.memory_manager = get_memory_state_manager()
 
         # 进度跟踪器缓存
@@ -708,28 +708,27 @@ class SimpleAnalysisService:
             logger.warning(f"⚠️ 生成新的用户ID: {new_object_id}")
             return PyObjectId(new_object_id)
 
-    def _get_trading_graph(self, config: Dict[str, Any]) -> TradingAgentsGraph:
-        """获取或创建TradingAgents实例
+    def _get_trading_graph(self, config: Dict[str, Any]) -> GraphLease:
+        """从实例池借出TradingAgents实例
 
-        ⚠️ 注意：为了避免并发执行时的数据混淆，每次都创建新实例
-        虽然这会增加一些初始化开销，但可以确保线程安全
-
-        TradingAgentsGraph 实例包含可变状态（self.ticker, self.curr_state等），
-        如果多个线程共享同一个实例，会导致数据混淆。
+        LLM客户端、Toolkit、工具节点、记忆库和编译后的图按配置指纹（供应商、模型、分析师、研究深度）
+        缓存在实例池中；每个实例同一时间只借给一个任务，运行状态在归还时清空，
+        因此并发任务不会共享可变状态。使用完毕后必须调用 _release_trading_graph 归还。
         """
-        # 🔧 [并发安全] 每次都创建新实例，避免多线程共享状态
-        # 不再使用缓存，因为 TradingAgentsGraph 有可变的实例变量
-        logger.info(f"🔧 创建新的TradingAgents实例（并发安全模式）...")
-
-        trading_graph = TradingAgentsGraph(
+        lease = get_trading_graph_pool().acquire(
+            config,
             selected_analysts=config.get("selected_analysts", ["market", "fundamentals"]),
             debug=config.get("debug", False),
-            config=config
         )
+        logger.info(f"✅ TradingAgents实例就绪（实例ID: {id(lease.graph)}, 复用: {lease.pool_hit}）")
+        return lease
 
-        logger.info(f"✅ TradingAgents实例创建成功（实例ID: {id(trading_graph)}）")
-
-        return trading_graph
+    def _release_trading_graph(self, lease: GraphLease):
+        """归还TradingAgents实例到实例池"""
+        try:
+            get_trading_graph_pool().release(lease)
+        except Exception as e:
+            logger.warning(f"⚠️ 归还TradingAgents实例失败: {e}")
 
     async def create_analysis_task(
         self,
@@ -1260,7 +1259,8 @@ class SimpleAnalysisService:
 
             # 初始化分析引擎 - 对应步骤4 "🚀 启动引擎" (8-10%)
             update_progress_sync(9, "🚀 初始化AI分析引擎", "engine_initialization")
-            trading_graph = self._get_trading_graph(config)
+            graph_lease = self._get_trading_graph(config)
+            trading_graph = graph_lease.graph
 
             # 🔍 验证TradingGraph实例中的配置
             logger.info(f"🔍 [引擎验证] TradingGraph配置中的快速模型: {trading_graph.config.get('quick_think_llm')}")
@@ -1503,12 +1503,19 @@ class SimpleAnalysisService:
             logger.info(f"🚀 准备调用 trading_graph.propagate，progress_callback={graph_progress_callback}")
 
             # 执行实际分析，传递进度回调和task_id
-            state, decision = trading_graph.propagate(
-                request.stock_code,
-                analysis_date,
-                progress_callback=graph_progress_callback,
-                task_id=task_id
-            )
+            try:
+                state, decision = trading_graph.propagate(
+                    request.stock_code,
+                    analysis_date,
+                    progress_callback=graph_progress_callback,
+                    task_id=task_id
+                )
+            finally:
+                self._release_trading_graph(graph_lease)
+
+            # 记录实例构建/复用耗时
+            if isinstance(state, dict) and isinstance(state.get("performance_metrics"), dict):
+                state["performance_metrics"]["graph_construction"] = graph_lease.metrics()
 
             logger.info(f"✅ trading_graph.propagate 执行完成")
 
@@ -0,0 +1,212 @@
+"""
+每日技术因子预计算服务
+
+收盘后（历史K线同步完成后）基于 stock_daily_quotes 对全市场一次性计算
+TECH_FIELDS 中的全部技术指标，按 (code, trade_date) 写入 stock_technical_factors。
+选股时技术条件直接走带索引的 Mongo 查询，可以与基础/财务条件混合使用，
+不再需要逐只股票拉取K线现算。
+"""
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from app.core.config import settings
+from app.core.database import get_mongo_db, get_mongo_db_sync
+from app.services.screening.panel_engine import build_screening_panel, load_daily_bars
+
+logger = logging.getLogger(__name__)
+
+TECHNICAL_FACTORS_COLLECTION = "stock_technical_factors"
+
+# 与 screening_service.TECH_FIELDS 保持一致
+TECHNICAL_FACTOR_FIELDS: Tuple[str, ...] = (
+    "ma5", "ma10", "ma20", "ma60",
+    "ema12", "ema26",
+    "dif", "dea", "macd_hist",
+    "rsi14",
+    "kdj_k", "kdj_d", "kdj_j",
+    "boll_upper", "boll_mid", "boll_lower",
+    "atr14",
+)
+
+# 选股中最常用、需要单独建 (trade_date, field) 索引的字段
+INDEXED_FACTOR_FIELDS: Tuple[str, ...] = ("ma20", "rsi14", "kdj_k", "kdj_d", "kdj_j", "dif", "dea", "macd_hist")
+
+
+def _clean(value: Any) -> Optional[float]:
+    """NaN/inf 转为 None，其余转为 float"""
+    if value is None:
+        return None
+    try:
+        v = float(value)
+    except (TypeError, ValueError):
+        return None
+    return v if math.isfinite(v) else None
+
+
+def build_factor_documents(panel, fields=TECHNICAL_FACTOR_FIELDS) -> List[Dict[str, Any]]:
+    """
+    将选股截面转换为因子文档（每只股票一条，trade_date 为该股票最近一根K线的日期）
+
+    Args:
+        panel: build_screening_panel 返回的 ScreeningPanel
+        fields: 需要写入的因子字段
+    """
+    panel.ensure_technical()
+    now = datetime.utcnow()
+    last_dates = panel.last_dates if panel.last_dates is not None else [panel.trade_date] * len(panel)
+    docs: List[Dict[str, Any]] = []
+    for i, code in enumerate(panel.codes):
+        doc: Dict[str, Any] = {
+            "code": str(code),
+            "trade_date": str(last_dates[i]),
+            "close": _clean(panel.last["close"][i]),
+            "pct_chg": _clean(panel.last["pct_chg"][i]),
+            "updated_at": now,
+        }
+        for f in fields:
+            arr = panel.last.get(f)
+            doc[f] = _clean(arr[i]) if arr is not None else None
+        docs.append(doc)
+    return docs
+
+
+class TechnicalFactorsService:
+    """全市场技术因子预计算与查询"""
+
+    def __init__(self, lookback_days: Optional[int] = None, batch_size: int = 1000):
+        self.collection_name = TECHNICAL_FACTORS_COLLECTION
+        self.lookback_days = lookback_days or settings.TECHNICAL_FACTORS_LOOKBACK_DAYS
+        self.batch_size = batch_size
+        self._lock = asyncio.Lock()
+
+    async def ensure_indexes(self) -> None:
+        """创建因子集合索引"""
+        coll = get_mongo_db()[self.collection_name]
+        await coll.create_index(
+            [("code", ASCENDING), ("trade_date", ASCENDING)],
+            unique=True, name="code_date_unique", background=True,
+        )
+        await coll.create_index([("trade_date", DESCENDING)], name="trade_date_index", background=True)
+        for f in INDEXED_FACTOR_FIELDS:
+            await coll.create_index(
+                [("trade_date", ASCENDING), (f, ASCENDING)], name=f"trade_date_{f}", background=True
+            )
+
+    def _compute_sync(self, end_date: Optional[str]) -> List[Dict[str, Any]]:
+        """读取K线并计算因子（同步，在线程中执行）"""
+        bars = load_daily_bars(get_mongo_db_sync(), end_date=end_date, lookback_days=self.lookback_days)
+        panel = build_screening_panel(bars)
+        if panel is None:
+            return []
+        return build_factor_documents(panel)
+
+    async def compute_and_store(self, trade_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        计算全市场技术因子并写入数据库
+
+        Args:
+            trade_date: 截止交易日 YYYY-MM-DD，None 表示最新
+
+        Returns:
+            Dict: 统计信息 {trade_date, symbols, upserted, modified, elapsed}
+        """
+        # 同一进程内多个同步任务可能先后触发，串行执行避免重复计算
+        async with self._lock:
+            start = time.time()
+            await self.ensure_indexes()
+            docs = await asyncio.to_thread(self._compute_sync, trade_date)
+            if not docs:
+                logger.warning("⚠️ 技术因子计算跳过：没有可用的日K线数据")
+                return {"trade_date": trade_date, "symbols": 0, "upserted": 0, "modified": 0, "elapsed": 0.0}
+
+            coll = get_mongo_db()[self.collection_name]
+            upserted = modified = 0
+            for i in range(0, len(docs), self.batch_size):
+                ops = [
+                    UpdateOne({"code": d["code"], "trade_date": d["trade_date"]}, {"$set": d}, upsert=True)
+                    for d in docs[i:i + self.batch_size]
+                ]
+                result = await coll.bulk_write(ops, ordered=False)
+                upserted += result.upserted_count
+                modified += result.modified_count
+
+            latest = max(d["trade_date"] for d in docs)
+            elapsed = time.time() - start
+            logger.info(
+                f"✅ 技术因子计算完成: 交易日={latest}, 股票数={len(docs)}, "
+                f"新增={upserted}, 更新={modified}, 耗时={elapsed:.2f}秒"
+            )
+            return {"trade_date": latest, "symbols": len(docs), "upserted": upserted,
+                    "modified": modified, "elapsed": round(elapsed, 2)}
+
+    async def get_latest_trade_date(self) -> Optional[str]:
+        """因子表中最新的交易日，没有数据时返回 None"""
+        coll = get_mongo_db()[self.collection_name]
+        doc = await coll.find_one({}, {"_id": 0, "trade_date": 1}, sort=[("trade_date", -1)])
+        return doc.get("trade_date") if doc else None
+
+    async def find_factors(
+        self,
+        query: Dict[str, Any],
+        trade_date: Optional[str] = None,
+        fields=TECHNICAL_FACTOR_FIELDS,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        按条件查询某个交易日的技术因子
+
+        Args:
+            query: 因子字段上的 Mongo 查询条件
+            trade_date: 交易日，None 表示最新
+            fields: 返回的因子字段
+
+        Returns:
+            Dict: {code: {field: value}}
+        """
+        trade_date = trade_date or await self.get_latest_trade_date()
+        if not trade_date:
+            return {}
+        coll = get_mongo_db()[self.collection_name]
+        projection = {"_id": 0, "code": 1, **{f: 1 for f in fields}}
+        out: Dict[str, Dict[str, Any]] = {}
+        async for doc in coll.find({**query, "trade_date": trade_date}, projection):
+            code = doc.pop("code", None)
+            if code:
+                out[code] = doc
+        return out
+
+
+# 全局服务实例
+_technical_factors_service: Optional[TechnicalFactorsService] = None
+
+
+def get_technical_factors_service() -> TechnicalFactorsService:
+    """获取技术因子服务实例"""
+    global _technical_factors_service
+    if _technical_factors_service is None:
+        _technical_factors_service = TechnicalFactorsService()
+    return _technical_factors_service
+
+
+async def run_technical_factors_compute():
+    """APScheduler任务：收盘后计算全市场技术因子"""
+    try:
+        service = get_technical_factors_service()
+        result = await service.compute_and_store()
+        logger.info(f"✅ 技术因子计算任务完成: {result}")
+        return result
+    except Exception as e:
+        logger.error(f"❌ 技术因子计算任务失败: {e}", exc_info=True)
+
+
+async def refresh_technical_factors_after_sync(source: str) -> None:
+    """历史K线同步完成后刷新技术因子（失败不影响同步任务本身）"""
+    if not (settings.TECHNICAL_FACTORS_ENABLED and settings.TECHNICAL_FACTORS_REFRESH_AFTER_SYNC):
+        return
+    logger.info(f"🔄 {source} 历史数据同步完成，刷新技术因子...")
+    await run_technical_factors_compute()
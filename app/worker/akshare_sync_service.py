@@ -8,8 +8,11 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 
 from app.core.database import get_mongo_db
+from app.core.rate_limiter import get_akshare_rate_limiter
 from app.services.historical_data_service import get_historical_data_service
 from app.services.news_data_service import get_news_data_service
+from app.services.technical_factors_service import refresh_technical_factors_after_sync
+from app.worker.sync_pipeline import SyncPipeline
 from tradingagents.dataflows.providers.china.akshare import get_akshare_provider
 
 logger = logging.getLogger(__name__)
@@ -33,6 +36,7 @@ class AKShareSyncService:
         self.db = None
         self.batch_size = 100
         self.rate_limit_delay = 0.2  # AKShare建议的延迟
+        self.rate_limiter = get_akshare_rate_limiter()
     
     async def initialize(self):
         """初始化同步服务"""
@@ -535,7 +539,8 @@ class AKShareSyncService:
         end_date: str = None,
         symbols: List[str] = None,
         incremental: bool = True,
-        period: str = "daily"
+        period: str = "daily",
+        job_id: str = None
     ) -> Dict[str, Any]:
         """
         同步历史数据
@@ -546,6 +551,7 @@ class AKShareSyncService:
             symbols: 指定股票代码列表
             incremental: 是否增量同步
             period: 数据周期 (daily/weekly/monthly)
+            job_id: 任务ID（用于进度跟踪）
 
         Returns:
             同步结果统计
@@ -590,27 +596,48 @@ class AKShareSyncService:
 
             logger.info(f"📊 历史数据同步: 结束日期={end_date}, 股票数量={len(symbols)}, 模式={'增量' if incremental else '全量'}")
 
-            # 4. 批量处理
-            for i in range(0, len(symbols), self.batch_size):
-                batch = symbols[i:i + self.batch_size]
-                batch_stats = await self._process_historical_batch(
-                    batch, start_date, end_date, period, incremental
+            # 4. 流水线处理：获取（受限流器控制）与保存并发进行
+            async def fetch(symbol: str):
+                symbol_start_date = start_date
+                if not symbol_start_date:
+                    if incremental:
+                        # 增量同步：获取该股票的最后日期
+                        symbol_start_date = await self._get_last_sync_date(symbol)
+                        logger.debug(f"📅 {symbol}: 从 {symbol_start_date} 开始同步")
+                    else:
+                        # 全量同步：最近1年
+                        symbol_start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
+                hist_data = await self.provider.get_historical_data(symbol, symbol_start_date, end_date, period)
+                if hist_data is None or hist_data.empty:
+                    raise ValueError("历史数据为空")
+                return hist_data
+
+            async def save(symbol: str, hist_data) -> int:
+                if self.historical_service is None:
+                    self.historical_service = await get_historical_data_service()
+                saved_count = await self.historical_service.save_historical_data(
+                    symbol=symbol,
+                    data=hist_data,
+                    data_source="akshare",
+                    market="CN",
+                    period=period
                 )
-
-                # 更新统计
-                stats["success_count"] += batch_stats["success_count"]
-                stats["error_count"] += batch_stats["error_count"]
-                stats["total_records"] += batch_stats["total_records"]
-                stats["errors"].extend(batch_stats["errors"])
-
-                # 进度日志
-                progress = min(i + self.batch_size, len(symbols))
-                logger.info(f"📈 历史数据同步进度: {progress}/{len(symbols)} "
-                           f"(成功: {stats['success_count']}, 记录: {stats['total_records']})")
-
-                # API限流
-                if i + self.batch_size < len(symbols):
-                    await asyncio.sleep(self.rate_limit_delay)
+                logger.debug(f"✅ {symbol}历史数据同步成功: {saved_count}条记录")
+                return saved_count
+
+            result = await SyncPipeline(
+                f"AKShare{period_name}同步",
+                fetch,
+                save,
+                rate_limiter=self.rate_limiter,
+                progress=self._job_progress(job_id, len(symbols)),
+            ).run(symbols)
+
+            stats["success_count"] = result.saved
+            stats["error_count"] = len(result.errors)
+            stats["total_records"] = result.records
+            stats["errors"].extend(result.errors)
+            stats["pipeline"] = result.stages
 
             # 4. 完成统计
             stats["end_time"] = datetime.utcnow()
@@ -629,72 +656,6 @@ class AKShareSyncService:
             stats["errors"].append({"error": str(e), "context": "sync_historical_data"})
             return stats
 
-    async def _process_historical_batch(
-        self,
-        batch: List[str],
-        start_date: str,
-        end_date: str,
-        period: str = "daily",
-        incremental: bool = False
-    ) -> Dict[str, Any]:
-        """处理历史数据批次"""
-        batch_stats = {
-            "success_count": 0,
-            "error_count": 0,
-            "total_records": 0,
-            "errors": []
-        }
-
-        for symbol in batch:
-            try:
-                # 确定该股票的起始日期
-                symbol_start_date = start_date
-                if not symbol_start_date:
-                    if incremental:
-                        # 增量同步：获取该股票的最后日期
-                        symbol_start_date = await self._get_last_sync_date(symbol)
-                        logger.debug(f"📅 {symbol}: 从 {symbol_start_date} 开始同步")
-                    else:
-                        # 全量同步：最近1年
-                        symbol_start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
-
-                # 获取历史数据
-                hist_data = await self.provider.get_historical_data(symbol, symbol_start_date, end_date, period)
-
-                if hist_data is not None and not hist_data.empty:
-                    # 保存到统一历史数据集合
-                    if self.historical_service is None:
-                        self.historical_service = await get_historical_data_service()
-
-                    saved_count = await self.historical_service.save_historical_data(
-                        symbol=symbol,
-                        data=hist_data,
-                        data_source="akshare",
-                        market="CN",
-                        period=period
-                    )
-
-                    batch_stats["success_count"] += 1
-                    batch_stats["total_records"] += saved_count
-                    logger.debug(f"✅ {symbol}历史数据同步成功: {saved_count}条记录")
-                else:
-                    batch_stats["error_count"] += 1
-                    batch_stats["errors"].append({
-                        "code": symbol,
-                        "error": "历史数据为空",
-                        "context": "_process_historical_batch"
-                    })
-
-            except Exception as e:
-                batch_stats["error_count"] += 1
-                batch_stats["errors"].append({
-                    "code": symbol,
-                    "error": str(e),
-                    "context": "_process_historical_batch"
-                })
-
-        return batch_stats
-
     async def _get_last_sync_date(self, symbol: str = None) -> str:
         """
         获取最后同步日期
@@ -751,12 +712,13 @@ class AKShareSyncService:
             # 出错时返回30天前，确保不漏数据
             return (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
 
-    async def sync_financial_data(self, symbols: List[str] = None) -> Dict[str, Any]:
+    async def sync_financial_data(self, symbols: List[str] = None, job_id: str = None) -> Dict[str, Any]:
         """
         同步财务数据
 
         Args:
             symbols: 指定股票代码列表
+            job_id: 任务ID（用于进度跟踪）
 
         Returns:
             同步结果统计
@@ -796,24 +758,31 @@ class AKShareSyncService:
             stats["total_processed"] = len(symbols)
             logger.info(f"📊 准备同步 {len(symbols)} 只股票的财务数据")
 
-            # 2. 批量处理
-            for i in range(0, len(symbols), self.batch_size):
-                batch = symbols[i:i + self.batch_size]
-                batch_stats = await self._process_financial_batch(batch)
-
-                # 更新统计
-                stats["success_count"] += batch_stats["success_count"]
-                stats["error_count"] += batch_stats["error_count"]
-                stats["errors"].extend(batch_stats["errors"])
-
-                # 进度日志
-                progress = min(i + self.batch_size, len(symbols))
-                logger.info(f"📈 财务数据同步进度: {progress}/{len(symbols)} "
-                           f"(成功: {stats['success_count']}, 错误: {stats['error_count']})")
-
-                # API限流
-                if i + self.batch_size < len(symbols):
-                    await asyncio.sleep(self.rate_limit_delay)
+            # 2. 流水线处理：获取（受限流器控制）与保存并发进行
+            async def fetch(symbol: str):
+                financial_data = await self.provider.get_financial_data(symbol)
+                if not financial_data:
+                    raise ValueError("财务数据为空")
+                return financial_data
+
+            async def save(symbol: str, financial_data) -> int:
+                if not await self._save_financial_data(symbol, financial_data):
+                    raise RuntimeError("财务数据保存失败")
+                logger.debug(f"✅ {symbol}财务数据保存成功")
+                return 1
+
+            result = await SyncPipeline(
+                "AKShare财务数据同步",
+                fetch,
+                save,
+                rate_limiter=self.rate_limiter,
+                progress=self._job_progress(job_id, len(symbols)),
+            ).run(symbols)
+
+            stats["success_count"] = result.saved
+            stats["error_count"] = len(result.errors)
+            stats["errors"].extend(result.errors)
+            stats["pipeline"] = result.stages
 
             # 3. 完成统计
             stats["end_time"] = datetime.utcnow()
@@ -832,50 +801,6 @@ class AKShareSyncService:
             stats["errors"].append({"error": str(e), "context": "sync_financial_data"})
             return stats
 
-    async def _process_financial_batch(self, batch: List[str]) -> Dict[str, Any]:
-        """处理财务数据批次"""
-        batch_stats = {
-            "success_count": 0,
-            "error_count": 0,
-            "errors": []
-        }
-
-        for symbol in batch:
-            try:
-                # 获取财务数据
-                financial_data = await self.provider.get_financial_data(symbol)
-
-                if financial_data:
-                    # 使用统一的财务数据服务保存数据
-                    success = await self._save_financial_data(symbol, financial_data)
-                    if success:
-                        batch_stats["success_count"] += 1
-                        logger.debug(f"✅ {symbol}财务数据保存成功")
-                    else:
-                        batch_stats["error_count"] += 1
-                        batch_stats["errors"].append({
-                            "code": symbol,
-                            "error": "财务数据保存失败",
-                            "context": "_process_financial_batch"
-                        })
-                else:
-                    batch_stats["error_count"] += 1
-                    batch_stats["errors"].append({
-                        "code": symbol,
-                        "error": "财务数据为空",
-                        "context": "_process_financial_batch"
-                    })
-
-            except Exception as e:
-                batch_stats["error_count"] += 1
-                batch_stats["errors"].append({
-                    "code": symbol,
-                    "error": str(e),
-                    "context": "_process_financial_batch"
-                })
-
-        return batch_stats
-
     async def _save_financial_data(self, symbol: str, financial_data: Dict[str, Any]) -> bool:
         """保存财务数据"""
         try:
@@ -1000,7 +925,8 @@ class AKShareSyncService:
         symbols: List[str] = None,
         max_news_per_stock: int = 20,
         force_update: bool = False,
-        favorites_only: bool = True
+        favorites_only: bool = True,
+        job_id: str = None
     ) -> Dict[str, Any]:
         """
         同步新闻数据
@@ -1010,6 +936,7 @@ class AKShareSyncService:
             max_news_per_stock: 每只股票最大新闻数量
             force_update: 是否强制更新
             favorites_only: 是否只同步自选股（默认True）
+            job_id: 任务ID（用于进度跟踪）
 
         Returns:
             同步结果统计
@@ -1049,27 +976,39 @@ class AKShareSyncService:
             stats["total_processed"] = len(symbols)
             logger.info(f"📊 需要同步 {len(symbols)} 只股票的新闻")
 
-            # 2. 批量处理
-            for i in range(0, len(symbols), self.batch_size):
-                batch = symbols[i:i + self.batch_size]
-                batch_stats = await self._process_news_batch(
-                    batch, max_news_per_stock
+            # 2. 流水线处理：获取（受限流器控制）与保存并发进行
+            async def fetch(symbol: str):
+                news_data = await self.provider.get_stock_news(
+                    symbol=symbol,
+                    limit=max_news_per_stock
                 )
+                if not news_data:
+                    logger.debug(f"⚠️ {symbol} 未获取到新闻数据")
+                return news_data
 
-                # 更新统计
-                stats["success_count"] += batch_stats["success_count"]
-                stats["error_count"] += batch_stats["error_count"]
-                stats["news_count"] += batch_stats["news_count"]
-                stats["errors"].extend(batch_stats["errors"])
-
-                # 进度日志
-                progress = min(i + self.batch_size, len(symbols))
-                logger.info(f"📈 新闻同步进度: {progress}/{len(symbols)} "
-                           f"(成功: {stats['success_count']}, 新闻: {stats['news_count']})")
-
-                # API限流
-                if i + self.batch_size < len(symbols):
-                    await asyncio.sleep(self.rate_limit_delay)
+            async def save(symbol: str, news_data) -> int:
+                saved_count = await self.news_service.save_news_data(
+                    news_data=news_data,
+                    data_source="akshare",
+                    market="CN"
+                )
+                logger.debug(f"✅ {symbol} 新闻同步成功: {saved_count}条")
+                return saved_count
+
+            result = await SyncPipeline(
+                "AKShare新闻同步",
+                fetch,
+                save,
+                rate_limiter=self.rate_limiter,
+                progress=self._job_progress(job_id, len(symbols)),
+            ).run(symbols)
+
+            # 没有新闻也算成功
+            stats["success_count"] = result.saved + result.empty
+            stats["error_count"] = len(result.errors)
+            stats["news_count"] = result.records
+            stats["errors"].extend(result.errors)
+            stats["pipeline"] = result.stages
 
             # 3. 完成统计
             stats["end_time"] = datetime.utcnow()
@@ -1089,57 +1028,24 @@ class AKShareSyncService:
             stats["errors"].append({"error": str(e), "context": "sync_news_data"})
             return stats
 
-    async def _process_news_batch(
-        self,
-        batch: List[str],
-        max_news_per_stock: int
-    ) -> Dict[str, Any]:
-        """处理新闻批次"""
-        batch_stats = {
-            "success_count": 0,
-            "error_count": 0,
-            "news_count": 0,
-            "errors": []
-        }
-
-        for symbol in batch:
-            try:
-                # 从AKShare获取新闻数据
-                news_data = await self.provider.get_stock_news(
-                    symbol=symbol,
-                    limit=max_news_per_stock
-                )
-
-                if news_data:
-                    # 保存新闻数据
-                    saved_count = await self.news_service.save_news_data(
-                        news_data=news_data,
-                        data_source="akshare",
-                        market="CN"
-                    )
-
-                    batch_stats["success_count"] += 1
-                    batch_stats["news_count"] += saved_count
-
-                    logger.debug(f"✅ {symbol} 新闻同步成功: {saved_count}条")
-                else:
-                    logger.debug(f"⚠️ {symbol} 未获取到新闻数据")
-                    batch_stats["success_count"] += 1  # 没有新闻也算成功
-
-                # 🔥 API限流：成功后休眠
-                await asyncio.sleep(0.2)
-
-            except Exception as e:
-                batch_stats["error_count"] += 1
-                error_msg = f"{symbol}: {str(e)}"
-                batch_stats["errors"].append(error_msg)
-                logger.error(f"❌ {symbol} 新闻同步失败: {e}")
-
-                # 🔥 失败后也要休眠，避免"失败雪崩"
-                # 失败时休眠更长时间，给API服务器恢复的机会
-                await asyncio.sleep(1.0)
+    # ==================== 进度跟踪辅助方法 ====================
+
+    def _job_progress(self, job_id: Optional[str], total: int):
+        """生成流水线的进度上报回调（写入调度任务执行记录）"""
+        if not job_id:
+            return None
+
+        async def report(progress: int, message: str):
+            from app.services.scheduler_service import update_job_progress
+            await update_job_progress(
+                job_id=job_id,
+                progress=progress,
+                message=message,
+                total_items=total,
+                processed_items=int(progress * total / 100)
+            )
 
-        return batch_stats
+        return report
 
 
 # 全局同步服务实例
@@ -1189,8 +1095,9 @@ async def run_akshare_historical_sync(incremental: bool = True):
     """APScheduler任务：同步历史数据"""
     try:
         service = await get_akshare_sync_service()
-        result = await service.sync_historical_data(incremental=incremental)
+        result = await service.sync_historical_data(incremental=incremental, job_id="akshare_historical_sync")
         logger.info(f"✅ AKShare历史数据同步完成: {result}")
+        await refresh_technical_factors_after_sync("AKShare")
         return result
     except Exception as e:
         logger.error(f"❌ AKShare历史数据同步失败: {e}")
@@ -1201,7 +1108,7 @@ async def run_akshare_financial_sync():
     """APScheduler任务：同步财务数据"""
     try:
         service = await get_akshare_sync_service()
-        result = await service.sync_financial_data()
+        result = await service.sync_financial_data(job_id="akshare_financial_sync")
         logger.info(f"✅ AKShare财务数据同步完成: {result}")
         return result
     except Exception as e:
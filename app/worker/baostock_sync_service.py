@@ -11,7 +11,10 @@ from dataclasses import dataclass
 
 from app.core.config import get_settings
 from app.core.database import get_database
+from app.core.rate_limiter import get_baostock_rate_limiter
 from app.services.historical_data_service import get_historical_data_service
+from app.services.technical_factors_service import refresh_technical_factors_after_sync
+from app.worker.sync_pipeline import SyncPipeline
 from tradingagents.dataflows.providers.china.baostock import BaoStockProvider
 
 logger = logging.getLogger(__name__)
@@ -45,6 +48,7 @@ class BaoStockSyncService:
             self.provider = BaoStockProvider()
             self.historical_service = None  # 延迟初始化
             self.db = None  # 🔥 延迟初始化，在 initialize() 中设置
+            self.rate_limiter = get_baostock_rate_limiter()
 
             logger.info("✅ BaoStock同步服务初始化成功")
         except Exception as e:
@@ -345,15 +349,17 @@ class BaoStockSyncService:
             logger.error(f"❌ 更新日K线到数据库失败: {e}")
             raise
     
-    async def sync_historical_data(self, days: int = 30, batch_size: int = 20, period: str = "daily", incremental: bool = True) -> BaoStockSyncStats:
+    async def sync_historical_data(self, days: int = 30, batch_size: int = 20, period: str = "daily",
+                                   incremental: bool = True, job_id: str = None) -> BaoStockSyncStats:
         """
         同步历史数据
 
         Args:
             days: 同步天数（如果>=3650则同步全历史，如果<0则使用增量模式）
-            batch_size: 批处理大小
+            batch_size: 保存阶段一次合并处理的股票数
             period: 数据周期 (daily/weekly/monthly)
             incremental: 是否增量同步（每只股票从自己的最后日期开始）
+            job_id: 任务ID（用于进度跟踪）
 
         Returns:
             同步统计信息
@@ -387,44 +393,10 @@ class BaoStockSyncService:
 
             logger.info(f"📊 开始同步{len(stock_codes)}只股票的历史数据...")
 
-            # 批量处理
-            for i in range(0, len(stock_codes), batch_size):
-                batch = stock_codes[i:i + batch_size]
-                batch_stats = await self._sync_historical_batch(batch, days, end_date, period, use_incremental)
-                
-                stats.historical_records += batch_stats.historical_records
-                stats.errors.extend(batch_stats.errors)
-                
-                logger.info(f"📊 批次进度: {i + len(batch)}/{len(stock_codes)}, "
-                          f"记录: {batch_stats.historical_records}, "
-                          f"错误: {len(batch_stats.errors)}")
-                
-                # 避免API限制
-                await asyncio.sleep(0.5)
-            
-            logger.info(f"✅ BaoStock历史数据同步完成: {stats.historical_records}条记录")
-            return stats
-            
-        except Exception as e:
-            logger.error(f"❌ BaoStock历史数据同步失败: {e}")
-            stats.errors.append(str(e))
-            return stats
-    
-    async def _sync_historical_batch(
-        self,
-        code_batch: List[str],
-        days: int,
-        end_date: str,
-        period: str = "daily",
-        incremental: bool = False
-    ) -> BaoStockSyncStats:
-        """同步历史数据批次"""
-        stats = BaoStockSyncStats()
-
-        for code in code_batch:
-            try:
-                # 确定该股票的起始日期
-                if incremental:
+            # 流水线处理：获取与保存并发进行
+            # BaoStock 客户端使用全局登录会话，不支持多线程并发请求，获取阶段只用 1 个协程
+            async def fetch(code: str):
+                if use_incremental:
                     # 增量同步：获取该股票的最后日期
                     start_date = await self._get_last_sync_date(code)
                     logger.debug(f"📅 {code}: 从 {start_date} 开始同步")
@@ -434,21 +406,38 @@ class BaoStockSyncService:
                 else:
                     # 固定天数同步
                     start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-
                 hist_data = await self.provider.get_historical_data(code, start_date, end_date, period)
+                if hist_data is None or hist_data.empty:
+                    raise ValueError(f"获取{code}历史数据失败")
+                return hist_data
+
+            async def save(code: str, hist_data) -> int:
+                return await self._update_historical_data(code, hist_data, period)
+
+            result = await SyncPipeline(
+                f"BaoStock{period_name}同步",
+                fetch,
+                save,
+                rate_limiter=self.rate_limiter,
+                fetch_workers=1,
+                save_batch_size=batch_size,
+                progress=self._job_progress(job_id, len(stock_codes)),
+            ).run(stock_codes)
+
+            stats.historical_records += result.records
+            stats.errors.extend(
+                error["error"] if error["context"].endswith(".fetch") else f"处理{error['code']}历史数据失败: {error['error']}"
+                for error in result.errors
+            )
 
-                if hist_data is not None and not hist_data.empty:
-                    # 更新数据库
-                    records_count = await self._update_historical_data(code, hist_data, period)
-                    stats.historical_records += records_count
-                else:
-                    stats.errors.append(f"获取{code}历史数据失败")
-
-            except Exception as e:
-                stats.errors.append(f"处理{code}历史数据失败: {e}")
-
-        return stats
-
+            logger.info(f"✅ BaoStock历史数据同步完成: {stats.historical_records}条记录")
+            return stats
+            
+        except Exception as e:
+            logger.error(f"❌ BaoStock历史数据同步失败: {e}")
+            stats.errors.append(str(e))
+            return stats
+    
     async def _update_historical_data(self, code: str, hist_data, period: str = "daily") -> int:
         """更新历史数据到数据库"""
         try:
@@ -525,6 +514,23 @@ class BaoStockSyncService:
             # 出错时返回30天前，确保不漏数据
             return (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
 
+    def _job_progress(self, job_id: Optional[str], total: int):
+        """生成流水线的进度上报回调（写入调度任务执行记录）"""
+        if not job_id:
+            return None
+
+        async def report(progress: int, message: str):
+            from app.services.scheduler_service import update_job_progress
+            await update_job_progress(
+                job_id=job_id,
+                progress=progress,
+                message=message,
+                total_items=total,
+                processed_items=int(progress * total / 100)
+            )
+
+        return report
+
     async def check_service_status(self) -> Dict[str, Any]:
         """检查服务状态"""
         try:
@@ -590,8 +596,9 @@ async def run_baostock_historical_sync():
     try:
         service = BaoStockSyncService()
         await service.initialize()  # 🔥 必须先初始化
-        stats = await service.sync_historical_data()
+        stats = await service.sync_historical_data(job_id="baostock_historical_sync")
         logger.info(f"🎯 BaoStock历史数据同步完成: {stats.historical_records}条记录, {len(stats.errors)}个错误")
+        await refresh_technical_factors_after_sync("BaoStock")
     except Exception as e:
         logger.error(f"❌ BaoStock历史数据同步任务失败: {e}")
 
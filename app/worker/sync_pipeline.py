@@ -0,0 +1,250 @@
+"""
+逐只股票同步的流水线执行器
+
+原先各数据源的同步循环严格串行：限流 -> 获取 -> 保存 -> 更新进度，
+接口等待和 MongoDB 写入从不重叠。流水线拆成三个阶段：
+
+    生产者(股票代码) -> [获取队列] -> N 个获取协程(受数据源限流器控制) -> [保存队列] -> M 个保存协程
+
+- 两个队列都有容量上限：保存跟不上时获取协程阻塞在 put 上，自然形成背压
+- 保存协程每次取出队列中已就绪的多只股票一起写入
+- 各阶段吞吐和队列深度定期通过 progress 回调上报（对接各服务的 _update_progress）
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """单个阶段的统计"""
+    name: str
+    workers: int
+    processed: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    peak_queue: int = 0
+
+    def throughput(self, elapsed: float) -> float:
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "processed": self.processed,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 2),
+            "per_second": round(self.throughput(elapsed), 2),
+            "peak_queue": self.peak_queue,
+        }
+
+
+@dataclass
+class PipelineResult:
+    """流水线运行结果"""
+    total: int = 0
+    saved: int = 0            # 获取并保存成功的条目数
+    empty: int = 0            # 获取结果为空的条目数
+    records: int = 0          # save 返回值之和
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    stopped: bool = False
+    duration: float = 0.0
+    stages: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @property
+    def done(self) -> int:
+        return self.saved + self.empty + len(self.errors)
+
+
+def _is_empty(data: Any) -> bool:
+    if data is None:
+        return True
+    empty = getattr(data, "empty", None)
+    if isinstance(empty, bool):
+        return empty
+    if isinstance(data, (list, dict, tuple)):
+        return not data
+    return False
+
+
+class SyncPipeline:
+    """
+    获取/保存分离的并发同步执行器
+
+    Args:
+        name: 名称（用于日志和进度消息）
+        fetch: async (item) -> data；返回 None/空 DataFrame/空列表表示无数据
+        save: async (item, data) -> int 记录数；抛出异常表示保存失败
+        rate_limiter: 数据源限流器（需要 acquire()），每次 fetch 前获取
+        fetch_workers / save_workers: 各阶段并发数
+        queue_size: 每个队列的容量
+        save_batch_size: 保存协程一次最多合并处理的条目数
+        progress: async (percent, message)，定期上报进度
+        should_stop: async () -> bool，定期检查是否需要停止
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[Any], Awaitable[Any]],
+        save: Callable[[Any, Any], Awaitable[int]],
+        rate_limiter=None,
+        fetch_workers: Optional[int] = None,
+        save_workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        save_batch_size: int = 8,
+        progress: Optional[Callable[[int, str], Awaitable[None]]] = None,
+        progress_interval: Optional[float] = None,
+        should_stop: Optional[Callable[[], Awaitable[bool]]] = None,
+    ):
+        self.name = name
+        self.fetch = fetch
+        self.save = save
+        self.rate_limiter = rate_limiter
+        self.fetch_workers = fetch_workers or settings.SYNC_PIPELINE_FETCH_WORKERS
+        self.save_workers = save_workers or settings.SYNC_PIPELINE_SAVE_WORKERS
+        self.queue_size = queue_size or settings.SYNC_PIPELINE_QUEUE_SIZE
+        self.save_batch_size = max(1, save_batch_size)
+        self.progress = progress
+        self.progress_interval = progress_interval or settings.SYNC_PIPELINE_PROGRESS_INTERVAL
+        self.should_stop = should_stop
+
+    async def run(self, items: Iterable[Any]) -> PipelineResult:
+        items = list(items)
+        result = PipelineResult(total=len(items))
+        fetch_stage = StageStats("fetch", self.fetch_workers)
+        save_stage = StageStats("save", self.save_workers)
+        fetch_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        save_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        stop = asyncio.Event()
+        start = time.perf_counter()
+
+        def add_error(item, stage: str, error: Exception):
+            result.errors.append({"code": item, "error": str(error), "error_type": type(error).__name__,
+                                  "context": f"{self.name}.{stage}"})
+
+        async def producer():
+            for item in items:
+                if stop.is_set():
+                    break
+                await fetch_queue.put(item)
+                fetch_stage.peak_queue = max(fetch_stage.peak_queue, fetch_queue.qsize())
+            for _ in range(self.fetch_workers):
+                await fetch_queue.put(_DONE)
+
+        async def fetcher():
+            while True:
+                item = await fetch_queue.get()
+                if item is _DONE:
+                    return
+                if stop.is_set():
+                    continue
+                began = time.perf_counter()
+                try:
+                    if self.rate_limiter is not None:
+                        await self.rate_limiter.acquire()
+                    data = await self.fetch(item)
+                except Exception as e:
+                    fetch_stage.errors += 1
+                    add_error(item, "fetch", e)
+                    logger.error(f"❌ [{self.name}] {item} 获取失败: {e}")
+                    continue
+                finally:
+                    fetch_stage.busy_seconds += time.perf_counter() - began
+                fetch_stage.processed += 1
+                if _is_empty(data):
+                    result.empty += 1
+                    continue
+                await save_queue.put((item, data))
+                save_stage.peak_queue = max(save_stage.peak_queue, save_queue.qsize())
+
+        async def saver():
+            finished = False
+            while not finished:
+                first = await save_queue.get()
+                if first is _DONE:
+                    return
+                batch = [first]
+                while len(batch) < self.save_batch_size:
+                    try:
+                        nxt = save_queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    if nxt is _DONE:
+                        finished = True
+                        break
+                    batch.append(nxt)
+
+                began = time.perf_counter()
+                outcomes = await asyncio.gather(*(self.save(item, data) for item, data in batch),
+                                                return_exceptions=True)
+                save_stage.busy_seconds += time.perf_counter() - began
+                for (item, _), outcome in zip(batch, outcomes):
+                    if isinstance(outcome, Exception):
+                        save_stage.errors += 1
+                        add_error(item, "save", outcome)
+                        logger.error(f"❌ [{self.name}] {item} 保存失败: {outcome}")
+                    else:
+                        save_stage.processed += 1
+                        result.saved += 1
+                        result.records += int(outcome or 0)
+
+        def snapshot() -> str:
+            elapsed = time.perf_counter() - start
+            return (f"{self.name}: {result.done}/{result.total} | "
+                    f"获取 {fetch_stage.throughput(elapsed):.1f}/秒, 保存 {save_stage.throughput(elapsed):.1f}/秒 | "
+                    f"队列 获取 {fetch_queue.qsize()}/{self.queue_size}, 保存 {save_queue.qsize()}/{self.queue_size} | "
+                    f"记录 {result.records}, 错误 {len(result.errors)}")
+
+        async def reporter():
+            while True:
+                await asyncio.sleep(self.progress_interval)
+                if self.should_stop is not None and await self.should_stop():
+                    logger.warning(f"⚠️ [{self.name}] 收到停止信号，正在退出...")
+                    result.stopped = True
+                    stop.set()
+                message = snapshot()
+                logger.info(f"📈 {message}")
+                if self.progress is not None:
+                    await self.progress(int(result.done / max(result.total, 1) * 100), message)
+
+        tasks = [asyncio.create_task(fetcher()) for _ in range(self.fetch_workers)]
+        savers = [asyncio.create_task(saver()) for _ in range(self.save_workers)]
+        report_task = asyncio.create_task(reporter())
+        try:
+            pipeline = asyncio.ensure_future(self._drain(producer(), tasks, savers, save_queue))
+            # 任一阶段或进度上报抛出异常（例如任务被取消）时整体退出
+            done, _ = await asyncio.wait({pipeline, report_task}, return_when=asyncio.FIRST_COMPLETED)
+            if report_task in done:
+                pipeline.cancel()
+                report_task.result()
+            pipeline.result()
+        finally:
+            for task in [report_task, *tasks, *savers]:
+                task.cancel()
+            await asyncio.gather(report_task, *tasks, *savers, return_exceptions=True)
+
+        result.duration = time.perf_counter() - start
+        result.stages = {
+            "fetch": fetch_stage.to_dict(result.duration),
+            "save": save_stage.to_dict(result.duration),
+        }
+        logger.info(f"✅ {snapshot()}，耗时 {result.duration:.2f}秒")
+        if self.progress is not None and not result.stopped:
+            await self.progress(100, snapshot())
+        return result
+
+    async def _drain(self, producer, fetchers, savers, save_queue):
+        await producer
+        await asyncio.gather(*fetchers)
+        for _ in savers:
+            await save_queue.put(_DONE)
+        await asyncio.gather(*savers)
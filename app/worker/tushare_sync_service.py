@@ -7,6 +7,8 @@ from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional
 import logging
 
+import pandas as pd
+
 from tradingagents.dataflows.providers.china.tushare import TushareProvider
 from app.services.stock_data_service import get_stock_data_service
 from app.services.historical_data_service import get_historical_data_service
@@ -15,12 +17,42 @@ from app.core.database import get_mongo_db
 from app.core.config import settings
 from app.core.rate_limiter import get_tushare_rate_limiter
 from app.utils.timezone import now_tz
+from app.services.technical_factors_service import refresh_technical_factors_after_sync
+from app.worker.sync_pipeline import SyncPipeline
 
 logger = logging.getLogger(__name__)
 
 # UTC+8 时区
 UTC_8 = timezone(timedelta(hours=8))
 
+# 按交易日同步时，聚合各股票最新日期的回看自然日数
+DATEWISE_LOOKBACK_DAYS = 45
+# 前复权调整的价格列（与 pro_bar adj='qfq' 一致）
+QFQ_PRICE_COLUMNS = ("open", "high", "low", "close", "pre_close")
+
+
+def apply_forward_adjustment(bars: pd.DataFrame, adj_factors: pd.Series) -> pd.DataFrame:
+    """
+    本地前复权：price * adj_factor(日期) / adj_factor(该股票窗口内最新日期)，保留 2 位小数
+
+    Args:
+        bars: 未复权日线，需包含 ts_code/trade_date
+        adj_factors: 以 (ts_code, trade_date) 为索引的复权因子
+    """
+    if bars.empty:
+        return bars
+    bars = bars.sort_values(['ts_code', 'trade_date']).copy()
+    factor = pd.Series(
+        adj_factors.reindex(pd.MultiIndex.from_frame(bars[['ts_code', 'trade_date']])).to_numpy(),
+        index=bars.index,
+    )
+    base = factor.groupby(bars['ts_code']).transform('last')
+    ratio = (factor / base).fillna(1.0)
+    for col in QFQ_PRICE_COLUMNS:
+        if col in bars.columns:
+            bars[col] = (bars[col] * ratio).round(2)
+    return bars
+
 
 def get_utc8_now():
     """
@@ -624,108 +656,50 @@ class TushareSyncService:
 
             logger.info(f"📊 历史数据同步: 结束日期={end_date}, 股票数量={len(symbols)}, 模式={'增量' if incremental else '全量'}")
 
-            # 4. 批量处理
-            for i, symbol in enumerate(symbols):
-                # 记录单个股票开始时间
-                stock_start_time = datetime.now()
-
-                try:
-                    # 检查是否需要退出
-                    if job_id and await self._should_stop(job_id):
-                        logger.warning(f"⚠️ 任务 {job_id} 收到停止信号，正在退出...")
-                        stats["stopped"] = True
-                        break
-
-                    # 速率限制
-                    await self.rate_limiter.acquire()
-
-                    # 确定该股票的起始日期
-                    symbol_start_date = start_date
-                    if not symbol_start_date:
-                        if all_history:
-                            symbol_start_date = "1990-01-01"
-                        elif incremental:
-                            # 增量同步：获取该股票的最后日期
-                            symbol_start_date = await self._get_last_sync_date(symbol)
-                            logger.debug(f"📅 {symbol}: 从 {symbol_start_date} 开始同步")
-                        else:
-                            symbol_start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
-
-                    # 记录请求参数
-                    logger.debug(
-                        f"🔍 {symbol}: 请求{period_name}数据 "
-                        f"start={symbol_start_date}, end={end_date}, period={period}"
-                    )
-
-                    # ⏱️ 性能监控：API 调用
-                    api_start = datetime.now()
-                    df = await self.provider.get_historical_data(symbol, symbol_start_date, end_date, period=period)
-                    api_duration = (datetime.now() - api_start).total_seconds()
-
-                    if df is not None and not df.empty:
-                        # ⏱️ 性能监控：数据保存
-                        save_start = datetime.now()
-                        records_saved = await self._save_historical_data(symbol, df, period=period)
-                        save_duration = (datetime.now() - save_start).total_seconds()
-
-                        stats["success_count"] += 1
-                        stats["total_records"] += records_saved
-
-                        # 计算单个股票耗时
-                        stock_duration = (datetime.now() - stock_start_time).total_seconds()
-                        logger.info(
-                            f"✅ {symbol}: 保存 {records_saved} 条{period_name}记录，"
-                            f"总耗时 {stock_duration:.2f}秒 "
-                            f"(API: {api_duration:.2f}秒, 保存: {save_duration:.2f}秒)"
-                        )
+            # 4. 流水线处理：获取（受限流器控制）与保存并发进行
+            async def fetch(symbol: str):
+                symbol_start_date = start_date
+                if not symbol_start_date:
+                    if all_history:
+                        symbol_start_date = "1990-01-01"
+                    elif incremental:
+                        # 增量同步：获取该股票的最后日期
+                        symbol_start_date = await self._get_last_sync_date(symbol)
+                        logger.debug(f"📅 {symbol}: 从 {symbol_start_date} 开始同步")
                     else:
-                        stock_duration = (datetime.now() - stock_start_time).total_seconds()
-                        logger.warning(
-                            f"⚠️ {symbol}: 无{period_name}数据 "
-                            f"(start={symbol_start_date}, end={end_date})，耗时 {stock_duration:.2f}秒"
-                        )
-
-                    # 每个股票都更新进度
-                    progress_percent = int(((i + 1) / len(symbols)) * 100)
-
-                    # 更新任务进度
-                    if job_id:
-                        await self._update_progress(
-                            job_id,
-                            progress_percent,
-                            f"正在同步 {symbol} ({i + 1}/{len(symbols)})"
-                        )
-
-                    # 每50个股票输出一次详细日志
-                    if (i + 1) % 50 == 0 or (i + 1) == len(symbols):
-                        logger.info(f"📈 {period_name}数据同步进度: {i + 1}/{len(symbols)} ({progress_percent}%) "
-                                   f"(成功: {stats['success_count']}, 记录: {stats['total_records']})")
-
-                        # 输出速率限制器统计
-                        limiter_stats = self.rate_limiter.get_stats()
-                        logger.info(f"   速率限制: {limiter_stats['current_calls']}/{limiter_stats['max_calls']}次, "
-                                   f"等待次数: {limiter_stats['total_waits']}, "
-                                   f"总等待时间: {limiter_stats['total_wait_time']:.1f}秒")
-
-                except Exception as e:
-                    import traceback
-                    error_details = traceback.format_exc()
-                    stats["error_count"] += 1
-                    stats["errors"].append({
-                        "code": symbol,
-                        "error": str(e),
-                        "error_type": type(e).__name__,
-                        "context": f"sync_historical_data_{period}",
-                        "traceback": error_details
-                    })
-                    logger.error(
-                        f"❌ {symbol} {period_name}数据同步失败\n"
-                        f"   参数: start={symbol_start_date if 'symbol_start_date' in locals() else 'N/A'}, "
-                        f"end={end_date}, period={period}\n"
-                        f"   错误类型: {type(e).__name__}\n"
-                        f"   错误信息: {str(e)}\n"
-                        f"   堆栈跟踪:\n{error_details}"
-                    )
+                        symbol_start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
+
+                df = await self.provider.get_historical_data(symbol, symbol_start_date, end_date, period=period)
+                if df is None or df.empty:
+                    logger.warning(f"⚠️ {symbol}: 无{period_name}数据 (start={symbol_start_date}, end={end_date})")
+                return df
+
+            async def save(symbol: str, df) -> int:
+                records_saved = await self._save_historical_data(symbol, df, period=period)
+                logger.debug(f"✅ {symbol}: 保存 {records_saved} 条{period_name}记录")
+                return records_saved
+
+            result = await SyncPipeline(
+                f"Tushare{period_name}同步",
+                fetch,
+                save,
+                rate_limiter=self.rate_limiter,
+                progress=(lambda p, m: self._update_progress(job_id, p, m)) if job_id else None,
+                should_stop=(lambda: self._should_stop(job_id)) if job_id else None,
+            ).run(symbols)
+
+            stats["success_count"] = result.saved
+            stats["total_records"] = result.records
+            stats["error_count"] = len(result.errors)
+            stats["errors"].extend(result.errors)
+            stats["pipeline"] = result.stages
+            if result.stopped:
+                stats["stopped"] = True
+
+            limiter_stats = self.rate_limiter.get_stats()
+            logger.info(f"   速率限制: {limiter_stats['current_calls']}/{limiter_stats['max_calls']}次, "
+                       f"等待次数: {limiter_stats['total_waits']}, "
+                       f"总等待时间: {limiter_stats['total_wait_time']:.1f}秒")
 
             # 4. 完成统计
             stats["end_time"] = datetime.utcnow()
@@ -756,6 +730,169 @@ class TushareSyncService:
             })
             return stats
 
+    async def sync_historical_data_by_date(
+        self,
+        symbols: List[str] = None,
+        end_date: str = None,
+        job_id: str = None
+    ) -> Dict[str, Any]:
+        """
+        按交易日增量同步日线（截面模式）
+
+        每个交易日调用一次 daily(trade_date) 和 adj_factor(trade_date) 获取全市场数据，
+        在本地做前复权后一次性写入所有股票。以下股票仍走逐只同步：
+        - 新上市或长期停牌后复牌（近期没有本地数据）
+        - 存在缺口（上一交易日有成交但本地没有该日数据）
+        - 窗口内发生除权除息（复权因子变化，历史前复权价格需要整体重算）
+
+        没有可用的本地数据、或需要补的交易日过多时，整体退回 sync_historical_data。
+
+        Args:
+            symbols: 只同步这些股票（默认全市场）
+            end_date: 结束日期 (YYYY-MM-DD)，默认今天
+            job_id: 任务ID（用于进度跟踪）
+
+        Returns:
+            同步结果统计
+        """
+        logger.info("🔄 开始按交易日同步日线历史数据...")
+        stats = {
+            "mode": "date",
+            "total_processed": 0,
+            "success_count": 0,
+            "error_count": 0,
+            "total_records": 0,
+            "api_calls": 0,
+            "trade_dates": [],
+            "per_symbol_count": 0,
+            "start_time": datetime.utcnow(),
+            "errors": []
+        }
+
+        async def fallback(reason: str) -> Dict[str, Any]:
+            logger.info(f"↩️ {reason}，改用逐只同步")
+            return await self.sync_historical_data(symbols=symbols, end_date=end_date, incremental=True, job_id=job_id)
+
+        async def call(fn, *args):
+            await self.rate_limiter.acquire()
+            stats["api_calls"] += 1
+            return await fn(*args)
+
+        try:
+            if self.historical_service is None:
+                self.historical_service = await get_historical_data_service()
+            end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+
+            # 1. 一次聚合查询得到各股票近期的最新日期，全局最大值即上次同步到的交易日
+            since = (datetime.strptime(end_date, '%Y-%m-%d') - timedelta(days=DATEWISE_LOOKBACK_DAYS)).strftime('%Y-%m-%d')
+            last_dates = await self.historical_service.get_latest_dates("tushare", since, period="daily")
+            if not last_dates:
+                return await fallback(f"{since} 之后没有本地日线数据")
+            last_synced = max(last_dates.values())
+            if last_synced >= end_date:
+                logger.info(f"✅ 日线数据已是最新（{last_synced}）")
+                return stats
+
+            # 2. 需要补的交易日
+            trade_dates = await call(self.provider.get_trade_dates, last_synced, end_date)
+            if trade_dates is None:
+                return await fallback("获取交易日历失败")
+            new_dates = [d for d in trade_dates if d > last_synced]
+            if not new_dates:
+                logger.info(f"✅ {last_synced} 之后没有新的交易日")
+                return stats
+            max_dates = getattr(settings, "TUSHARE_DATEWISE_MAX_DATES", 20)
+            if len(new_dates) > max_dates:
+                return await fallback(f"需要补 {len(new_dates)} 个交易日，超过 {max_dates}")
+            stats["trade_dates"] = new_dates
+
+            # 3. 拉取上次同步日和每个新交易日的全市场日线与复权因子
+            bars, factors = [], []
+            for i, trade_date in enumerate([last_synced] + new_dates):
+                if job_id and await self._should_stop(job_id):
+                    logger.warning(f"⚠️ 任务 {job_id} 收到停止信号，正在退出...")
+                    stats["stopped"] = True
+                    return stats
+                daily = await call(self.provider.get_daily_by_date, trade_date)
+                adj = await call(self.provider.get_adj_factor_by_date, trade_date)
+                # 上次同步日的数据同样不可缺少：缺少复权因子无法识别除权，缺少日线无法识别缺口
+                if daily is None or adj is None:
+                    return await fallback(f"{trade_date} 全市场数据获取失败")
+                bars.append(daily)
+                factors.append(adj)
+                if job_id:
+                    await self._update_progress(job_id, int((i + 1) / (len(new_dates) + 1) * 50), f"正在获取 {trade_date} 全市场日线")
+
+            bars_df = pd.concat(bars, ignore_index=True)
+            adj_df = pd.concat(factors, ignore_index=True)
+            adj_df['trade_date'] = pd.to_datetime(adj_df['trade_date'].astype(str), format='%Y%m%d').dt.strftime('%Y-%m-%d')
+            if symbols:
+                wanted = set(symbols)
+                bars_df = bars_df[bars_df['symbol'].isin(wanted)]
+
+            # 4. 分流：截面写入 / 逐只同步
+            traded_on_last = set(bars_df.loc[bars_df['trade_date'] == last_synced, 'symbol'])
+            window = bars_df[bars_df['trade_date'] > last_synced]
+            adj_by_date = adj_df.set_index(['ts_code', 'trade_date'])['adj_factor']
+            last_factor = adj_df[adj_df['trade_date'] == last_synced].set_index('ts_code')['adj_factor']
+            latest_factor = adj_df[adj_df['trade_date'] > last_synced].sort_values('trade_date').groupby('ts_code')['adj_factor'].last()
+
+            per_symbol, full_refetch = [], []
+            for ts_code, symbol in window[['ts_code', 'symbol']].drop_duplicates().itertuples(index=False):
+                if symbol not in last_dates or (symbol in traded_on_last and last_dates[symbol] < last_synced):
+                    per_symbol.append(symbol)
+                elif ts_code in last_factor.index and ts_code in latest_factor.index \
+                        and last_factor[ts_code] != latest_factor[ts_code]:
+                    full_refetch.append(symbol)
+            routed = set(per_symbol) | set(full_refetch)
+            datewise = window[~window['symbol'].isin(routed)]
+            stats["total_processed"] = window['symbol'].nunique()
+
+            # 5. 本地前复权后一次性写入
+            adjusted = apply_forward_adjustment(datewise, adj_by_date)
+            records = await self.historical_service.save_cross_section(adjusted, data_source="tushare", market="CN", period="daily")
+            stats["total_records"] += records
+            stats["success_count"] += datewise['symbol'].nunique()
+            logger.info(
+                f"📊 截面同步: {len(new_dates)} 个交易日, {datewise['symbol'].nunique()} 只股票, {records} 条记录, "
+                f"API调用 {stats['api_calls']} 次; 逐只同步 {len(per_symbol)} 只(新股/缺口), 重算复权 {len(full_refetch)} 只"
+            )
+
+            # 6. 新股/缺口增量补齐，除权股票重新拉取全部历史
+            for batch, all_history in ((per_symbol, False), (full_refetch, True)):
+                if not batch:
+                    continue
+                sub = await self.sync_historical_data(
+                    symbols=batch, end_date=end_date, incremental=not all_history, all_history=all_history
+                )
+                stats["per_symbol_count"] += len(batch)
+                stats["success_count"] += sub.get("success_count", 0)
+                stats["error_count"] += sub.get("error_count", 0)
+                stats["total_records"] += sub.get("total_records", 0)
+                stats["api_calls"] += len(batch)
+                stats["errors"].extend(sub.get("errors", []))
+
+            if job_id:
+                await self._update_progress(job_id, 100, f"按交易日同步完成: {', '.join(new_dates)}")
+
+            stats["end_time"] = datetime.utcnow()
+            stats["duration"] = (stats["end_time"] - stats["start_time"]).total_seconds()
+            logger.info(
+                f"✅ 按交易日同步完成: 股票 {stats['success_count']}/{stats['total_processed']}, "
+                f"记录 {stats['total_records']} 条, API调用 {stats['api_calls']} 次, 耗时 {stats['duration']:.2f} 秒"
+            )
+            return stats
+
+        except Exception as e:
+            import traceback
+            logger.error(f"❌ 按交易日同步失败: {e}\n{traceback.format_exc()}")
+            stats["errors"].append({
+                "error": str(e),
+                "error_type": type(e).__name__,
+                "context": "sync_historical_data_by_date",
+            })
+            return stats
+
     async def _save_historical_data(self, symbol: str, df, period: str = "daily") -> int:
         """保存历史数据到数据库"""
         try:
@@ -873,62 +1010,49 @@ class TushareSyncService:
             stats["total_processed"] = len(symbols)
             logger.info(f"📊 需要同步 {len(symbols)} 只股票财务数据")
 
-            # 批量处理
-            for i, symbol in enumerate(symbols):
-                try:
-                    # 速率限制
-                    await self.rate_limiter.acquire()
+            # 流水线处理：获取（受限流器控制）与保存并发进行
+            async def fetch(symbol: str):
+                financial_data = await self.provider.get_financial_data(symbol, limit=limit)
+                if not financial_data:
+                    logger.warning(f"⚠️ {symbol}: 无财务数据")
+                return financial_data
+
+            async def save(symbol: str, financial_data) -> int:
+                if not await self._save_financial_data(symbol, financial_data):
+                    raise RuntimeError("财务数据保存失败")
+                return 1
+
+            async def report(progress: int, message: str):
+                from app.services.scheduler_service import update_job_progress
+                await update_job_progress(
+                    job_id=job_id,
+                    progress=progress,
+                    message=message,
+                    total_items=len(symbols),
+                    processed_items=int(progress * len(symbols) / 100)
+                )
 
-                    # 获取财务数据（指定获取期数）
-                    financial_data = await self.provider.get_financial_data(symbol, limit=limit)
+            from app.services.scheduler_service import TaskCancelledException
+            try:
+                result = await SyncPipeline(
+                    "Tushare财务数据同步",
+                    fetch,
+                    save,
+                    rate_limiter=self.rate_limiter,
+                    progress=report if job_id else None,
+                ).run(symbols)
+            except TaskCancelledException:
+                # 任务被取消，记录并退出
+                logger.warning("⚠️ 财务数据同步任务被用户取消")
+                stats["end_time"] = datetime.utcnow()
+                stats["duration"] = (stats["end_time"] - stats["start_time"]).total_seconds()
+                stats["cancelled"] = True
+                raise
 
-                    if financial_data:
-                        # 保存财务数据
-                        success = await self._save_financial_data(symbol, financial_data)
-                        if success:
-                            stats["success_count"] += 1
-                        else:
-                            stats["error_count"] += 1
-                    else:
-                        logger.warning(f"⚠️ {symbol}: 无财务数据")
-
-                    # 进度日志和进度跟踪
-                    if (i + 1) % 20 == 0:
-                        progress = int((i + 1) / len(symbols) * 100)
-                        logger.info(f"📈 财务数据同步进度: {i + 1}/{len(symbols)} ({progress}%) "
-                                   f"(成功: {stats['success_count']}, 错误: {stats['error_count']})")
-                        # 输出速率限制器统计
-                        limiter_stats = self.rate_limiter.get_stats()
-                        logger.info(f"   速率限制: {limiter_stats['current_calls']}/{limiter_stats['max_calls']}次")
-
-                        # 更新任务进度
-                        if job_id:
-                            from app.services.scheduler_service import update_job_progress, TaskCancelledException
-                            try:
-                                await update_job_progress(
-                                    job_id=job_id,
-                                    progress=progress,
-                                    message=f"正在同步 {symbol} 财务数据",
-                                    current_item=symbol,
-                                    total_items=len(symbols),
-                                    processed_items=i + 1
-                                )
-                            except TaskCancelledException:
-                                # 任务被取消，记录并退出
-                                logger.warning(f"⚠️ 财务数据同步任务被用户取消 (已处理 {i + 1}/{len(symbols)})")
-                                stats["end_time"] = datetime.utcnow()
-                                stats["duration"] = (stats["end_time"] - stats["start_time"]).total_seconds()
-                                stats["cancelled"] = True
-                                raise
-
-                except Exception as e:
-                    stats["error_count"] += 1
-                    stats["errors"].append({
-                        "code": symbol,
-                        "error": str(e),
-                        "context": "sync_financial_data"
-                    })
-                    logger.error(f"❌ {symbol} 财务数据同步失败: {e}")
+            stats["success_count"] = result.saved
+            stats["error_count"] = len(result.errors)
+            stats["errors"].extend(result.errors)
+            stats["pipeline"] = result.stages
 
             # 完成统计
             stats["end_time"] = datetime.utcnow()
@@ -1063,42 +1187,43 @@ class TushareSyncService:
             stats["total_processed"] = len(symbols)
             logger.info(f"📊 需要同步 {len(symbols)} 只股票的新闻")
 
-            # 2. 批量处理
-            for i in range(0, len(symbols), self.batch_size):
-                # 检查是否需要退出
-                if job_id and await self._should_stop(job_id):
-                    logger.warning(f"⚠️ 任务 {job_id} 收到停止信号，正在退出...")
-                    stats["stopped"] = True
-                    break
-
-                batch = symbols[i:i + self.batch_size]
-                batch_stats = await self._process_news_batch(
-                    batch, hours_back, max_news_per_stock
+            # 2. 流水线处理：获取（受限流器控制）与保存并发进行
+            async def fetch(symbol: str):
+                news_data = await self.provider.get_stock_news(
+                    symbol=symbol,
+                    limit=max_news_per_stock,
+                    hours_back=hours_back
                 )
+                if not news_data:
+                    logger.debug(f"⚠️ {symbol} 未获取到新闻数据")
+                return news_data
 
-                # 更新统计
-                stats["success_count"] += batch_stats["success_count"]
-                stats["error_count"] += batch_stats["error_count"]
-                stats["news_count"] += batch_stats["news_count"]
-                stats["errors"].extend(batch_stats["errors"])
-
-                # 进度日志和进度更新
-                progress = min(i + self.batch_size, len(symbols))
-                progress_percent = int((progress / len(symbols)) * 100)
-                logger.info(f"📈 新闻同步进度: {progress}/{len(symbols)} ({progress_percent}%) "
-                           f"(成功: {stats['success_count']}, 新闻: {stats['news_count']})")
-
-                # 更新任务进度
-                if job_id:
-                    await self._update_progress(
-                        job_id,
-                        progress_percent,
-                        f"已处理 {progress}/{len(symbols)} 只股票，获取 {stats['news_count']} 条新闻"
-                    )
-
-                # API限流
-                if i + self.batch_size < len(symbols):
-                    await asyncio.sleep(self.rate_limit_delay)
+            async def save(symbol: str, news_data) -> int:
+                saved_count = await self.news_service.save_news_data(
+                    news_data=news_data,
+                    data_source="tushare",
+                    market="CN"
+                )
+                logger.debug(f"✅ {symbol} 新闻同步成功: {saved_count}条")
+                return saved_count
+
+            result = await SyncPipeline(
+                "Tushare新闻同步",
+                fetch,
+                save,
+                rate_limiter=self.rate_limiter,
+                progress=(lambda p, m: self._update_progress(job_id, p, m)) if job_id else None,
+                should_stop=(lambda: self._should_stop(job_id)) if job_id else None,
+            ).run(symbols)
+
+            # 没有新闻也算成功
+            stats["success_count"] = result.saved + result.empty
+            stats["error_count"] = len(result.errors)
+            stats["news_count"] = result.records
+            stats["errors"].extend(result.errors)
+            stats["pipeline"] = result.stages
+            if result.stopped:
+                stats["stopped"] = True
 
             # 3. 完成统计
             stats["end_time"] = datetime.utcnow()
@@ -1118,60 +1243,6 @@ class TushareSyncService:
             stats["errors"].append({"error": str(e), "context": "sync_news_data"})
             return stats
 
-    async def _process_news_batch(
-        self,
-        batch: List[str],
-        hours_back: int,
-        max_news_per_stock: int
-    ) -> Dict[str, Any]:
-        """处理新闻批次"""
-        batch_stats = {
-            "success_count": 0,
-            "error_count": 0,
-            "news_count": 0,
-            "errors": []
-        }
-
-        for symbol in batch:
-            try:
-                # 从Tushare获取新闻数据
-                news_data = await self.provider.get_stock_news(
-                    symbol=symbol,
-                    limit=max_news_per_stock,
-                    hours_back=hours_back
-                )
-
-                if news_data:
-                    # 保存新闻数据
-                    saved_count = await self.news_service.save_news_data(
-                        news_data=news_data,
-                        data_source="tushare",
-                        market="CN"
-                    )
-
-                    batch_stats["success_count"] += 1
-                    batch_stats["news_count"] += saved_count
-
-                    logger.debug(f"✅ {symbol} 新闻同步成功: {saved_count}条")
-                else:
-                    logger.debug(f"⚠️ {symbol} 未获取到新闻数据")
-                    batch_stats["success_count"] += 1  # 没有新闻也算成功
-
-                # 🔥 API限流：成功后休眠
-                await asyncio.sleep(0.2)
-
-            except Exception as e:
-                batch_stats["error_count"] += 1
-                error_msg = f"{symbol}: {str(e)}"
-                batch_stats["errors"].append(error_msg)
-                logger.error(f"❌ {symbol} 新闻同步失败: {e}")
-
-                # 🔥 失败后也要休眠，避免"失败雪崩"
-                # 失败时休眠更长时间，给API服务器恢复的机会
-                await asyncio.sleep(1.0)
-
-        return batch_stats
-
     # ==================== 进度跟踪辅助方法 ====================
 
     async def _should_stop(self, job_id: str) -> bool:
@@ -1309,8 +1380,12 @@ async def run_tushare_historical_sync(incremental: bool = True):
     try:
         service = await get_tushare_sync_service()
         logger.info(f"✅ [APScheduler] Tushare 同步服务已初始化")
-        result = await service.sync_historical_data(incremental=incremental, job_id="tushare_historical_sync")
+        if incremental and getattr(settings, "TUSHARE_HISTORICAL_SYNC_MODE", "date") == "date":
+            result = await service.sync_historical_data_by_date(job_id="tushare_historical_sync")
+        else:
+            result = await service.sync_historical_data(incremental=incremental, job_id="tushare_historical_sync")
         logger.info(f"✅ [APScheduler] Tushare历史数据同步完成: {result}")
+        await refresh_technical_factors_after_sync("Tushare")
         return result
     except Exception as e:
         logger.error(f"❌ [APScheduler] Tushare历史数据同步失败: {e}")
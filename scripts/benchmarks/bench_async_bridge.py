@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+同步 -> 异步桥接的单次调用开销：旧实现（每次新建事件循环/线程池）vs 共享后台事件循环
+
+场景:
+  sync      普通线程中调用（旧实现复用线程默认事件循环）
+  in-loop   运行中的事件循环内调用（旧实现每次新建线程池 + asyncio.run）
+  warm      协程使用按事件循环缓存的客户端（模拟 aiohttp/Motor 连接池，建连耗时 --connect-ms），
+            旧实现在 in-loop 场景下每次都要重新建连
+
+用法:
+    python scripts/benchmarks/bench_async_bridge.py --calls 500 --connect-ms 2
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import os
+import sys
+import time
+import weakref
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.utils.async_bridge import AsyncBridge
+
+
+def legacy_run_async_blocking(coro):
+    """原 DataSourceManager._run_async_blocking 实现"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        try:
+            loop = asyncio.get_event_loop()
+            if loop.is_closed():
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+        except RuntimeError:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coro)
+
+    def _runner():
+        return asyncio.run(coro)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(_runner).result()
+
+
+_clients = weakref.WeakKeyDictionary()
+
+
+async def noop():
+    return 1
+
+
+def make_warm_call(connect_ms: float):
+    async def warm_call():
+        loop = asyncio.get_running_loop()
+        if loop not in _clients:
+            await asyncio.sleep(connect_ms / 1000)  # 建连/握手
+            _clients[loop] = object()
+        await asyncio.sleep(0)
+        return 1
+    return warm_call
+
+
+def measure(run, factory, calls: int, in_loop: bool) -> float:
+    """返回单次调用平均耗时（微秒）"""
+    def body():
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            run(factory())
+        return (time.perf_counter() - t0) / calls * 1e6
+
+    if not in_loop:
+        return body()
+
+    async def main():
+        return body()
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="同步->异步桥接单次调用开销基准测试")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--connect-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    bridge = AsyncBridge(name="bench-async-bridge")
+    warm = make_warm_call(args.connect_ms)
+    scenarios = [
+        ("sync", noop, False),
+        ("in-loop", noop, True),
+        ("warm/sync", warm, False),
+        ("warm/in-loop", warm, True),
+    ]
+
+    print(f"📊 每个场景 {args.calls} 次调用, 建连耗时 {args.connect_ms}ms")
+    print(f"{'场景':<14}{'旧实现(us)':>14}{'共享循环(us)':>14}{'加速':>10}")
+    for name, factory, in_loop in scenarios:
+        # 预热：启动后台循环、建立线程默认事件循环
+        legacy_run_async_blocking(noop())
+        bridge.run(noop())
+        legacy = measure(legacy_run_async_blocking, factory, args.calls, in_loop)
+        shared = measure(bridge.run, factory, args.calls, in_loop)
+        print(f"{name:<14}{legacy:>14.1f}{shared:>14.1f}{legacy / shared:>9.1f}x")
+
+    bridge.shutdown()
+
+
+if __name__ == "__main__":
+    main()
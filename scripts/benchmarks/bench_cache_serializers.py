@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缓存序列化格式对比：CSV / JSON(records) / Arrow IPC 帧 / NumPy 列块帧
+
+以 10 年日线（约 2430 根K线，日期索引 + OHLCV + 成交额/涨跌幅）为样本，
+比较单条缓存的字节数、写入与读取耗时。
+
+用法:
+    python scripts/benchmarks/bench_cache_serializers.py --years 10 --repeat 50
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.cache.serialization import ARROW_AVAILABLE, decode_frame, encode_frame
+
+
+def make_daily(years: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2015-01-01", periods=years * 243, name="date")
+    close = 20 + np.cumsum(rng.normal(0, 0.4, len(dates)))
+    return pd.DataFrame({
+        "open": close + rng.normal(0, 0.1, len(dates)),
+        "high": close + rng.uniform(0, 0.5, len(dates)),
+        "low": close - rng.uniform(0, 0.5, len(dates)),
+        "close": close,
+        "volume": rng.integers(10_000, 5_000_000, len(dates)),
+        "amount": rng.uniform(1e6, 1e9, len(dates)),
+        "pct_chg": rng.normal(0, 2, len(dates)),
+    }, index=dates)
+
+
+def _formats():
+    formats = {
+        "csv": (lambda df: df.to_csv().encode("utf-8"),
+                lambda b: pd.read_csv(io.BytesIO(b), index_col=0, parse_dates=True)),
+        "json": (lambda df: df.reset_index().to_json(orient="records", date_format="iso").encode("utf-8"),
+                 lambda b: pd.read_json(io.BytesIO(b), orient="records")),
+        "npy": (lambda df: encode_frame(df, "npy"), decode_frame),
+    }
+    if ARROW_AVAILABLE:
+        formats["arrow"] = (lambda df: encode_frame(df, "arrow"), decode_frame)
+    return formats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="缓存序列化格式基准测试")
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    df = make_daily(args.years)
+    print(f"📊 样本: {len(df)} 行 x {df.shape[1]} 列, 重复 {args.repeat} 次")
+    print(f"{'格式':<8}{'字节':>12}{'写入(ms)':>12}{'读取(ms)':>12}{'dtype保留':>12}")
+
+    for name, (dump, load) in _formats().items():
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            blob = dump(df)
+        t_dump = (time.perf_counter() - t0) / args.repeat * 1000
+
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            out = load(blob)
+        t_load = (time.perf_counter() - t0) / args.repeat * 1000
+
+        same = isinstance(out.index, pd.DatetimeIndex) and out.dtypes.equals(df.dtypes)
+        print(f"{name:<8}{len(blob):>12,}{t_dump:>12.2f}{t_load:>12.2f}{'✅' if same else '❌':>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史K线存储布局对比：逐行文档 vs 按年分桶列存
+
+在指定的 MongoDB 中生成临时集合，写入 N 只股票 × Y 年的合成日线，比较：
+- 文档数
+- 数据大小 / 索引大小（collStats）
+- 单只股票全历史读取延迟（p50 / p99）
+
+需要可访问的 MongoDB（默认使用 app 配置中的 MONGO_URI / MONGO_DB），结束后删除临时集合。
+
+用法:
+    python scripts/benchmarks/bench_daily_quotes_layout.py --symbols 200 --years 10 --reads 200
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, project_root)
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import InsertOne
+
+from app.services.historical_buckets import HistoricalBucketStore, group_by_year, pack_bucket
+
+
+def make_rows(symbol: str, years: int, rng) -> list:
+    dates = pd.bdate_range("2015-01-01", periods=years * 243).strftime("%Y-%m-%d")
+    close = 10 + np.cumsum(rng.normal(0, 0.2, len(dates)))
+    rows = []
+    for i, d in enumerate(dates):
+        c = float(close[i])
+        rows.append({
+            "symbol": symbol, "code": symbol, "full_symbol": f"{symbol}.SZ", "market": "CN",
+            "trade_date": d, "period": "daily", "data_source": "tushare",
+            "open": c, "high": c + 0.1, "low": c - 0.1, "close": c, "pre_close": c,
+            "volume": float(rng.integers(1e5, 1e7)), "amount": float(rng.uniform(1e6, 1e9)),
+            "change": 0.0, "pct_chg": 0.0, "turnover_rate": 1.0,
+        })
+    return rows
+
+
+async def coll_stats(db, name):
+    stats = await db.command("collStats", name)
+    return stats["count"], stats["size"], stats["totalIndexSize"]
+
+
+async def read_latency(fn, symbols, reads):
+    latencies = []
+    for i in range(reads):
+        t0 = time.perf_counter()
+        rows = await fn(symbols[i % len(symbols)])
+        latencies.append(time.perf_counter() - t0)
+        assert rows
+    arr = np.array(latencies) * 1000
+    return np.percentile(arr, 50), np.percentile(arr, 99)
+
+
+async def main_async(args):
+    if args.mongo_uri:
+        uri, db_name = args.mongo_uri, args.db
+    else:
+        from app.core.config import get_settings
+        settings = get_settings()
+        uri, db_name = settings.MONGO_URI, settings.MONGO_DB
+
+    client = AsyncIOMotorClient(uri)
+    db = client[db_name]
+    suffix = uuid.uuid4().hex[:8]
+    rows_coll = db[f"bench_rows_{suffix}"]
+    bucket_coll = db[f"bench_buckets_{suffix}"]
+    rng = np.random.default_rng(3)
+    symbols = [f"{i:06d}" for i in range(args.symbols)]
+
+    try:
+        await rows_coll.create_index([("symbol", 1), ("trade_date", 1), ("data_source", 1), ("period", 1)], unique=True)
+        await rows_coll.create_index([("symbol", 1)])
+        await rows_coll.create_index([("trade_date", -1)])
+        await rows_coll.create_index([("symbol", 1), ("trade_date", -1)])
+        store = HistoricalBucketStore(bucket_coll)
+        await store.ensure_indexes()
+
+        print(f"📊 写入 {args.symbols} 只股票 × {args.years} 年日线...")
+        for symbol in symbols:
+            rows = make_rows(symbol, args.years, rng)
+            await rows_coll.bulk_write([InsertOne(dict(r)) for r in rows], ordered=False)
+            buckets = [pack_bucket(rows[0], year, recs) for year, recs in group_by_year(rows).items()]
+            await bucket_coll.insert_many(buckets)
+
+        async def read_rows(symbol):
+            return await rows_coll.find({"symbol": symbol}).sort("trade_date", -1).to_list(length=None)
+
+        async def read_buckets(symbol):
+            return await store.find(symbol)
+
+        print(f"{'布局':<10}{'文档数':>12}{'数据(MB)':>12}{'索引(MB)':>12}{'p50(ms)':>10}{'p99(ms)':>10}")
+        for name, coll, reader in (("rows", rows_coll, read_rows), ("buckets", bucket_coll, read_buckets)):
+            count, size, index_size = await coll_stats(db, coll.name)
+            p50, p99 = await read_latency(reader, symbols, args.reads)
+            print(f"{name:<10}{count:>12,}{size / 2**20:>12.1f}{index_size / 2**20:>12.2f}{p50:>10.1f}{p99:>10.1f}")
+    finally:
+        await rows_coll.drop()
+        await bucket_coll.drop()
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="历史K线存储布局基准测试")
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--reads", type=int, default=200, help="全历史读取次数")
+    parser.add_argument("--mongo-uri", help="MongoDB连接串，默认读取应用配置")
+    parser.add_argument("--db", default="tradingagents_bench")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史K线批量写入基准：逐行 iterrows + ReplaceOne vs 列式转换 + 自适应批量写入
+
+对比两条路径保存 N 只股票 × M 行日线的耗时：
+- legacy: 原 save_historical_data 实现（iterrows + _standardize_record，固定 200 条一批，逐只股票串行）
+- columnar: frame_to_columns + UpdateOne/insert_many，批大小自适应，多只股票并发写入
+
+默认在进程内模拟写入延迟（每批固定开销 + 每条记录开销），只比较 Python 转换和调度；
+指定 --mongo-uri 时写入真实 MongoDB 的临时集合，结束后删除。
+
+用法:
+    python scripts/benchmarks/bench_historical_bulk_write.py --symbols 5000 --rows 250
+    python scripts/benchmarks/bench_historical_bulk_write.py --symbols 500 --mongo-uri mongodb://localhost:27017
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, project_root)
+
+from pymongo import ReplaceOne
+
+from app.services.historical_data_service import HistoricalDataService
+
+
+def make_frame(rows: int, rng) -> pd.DataFrame:
+    close = 10 + np.cumsum(rng.normal(0, 0.2, rows))
+    return pd.DataFrame({
+        "ts_code": "000001.SZ",
+        "trade_date": pd.bdate_range("2023-01-02", periods=rows).strftime("%Y%m%d"),
+        "open": close, "high": close + 0.1, "low": close - 0.1, "close": close,
+        "pre_close": np.roll(close, 1), "change": 0.0, "pct_chg": 0.0,
+        "vol": rng.integers(1e4, 1e6, rows).astype(float),
+        "amount": rng.uniform(1e4, 1e6, rows),
+    })
+
+
+class _SimulatedCollection:
+    """模拟写入延迟：每批 base 秒 + 每条 per_doc 秒"""
+
+    def __init__(self, base: float, per_doc: float):
+        self.base = base
+        self.per_doc = per_doc
+        self.seen = set()
+
+    async def _write(self, n):
+        await asyncio.sleep(self.base + self.per_doc * n)
+
+    async def find_one(self, query, projection=None):
+        return {"_id": 1} if query.get("symbol") in self.seen else None
+
+    async def insert_many(self, documents, ordered=True):
+        await self._write(len(documents))
+        self.seen.add(documents[0]["symbol"])
+        return SimpleNamespace(inserted_ids=[None] * len(documents))
+
+    async def bulk_write(self, operations, ordered=True):
+        await self._write(len(operations))
+        return SimpleNamespace(upserted_count=len(operations), modified_count=0)
+
+
+async def legacy_save(service: HistoricalDataService, symbol: str, data: pd.DataFrame) -> int:
+    """原实现的转换与写入流程"""
+    data = data.copy()
+    data['amount'] = data['amount'] * 1000
+    data['vol'] = data['vol'] * 100
+    operations, saved = [], 0
+    for date_index, row in data.iterrows():
+        doc = service._standardize_record(symbol, row, "tushare", "CN", "daily", date_index)
+        operations.append(ReplaceOne(
+            {"symbol": doc["symbol"], "trade_date": doc["trade_date"],
+             "data_source": doc["data_source"], "period": doc["period"]},
+            doc, upsert=True,
+        ))
+        if len(operations) >= 200:
+            saved += await service._execute_bulk_write_with_retry(symbol, operations)
+            operations = []
+    if operations:
+        saved += await service._execute_bulk_write_with_retry(symbol, operations)
+    return saved
+
+
+async def run(args):
+    rng = np.random.default_rng(7)
+    frames = [(f"{i:06d}", make_frame(args.rows, rng)) for i in range(args.symbols)]
+    total_rows = args.symbols * args.rows
+
+    client = None
+    if args.mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_uri)
+        db = client[args.db]
+
+    def new_collection():
+        if client is None:
+            return _SimulatedCollection(args.batch_latency, args.doc_latency)
+        return db[f"bench_quotes_{uuid.uuid4().hex[:8]}"]
+
+    print(f"📊 {args.symbols} 只股票 × {args.rows} 行 = {total_rows:,} 条"
+          f"{'（真实MongoDB）' if client else f'（模拟延迟 每批{args.batch_latency * 1000:.0f}ms + 每条{args.doc_latency * 1e6:.0f}µs）'}")
+    print(f"{'路径':<12}{'耗时(秒)':>10}{'条/秒':>12}{'保存条数':>12}")
+
+    collections = []
+    try:
+        for name in ("legacy", "columnar", "columnar-2"):
+            service = HistoricalDataService(layout="rows")
+            service.collection = collections[-1] if name == "columnar-2" else new_collection()
+            if name != "columnar-2":
+                collections.append(service.collection)
+            if client is not None and name != "columnar-2":
+                await service.collection.create_index(
+                    [("symbol", 1), ("trade_date", 1), ("data_source", 1), ("period", 1)], unique=True)
+
+            start = time.perf_counter()
+            if name == "legacy":
+                saved = 0
+                for symbol, df in frames:
+                    saved += await legacy_save(service, symbol, df)
+            else:
+                # columnar: 全新集合（insert_many）；columnar-2: 同一集合再写一遍（upsert）
+                results = await service.save_historical_data_many(frames, "tushare")
+                saved = sum(results.values())
+            elapsed = time.perf_counter() - start
+            print(f"{name:<12}{elapsed:>10.2f}{total_rows / elapsed:>12,.0f}{saved:>12,}")
+    finally:
+        if client is not None:
+            for coll in collections:
+                await coll.drop()
+            client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="历史K线批量写入基准测试")
+    parser.add_argument("--symbols", type=int, default=5000)
+    parser.add_argument("--rows", type=int, default=250)
+    parser.add_argument("--batch-latency", type=float, default=0.005, help="模拟每批写入的固定开销（秒）")
+    parser.add_argument("--doc-latency", type=float, default=0.00001, help="模拟每条记录的写入开销（秒）")
+    parser.add_argument("--mongo-uri", help="写入真实 MongoDB（临时集合）")
+    parser.add_argument("--db", default="tradingagents_bench")
+    args = parser.parse_args()
+
+    import logging
+    logging.getLogger("app.services.historical_data_service").setLevel(logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
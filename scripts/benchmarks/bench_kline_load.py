@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+K线接口并发延迟测试（p50 / p99）
+
+两种模式：
+1. 进程内对比（默认）：模拟固定的数据库往返延迟，比较
+   - sync: 在事件循环中直接调用同步读取（原 MongoDBCacheAdapter 路径，阻塞事件循环）
+   - async: 通过 MarketDataRepository 以 await 方式读取（Motor 路径）
+2. 压测真实服务：指定 --url，对 /api/stocks/{code}/kline 按固定速率发起请求
+
+延迟从请求的计划到达时刻起算，包含排队时间，能反映事件循环被阻塞时的尾延迟。
+
+用法:
+    python scripts/benchmarks/bench_kline_load.py --requests 400 --rate 200 --db-latency 0.005
+    python scripts/benchmarks/bench_kline_load.py --url http://127.0.0.1:8000 --token <JWT> --codes 000001,600519
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, project_root)
+
+
+def make_docs(n=250):
+    return [{"symbol": "000001", "period": "daily", "data_source": "tushare",
+             "trade_date": f"2024-{1 + i // 28:02d}-{1 + i % 28:02d}", "open": 10.0 + i, "high": 11.0 + i,
+             "low": 9.0 + i, "close": 10.5 + i, "vol": 1000.0 * i, "amount": 1e6 * i} for i in range(n)]
+
+
+class _LatencyCursor:
+    def __init__(self, docs, latency):
+        self._docs = docs
+        self._latency = latency
+
+    def sort(self, key, direction):
+        self._docs = sorted(self._docs, key=lambda d: d[key], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self._docs = self._docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        await asyncio.sleep(self._latency)
+        return list(self._docs[:length])
+
+
+class _LatencyCollection:
+    def __init__(self, docs, latency):
+        self._docs = docs
+        self._latency = latency
+
+    def find(self, query, projection=None):
+        return _LatencyCursor(self._docs, self._latency)
+
+    def find_sync(self):
+        time.sleep(self._latency)
+        return list(self._docs)
+
+
+def summarize(name, latencies, wall):
+    arr = np.array(latencies) * 1000
+    print(f"{name:<8}{len(arr):>8}{np.percentile(arr, 50):>10.1f}{np.percentile(arr, 99):>10.1f}"
+          f"{arr.max():>10.1f}{len(arr) / wall:>10.1f}")
+
+
+async def run_load(handler, total, rate):
+    """开环压测：按固定到达速率发起请求，延迟从计划到达时刻起算（包含排队时间）"""
+    latencies = []
+    start = time.perf_counter()
+
+    async def one(i):
+        scheduled = start + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await handler()
+        latencies.append(time.perf_counter() - scheduled)
+
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return latencies, time.perf_counter() - start
+
+
+async def in_process(args):
+    import pandas as pd
+    from app.services.market_data_repository import MarketDataRepository, columns_to_items
+
+    coll = _LatencyCollection(make_docs(), args.db_latency)
+    repo = MarketDataRepository(db={"stock_daily_quotes": coll})
+
+    async def sync_handler():
+        # 原实现：同步查询 + DataFrame + iterrows，期间事件循环被阻塞
+        df = pd.DataFrame(coll.find_sync())
+        [{"time": r["trade_date"], "close": float(r["close"])} for _, r in df.tail(args.limit).iterrows()]
+
+    async def async_handler():
+        bars = await repo.get_bars("000001", limit=args.limit, sources=["tushare"])
+        columns_to_items(bars["columns"])
+
+    print(f"📊 {args.requests} 次请求, 到达速率 {args.rate}/秒, 模拟DB延迟 {args.db_latency * 1000:.1f}ms, limit={args.limit}")
+    print(f"{'路径':<8}{'请求数':>8}{'p50(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}{'QPS':>10}")
+    for name, handler in (("sync", sync_handler), ("async", async_handler)):
+        latencies, wall = await run_load(handler, args.requests, args.rate)
+        summarize(name, latencies, wall)
+
+
+async def against_server(args):
+    import httpx
+
+    codes = [c.strip() for c in args.codes.split(",") if c.strip()]
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    async with httpx.AsyncClient(base_url=args.url, headers=headers, timeout=30) as client:
+        counter = {"i": 0, "errors": 0}
+
+        async def handler():
+            code = codes[counter["i"] % len(codes)]
+            counter["i"] += 1
+            resp = await client.get(f"/api/stocks/{code}/kline", params={"period": "day", "limit": args.limit})
+            if resp.status_code != 200:
+                counter["errors"] += 1
+
+        print(f"📊 {args.url} {args.requests} 次请求, 到达速率 {args.rate}/秒")
+        print(f"{'路径':<8}{'请求数':>8}{'p50(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}{'QPS':>10}")
+        latencies, wall = await run_load(handler, args.requests, args.rate)
+        summarize("server", latencies, wall)
+        if counter["errors"]:
+            print(f"⚠️ 非200响应: {counter['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="K线接口并发延迟测试")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--rate", type=float, default=200, help="每秒到达的请求数")
+    parser.add_argument("--limit", type=int, default=120)
+    parser.add_argument("--db-latency", type=float, default=0.005, help="进程内模式下每次查询的模拟延迟（秒）")
+    parser.add_argument("--url", help="压测真实服务的地址，例如 http://127.0.0.1:8000")
+    parser.add_argument("--token", help="访问令牌")
+    parser.add_argument("--codes", default="000001", help="逗号分隔的股票代码")
+    args = parser.parse_args()
+
+    asyncio.run(against_server(args) if args.url else in_process(args))
+
+
+if __name__ == "__main__":
+    main()
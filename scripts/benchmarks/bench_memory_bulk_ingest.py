@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+记忆批量导入吞吐对比：逐条嵌入 vs 批量并发嵌入
+
+嵌入接口用桩函数模拟（每次请求固定延迟 + 每条文本少量耗时），
+ChromaDB 使用内存客户端，真实执行写入。
+
+用法:
+    python scripts/benchmarks/bench_memory_bulk_ingest.py --count 500 --latency 0.05
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from types import SimpleNamespace
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, project_root)
+
+import chromadb
+
+from tradingagents.agents.utils import memory as memory_module
+from tradingagents.agents.utils.embedding_cache import EmbeddingCache
+from tradingagents.agents.utils.memory import FinancialSituationMemory
+
+DIM = 256
+
+
+class StubEmbeddings:
+    """模拟OpenAI兼容的嵌入接口"""
+
+    def __init__(self, latency: float, per_text: float):
+        self.latency = latency
+        self.per_text = per_text
+        self.requests = 0
+
+    def create(self, model, input):
+        texts = input if isinstance(input, list) else [input]
+        self.requests += 1
+        time.sleep(self.latency + self.per_text * len(texts))
+        data = [SimpleNamespace(index=i, embedding=[(hash(t) % 997) / 997.0 + 1e-3] * DIM)
+                for i, t in enumerate(texts)]
+        return SimpleNamespace(data=data)
+
+
+def make_memory(stub: StubEmbeddings) -> FinancialSituationMemory:
+    memory = FinancialSituationMemory.__new__(FinancialSituationMemory)
+    memory.llm_provider = "openai"
+    memory.client = SimpleNamespace(embeddings=stub, base_url="http://stub/v1")
+    memory.embedding = "stub-embedding"
+    memory.enable_embedding_length_check = False
+    memory.max_embedding_length = 50000
+    memory.situation_collection = chromadb.Client().create_collection(f"bench_{uuid.uuid4().hex[:8]}")
+    return memory
+
+
+def legacy_add(memory: FinancialSituationMemory, data):
+    """原实现：逐条嵌入 + 基于count()的ID"""
+    offset = memory.situation_collection.count()
+    memory.situation_collection.add(
+        documents=[s for s, _ in data],
+        metadatas=[{"recommendation": r} for _, r in data],
+        embeddings=[memory._compute_embedding(s) for s, _ in data],
+        ids=[str(offset + i) for i in range(len(data))],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="记忆批量导入基准测试")
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05, help="每次嵌入请求的固定延迟（秒）")
+    parser.add_argument("--per-text", type=float, default=0.0005, help="每条文本的额外耗时（秒）")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    data = [(f"{i}: 市场波动加剧，成交量放大，行业轮动明显。" * 5, f"建议 {i}") for i in range(args.count)]
+    print(f"📊 样本: {args.count} 条记忆, 请求延迟 {args.latency*1000:.0f}ms")
+    print(f"{'方式':<10}{'请求数':>8}{'耗时(s)':>10}{'条/秒':>10}")
+
+    stub = StubEmbeddings(args.latency, args.per_text)
+    t0 = time.perf_counter()
+    legacy_add(make_memory(stub), data)
+    elapsed = time.perf_counter() - t0
+    print(f"{'逐条':<10}{stub.requests:>8}{elapsed:>10.2f}{args.count / elapsed:>10.1f}")
+
+    memory_module.get_embedding_cache = lambda cache=EmbeddingCache(max_entries=args.count): cache
+    stub = StubEmbeddings(args.latency, args.per_text)
+    memory = make_memory(stub)
+    t0 = time.perf_counter()
+    memory.add_situations_bulk(data, batch_size=args.batch_size, max_concurrency=args.concurrency)
+    elapsed = time.perf_counter() - t0
+    print(f"{'批量并发':<10}{stub.requests:>8}{elapsed:>10.2f}{args.count / elapsed:>10.1f}")
+
+    t0 = time.perf_counter()
+    memory.add_situations_bulk(data, batch_size=args.batch_size, max_concurrency=args.concurrency)
+    elapsed = time.perf_counter() - t0
+    print(f"{'重复导入':<10}{stub.requests:>8}{elapsed:>10.2f}{args.count / elapsed:>10.1f}"
+          f"  (记录数 {memory.situation_collection.count()})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全市场实时 PE/PB 基准：逐只 calculate_realtime_pe_pb vs 批量向量化 compute_realtime_pe_pb_batch
+
+- per-symbol: 每只股票 3 次 find_one（market_quotes / stock_basic_info / stock_financial_data）
+- batch: 每个集合读取一次，按代码对齐后向量化计算
+
+使用内存中的模拟集合，每次查询附加 --query-latency 的往返延迟（默认 0.5ms，约等于本机 MongoDB）。
+
+用法:
+    python scripts/benchmarks/bench_realtime_pe_pb.py --symbols 5000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.realtime_metrics import (
+    calculate_realtime_pe_pb,
+    compute_realtime_pe_pb_batch,
+    documents_to_frames,
+    metrics_frame_to_dict,
+)
+
+
+def make_documents(symbols: int, rng):
+    now = datetime.now()
+    quotes, basic, financial = [], [], []
+    for i in range(symbols):
+        code = f"{i:06d}"
+        pre_close = float(rng.uniform(2, 200))
+        quotes.append({"code": code, "close": pre_close * float(rng.uniform(0.9, 1.1)),
+                       "pre_close": pre_close, "updated_at": now})
+        basic.append({"code": code, "source": "tushare", "pe": float(rng.uniform(-20, 80)),
+                      "pe_ttm": float(rng.uniform(-20, 80)), "pb": float(rng.uniform(0.5, 10)),
+                      "total_mv": float(rng.uniform(20, 5000)), "total_share": float(rng.uniform(1e4, 1e6)),
+                      "updated_at": now - timedelta(days=1)})
+        financial.append({"code": code, "report_period": "20250930", "total_equity": float(rng.uniform(1e8, 1e11))})
+    return quotes, basic, financial
+
+
+class _Collection:
+    def __init__(self, docs, latency):
+        self._docs = {d["code"]: d for d in docs}
+        self._latency = latency
+        self.queries = 0
+
+    def find_one(self, query, *args, **kwargs):
+        self.queries += 1
+        time.sleep(self._latency)
+        return self._docs.get(query.get("code"))
+
+
+class _Client:
+    def __init__(self, quotes, basic, financial, latency):
+        self.market_quotes = _Collection(quotes, latency)
+        self.stock_basic_info = _Collection(basic, latency)
+        self.stock_financial_data = _Collection(financial, latency)
+
+    def __getitem__(self, name):
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="全市场实时PE/PB计算基准测试")
+    parser.add_argument("--symbols", type=int, default=5000)
+    parser.add_argument("--query-latency", type=float, default=0.0005, help="模拟每次查询的往返延迟（秒）")
+    args = parser.parse_args()
+
+    logging.getLogger("tradingagents.dataflows.realtime_metrics").setLevel(logging.ERROR)
+    quotes, basic, financial = make_documents(args.symbols, np.random.default_rng(7))
+    client = _Client(quotes, basic, financial, args.query_latency)
+
+    start = time.perf_counter()
+    single = {q["code"]: calculate_realtime_pe_pb(q["code"], client) for q in quotes}
+    per_symbol = time.perf_counter() - start
+    queries = client.market_quotes.queries + client.stock_basic_info.queries + client.stock_financial_data.queries
+
+    start = time.perf_counter()
+    # 批量路径同样支付三次查询往返
+    time.sleep(3 * args.query_latency)
+    batch = metrics_frame_to_dict(compute_realtime_pe_pb_batch(*documents_to_frames(quotes, basic, financial)))
+    batched = time.perf_counter() - start
+
+    computed = sum(1 for v in single.values() if v)
+    mismatched = sum(
+        1 for code, v in single.items()
+        if v and (code not in batch or batch[code]["pe"] != v["pe"] or batch[code]["pb"] != v["pb"])
+    )
+    print(f"📊 {args.symbols} 只股票（模拟查询延迟 {args.query_latency * 1000:.1f}ms）")
+    print(f"{'路径':<12}{'耗时(秒)':>10}{'查询次数':>10}{'结果数':>10}")
+    print(f"{'per-symbol':<12}{per_symbol:>10.3f}{queries:>10}{computed:>10}")
+    print(f"{'batch':<12}{batched:>10.3f}{3:>10}{len(batch):>10}")
+    print(f"加速比: {per_symbol / batched:.1f}x，结果不一致: {mismatched}")
+
+
+if __name__ == "__main__":
+    main()
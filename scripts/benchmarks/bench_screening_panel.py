@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全市场截面选股基准测试（离线合成数据，不依赖 MongoDB）
+
+分别统计：构建截面（含技术指标）耗时、首次筛选耗时、缓存截面上的重复筛选耗时。
+
+用法:
+    python scripts/benchmarks/bench_screening_panel.py --symbols 5000 --bars 150
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, project_root)
+
+from app.services.screening.panel_engine import build_screening_panel
+from app.services.screening_service import ScreeningParams, ScreeningService
+
+CONDITIONS = {
+    "logic": "AND",
+    "children": [
+        {"field": "close", "op": ">", "right_field": "ma20"},
+        {"field": "rsi14", "op": "between", "value": [40, 70]},
+        {"field": "dif", "op": "cross_up", "right_field": "dea"},
+    ],
+}
+
+
+def make_bars(n_symbols: int, n_bars: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 20 + np.cumsum(rng.normal(0, 0.3, (n_symbols, n_bars)), axis=1)
+    dates = pd.bdate_range("2024-01-01", periods=n_bars).strftime("%Y-%m-%d")
+    return pd.DataFrame({
+        "symbol": np.repeat([f"{i:06d}" for i in range(n_symbols)], n_bars),
+        "trade_date": np.tile(dates, n_symbols),
+        "data_source": "tushare",
+        "open": close.ravel(),
+        "high": (close + rng.uniform(0, 0.5, close.shape)).ravel(),
+        "low": (close - rng.uniform(0, 0.5, close.shape)).ravel(),
+        "close": close.ravel(),
+        "vol": rng.uniform(1e4, 1e6, close.size),
+        "amount": rng.uniform(1e6, 1e9, close.size),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="全市场截面选股基准测试")
+    parser.add_argument("--symbols", type=int, default=5000)
+    parser.add_argument("--bars", type=int, default=150)
+    args = parser.parse_args()
+
+    bars = make_bars(args.symbols, args.bars)
+    print(f"📊 数据规模: {args.symbols} 只股票 × {args.bars} 根K线")
+
+    t0 = time.perf_counter()
+    panel = build_screening_panel(bars)
+    panel.ensure_technical()
+    print(f"🧮 构建截面+技术指标: {time.perf_counter() - t0:.2f}s")
+
+    svc = ScreeningService()
+    svc._get_panel = lambda date: panel
+    params = ScreeningParams(limit=50, order_by=[{"field": "pct_chg", "direction": "desc"}])
+    for label in ("首次筛选", "重复筛选"):
+        t0 = time.perf_counter()
+        res = svc.run(CONDITIONS, params)
+        print(f"🚀 {label}: {(time.perf_counter() - t0) * 1000:.1f}ms, 命中 {res['total']} 只")
+
+
+if __name__ == "__main__":
+    main()
@@ -190,3 +190,60 @@ def test_get_pe_pb_with_fallback_to_static(monkeypatch):
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
+
+def test_batch_matches_single_symbol_calculation():
+    """批量向量化计算与逐只计算结果一致"""
+    from datetime import datetime, timedelta
+    from tradingagents.dataflows.realtime_metrics import (
+        compute_realtime_pe_pb_batch, documents_to_frames, metrics_frame_to_dict,
+    )
+
+    now = datetime.now()
+    after_close = now.replace(hour=16, minute=0)
+    quotes = [
+        {"code": "000001", "close": 10.5, "pre_close": 10.0, "updated_at": now},
+        {"code": "000002", "close": 20.0, "pre_close": None, "updated_at": now},   # 无昨收，用总市值反推股本
+        {"code": "000003", "close": 8.0, "pre_close": 7.5, "updated_at": now},     # 收盘后已更新，直接使用静态数据
+        {"code": "000004", "close": 5.0, "pre_close": 5.1, "updated_at": now},     # 亏损股，无法计算
+        {"code": "000005", "close": 0, "pre_close": 3.0, "updated_at": now},       # 无效价格
+    ]
+    basic = [
+        {"code": "000001", "pe": 20.0, "pe_ttm": 20.0, "pb": 3.0, "total_share": 100000, "total_mv": 100.0,
+         "updated_at": now - timedelta(days=1)},
+        {"code": "000002", "pe": 15.0, "pe_ttm": 16.0, "pb": 2.0, "total_mv": 200.0, "updated_at": None},
+        {"code": "000003", "pe": 12.0, "pe_ttm": 11.0, "pb": 1.5, "total_mv": 80.0, "updated_at": after_close},
+        {"code": "000004", "pe": -5.0, "pe_ttm": -4.0, "pb": 0.8, "total_mv": 50.0, "updated_at": None},
+        {"code": "000005", "pe": 9.0, "pe_ttm": 9.0, "pb": 1.0, "total_mv": 30.0, "updated_at": None},
+    ]
+    financial = [{"code": "000001", "total_equity": 2000000000}]
+
+    class MockCollection:
+        def __init__(self, docs):
+            self._docs = {d["code"]: d for d in docs}
+
+        def find_one(self, query, **kwargs):
+            return self._docs.get(query.get("code"))
+
+        def find(self, query, projection=None):
+            return [d for d in self._docs.values() if d["code"] == query.get("code")]
+
+    class MockDB:
+        market_quotes = MockCollection(quotes)
+        stock_basic_info = MockCollection(basic)
+        stock_financial_data = MockCollection(financial)
+
+    class MockClient:
+        def __getitem__(self, name):
+            return MockDB()
+
+    batch = metrics_frame_to_dict(compute_realtime_pe_pb_batch(*documents_to_frames(quotes, basic, financial)))
+    assert sorted(batch) == ["000001", "000002", "000003"]
+    for code in ("000001", "000002", "000003", "000004", "000005"):
+        single = calculate_realtime_pe_pb(code, MockClient())
+        if single is None:
+            assert code not in batch
+            continue
+        for key in ("pe", "pb", "pe_ttm", "price", "market_cap", "ttm_net_profit", "total_shares", "is_realtime", "source"):
+            assert batch[code].get(key) == single.get(key), (code, key)
+    assert batch["000001"]["pe"] == 21.0 and batch["000001"]["pb"] == 5.25
@@ -0,0 +1,108 @@
+import asyncio
+
+from app.services.historical_buckets import (
+    HistoricalBucketStore, bucket_id, group_by_year, pack_bucket, unpack_bucket,
+)
+
+
+def _row(date, close, **extra):
+    row = {"symbol": "000001", "code": "000001", "full_symbol": "000001.SZ", "market": "CN",
+           "data_source": "tushare", "period": "daily", "trade_date": date,
+           "open": close, "high": close, "low": close, "close": close, "pre_close": close,
+           "volume": 100.0, "amount": 1000.0, "change": 0.0, "pct_chg": 0.0}
+    row.update(extra)
+    return row
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+        self.consumed = 0
+
+    def sort(self, key, direction):
+        self._docs = sorted(self._docs, key=lambda d: d[key], reverse=direction < 0)
+        return self
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for doc in self._docs:
+            self.consumed += 1
+            yield doc
+
+
+class _FakeBucketCollection:
+    def __init__(self):
+        self.docs = {}
+        self.cursors = []
+
+    def _match(self, doc, query):
+        for k, v in query.items():
+            if isinstance(v, dict):
+                if "$in" in v and doc.get(k) not in v["$in"]:
+                    return False
+                if "$gte" in v and not doc.get(k) >= v["$gte"]:
+                    return False
+                if "$lte" in v and not doc.get(k) <= v["$lte"]:
+                    return False
+            elif doc.get(k) != v:
+                return False
+        return True
+
+    def find(self, query):
+        cursor = _FakeCursor([d for d in self.docs.values() if self._match(d, query)])
+        self.cursors.append(cursor)
+        return cursor
+
+    async def find_one(self, query, projection=None, sort=None):
+        docs = [d for d in self.docs.values() if self._match(d, query)]
+        for key, direction in reversed(sort or []):
+            docs.sort(key=lambda d: d[key], reverse=direction < 0)
+        return docs[0] if docs else None
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            self.docs[op._filter["_id"]] = op._doc
+
+
+def test_pack_unpack_roundtrip_dedups_by_date():
+    rows = [_row("2024-01-03", 11.0), _row("2024-01-02", 10.0), _row("2024-01-03", 12.0, turnover_rate=1.5)]
+    bucket = pack_bucket(rows[0], 2024, rows)
+
+    assert bucket["_id"] == bucket_id("000001", "tushare", "daily", 2024)
+    assert bucket["count"] == 2
+    assert (bucket["first_date"], bucket["last_date"]) == ("2024-01-02", "2024-01-03")
+    assert bucket["columns"]["close"] == [10.0, 12.0]
+    assert "pe" not in bucket["columns"]
+
+    records = unpack_bucket(bucket)
+    assert [r["trade_date"] for r in records] == ["2024-01-02", "2024-01-03"]
+    assert records[1]["turnover_rate"] == 1.5
+    assert "turnover_rate" not in records[0]
+    assert records[0]["symbol"] == "000001" and records[0]["close"] == 10.0
+
+
+def test_upsert_merges_existing_year_and_find_respects_range_and_limit():
+    coll = _FakeBucketCollection()
+    store = HistoricalBucketStore(coll)
+    history = [_row(f"{y}-06-{d:02d}", float(y) + d) for y in (2022, 2023, 2024) for d in (1, 2)]
+
+    async def run():
+        await store.upsert_records(history)
+        await store.upsert_records([_row("2024-06-02", 99.0), _row("2024-06-03", 100.0)])
+
+        assert set(group_by_year(history)) == {2022, 2023, 2024}
+        assert coll.docs[bucket_id("000001", "tushare", "daily", 2024)]["columns"]["close"] == [2025.0, 99.0, 100.0]
+
+        latest = await store.find("000001", limit=2)
+        assert [r["trade_date"] for r in latest] == ["2024-06-03", "2024-06-02"]
+        # 读够 limit 条后不再继续读取更早年份的桶
+        assert coll.cursors[-1].consumed <= 2
+
+        ranged = await store.find("000001", start_date="2023-06-02", end_date="2024-06-01")
+        assert [r["trade_date"] for r in ranged] == ["2024-06-01", "2023-06-02"]
+
+        assert await store.latest_date("000001", "tushare") == "2024-06-03"
+
+    asyncio.run(run())
@@ -0,0 +1,137 @@
+import asyncio
+from types import SimpleNamespace
+
+import pandas as pd
+
+from app.services.historical_bulk_writer import (
+    AdaptiveBatchSizer, build_upsert_operations, columns_to_documents, frame_to_columns,
+)
+from app.services.historical_data_service import HistoricalDataService
+
+
+def _tushare_frame():
+    return pd.DataFrame({
+        "trade_date": ["20240102", "20240103", "20240104"],
+        "open": [10.0, 10.5, 11.0],
+        "high": [10.8, 11.2, 11.5],
+        "low": [9.9, 10.3, 10.8],
+        "close": [10.5, 11.0, 11.2],
+        "pre_close": [10.0, 10.5, None],
+        "vol": [1000.0, 1200.0, 900.0],
+        "amount": [1050.0, 1320.0, 1008.0],
+        "pct_chg": [5.0, 4.7619, 1.8182],
+        "turnover_rate": [1.2, None, 0.9],
+    })
+
+
+def _row_path(service, df, data_source, market):
+    """旧的逐行路径：先在 DataFrame 上做单位换算，再逐行标准化"""
+    df = df.copy()
+    if data_source == "tushare":
+        df["amount"] = df["amount"] * 1000
+        df["vol"] = df["vol"] * 100
+    if market in ("HK", "US") and "pre_close" not in df.columns:
+        df["pre_close"] = df["close"].shift(1)
+    return [service._standardize_record("000001", row, data_source, market, "daily", idx) for idx, row in df.iterrows()]
+
+
+def test_columnar_conversion_matches_row_path():
+    service = HistoricalDataService(layout="rows")
+    for df, source, market in (
+        (_tushare_frame(), "tushare", "CN"),
+        (_tushare_frame().drop(columns=["pre_close"]).rename(columns={"trade_date": "date"}), "yfinance", "HK"),
+    ):
+        expected = _row_path(service, df, source, market)
+        columns = frame_to_columns(df, source, market)
+        docs = columns_to_documents(columns, {"symbol": "000001"})
+        assert len(docs) == len(expected)
+        for got, want in zip(docs, expected):
+            for key in ("trade_date", "open", "close", "pre_close", "volume", "amount", "change", "pct_chg", "turnover_rate"):
+                assert got[key] == want[key], (source, key, got[key], want[key])
+    # 调用方的 DataFrame 不被修改
+    df = _tushare_frame()
+    frame_to_columns(df, "tushare", "CN")
+    assert df["amount"].tolist() == [1050.0, 1320.0, 1008.0]
+
+
+def test_upsert_operations_keep_created_at_on_insert_only():
+    ops = build_upsert_operations([{"symbol": "000001", "trade_date": "2024-01-02", "data_source": "tushare",
+                                    "period": "daily", "close": 1.0, "created_at": "t0", "updated_at": "t1"}])
+    assert ops[0]._filter == {"symbol": "000001", "trade_date": "2024-01-02", "data_source": "tushare", "period": "daily"}
+    assert ops[0]._doc["$setOnInsert"] == {"created_at": "t0"}
+    assert "created_at" not in ops[0]._doc["$set"]
+
+
+def test_adaptive_batch_sizer_grows_and_shrinks():
+    sizer = AdaptiveBatchSizer(initial=200, min_size=100, max_size=1000, target_seconds=1.0)
+    assert sizer.observe(200, 0.1) == 300
+    assert sizer.observe(10, 0.1) == 300  # 不满一批不放大
+    assert sizer.observe(300, 5.0) == 150
+    assert sizer.observe(150, 5.0) == 100
+
+
+class _FakeCollection:
+    def __init__(self, existing=False):
+        self.existing = existing
+        self.inserted = []
+        self.bulk_batches = []
+
+    async def find_one(self, query, projection=None):
+        return {"_id": 1} if self.existing else None
+
+    async def insert_many(self, documents, ordered=True):
+        self.inserted.append(len(documents))
+        return SimpleNamespace(inserted_ids=list(range(len(documents))))
+
+    async def bulk_write(self, operations, ordered=True):
+        self.bulk_batches.append(len(operations))
+        return SimpleNamespace(upserted_count=len(operations), modified_count=0)
+
+
+def test_save_uses_insert_for_new_series_and_batched_upserts_otherwise():
+    async def run():
+        df = pd.concat([_tushare_frame()] * 100, ignore_index=True)
+        df["trade_date"] = pd.bdate_range("2020-01-01", periods=len(df)).strftime("%Y%m%d")
+
+        fresh = HistoricalDataService(layout="rows")
+        fresh.collection = _FakeCollection(existing=False)
+        fresh.batch_sizer = AdaptiveBatchSizer(initial=100, min_size=100, max_size=100)
+        assert await fresh.save_historical_data("000001", df, "tushare") == 300
+        assert fresh.collection.inserted == [100, 100, 100]
+        assert fresh.collection.bulk_batches == []
+
+        existing = HistoricalDataService(layout="rows")
+        existing.collection = _FakeCollection(existing=True)
+        existing.batch_sizer = AdaptiveBatchSizer(initial=250, min_size=100, max_size=250)
+        results = await existing.save_historical_data_many([("000001", df), ("600000", df)], "tushare")
+        assert results == {"000001": 300, "600000": 300}
+        assert sorted(existing.collection.bulk_batches) == [50, 50, 250, 250]
+
+    asyncio.run(run())
+
+
+def test_save_cross_section_writes_all_symbols_in_shared_batches():
+    async def run():
+        df = pd.DataFrame({
+            "symbol": ["000001", "600000", "300750"],
+            "trade_date": "2024-06-04",
+            "close": [10.5, 8.0, 200.0],
+            "pre_close": [10.0, 8.0, 190.0],
+            "volume": [10.0, 20.0, 30.0],
+            "amount": [1.0, 2.0, 3.0],
+        })
+        service = HistoricalDataService(layout="rows")
+        service.collection = _FakeCollection(existing=False)
+        written = []
+
+        async def bulk_write(operations, ordered=True):
+            written.extend(op._doc["$set"] for op in operations)
+            return SimpleNamespace(upserted_count=len(operations), modified_count=0)
+
+        service.collection.bulk_write = bulk_write
+        assert await service.save_cross_section(df, "tushare") == 3
+        assert service.collection.inserted == []
+        assert [d["full_symbol"] for d in written] == ["000001.SZ", "600000.SH", "300750.SZ"]
+        assert [d["amount"] for d in written] == [1000.0, 2000.0, 3000.0]
+
+    asyncio.run(run())
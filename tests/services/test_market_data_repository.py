@@ -0,0 +1,133 @@
+import asyncio
+
+from app.services.market_data_repository import MarketDataRepository, columns_to_items
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+        self.sort_spec = None
+        self.limit_n = None
+
+    def sort(self, key, direction):
+        self.sort_spec = (key, direction)
+        self._docs = sorted(self._docs, key=lambda d: d[key], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        self._docs = self._docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        return [dict(d) for d in self._docs[:length]]
+
+
+class _FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.calls = []
+
+    def _match(self, doc, query):
+        for k, v in query.items():
+            if k == "$or":
+                if not any(self._match(doc, q) for q in v):
+                    return False
+            elif isinstance(v, dict):
+                if "$lte" in v and not doc.get(k) <= v["$lte"]:
+                    return False
+                if "$in" in v and doc.get(k) not in v["$in"]:
+                    return False
+            elif doc.get(k) != v:
+                return False
+        return True
+
+    def _project(self, doc, projection):
+        keep = [k for k, v in projection.items() if v and k != "_id"]
+        return {k: doc[k] for k in keep if k in doc} if keep else {k: v for k, v in doc.items() if k != "_id"}
+
+    def find(self, query, projection):
+        cursor = _FakeCursor([self._project(d, projection) for d in self.docs if self._match(d, query)])
+        self.calls.append((query, projection, cursor))
+        return cursor
+
+    async def find_one(self, query, projection):
+        for d in self.docs:
+            if self._match(d, query):
+                return self._project(d, projection)
+        return None
+
+
+def make_bars(source, n, symbol="000001"):
+    return [{"_id": i, "symbol": symbol, "period": "daily", "data_source": source,
+             "trade_date": f"2024-01-{i + 1:02d}", "open": i, "high": i + 1, "low": i - 1,
+             "close": i + 0.5, "vol": 100 * i, "pre_close": 0} for i in range(n)]
+
+
+def test_get_bars_pushes_sort_limit_projection_and_respects_priority():
+    daily = _FakeCollection(make_bars("akshare", 20) + make_bars("baostock", 25))
+    repo = MarketDataRepository(db={"stock_daily_quotes": daily})
+
+    bars = asyncio.run(repo.get_bars("1", limit=5, end_date="2024-01-18", sources=["tushare", "akshare", "baostock"]))
+
+    assert bars["source"] == "akshare"
+    cols = bars["columns"]
+    assert cols["time"] == ["2024-01-14", "2024-01-15", "2024-01-16", "2024-01-17", "2024-01-18"]
+    assert cols["volume"] == [1300.0, 1400.0, 1500.0, 1600.0, 1700.0]
+    assert cols["amount"] == [None] * 5
+    query, projection, cursor = daily.calls[-1]
+    assert cursor.sort_spec == ("trade_date", -1) and cursor.limit_n == 5
+    assert projection["_id"] == 0 and "pre_close" not in projection
+    assert query == {"symbol": "000001", "period": "daily", "data_source": "akshare", "trade_date": {"$lte": "2024-01-18"}}
+
+    items = columns_to_items(cols)
+    assert items[0] == {"time": "2024-01-14", "open": 13.0, "high": 14.0, "low": 12.0,
+                        "close": 13.5, "volume": 1300.0, "amount": None}
+
+
+def test_get_bars_returns_none_when_no_source_has_data():
+    repo = MarketDataRepository(db={"stock_daily_quotes": _FakeCollection([])})
+    assert asyncio.run(repo.get_bars("000001", sources=["tushare"])) is None
+
+
+def test_quotes_use_projection():
+    quotes = _FakeCollection([
+        {"_id": 1, "code": "000001", "close": 10.5, "pct_chg": 1.2, "amount": 1e8, "volume": 5},
+        {"_id": 2, "code": "600000", "symbol": "600000", "close": 8.1, "pct_chg": -0.3},
+    ])
+    repo = MarketDataRepository(db={"market_quotes": quotes})
+
+    assert asyncio.run(repo.get_quote("000001", fields=["close"])) == {"close": 10.5}
+    assert asyncio.run(repo.get_quote("600000", fields=["close"], match_symbol=True)) == {"close": 8.1}
+    got = asyncio.run(repo.get_quotes(["000001", "600000", "300750"], fields=["close", "pct_chg"]))
+    assert got == {"000001": {"code": "000001", "close": 10.5, "pct_chg": 1.2},
+                   "600000": {"code": "600000", "close": 8.1, "pct_chg": -0.3}}
+
+
+def test_source_priority_filters_by_market_category(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.core import unified_config
+
+    configs = [
+        SimpleNamespace(type="tushare", enabled=True, market_categories=["us_stocks"]),
+        SimpleNamespace(type="baostock", enabled=True, market_categories=["a_shares"]),
+        SimpleNamespace(type="akshare", enabled=True, market_categories=[]),
+    ]
+    reads = []
+
+    async def fake_configs(self):
+        reads.append(1)
+        return configs
+
+    monkeypatch.setattr(unified_config.UnifiedConfigManager, "get_data_source_configs_async", fake_configs)
+    daily = _FakeCollection(make_bars("tushare", 5) + make_bars("baostock", 3))
+    repo = MarketDataRepository(db={"stock_daily_quotes": daily})
+
+    assert asyncio.run(repo.get_source_priority("a_shares")) == ["baostock", "akshare"]
+    assert asyncio.run(repo.get_source_priority("us_stocks")) == ["tushare", "akshare"]
+    # A 股K线不读取只服务美股的数据源
+    bars = asyncio.run(repo.get_bars("000001"))
+    assert bars["source"] == "baostock"
+    assert [q["data_source"] for q, _, _ in daily.calls] == ["baostock"]
+    assert len(reads) == 2
@@ -132,3 +132,78 @@ def test_quotes_ingestion_run_once_writes_bulk(monkeypatch):
 
     import asyncio
     asyncio.run(_run())
+
+
+def test_persisted_indicator_state_replays_missing_days(monkeypatch):
+    import numpy as np
+    import pandas as pd
+
+    from app.services.quotes_ingestion_service import QuotesIngestionService
+    import app.services.quotes_ingestion_service as qis_mod
+    from tradingagents.tools.analysis.indicators import compute_many
+    from tradingagents.tools.analysis.streaming_indicators import DEFAULT_STREAMING_SPECS, StreamingIndicators
+
+    rng = np.random.default_rng(5)
+    close = np.cumsum(rng.normal(0, 1, 120)) + 100
+    df = pd.DataFrame({
+        "trade_date": pd.date_range("2024-01-01", periods=120).strftime("%Y-%m-%d"),
+        "high": close + 1, "low": close - 1, "close": close,
+    })
+    expected = compute_many(df, DEFAULT_STREAMING_SPECS).iloc[-1]
+
+    # 服务在第 100 个交易日盘中停止：持久化状态停在盘中价格，之后 19 个交易日只有日K线入库
+    stale = StreamingIndicators.from_history(df.iloc[:99])
+    intraday = df.iloc[99].to_dict()
+    stale.update({**intraday, "close": intraday["close"] * 1.03})
+
+    daily_docs = [{"symbol": "000001", "period": "daily", **rec} for rec in df.iloc[:119].to_dict("records")]
+
+    class _Cursor:
+        def __init__(self, docs):
+            self._docs = docs
+
+        async def to_list(self, length=None):
+            return self._docs
+
+    class _Coll:
+        def __init__(self, docs):
+            self.docs = docs
+            self.queries = []
+
+        def find(self, query, projection=None):
+            self.queries.append(query)
+            if "trade_date" not in query:
+                return _Cursor([d for d in self.docs if d["code"] in query["code"]["$in"]])
+            rng_ = query["trade_date"]
+            return _Cursor([d for d in self.docs
+                            if d["symbol"] in query["symbol"]["$in"] and rng_["$gte"] <= d["trade_date"] < rng_["$lt"]])
+
+        async def bulk_write(self, ops, ordered=False):
+            self.last_ops = ops
+
+    colls = {
+        "stock_indicator_states": _Coll([{"code": "000001", "state": stale.to_dict()}]),
+        "stock_daily_quotes": _Coll(daily_docs),
+        "market_quotes": _Coll([]),
+    }
+
+    class _DB:
+        def __getitem__(self, name):
+            return colls[name]
+
+    monkeypatch.setattr(qis_mod, "get_mongo_db", lambda: _DB(), raising=True)
+
+    async def _run():
+        svc = QuotesIngestionService()
+        last = df.iloc[-1].to_dict()
+        await svc._update_streaming_indicators({"000001": last}, last["trade_date"].replace("-", ""))
+        await svc._update_streaming_indicators({"000001": last}, last["trade_date"].replace("-", ""))
+        return svc._indicator_states["000001"]
+
+    state = asyncio.run(_run())
+    values = state.values()
+    for col, v in values.items():
+        assert abs(v - expected[col]) < 1e-9, col
+    assert state.bars == 120
+    # 同一交易日第二次更新不再查询日K线
+    assert len(colls["stock_daily_quotes"].queries) == 1
@@ -0,0 +1,117 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.services.realtime_valuation_service import RealtimeValuationService
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    async def to_list(self, length=None):
+        return list(self._docs)
+
+
+class _Collection:
+    def __init__(self, docs, reads):
+        self.docs = docs
+        self.reads = reads
+        self.tick_queries = 0
+
+    def find(self, query, projection=None):
+        self.reads.append("find")
+        return _Cursor(self.docs)
+
+    def aggregate(self, pipeline, **kwargs):
+        self.reads.append("aggregate")
+        return _Cursor(self.docs)
+
+    async def find_one(self, query, projection=None, sort=None):
+        self.tick_queries += 1
+        return max(self.docs, key=lambda d: d["updated_at"]) if self.docs else None
+
+
+class _DB:
+    def __init__(self, quotes, basic, financial):
+        self.reads = []
+        self.collections = {
+            "market_quotes": _Collection(quotes, self.reads),
+            "stock_basic_info": _Collection(basic, self.reads),
+            "stock_financial_data": _Collection(financial, self.reads),
+        }
+
+    def __getitem__(self, name):
+        return self.collections[name]
+
+
+def test_metrics_are_computed_once_per_quotes_tick(monkeypatch):
+    import app.services.realtime_valuation_service as module
+    monkeypatch.setattr(module, "TICK_CHECK_INTERVAL", 0)
+
+    tick = datetime(2025, 6, 3, 10, 30)
+    yesterday = tick - timedelta(days=1)
+    quotes = [{"code": f"{i:06d}", "close": 11.0, "pre_close": 10.0, "updated_at": tick} for i in range(2000)]
+    basic = [{"code": f"{i:06d}", "pe": 20.0, "pe_ttm": 20.0, "pb": 2.0, "total_mv": 100.0,
+              "total_share": 100000.0, "updated_at": yesterday} for i in range(2000)]
+    financial = [{"code": "000001", "total_equity": 5e9}, {"code": "000002", "total_equity": 1e15}]
+    db = _DB(quotes, basic, financial)
+    service = RealtimeValuationService(db=db)
+
+    async def run():
+        first = await asyncio.gather(*(service.get_metrics(["000001", "2", "999999"]) for _ in range(5)))
+        everything = await service.get_metrics()
+        assert len(db.reads) == 3  # 同一批次只读取一次三个集合
+
+        quotes[1]["close"] = 12.1
+        quotes[1]["updated_at"] = tick + timedelta(minutes=6)
+        updated = await service.get_metric("000001")
+        assert len(db.reads) == 6
+        return first, everything, updated
+
+    first, everything, updated = asyncio.run(run())
+    # 000002 的 PB 超出合理范围被过滤，999999 没有数据
+    assert all(list(m) == ["000001"] for m in first)
+    assert first[0]["000001"]["pe"] == 22.0 and first[0]["000001"]["pb"] == 2.2
+    assert first[0]["000001"]["market_cap"] == 110.0 and first[0]["000001"]["is_realtime"]
+    assert len(everything) == 1999
+    assert updated["pe"] == 24.2
+
+
+def test_tick_lookup_is_cached_within_check_interval(monkeypatch):
+    import app.services.realtime_valuation_service as module
+    monkeypatch.setattr(module, "TICK_CHECK_INTERVAL", 60)
+    monkeypatch.setattr(module.settings, "QUOTES_INGEST_INTERVAL_SECONDS", 0)
+
+    tick = datetime(2025, 6, 3, 10, 30)
+    quotes = [{"code": "000001", "close": 11.0, "pre_close": 10.0, "updated_at": tick}]
+    basic = [{"code": "000001", "pe": 20.0, "pe_ttm": 20.0, "pb": 2.0, "total_mv": 100.0,
+              "total_share": 100000.0, "updated_at": tick - timedelta(days=1)}]
+    db = _DB(quotes, basic, [])
+    service = RealtimeValuationService(db=db)
+
+    async def run():
+        # 缓存过期会绕过快速路径，但同一秒内的批次查询复用结果
+        for _ in range(5):
+            await service.get_metrics(["000001"])
+
+    asyncio.run(run())
+    assert db.collections["market_quotes"].tick_queries == 1
+
+
+def test_screening_keeps_static_values_used_by_filters(monkeypatch):
+    import app.services.enhanced_screening_service as module
+
+    class _Valuation:
+        async def get_metrics(self, codes):
+            return {"000001": {"pe": 30.0, "pe_ttm": 31.0, "pb": 3.0, "market_cap": 150.0, "is_realtime": True}}
+
+    monkeypatch.setattr(module, "get_realtime_valuation_service", lambda: _Valuation())
+    service = module.EnhancedScreeningService.__new__(module.EnhancedScreeningService)
+    items = [{"code": "000001", "pe": 20.0, "pb": 2.0, "total_mv": 100.0}, {"code": "000002", "pe": 15.0}]
+
+    items = asyncio.run(service._enrich_results_with_realtime_metrics(items))
+    # 筛选条件作用于静态值，展示的 pe/pb 与之保持一致，实时值单独给出
+    assert items[0]["pe"] == 20.0 and items[0]["pb"] == 2.0 and items[0]["total_mv"] == 100.0
+    assert items[0]["pe_realtime"] == 30.0 and items[0]["pb_realtime"] == 3.0
+    assert items[0]["total_mv_realtime"] == 150.0 and items[0]["pe_is_realtime"]
+    assert "pe_realtime" not in items[1]
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from app.services.screening.eval_utils import evaluate_conditions
+from app.services.screening.panel_engine import SCREENING_SPECS, build_screening_panel
+from app.services.screening_service import ALLOWED_FIELDS, ALLOWED_OPS, ScreeningParams, ScreeningService
+from tradingagents.tools.analysis.indicators import compute_many
+
+
+def make_bars(n_symbols=30, n_bars=90, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    dates = pd.bdate_range('2024-01-01', periods=n_bars).strftime('%Y-%m-%d')
+    for i in range(n_symbols):
+        length = n_bars - (i % 7) * 5  # 长度不一
+        close = 10 + np.cumsum(rng.normal(0, 0.3, length))
+        rows.append(pd.DataFrame({
+            'symbol': f'{i:06d}',
+            'trade_date': dates[:length],
+            'data_source': 'tushare',
+            'open': close, 'high': close + 0.2, 'low': close - 0.2, 'close': close,
+            'vol': rng.integers(1000, 5000, length).astype(float),
+            'amount': rng.uniform(1e6, 1e8, length),
+        }))
+    bars = pd.concat(rows, ignore_index=True)
+    # 其他数据源的重复记录应被去重
+    dup = bars[bars['symbol'] == '000001'].assign(data_source='baostock', close=999.0)
+    return pd.concat([dup, bars], ignore_index=True)
+
+
+CONDITIONS = [
+    {"field": "close", "op": ">", "value": 10},
+    {"field": "rsi14", "op": "between", "value": [30, 70]},
+    {"field": "dif", "op": "cross_up", "right_field": "dea"},
+    {"field": "close", "op": "cross_up", "right_field": "ma5"},
+    {"field": "close", "op": "cross_down", "right_field": "ma5"},
+    {"field": "ma5", "op": ">=", "right_field": "ma20"},
+    {"field": "kdj_k", "op": "!=", "value": 50},
+    {"logic": "OR", "children": [
+        {"field": "pct_chg", "op": ">", "value": 1},
+        {"field": "macd_hist", "op": "cross_down", "right_field": "ma60"},
+    ]},
+    {"logic": "AND", "children": [
+        {"field": "close", "op": "<", "right_field": "boll_upper"},
+        {"field": "close", "op": "<", "value": None},
+    ]},
+]
+
+
+def test_mask_matches_per_symbol_evaluation():
+    bars = make_bars()
+    panel = build_screening_panel(bars)
+    panel.ensure_technical()
+    assert len(panel) == 30
+
+    from app.services.screening.eval_utils import evaluate_conditions_mask
+
+    per_symbol = {}
+    for code, g in bars[bars['data_source'] == 'tushare'].groupby('symbol'):
+        df = compute_many(g.reset_index(drop=True), SCREENING_SPECS)
+        df['pct_chg'] = df['close'].pct_change() * 100.0
+        per_symbol[code] = df
+
+    for cond in CONDITIONS:
+        mask = evaluate_conditions_mask(panel.last, panel.prev, panel.has_prev, cond, ALLOWED_FIELDS, ALLOWED_OPS)
+        for i, code in enumerate(panel.codes):
+            assert bool(mask[i]) == evaluate_conditions(per_symbol[code], cond, ALLOWED_FIELDS, ALLOWED_OPS), (cond, code)
+
+
+def test_run_uses_panel_with_sorting_and_pagination(monkeypatch):
+    panel = build_screening_panel(make_bars())
+    svc = ScreeningService()
+    monkeypatch.setattr(svc, "_get_panel", lambda date: panel)
+
+    conditions = {"logic": "AND", "children": [{"field": "ma20", "op": ">", "value": 0}]}
+    params = ScreeningParams(limit=5, offset=2, order_by=[{"field": "close", "direction": "desc"}])
+    res = svc.run(conditions, params)
+
+    assert res["total"] == 30
+    closes = [it["close"] for it in res["items"]]
+    assert len(closes) == 5 and closes == sorted(closes, reverse=True)
+    all_closes = sorted(panel.last["close"], reverse=True)
+    assert closes == list(all_closes[2:7])
+    assert res["items"][0]["ma20"] is not None
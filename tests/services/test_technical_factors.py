@@ -0,0 +1,149 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from app.services.screening.panel_engine import SCREENING_SPECS, build_screening_panel
+from app.services.technical_factors_service import TECHNICAL_FACTOR_FIELDS, build_factor_documents
+from tradingagents.tools.analysis.indicators import compute_many
+
+
+def make_bars(n_symbols=12, n_bars=80, seed=1):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2024-01-01', periods=n_bars).strftime('%Y-%m-%d')
+    rows = []
+    for i in range(n_symbols):
+        length = n_bars - (i % 4) * 3  # 部分股票停牌，最后交易日不同
+        close = 10 + np.cumsum(rng.normal(0, 0.3, length))
+        rows.append(pd.DataFrame({
+            'symbol': f'{i:06d}',
+            'trade_date': dates[:length],
+            'data_source': 'tushare',
+            'open': close, 'high': close + 0.2, 'low': close - 0.2, 'close': close,
+            'vol': rng.integers(1000, 5000, length).astype(float),
+            'amount': rng.uniform(1e6, 1e8, length),
+        }))
+    return pd.concat(rows, ignore_index=True)
+
+
+def test_factor_fields_match_screening_tech_fields():
+    from app.services.screening_service import TECH_FIELDS
+
+    assert set(TECHNICAL_FACTOR_FIELDS) == set(TECH_FIELDS)
+
+
+def test_factor_documents_match_per_symbol_indicators():
+    bars = make_bars()
+    docs = {d['code']: d for d in build_factor_documents(build_screening_panel(bars))}
+    assert len(docs) == 12
+
+    for code, g in bars.groupby('symbol'):
+        df = compute_many(g.reset_index(drop=True), SCREENING_SPECS)
+        doc = docs[code]
+        assert doc['trade_date'] == g['trade_date'].iloc[-1]
+        for f in TECHNICAL_FACTOR_FIELDS:
+            expected = df[f].iloc[-1]
+            if pd.isna(expected):
+                assert doc[f] is None
+            else:
+                assert abs(doc[f] - expected) < 1e-9
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, *_args, **_kwargs):
+        return self
+
+    def skip(self, n):
+        self._docs = self._docs[n:]
+        return self
+
+    def limit(self, n):
+        self._docs = self._docs[:n]
+        return self
+
+    async def __aiter__(self):
+        for d in self._docs:
+            yield d
+
+
+class _FakeColl:
+    def __init__(self, docs):
+        self._docs = docs
+        self.queries = []
+
+    def _match(self, query):
+        codes = query.get('code', {}).get('$in')
+        return [d for d in self._docs if codes is None or d['code'] in codes]
+
+    async def count_documents(self, query):
+        self.queries.append(query)
+        return len(self._match(query))
+
+    def find(self, query):
+        return _FakeCursor(self._match(query))
+
+
+class _FakeFactors:
+    def __init__(self, factors):
+        self._factors = factors
+        self.queries = []
+
+    async def get_latest_trade_date(self):
+        return '2024-04-01'
+
+    async def find_factors(self, query, trade_date=None, fields=TECHNICAL_FACTOR_FIELDS):
+        self.queries.append(query)
+        if 'code' in query:
+            return {c: v for c, v in self._factors.items() if c in query['code']['$in']}
+        bound = query['rsi14']['$gt']
+        return {c: v for c, v in self._factors.items() if v['rsi14'] > bound}
+
+
+def test_database_screening_mixes_technical_factor_conditions(monkeypatch):
+    import app.services.database_screening_service as mod
+
+    docs = [{'code': c, 'name': c, 'pe': 10.0, 'total_mv': 100.0 - i} for i, c in enumerate(['000001', '000002', '000003'])]
+    coll = _FakeColl(docs)
+    factors = _FakeFactors({
+        '000001': {'rsi14': 40.0, 'ma20': 10.1},
+        '000002': {'rsi14': 65.0, 'ma20': 10.2},
+        '000003': {'rsi14': 75.0, 'ma20': 10.3},
+    })
+    monkeypatch.setattr(mod, 'get_mongo_db', lambda: {'stock_screening_view': coll})
+    monkeypatch.setattr(mod, 'get_technical_factors_service', lambda: factors)
+
+    async def _noop(*_args, **_kwargs):
+        return None
+
+    svc = mod.DatabaseScreeningService()
+    monkeypatch.setattr(svc, '_enrich_with_financial_data', _noop)
+
+    async def _run():
+        assert await svc.can_handle_conditions([{'field': 'rsi14', 'operator': '>', 'value': 50}])
+
+        items, total = await svc.screen_stocks(
+            conditions=[
+                {'field': 'pe', 'operator': '<', 'value': 20},
+                {'field': 'rsi14', 'operator': '>', 'value': 50},
+            ],
+            order_by=[{'field': 'rsi14', 'direction': 'desc'}],
+            source='tushare',
+        )
+        assert factors.queries[0] == {'rsi14': {'$gt': 50}}
+        assert set(coll.queries[-1]['code']['$in']) == {'000002', '000003'}
+        assert coll.queries[-1]['pe'] == {'$lt': 20}
+        assert total == 2
+        assert [it['code'] for it in items] == ['000003', '000002']
+        assert items[0]['ma20'] == 10.3
+
+        # 无技术条件时按结果代码补充技术因子
+        items, total = await svc.screen_stocks(
+            conditions=[{'field': 'pe', 'operator': '<', 'value': 20}], limit=2, source='tushare',
+        )
+        assert total == 3
+        assert [it['rsi14'] for it in items] == [40.0, 65.0]
+
+    asyncio.run(_run())
@@ -0,0 +1,109 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pandas as pd
+
+from app.worker.tushare_sync_service import TushareSyncService, apply_forward_adjustment
+
+
+def _bars(trade_date, ts_codes):
+    return pd.DataFrame({
+        "ts_code": ts_codes,
+        "symbol": [c.split(".")[0] for c in ts_codes],
+        "trade_date": trade_date,
+        "open": 10.0, "high": 11.0, "low": 9.0, "close": 10.5, "pre_close": 10.0,
+        "volume": 1000.0, "amount": 500.0,
+    })
+
+
+def _factors(trade_date, factors):
+    return pd.DataFrame({
+        "ts_code": list(factors),
+        "trade_date": trade_date.replace("-", ""),
+        "adj_factor": list(factors.values()),
+    })
+
+
+def test_apply_forward_adjustment_uses_latest_factor_in_window():
+    bars = pd.concat([_bars("2024-06-03", ["600000.SH"]), _bars("2024-06-04", ["600000.SH"])], ignore_index=True)
+    factors = pd.Series(
+        [1.0, 2.0],
+        index=pd.MultiIndex.from_tuples([("600000.SH", "2024-06-03"), ("600000.SH", "2024-06-04")]),
+    )
+    adjusted = apply_forward_adjustment(bars, factors)
+    assert adjusted["close"].tolist() == [5.25, 10.5]
+    assert adjusted["pre_close"].tolist() == [5.0, 10.0]
+    assert adjusted["volume"].tolist() == [1000.0, 1000.0]
+
+
+def test_datewise_sync_routes_new_gap_and_ex_rights_symbols_to_per_symbol_path():
+    with patch("app.worker.tushare_sync_service.get_mongo_db", return_value=Mock()), \
+         patch("app.worker.tushare_sync_service.get_stock_data_service", return_value=Mock()):
+        service = TushareSyncService()
+
+    service.rate_limiter = Mock(acquire=AsyncMock())
+    last, new = "2024-06-03", "2024-06-04"
+    daily = {
+        # 000004 在 06-03 停牌
+        last: _bars(last, ["000001.SZ", "000002.SZ", "600000.SH"]),
+        new: _bars(new, ["000001.SZ", "000002.SZ", "600000.SH", "300999.SZ", "000004.SZ"]),
+    }
+    factors = {
+        last: _factors(last, {"000001.SZ": 1.0, "000002.SZ": 1.0, "600000.SH": 1.0, "000004.SZ": 1.0}),
+        new: _factors(new, {"000001.SZ": 1.0, "000002.SZ": 1.0, "600000.SH": 1.1, "300999.SZ": 1.0, "000004.SZ": 1.0}),
+    }
+    service.provider = Mock(
+        get_trade_dates=AsyncMock(return_value=[last, new]),
+        get_daily_by_date=AsyncMock(side_effect=lambda d: daily[d]),
+        get_adj_factor_by_date=AsyncMock(side_effect=lambda d: factors[d]),
+    )
+    saved = {}
+
+    async def save_cross_section(df, **kwargs):
+        saved["df"] = df
+        return len(df)
+
+    service.historical_service = Mock(
+        get_latest_dates=AsyncMock(return_value={
+            "000001": last, "000002": "2024-05-31", "600000": last, "000004": "2024-05-20",
+        }),
+        save_cross_section=AsyncMock(side_effect=save_cross_section),
+    )
+    service.sync_historical_data = AsyncMock(return_value={"success_count": 1, "total_records": 1, "error_count": 0})
+
+    stats = asyncio.run(service.sync_historical_data_by_date(end_date=new))
+
+    assert sorted(saved["df"]["symbol"]) == ["000001", "000004"]
+    assert set(saved["df"]["trade_date"]) == {new}
+    calls = {c.kwargs["all_history"]: sorted(c.kwargs["symbols"]) for c in service.sync_historical_data.await_args_list}
+    assert calls == {False: ["000002", "300999"], True: ["600000"]}
+    # 1 次交易日历 + 2 个交易日 × (daily + adj_factor)，逐只同步另计
+    assert stats["api_calls"] - stats["per_symbol_count"] == 5
+    assert stats["total_processed"] == 5
+    assert stats["success_count"] == 4
+
+
+def test_datewise_sync_falls_back_when_last_synced_factors_are_missing():
+    with patch("app.worker.tushare_sync_service.get_mongo_db", return_value=Mock()), \
+         patch("app.worker.tushare_sync_service.get_stock_data_service", return_value=Mock()):
+        service = TushareSyncService()
+
+    service.rate_limiter = Mock(acquire=AsyncMock())
+    last, new = "2024-06-03", "2024-06-04"
+    service.provider = Mock(
+        get_trade_dates=AsyncMock(return_value=[last, new]),
+        get_daily_by_date=AsyncMock(side_effect=lambda d: _bars(d, ["600000.SH"])),
+        # 上次同步日的复权因子获取失败：无法判断 600000 是否除权
+        get_adj_factor_by_date=AsyncMock(side_effect=lambda d: None if d == last else _factors(d, {"600000.SH": 1.1})),
+    )
+    service.historical_service = Mock(
+        get_latest_dates=AsyncMock(return_value={"600000": last}),
+        save_cross_section=AsyncMock(return_value=1),
+    )
+    service.sync_historical_data = AsyncMock(return_value={"mode": "symbol"})
+
+    stats = asyncio.run(service.sync_historical_data_by_date(end_date=new))
+
+    assert stats == {"mode": "symbol"}
+    service.historical_service.save_cross_section.assert_not_awaited()
+    service.sync_historical_data.assert_awaited_once_with(symbols=None, end_date=new, incremental=True, job_id=None)
@@ -0,0 +1,115 @@
+import threading
+import time
+
+from tradingagents.agents.utils.embedding_cache import EmbeddingCache
+from tradingagents.agents.utils.memory import FinancialSituationMemory
+
+
+class CountingEmbedder:
+    def __init__(self, delay=0.0, vector=None):
+        self.calls = 0
+        self.delay = delay
+        self.vector = vector
+        self._lock = threading.Lock()
+
+    def __call__(self, text):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return list(self.vector) if self.vector is not None else [float(len(text)), 1.0]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value.encode("utf-8")
+
+
+def make_memory(cache, embedder, monkeypatch, provider="dashscope"):
+    monkeypatch.setattr("tradingagents.agents.utils.memory.get_embedding_cache", lambda: cache)
+    memory = FinancialSituationMemory.__new__(FinancialSituationMemory)
+    memory.llm_provider = provider
+    memory.client = None
+    memory.embedding = "text-embedding-v3"
+    memory.enable_embedding_length_check = False
+    memory.max_embedding_length = 50000
+    memory._compute_embedding = embedder
+    return memory
+
+
+def test_memories_share_one_embedding_per_situation(monkeypatch):
+    cache = EmbeddingCache()
+    embedder = CountingEmbedder()
+    agents = [make_memory(cache, embedder, monkeypatch) for _ in range(5)]
+
+    situation = "market report\n\nsentiment report\n\nnews report\n\nfundamentals report"
+    for _ in range(2):  # 两轮辩论
+        for memory in agents:
+            assert memory.get_embedding(situation) == [float(len(situation)), 1.0]
+
+    assert embedder.calls == 1
+    assert cache.stats()["hits"] == 9 and cache.stats()["misses"] == 1
+
+
+def test_cache_hit_updates_last_text_info(monkeypatch):
+    cache = EmbeddingCache()
+    embedder = CountingEmbedder()
+    first, second = make_memory(cache, embedder, monkeypatch), make_memory(cache, embedder, monkeypatch)
+
+    first.get_embedding("long situation text")
+    second.get_embedding("short")
+    first.get_embedding("short")  # 命中缓存，不调用 _compute_embedding
+
+    assert embedder.calls == 2
+    assert first.get_last_text_info()["original_length"] == len("short")
+    assert first.get_last_text_info()["was_truncated"] is False
+
+
+def test_concurrent_identical_requests_are_coalesced():
+    cache = EmbeddingCache()
+    embedder = CountingEmbedder(delay=0.2)
+    barrier = threading.Barrier(6)
+    results = []
+
+    def worker():
+        barrier.wait(timeout=5)
+        results.append(cache.get_or_compute("dashscope", "m", "same text", lambda: embedder("same text")))
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert embedder.calls == 1
+    assert len(results) == 6 and all(r == results[0] for r in results)
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["hits"] + stats["inflight_waits"] == 5
+
+
+def test_keys_separate_models_and_degraded_vectors_are_not_cached():
+    cache = EmbeddingCache()
+    embedder = CountingEmbedder()
+    cache.get_or_compute("dashscope", "v3", "text", lambda: embedder("text"))
+    cache.get_or_compute("dashscope", "v2", "text", lambda: embedder("text"))
+    assert embedder.calls == 2
+
+    zeros = CountingEmbedder(vector=[0.0] * 4)
+    cache.get_or_compute("dashscope", "v3", "down", lambda: zeros("down"))
+    cache.get_or_compute("dashscope", "v3", "down", lambda: zeros("down"))
+    assert zeros.calls == 2
+
+
+def test_redis_tier_survives_process_local_eviction():
+    redis = FakeRedis()
+    embedder = CountingEmbedder()
+    EmbeddingCache(redis_client=redis).get_or_compute("dashscope", "v3", "text", lambda: embedder("text"))
+
+    other_process = EmbeddingCache(redis_client=redis)
+    assert other_process.get_or_compute("dashscope", "v3", "text", lambda: embedder("text")) == [4.0, 1.0]
+    assert embedder.calls == 1 and other_process.stats()["redis_hits"] == 1
@@ -0,0 +1,86 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from tradingagents.agents.utils.embedding_cache import EmbeddingCache
+from tradingagents.agents.utils.memory import FinancialSituationMemory, situation_id
+
+
+class FakeEmbeddingsAPI:
+    """OpenAI兼容的 embeddings.create，记录每次请求的批大小"""
+
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def create(self, model, input):
+        texts = input if isinstance(input, list) else [input]
+        with self._lock:
+            self.batches.append(len(texts))
+        time.sleep(self.delay)
+        data = [SimpleNamespace(index=i, embedding=[float(len(t)), float(i + 1)]) for i, t in enumerate(texts)]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+class FakeCollection:
+    def __init__(self):
+        self.rows = {}
+        self.writes = []
+
+    def upsert(self, documents, metadatas, embeddings, ids):
+        self.writes.append(len(ids))
+        for i, doc, meta, emb in zip(ids, documents, metadatas, embeddings):
+            self.rows[i] = (doc, meta, emb)
+
+    def count(self):
+        return len(self.rows)
+
+
+def make_memory(monkeypatch, api):
+    cache = EmbeddingCache()
+    monkeypatch.setattr("tradingagents.agents.utils.memory.get_embedding_cache", lambda: cache)
+    memory = FinancialSituationMemory.__new__(FinancialSituationMemory)
+    memory.llm_provider = "openai"
+    memory.client = SimpleNamespace(embeddings=api, base_url="http://fake/v1")
+    memory.embedding = "text-embedding-3-small"
+    memory.enable_embedding_length_check = True
+    memory.max_embedding_length = 50000
+    memory.situation_collection = FakeCollection()
+    return memory
+
+
+def test_bulk_ingest_batches_embeddings_and_chunks_writes(monkeypatch):
+    api = FakeEmbeddingsAPI()
+    memory = make_memory(monkeypatch, api)
+    data = [(f"situation {i:03d}", f"advice {i}") for i in range(95)]
+
+    written = memory.add_situations_bulk(data, batch_size=20, max_concurrency=3, write_chunk_size=40)
+
+    assert written == 95
+    assert sorted(api.batches) == [15, 20, 20, 20, 20]
+    assert memory.situation_collection.writes == [40, 40, 15]
+    doc, meta, emb = memory.situation_collection.rows[situation_id("situation 007", "advice 7")]
+    # 返回顺序被打乱时仍按 index 对齐
+    assert doc == "situation 007" and meta == {"recommendation": "advice 7"} and emb[1] == 8.0
+
+
+def test_reingestion_is_idempotent_and_skips_cached_embeddings(monkeypatch):
+    api = FakeEmbeddingsAPI()
+    memory = make_memory(monkeypatch, api)
+    data = [(f"situation {i}", "advice") for i in range(12)]
+
+    memory.add_situations(data)
+    memory.add_situations(data + [data[0]])
+
+    assert memory.situation_collection.count() == 12
+    assert sum(api.batches) == 12  # 第二次全部命中嵌入缓存
+
+
+def test_rate_budget_spaces_batches(monkeypatch):
+    api = FakeEmbeddingsAPI()
+    memory = make_memory(monkeypatch, api)
+    start = time.monotonic()
+    memory.get_embeddings([f"t{i}" for i in range(4)], batch_size=1, max_concurrency=4,
+                          max_batches_per_second=20)
+    assert time.monotonic() - start >= 3 / 20 * 0.9
@@ -0,0 +1,176 @@
+import asyncio
+import time
+
+from app.core.rate_limiter import DistributedRateLimiter
+
+
+class _FakeRedis:
+    """在 Python 中按 _RESERVE_SCRIPT 的语义模拟 Redis 预约（多个限制器共享同一份状态）"""
+
+    def __init__(self):
+        self.zsets = {}
+        self.calls = 0
+
+    def register_script(self, source):
+        async def script(keys, args):
+            self.calls += 1
+            now = int(time.time() * 1000)
+            max_wait, token = int(args[0]), args[1]
+            allow_at = now
+            for i, key in enumerate(keys):
+                limit, window = int(args[2 + 2 * i]), int(args[3 + 2 * i])
+                zset = self.zsets.setdefault(key, {})
+                for member, score in list(zset.items()):
+                    if score <= now - window:
+                        del zset[member]
+                if len(zset) >= limit:
+                    allow_at = max(allow_at, sorted(zset.values())[len(zset) - limit] + window)
+            wait = allow_at - now
+            if max_wait >= 0 and wait > max_wait:
+                return [0, wait]
+            for key in keys:
+                self.zsets[key][token] = allow_at
+            return [1, wait]
+        return script
+
+    async def zrem(self, key, member):
+        return 1 if self.zsets.get(key, {}).pop(member, None) is not None else 0
+
+
+class _DownRedis:
+    def __init__(self):
+        self.created = 0
+
+    def register_script(self, source):
+        async def script(keys, args):
+            raise ConnectionError("redis down")
+        return script
+
+
+def test_replicas_share_one_quota_and_endpoint_limits():
+    redis = _FakeRedis()
+    a = DistributedRateLimiter(3, 0.3, name="a", provider="tushare", backend="redis", redis_factory=lambda: redis)
+    b = DistributedRateLimiter(3, 0.3, name="b", provider="tushare", backend="redis", redis_factory=lambda: redis)
+    for limiter in (a, b):
+        limiter.set_endpoint_limit("rt_k", 1, 60)
+
+    async def run():
+        start = time.perf_counter()
+        await asyncio.gather(a.acquire(), b.acquire(), a.acquire())
+        assert await b.try_acquire() is False  # 全局配额已被两个进程用完
+        await b.acquire()
+        elapsed = time.perf_counter() - start
+        assert await a.try_acquire(endpoint="rt_k") is True
+        assert await b.try_acquire(endpoint="rt_k") is False  # 接口限额由两个进程共享
+        return elapsed
+
+    elapsed = asyncio.run(run())
+    # 两个限制器合计 4 次调用超过 3 次/0.3秒，第 4 次需要排队到窗口腾出
+    assert elapsed >= 0.25
+    assert a.total_waits + b.total_waits == 1
+    assert set(redis.zsets) == {"rate_limit:provider:tushare", "rate_limit:provider:tushare:rt_k"}
+    assert a.get_stats()["backend"] == "redis"
+
+
+def test_falls_back_to_local_window_when_redis_is_down(monkeypatch):
+    from app.core import rate_limiter as module
+    monkeypatch.setattr(module.settings, "RATE_LIMIT_FALLBACK_DIVISOR", 2)
+    down = _DownRedis()
+
+    def factory():
+        down.created += 1
+        return down
+
+    limiter = DistributedRateLimiter(4, 60, name="ak", provider="akshare", backend="redis", redis_factory=factory)
+
+    async def run():
+        results = [await limiter.try_acquire() for _ in range(3)]
+        return results
+
+    # 降级后每个进程只用 4 / 2 = 2 次配额，且重试间隔内不再访问 Redis
+    assert asyncio.run(run()) == [True, True, False]
+    assert down.created == 1
+    stats = limiter.get_stats()
+    assert stats["backend"] == "local"
+    assert stats["redis_errors"] == 1
+    assert stats["current_calls"] == 2
+    assert stats["total_calls"] == 2
+
+
+def test_release_refunds_only_this_instances_latest_permit(monkeypatch):
+    from app.core import rate_limiter as module
+    redis = _FakeRedis()
+    a = DistributedRateLimiter(10, 60, name="a", provider="tushare", backend="redis", redis_factory=lambda: redis)
+    b = DistributedRateLimiter(10, 60, name="b", provider="tushare", backend="redis", redis_factory=lambda: redis)
+    for limiter in (a, b):
+        limiter.set_endpoint_limit("rt_k", 2, 3600)
+
+    async def run():
+        assert await a.try_acquire(endpoint="rt_k") is True
+        assert await b.try_acquire(endpoint="rt_k") is True
+        assert await a.try_acquire(endpoint="rt_k") is False
+        # a 的调用失败：退还后接口配额和全局配额都恢复一次
+        assert await a.release(endpoint="rt_k") is True
+        assert await a.release(endpoint="rt_k") is False  # 没有可退还的配额
+        assert len(redis.zsets["rate_limit:provider:tushare:rt_k"]) == 1
+        assert len(redis.zsets["rate_limit:provider:tushare"]) == 1
+        assert await a.try_acquire(endpoint="rt_k") is True
+        assert await b.try_acquire(endpoint="rt_k") is False
+
+    asyncio.run(run())
+    assert a.get_stats()["released"] == 1
+
+    # 降级为进程内窗口时同样可以退还
+    monkeypatch.setattr(module.settings, "RATE_LIMIT_FALLBACK_DIVISOR", 1)
+    local = DistributedRateLimiter(10, 60, name="l", provider="tushare", backend="local")
+    local.set_endpoint_limit("rt_k", 1, 3600)
+
+    async def run_local():
+        assert await local.try_acquire(endpoint="rt_k") is True
+        assert await local.try_acquire(endpoint="rt_k") is False
+        assert await local.release(endpoint="rt_k") is True
+        return await local.try_acquire(endpoint="rt_k")
+
+    assert asyncio.run(run_local()) is True
+    assert local.get_stats()["current_calls"] == 1
+
+
+def test_local_refusal_takes_no_endpoint_quota_and_release_returns_own_permit():
+    limiter = DistributedRateLimiter(1, 60, name="ts", provider="tushare", backend="local")
+    limiter.set_endpoint_limit("rt_k", 1, 3600)
+
+    async def run():
+        await limiter.acquire()  # 其他调用方用完全局窗口
+        # 全局窗口已满：拒绝时不能占用 rt_k 的每小时配额
+        assert await limiter.try_acquire(endpoint="rt_k") is False
+        assert len(limiter._fallback("rt_k").calls) == 0
+
+        other = DistributedRateLimiter(3, 60, name="ak", provider="akshare", backend="local")
+        other.set_endpoint_limit("rt_k", 1, 3600)
+        assert await other.try_acquire(endpoint="rt_k") is True
+        mine = other._fallback(None).calls[-1]
+        await asyncio.sleep(0.01)
+        await other.acquire()  # 之后的其他调用
+        later = other._fallback(None).calls[-1]
+        # 退还的是本次占用的记录，而不是窗口中最新的一条
+        assert await other.release(endpoint="rt_k") is True
+        assert list(other._fallback(None).calls) == [later] and mine != later
+        assert len(other._fallback("rt_k").calls) == 0
+
+    asyncio.run(run())
+
+
+def test_local_backend_never_touches_redis():
+    def factory():
+        raise AssertionError("local backend must not create a Redis client")
+
+    limiter = DistributedRateLimiter(2, 60, name="bs", provider="baostock", backend="local", redis_factory=factory)
+    limiter.set_endpoint_limit("query_history_k_data_plus", 1, 60)
+
+    async def run():
+        await limiter.acquire()
+        return [await limiter.try_acquire(endpoint="query_history_k_data_plus"),
+                await limiter.try_acquire(endpoint="query_history_k_data_plus")]
+
+    assert asyncio.run(run()) == [True, False]
+    assert limiter.get_stats()["fallback_calls"] == 3
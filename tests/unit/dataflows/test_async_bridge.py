@@ -0,0 +1,117 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+from tradingagents.utils import async_bridge
+from tradingagents.utils.async_bridge import AsyncBridge
+
+
+@pytest.fixture
+def bridge():
+    bridge = AsyncBridge(name="test-async-bridge")
+    yield bridge
+    bridge.shutdown()
+
+
+def test_one_loop_serves_sync_callers_and_running_loops(bridge):
+    async def whoami():
+        return asyncio.get_running_loop(), threading.current_thread().name
+
+    loops = {bridge.run(whoami()) for _ in range(20)}
+
+    async def caller_inside_loop():
+        # 运行中的事件循环里同步调用（原实现会为每次调用新建线程池和事件循环）
+        return bridge.run(whoami())
+
+    loops.add(asyncio.run(caller_inside_loop()))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as pool:
+        loops.update(pool.map(lambda _: bridge.run(whoami()), range(20)))
+
+    assert len(loops) == 1
+    loop, thread_name = loops.pop()
+    assert thread_name == "test-async-bridge" and loop is bridge.loop
+    assert bridge.get_stats()["calls"] == 41
+
+
+def test_loop_bound_clients_stay_warm_across_calls(bridge):
+    class Client:
+        """模拟绑定事件循环的连接池（aiohttp/Motor）"""
+        def __init__(self):
+            self.lock = asyncio.Lock()
+            self.loop = asyncio.get_running_loop()
+
+        async def get(self, value):
+            assert asyncio.get_running_loop() is self.loop, "连接池被跨事件循环使用"
+            async with self.lock:
+                await asyncio.sleep(0)
+                return value
+
+    holder = {}
+
+    async def call(value):
+        client = holder.setdefault("client", Client())
+        return await client.get(value)
+
+    assert [bridge.run(call(i)) for i in range(5)] == list(range(5))
+
+
+def test_timeout_cancels_and_errors_propagate(bridge):
+    state = {}
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    start = time.perf_counter()
+    with pytest.raises(concurrent.futures.TimeoutError):
+        bridge.run(slow(), timeout=0.05)
+    assert time.perf_counter() - start < 1
+    deadline = time.monotonic() + 1
+    while "cancelled" not in state and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert state == {"cancelled": True}
+
+    async def boom():
+        raise ValueError("provider error")
+
+    with pytest.raises(ValueError, match="provider error"):
+        bridge.run(boom())
+
+    async def nested():
+        return bridge.run(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError):
+        bridge.run(nested())
+
+    stats = bridge.get_stats()
+    assert stats["timeouts"] == 1 and stats["errors"] == 2
+
+
+def test_data_source_manager_reuses_shared_loop(monkeypatch):
+    from tradingagents.dataflows.data_source_manager import DataSourceManager
+
+    bridge = AsyncBridge(name="dsm-bridge")
+    monkeypatch.setattr(async_bridge, "_bridge", bridge)
+    manager = DataSourceManager.__new__(DataSourceManager)
+
+    async def fetch(i):
+        await asyncio.sleep(0)
+        return i, threading.current_thread().name
+
+    async def analysis():
+        return [manager._run_async_blocking(fetch(i)) for i in range(30)]
+
+    try:
+        before = threading.active_count()
+        results = asyncio.run(analysis())
+        assert [r[0] for r in results] == list(range(30))
+        assert {r[1] for r in results} == {"dsm-bridge"}
+        assert threading.active_count() <= before + 1
+    finally:
+        bridge.shutdown()
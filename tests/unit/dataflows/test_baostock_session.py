@@ -0,0 +1,178 @@
+import asyncio
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from tradingagents.dataflows.providers.china import baostock_session
+from tradingagents.dataflows.providers.china.baostock_session import BaoStockError, BaoStockSession
+
+
+class _ResultData:
+    def __init__(self, rows, fields, error_code="0", error_msg="success"):
+        self._rows = list(rows)
+        self.fields = fields
+        self.error_code = error_code
+        self.error_msg = error_msg
+        self._current = None
+
+    def next(self):
+        if not self._rows:
+            return False
+        self._current = self._rows.pop(0)
+        return True
+
+    def get_row_data(self):
+        return self._current
+
+
+def _fake_bs(fail_queries=(), delay=0.0):
+    """模拟 baostock 模块：非线程安全（并发进入时报错），fail_queries 依次返回给定错误码"""
+    bs = types.ModuleType("baostock")
+    bs.logins = 0
+    bs.logouts = 0
+    bs.logged_in = False
+    bs.active = 0
+    bs.fail_queries = list(fail_queries)
+
+    def login():
+        bs.logins += 1
+        bs.logged_in = True
+        return _ResultData([], [])
+
+    def logout():
+        bs.logouts += 1
+        bs.logged_in = False
+        return _ResultData([], [])
+
+    def query(rows, fields):
+        bs.active += 1
+        try:
+            assert bs.active == 1, "baostock 客户端被并发访问"
+            time.sleep(delay)
+            if bs.fail_queries:
+                return _ResultData([], fields, bs.fail_queries.pop(0), "error")
+            if not bs.logged_in:
+                return _ResultData([], fields, "10001001", "用户未登录")
+            return _ResultData(rows, fields)
+        finally:
+            bs.active -= 1
+
+    bs.login = login
+    bs.logout = logout
+    bs.query_stock_basic = lambda code="", **kw: query(
+        [[code or "sz.000001", "平安银行", "1991-04-03", "", "1", "1"]],
+        ["code", "code_name", "ipoDate", "outDate", "type", "status"])
+    bs.query_history_k_data_plus = lambda code, fields, **kw: query(
+        [["2024-06-03", code, "10.0", "10.5", "9.8", "10.2", "10.0", "1000", "10200", "2.0"],
+         ["2024-06-04", code, "10.2", "10.8", "10.1", "10.6", "10.2", "1200", "12720", "3.92"]],
+        fields.split(","))
+    bs.query_trade_dates = lambda **kw: query([["2024-06-04", "1"]], ["calendar_date", "is_trading_day"])
+    return bs
+
+
+@pytest.fixture
+def fake_bs(monkeypatch):
+    bs = _fake_bs()
+    monkeypatch.setitem(sys.modules, "baostock", bs)
+    monkeypatch.setattr(baostock_session, "_session", None)
+    return bs
+
+
+def test_provider_fetches_share_one_login(fake_bs):
+    from tradingagents.dataflows.providers.china.baostock import BaoStockProvider
+
+    provider = BaoStockProvider()
+
+    async def run():
+        assert await provider.test_connection()
+        for code in ("000001", "600000", "300750"):
+            quotes = await provider.get_stock_quotes(code)
+            assert quotes["price"] == 10.6
+            assert (await provider.get_stock_basic_info(code))["name"] == "平安银行"
+        return provider.get_stock_list_sync()
+
+    df = asyncio.run(run())
+    assert len(df) == 1
+    assert fake_bs.logins == 1 and fake_bs.logouts == 0
+
+    stats = provider.session.get_stats()
+    assert stats["logins"] == 1 and stats["errors"] == 0
+    assert stats["queries"] >= 7 and stats["rows"] >= stats["queries"]
+
+
+def test_session_relogins_on_session_errors_only():
+    bs = _fake_bs(fail_queries=["10001001"])
+    session = BaoStockSession(bs)
+
+    rows, fields = session.query("query_stock_basic")
+    assert rows and fields[0] == "code"
+    assert bs.logins == 2 and session.relogins == 1
+
+    bs.fail_queries = ["10002007"]  # 网络错误
+    assert session.query("query_trade_dates")[0]
+    assert bs.logins == 3 and session.relogins == 2
+
+    # 连续两次会话错误：只重试一次，随后抛出
+    bs.fail_queries = ["10001001", "10001001"]
+    with pytest.raises(BaoStockError):
+        session.query("query_stock_basic")
+
+    # 参数错误等业务错误不重新登录
+    bs.fail_queries = ["10004011"]
+    logins = bs.logins
+    with pytest.raises(BaoStockError) as exc_info:
+        session.query("query_stock_basic")
+    assert exc_info.value.error_code == "10004011"
+    assert bs.logins == logins
+
+    # 空闲过久后先重新登录
+    session.idle_timeout = 0
+    session._last_used -= 1
+    session.query("query_stock_basic")
+    assert bs.logins == logins + 1
+
+
+def test_session_serializes_concurrent_threads():
+    bs = _fake_bs(delay=0.005)
+    session = BaoStockSession(bs)
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(5):
+                session.query("query_trade_dates")
+        except Exception as e:  # pragma: no cover - 失败时报告
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert bs.logins == 1
+    assert session.get_stats()["queries"] == 20
+
+
+def test_config_connection_test_uses_shared_session(fake_bs):
+    from app.models.config import DataSourceConfig
+    from app.services.config_service import ConfigService
+
+    service = ConfigService()
+    config = DataSourceConfig(name="BaoStock", type="baostock")
+
+    async def run():
+        return [await service.test_data_source_config(config) for _ in range(3)]
+
+    results = asyncio.run(run())
+    assert all(r["success"] for r in results)
+    # 连接测试复用同步任务的会话：只登录一次，也不会登出打断其他调用方
+    assert fake_bs.logins == 1 and fake_bs.logouts == 0
+
+    fake_bs.fail_queries = ["10004011"]
+    failed = asyncio.run(service.test_data_source_config(config))
+    assert failed["success"] is False and "10004011" in failed["message"]
@@ -0,0 +1,151 @@
+from datetime import datetime, time
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.dataflows.cache.bar_store import BarStore, TradingCalendar
+
+
+class FakeProvider:
+    """按请求区间返回K线并记录调用"""
+
+    def __init__(self, adj=1.0):
+        self.calls = []
+        self.adj = adj
+
+    def __call__(self, start, end):
+        self.calls.append((start, end))
+        dates = pd.bdate_range(start, end)
+        if len(dates) == 0:
+            return None
+        close = dates.dayofyear.to_numpy() * self.adj
+        return pd.DataFrame({"date": dates, "close": close, "volume": 100})
+
+
+def make_store(tmp_path, now):
+    return BarStore(root_dir=str(tmp_path), now_fn=lambda: now)
+
+
+def test_serves_subranges_and_fetches_only_missing_tail(tmp_path):
+    provider = FakeProvider()
+    store = make_store(tmp_path, datetime(2024, 3, 8, 18, 0))
+
+    df = store.get_range("000001", "2024-01-02", "2024-03-01", provider, source="tushare")
+    assert provider.calls == [("2024-01-02", "2024-03-01")]
+    assert df["date"].iloc[0] == pd.Timestamp("2024-01-02") and df["date"].iloc[-1] == pd.Timestamp("2024-03-01")
+
+    # 子区间完全由本地数据回答
+    sub = store.get_range("000001", "2024-02-01", "2024-02-10", provider, source="tushare")
+    assert len(provider.calls) == 1 and len(sub) == 7
+
+    # 只拉取尾部缺口（与最后一根本地K线重叠一天）
+    full = store.get_range("000001", "2024-01-02", "2024-03-08", provider, source="tushare")
+    assert provider.calls[-1] == ("2024-03-01", "2024-03-08")
+    assert full["date"].is_unique and full["date"].is_monotonic_increasing
+    assert len(full) == len(pd.bdate_range("2024-01-02", "2024-03-08"))
+
+    # 周末没有交易日，不请求数据源
+    store.get_range("000001", "2024-01-02", "2024-03-10", provider, source="tushare")
+    assert len(provider.calls) == 2
+
+
+def test_unsettled_today_bar_is_refetched(tmp_path):
+    provider = FakeProvider()
+    store = make_store(tmp_path, datetime(2024, 3, 8, 10, 30))
+    store.get_range("000001", "2024-03-01", "2024-03-08", provider)
+    _, meta = store.read("000001")
+    assert meta["covered_end"] == "2024-03-07"
+
+    store.get_range("000001", "2024-03-01", "2024-03-08", provider)
+    assert provider.calls[-1] == ("2024-03-07", "2024-03-08")
+
+
+def test_adjustment_change_triggers_full_refetch(tmp_path):
+    provider = FakeProvider()
+    store = make_store(tmp_path, datetime(2024, 3, 8, 18, 0))
+    store.get_range("000001", "2024-01-02", "2024-03-01", provider)
+
+    provider.adj = 0.5  # 除权后前复权价格整体变化
+    df = store.get_range("000001", "2024-01-02", "2024-03-08", provider)
+    assert provider.calls[-1] == ("2024-01-02", "2024-03-08")
+    expected = provider("2024-01-02", "2024-03-08")
+    np.testing.assert_allclose(df["close"].to_numpy(), expected["close"].to_numpy())
+
+
+def test_calendar_holidays_skip_fetch(tmp_path):
+    provider = FakeProvider()
+    calendar = TradingCalendar(holidays=["2024-02-12", "2024-02-13"])
+    store = BarStore(root_dir=str(tmp_path), calendar=calendar,
+                     settle_time=time(0, 0), now_fn=lambda: datetime(2024, 2, 14, 9, 0))
+    store.get_range("000001", "2024-02-01", "2024-02-09", provider)
+    store.get_range("000001", "2024-02-01", "2024-02-13", provider)
+    assert len(provider.calls) == 1
+
+
+def test_failed_fetch_leaves_gap_uncovered_and_is_retried(tmp_path):
+    provider = FakeProvider()
+    clock = {"now": datetime(2024, 3, 15, 18, 0)}
+    store = BarStore(root_dir=str(tmp_path), now_fn=lambda: clock["now"], empty_ttl=3600)
+    assert len(store.get_range("000001", "2024-03-01", "2024-03-08", provider)) == 6
+
+    def failing(start, end):
+        provider.calls.append((start, end))
+        return None
+
+    # 数据源临时故障：返回本地已有数据，尾部缺口保持未覆盖
+    assert len(store.get_range("000001", "2024-03-01", "2024-03-15", failing)) == 6
+    assert store.read("000001")[1]["covered_end"] == "2024-03-08"
+
+    # 数据源只返回到 03-13（数据延迟）：其后的尾部只在 TTL 内视为已覆盖
+    lagging = lambda start, end: provider(start, "2024-03-13")
+    assert len(store.get_range("000001", "2024-03-01", "2024-03-15", lagging)) == 9
+    assert store.read("000001")[1]["provisional_from"] == "2024-03-14"
+    calls = len(provider.calls)
+    store.get_range("000001", "2024-03-01", "2024-03-15", provider)
+    assert len(provider.calls) == calls
+
+    clock["now"] = datetime(2024, 3, 15, 19, 0)
+    df = store.get_range("000001", "2024-03-01", "2024-03-15", provider)
+    assert provider.calls[-1] == ("2024-03-13", "2024-03-15")
+    assert len(df) == 11
+    meta = store.read("000001")[1]
+    assert meta["covered_end"] == "2024-03-15" and "provisional_from" not in meta
+
+    # 首次请求即失败：不写入任何覆盖区间
+    assert store.get_range("600000", "2024-03-01", "2024-03-08", failing) is None
+    assert store.read("600000") == (None, None)
+
+
+def test_empty_answers_cover_suspensions_and_unknown_holidays(tmp_path):
+    suspended = pd.bdate_range("2024-03-11", "2024-03-15")
+    provider = FakeProvider()
+
+    def with_suspension(start, end):
+        df = provider(start, end)
+        return df[~df["date"].isin(suspended)] if df is not None else pd.DataFrame()
+
+    clock = {"now": datetime(2024, 3, 22, 18, 0)}
+    store = BarStore(root_dir=str(tmp_path), now_fn=lambda: clock["now"], empty_ttl=3600)
+    store.get_range("000001", "2024-03-01", "2024-03-08", with_suspension)
+
+    # 停牌一周（日历未登记）：数据源应答后整段记为已覆盖，TTL 内不再请求，过期后只复查一次
+    store.get_range("000001", "2024-03-01", "2024-03-15", with_suspension)
+    assert store.read("000001")[1]["covered_end"] == "2024-03-15"
+    calls = len(provider.calls)
+    clock["now"] = datetime(2024, 3, 22, 18, 30)
+    store.get_range("000001", "2024-03-01", "2024-03-15", with_suspension)
+    assert len(provider.calls) == calls
+    clock["now"] = datetime(2024, 3, 22, 20, 0)
+    store.get_range("000001", "2024-03-01", "2024-03-15", with_suspension)
+    store.get_range("000001", "2024-03-01", "2024-03-15", with_suspension)
+    assert provider.calls[calls:] == [("2024-03-08", "2024-03-15")]
+
+    # 停牌发生在头部缺口内同样整体覆盖
+    store.get_range("000001", "2024-02-26", "2024-03-15", with_suspension)
+    assert store.read("000001")[1]["covered_start"] == "2024-02-26"
+    calls = len(provider.calls)
+    df = store.get_range("000001", "2024-02-26", "2024-03-22", with_suspension)
+    assert provider.calls[-1] == ("2024-03-08", "2024-03-22")
+    assert not df["date"].isin(suspended).any() and df["date"].iloc[-1] == pd.Timestamp("2024-03-22")
+    store.get_range("000001", "2024-02-26", "2024-03-22", with_suspension)
+    assert len(provider.calls) == calls + 1
@@ -0,0 +1,77 @@
+import json
+import multiprocessing as mp
+from datetime import datetime, timedelta
+
+from tradingagents.dataflows.cache.file_cache import StockDataCache
+from tradingagents.dataflows.cache.metadata_index import INDEX_FILENAME, CacheMetadataIndex
+
+
+def _write_entries(db_path, worker, n):
+    index = CacheMetadataIndex(db_path)
+    for i in range(n):
+        index.upsert(f"w{worker}_{i}", {
+            "symbol": f"{i:06d}", "data_type": "stock_data", "market_type": "china",
+            "data_source": "tushare", "cached_at": datetime.now().isoformat(),
+        })
+
+
+def test_find_supports_range_covering_and_ttl(tmp_path):
+    index = CacheMetadataIndex(tmp_path / INDEX_FILENAME)
+    now = datetime.now()
+    base = {"symbol": "000001", "data_type": "stock_data", "market_type": "china", "data_source": "tushare"}
+    index.upsert("old", {**base, "start_date": "2024-01-01", "end_date": "2024-12-31",
+                         "cached_at": (now - timedelta(hours=5)).isoformat()})
+    index.upsert("narrow", {**base, "start_date": "2024-06-01", "end_date": "2024-06-30",
+                            "cached_at": now.isoformat()})
+    index.upsert("other", {**base, "symbol": "600000", "cached_at": now.isoformat()})
+
+    assert index.find("000001", "stock_data", "china") == ["narrow", "old"]
+    assert index.find("000001", "stock_data", "china", start_date="2024-03-01", end_date="2024-09-30") == ["old"]
+    assert index.find("000001", "stock_data", "china", max_age_hours=1) == ["narrow"]
+    assert index.find("000001", "stock_data", "china", data_source="akshare") == []
+
+    expired = index.expire(now - timedelta(hours=1))
+    assert [k for k, _ in expired] == ["old"]
+    assert index.count() == 2
+
+
+def test_concurrent_writers_from_several_processes(tmp_path):
+    db_path = tmp_path / INDEX_FILENAME
+    CacheMetadataIndex(db_path)
+    procs = [mp.get_context("spawn").Process(target=_write_entries, args=(db_path, w, 50)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+        assert p.exitcode == 0
+    assert CacheMetadataIndex(db_path).count() == 200
+
+
+def test_stock_data_cache_uses_index_and_imports_legacy_metadata(tmp_path):
+    legacy_dir = tmp_path / "metadata"
+    legacy_dir.mkdir()
+    data_file = tmp_path / "legacy.txt"
+    data_file.write_text("legacy", encoding="utf-8")
+    with open(legacy_dir / "legacy_key_meta.json", "w", encoding="utf-8") as f:
+        json.dump({"symbol": "AAPL", "data_type": "fundamentals", "market_type": "us",
+                   "data_source": "finnhub", "file_path": str(data_file), "file_format": "txt",
+                   "cached_at": datetime.now().isoformat()}, f)
+
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    assert cache.metadata_index is not None
+    assert cache.find_cached_fundamentals_data("AAPL") == "legacy_key"
+
+    key = cache.save_stock_data("000001", "bars", start_date="2024-01-01", end_date="2024-12-31",
+                                data_source="tushare")
+    # 不同的日期参数：精确键未命中，通过索引找到覆盖该范围的缓存
+    assert cache.find_cached_stock_data("000001", start_date="2024-02-01", end_date="2024-03-01",
+                                        data_source="tushare") == key
+    assert cache.load_stock_data(key) == "bars"
+
+    stats = cache.get_cache_stats()
+    assert stats["stock_data_count"] == 1 and stats["fundamentals_count"] == 1
+    assert stats["total_size"] == len("bars") + len("legacy")
+
+    assert cache.clear_old_cache(max_age_days=0) == 2
+    assert cache.metadata_index.count() == 0
+    assert not (legacy_dir / "legacy_key_meta.json").exists()
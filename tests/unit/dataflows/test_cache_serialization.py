@@ -0,0 +1,103 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows.cache.serialization import (
+    ARROW_AVAILABLE,
+    FRAME_MAGIC,
+    decode_frame,
+    encode_frame,
+    is_frame,
+    read_frame_file,
+)
+
+CODECS = ["npy"] + (["arrow"] if ARROW_AVAILABLE else [])
+
+
+def make_daily(n=30):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2024-01-01", periods=n, name="date")
+    return pd.DataFrame({
+        "open": rng.uniform(9, 11, n),
+        "close": rng.uniform(9, 11, n),
+        "volume": rng.integers(1000, 5000, n),
+        "suspended": np.zeros(n, dtype=bool),
+        "code": ["000001"] * (n - 1) + [None],
+        "updated_at": pd.date_range("2024-01-01", periods=n, freq="h", tz="Asia/Shanghai"),
+    }, index=dates)
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_frame_roundtrip_preserves_dtypes_and_index(codec, tmp_path):
+    df = make_daily()
+    blob = encode_frame(df, codec)
+    assert is_frame(blob) and blob[:4] == FRAME_MAGIC
+
+    pd.testing.assert_frame_equal(decode_frame(blob), df, check_freq=False)
+
+    path = tmp_path / "bars.frame"
+    path.write_bytes(blob)
+    mapped = read_frame_file(path, zero_copy=True)
+    pd.testing.assert_frame_equal(mapped, df, check_freq=False)
+
+    plain = pd.DataFrame({"a": [1.5, 2.5]})
+    pd.testing.assert_frame_equal(decode_frame(encode_frame(plain, codec)), plain)
+
+
+def test_unknown_frame_version_is_rejected():
+    blob = bytearray(encode_frame(make_daily(), "npy"))
+    blob[4] = 99
+    with pytest.raises(ValueError):
+        decode_frame(bytes(blob))
+
+
+def test_file_cache_writes_frames_and_reads_legacy_csv(tmp_path):
+    from tradingagents.dataflows.cache.file_cache import StockDataCache
+
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    df = make_daily()
+    key = cache.save_stock_data("000001", df, "2024-01-01", "2024-02-09", data_source="tushare")
+    meta = cache._load_metadata(key)
+    assert meta["file_format"] == "frame"
+    pd.testing.assert_frame_equal(cache.load_stock_data(key), df, check_freq=False)
+
+    # 旧版 CSV 缓存仍可读取
+    legacy_path = tmp_path / "legacy.csv"
+    df[["open", "close"]].to_csv(legacy_path)
+    cache._save_metadata("legacy", {"symbol": "000002", "data_type": "stock_data", "market_type": "china",
+                                    "file_path": str(legacy_path), "file_format": "csv"})
+    legacy = cache.load_stock_data("legacy")
+    assert list(legacy.columns) == ["open", "close"] and len(legacy) == len(df)
+
+
+def test_db_cache_decodes_frames_and_legacy_json():
+    from tradingagents.dataflows.cache.db_cache import DatabaseCacheManager
+
+    df = make_daily()[["open", "close", "volume"]]
+    blob = encode_frame(df)
+    text = DatabaseCacheManager._to_redis_text(blob)
+    assert isinstance(text, str)
+    pd.testing.assert_frame_equal(DatabaseCacheManager._decode_data(text, "dataframe_frame"), df, check_freq=False)
+    pd.testing.assert_frame_equal(DatabaseCacheManager._decode_data(blob, "dataframe_frame"), df, check_freq=False)
+
+    legacy = json.dumps([{"close": 1.0}, {"close": 2.0}])
+    assert DatabaseCacheManager._decode_data(legacy, "dataframe_json")["close"].tolist() == [1.0, 2.0]
+    assert DatabaseCacheManager._decode_data("text", "text") == "text"
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_decoded_frames_are_writable(codec, tmp_path):
+    df = make_daily()
+    blob = encode_frame(df, codec)
+    path = tmp_path / "bars.frame"
+    path.write_bytes(blob)
+
+    for out in (decode_frame(blob), read_frame_file(path)):
+        out.iloc[0, out.columns.get_loc("close")] = 1.0
+        out.loc[out.index[1], "volume"] = 7
+        out["open"] = out["open"].where(out["open"] > 10)
+        out.fillna({"open": 0.0}, inplace=True)
+        np.multiply(out["close"].to_numpy(), 2, out=out["close"].to_numpy())
+        assert out["close"].iloc[0] == 2.0 and out["volume"].iloc[1] == 7
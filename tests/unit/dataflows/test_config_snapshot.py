@@ -0,0 +1,196 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from tradingagents.config import config_snapshot
+from tradingagents.config.config_snapshot import ConfigSnapshot, ConfigSnapshotStore
+
+
+def _doc(version, tushare_priority=3):
+    return {
+        "version": version,
+        "data_source_configs": [
+            {"name": "Tushare", "type": "tushare", "enabled": True, "priority": tushare_priority,
+             "market_categories": ["a_shares"], "api_key": "tk"},
+            {"name": "AKShare", "type": "akshare", "enabled": True, "priority": 2,
+             "market_categories": ["a_shares", "港股"]},
+            {"name": "BaoStock", "type": "baostock", "enabled": False, "priority": 9},
+            {"name": "yfinance", "type": "yfinance", "enabled": True, "priority": 1},
+        ],
+    }
+
+
+class _FakePubSub:
+    def __init__(self):
+        self.messages = queue.Queue()
+        self.channels = []
+        self.closed = False
+
+    def subscribe(self, channel):
+        self.channels.append(channel)
+
+    def listen(self):
+        while not self.closed:
+            try:
+                yield self.messages.get(timeout=0.05)
+            except queue.Empty:
+                continue
+
+    def close(self):
+        self.closed = True
+
+    def publish(self, data):
+        self.messages.put({"type": "message", "data": data})
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_snapshot_views_are_immutable_and_cached():
+    snapshot = ConfigSnapshot.from_document(_doc(7))
+    assert [ds["type"] for ds in snapshot.enabled_data_sources("a_shares")] == ["tushare", "akshare", "yfinance"]
+    assert [ds["type"] for ds in snapshot.enabled_data_sources("港股", "hk_stocks")] == ["akshare", "yfinance"]
+    assert snapshot.enabled_data_sources("a_shares") is snapshot.enabled_data_sources("a_shares")
+    assert snapshot.enabled_types() == {"tushare", "akshare", "yfinance"}
+    assert snapshot.credentials()["tushare"]["api_key"] == "tk"
+
+    with pytest.raises(TypeError):
+        snapshot.data_source_configs[0]["priority"] = 100
+    assert snapshot.data_source_configs[0]["market_categories"] == ("a_shares",)
+
+
+def test_push_invalidation_reloads_only_on_newer_versions():
+    docs = [_doc(1)]
+    loads = []
+    pubsub = _FakePubSub()
+
+    def loader():
+        loads.append(docs[-1]["version"])
+        return docs[-1]
+
+    store = ConfigSnapshotStore(loader=loader, version_probe=lambda: pytest.fail("推送可用时不应探测版本"),
+                                subscriber_factory=lambda: pubsub, check_interval=0.01)
+    try:
+        assert store.get().version == 1
+        assert _wait_for(lambda: store.get_stats()["push_active"])
+        store.get()  # 订阅生效前已开始加载时会重新加载一次
+        loads[:] = [1]
+        time.sleep(0.05)  # 超过探测间隔：推送可用时仍不产生 I/O
+        for _ in range(100):
+            store.get()
+        assert loads == [1]
+        assert pubsub.channels == [config_snapshot.CONFIG_INVALIDATION_CHANNEL]
+
+        pubsub.publish("1")  # 重复/过期通知
+        assert _wait_for(lambda: store.push_messages == 1)
+        assert store.get().version == 1 and loads == [1]
+
+        docs.append(_doc(2, tushare_priority=1))
+        pubsub.publish("2")
+        assert _wait_for(lambda: store.get_stats()["stale"])
+        snapshot = store.get()
+        assert snapshot.version == 2 and loads == [1, 2]
+        assert [ds["type"] for ds in snapshot.enabled_data_sources("a_shares")] == ["akshare", "tushare", "yfinance"]
+
+        # 本进程写入后直接失效
+        docs.append(_doc(3))
+        assert store.invalidate(3)
+        assert store.get().version == 3
+    finally:
+        store.close()
+
+
+def test_change_saved_before_subscription_is_not_missed():
+    docs = [_doc(1)]
+    subscribe_gate = threading.Event()
+
+    class _SlowPubSub(_FakePubSub):
+        def subscribe(self, channel):
+            subscribe_gate.wait(timeout=2)
+            super().subscribe(channel)
+
+    store = ConfigSnapshotStore(loader=lambda: docs[-1], version_probe=lambda: docs[-1]["version"],
+                                subscriber_factory=_SlowPubSub, check_interval=60)
+    try:
+        assert store.get().version == 1
+        # 首次加载与订阅生效之间保存的配置没有对应的通知
+        docs.append(_doc(2))
+        subscribe_gate.set()
+        assert _wait_for(lambda: store.get_stats()["push_active"])
+        assert store.get().version == 2
+    finally:
+        store.close()
+
+
+def test_without_push_probes_version_and_survives_load_errors():
+    state = {"version": 1, "fail": False, "probes": 0}
+    loads = []
+
+    def loader():
+        if state["fail"]:
+            raise ConnectionError("mongo down")
+        loads.append(state["version"])
+        return _doc(state["version"])
+
+    def probe():
+        state["probes"] += 1
+        return state["version"]
+
+    store = ConfigSnapshotStore(loader=loader, version_probe=probe,
+                                subscriber_factory=lambda: None, check_interval=0.05)
+    assert store.get().version == 1
+    store.get()
+    assert loads == [1] and state["probes"] == 0
+
+    time.sleep(0.06)
+    store.get()
+    assert loads == [1] and state["probes"] == 1  # 版本未变：只探测不加载
+
+    state["version"] = 2
+    time.sleep(0.06)
+    assert store.get().version == 2 and loads == [1, 2]
+
+    # 加载失败时沿用上一版本，间隔内不重复查询
+    state["fail"] = True
+    store.invalidate()
+    assert store.get().version == 2
+    assert store.get().version == 2
+    assert store.load_errors == 1
+
+    empty = ConfigSnapshotStore(loader=lambda: (_ for _ in ()).throw(ConnectionError("down")),
+                                subscriber_factory=lambda: None, check_interval=60)
+    assert empty.get().data_source_configs == ()
+
+
+def test_hot_paths_read_from_snapshot(monkeypatch):
+    from tradingagents.dataflows import interface
+    from tradingagents.dataflows.data_source_manager import ChinaDataSource, DataSourceManager
+
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return _doc(5)
+
+    store = ConfigSnapshotStore(loader=loader, subscriber_factory=lambda: None, check_interval=60)
+    monkeypatch.setattr(config_snapshot, "_store", store)
+
+    manager = DataSourceManager.__new__(DataSourceManager)
+    manager.available_sources = [ChinaDataSource.TUSHARE, ChinaDataSource.AKSHARE, ChinaDataSource.BAOSTOCK]
+    for _ in range(20):
+        assert manager._get_data_source_priority_order("000001") == [ChinaDataSource.TUSHARE, ChinaDataSource.AKSHARE]
+        assert interface._get_enabled_hk_data_sources() == ["akshare", "yfinance"]
+        assert manager._get_datasource_configs_from_db()["tushare"]["api_key"] == "tk"
+    assert len(loads) == 1
+
+    assert config_snapshot.invalidate_config_snapshot(6)
+    manager._get_data_source_priority_order("000001")
+    assert len(loads) == 2
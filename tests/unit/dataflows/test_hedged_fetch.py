@@ -0,0 +1,201 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pandas as pd
+
+from tradingagents.dataflows.data_source_manager import ChinaDataSource, DataSourceManager
+from tradingagents.dataflows.hedged_fetch import HedgedFetcher, SourceHealthTracker
+
+
+def _tracker(**options):
+    options.setdefault("default_delay", 0.2)
+    options.setdefault("min_delay", 0.01)
+    return SourceHealthTracker(**options)
+
+
+def _scripted(script, calls=None):
+    """script: {source: (delay, result 或 Exception)}"""
+    def fetch(source):
+        if calls is not None:
+            calls.append(source)
+        delay, result = script[source]
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return fetch
+
+
+class _SaturatedExecutor:
+    """只执行第一个请求，之后提交的请求一直排队（模拟线程池已满）"""
+
+    def __init__(self):
+        self.pool = ThreadPoolExecutor(max_workers=1)
+        self.submitted = 0
+        self.queued = []
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        if self.submitted == 1:
+            return self.pool.submit(fn, *args)
+        future = Future()
+        self.queued.append(future)
+        return future
+
+
+def test_slow_primary_is_hedged_after_its_p95():
+    fetcher = HedgedFetcher(tracker=_tracker())
+    fast = {"tushare": (0.02, "tushare-data"), "baostock": (0.05, "baostock-data"), "akshare": (0.05, "akshare-data")}
+    for _ in range(10):
+        assert fetcher.fetch(["tushare", "baostock"], _scripted(fast)).source == "tushare"
+    assert fetcher.tracker.hedge_delay("tushare") < 0.1
+
+    start = time.perf_counter()
+    outcome = fetcher.fetch(["tushare", "baostock", "akshare"],
+                            _scripted({**fast, "tushare": (1.0, "late")}), label="000001")
+    elapsed = time.perf_counter() - start
+    assert outcome.source == "baostock" and outcome.result == "baostock-data"
+    assert outcome.hedged
+    assert elapsed < 0.5
+    assert [a["status"] for a in outcome.attempts] == ["ok", "abandoned"]
+
+
+def test_rate_limited_sources_are_not_hedged_and_queued_losers_are_cancelled():
+    # 默认只对冲到 baostock：有配额的 akshare 只在 tushare 失败后才调用
+    fetcher = HedgedFetcher(tracker=_tracker(default_delay=0.02))
+    calls = []
+    outcome = fetcher.fetch(["tushare", "akshare"],
+                            _scripted({"tushare": (0.3, "tushare-data"), "akshare": (0.0, "akshare-data")}, calls))
+    assert outcome.source == "tushare" and not outcome.hedged
+    assert calls == ["tushare"]
+
+    # 投机请求排队未执行时主请求已返回：取消排队的请求，不计入统计
+    executor = _SaturatedExecutor()
+    try:
+        fetcher = HedgedFetcher(tracker=_tracker(default_delay=0.02), executor=executor,
+                                hedge_sources=["akshare", "baostock"])
+        calls = []
+        outcome = fetcher.fetch(["tushare", "akshare"],
+                                _scripted({"tushare": (0.2, "tushare-data"), "akshare": (0.0, "akshare-data")}, calls))
+        assert outcome.source == "tushare" and outcome.hedged
+        assert [a["status"] for a in outcome.attempts] == ["ok", "cancelled"]
+        assert calls == ["tushare"] and all(f.cancelled() for f in executor.queued)
+        assert fetcher.tracker.get_stats()["akshare@default"]["calls"] == 0
+    finally:
+        executor.pool.shutdown()
+
+
+def test_hung_primary_hedges_past_rate_limited_sources_and_timeout_bounds_the_wait():
+    fetcher = HedgedFetcher(tracker=_tracker(default_delay=0.05))
+    calls = []
+    script = {"tushare": (1.0, "late"), "akshare": (0.0, "akshare-data"), "baostock": (0.02, "baostock-data")}
+    start = time.perf_counter()
+    outcome = fetcher.fetch(["tushare", "akshare", "baostock"], _scripted(script, calls), timeout=2.0)
+    # 跳过不允许对冲的 akshare，直接投机启动 baostock
+    assert time.perf_counter() - start < 0.5
+    assert outcome.source == "baostock" and outcome.hedged
+    assert calls == ["tushare", "baostock"]
+
+    # 对冲的数据源也失败：按优先级回到 akshare
+    calls.clear()
+    script["baostock"] = (0.0, RuntimeError("down"))
+    outcome = fetcher.fetch(["tushare", "akshare", "baostock"], _scripted(script, calls), timeout=2.0)
+    assert outcome.source == "akshare" and calls == ["tushare", "baostock", "akshare"]
+
+    # 全部挂起：在整体超时后返回，超时计为失败，持续挂起的数据源被熔断、不再占用线程池
+    tracker = _tracker(failure_threshold=2, cooldown=60)
+    fetcher = HedgedFetcher(tracker=tracker)
+    for _ in range(2):
+        start = time.perf_counter()
+        outcome = fetcher.fetch(["tushare", "akshare"], _scripted(script), timeout=0.2)
+        assert not outcome.ok and time.perf_counter() - start < 1.0
+        assert [a["status"] for a in outcome.attempts] == ["abandoned"]
+    assert tracker.get_stats()["tushare@default"]["state"] == "open"
+    calls.clear()
+    assert fetcher.fetch(["tushare", "akshare"], _scripted(script, calls), timeout=0.2).source == "akshare"
+    assert calls == ["akshare"]
+    time.sleep(1.5)  # 挂起的请求晚些完成时不再重复计入统计
+    assert tracker.get_stats()["tushare@default"]["calls"] == 2
+
+
+def test_failures_move_on_immediately_and_invalid_results_count_as_failures():
+    fetcher = HedgedFetcher(tracker=_tracker(default_delay=5.0))
+    calls = []
+    start = time.perf_counter()
+    outcome = fetcher.fetch(
+        ["tushare", "akshare", "baostock"],
+        _scripted({"tushare": (0.01, RuntimeError("token invalid")),
+                   "akshare": (0.01, pd.DataFrame()),
+                   "baostock": (0.01, pd.DataFrame({"close": [1.0]}))}, calls),
+    )
+    assert time.perf_counter() - start < 0.5
+    assert outcome.source == "baostock" and not outcome.hedged
+    assert calls == ["tushare", "akshare", "baostock"]
+    assert [a["status"] for a in outcome.attempts] == ["error", "invalid", "ok"]
+
+    failed = fetcher.fetch(["tushare"], _scripted({"tushare": (0.0, "❌ 未获取到数据")}))
+    assert not failed.ok and failed.result == "❌ 未获取到数据"
+
+
+def test_circuit_breaker_skips_failing_source_then_probes_it():
+    tracker = _tracker(failure_threshold=2, cooldown=0.2)
+    fetcher = HedgedFetcher(tracker=tracker)
+    script = {"tushare": (0.0, RuntimeError("down")), "akshare": (0.0, "akshare-data")}
+
+    for _ in range(2):
+        assert fetcher.fetch(["tushare", "akshare"], _scripted(script)).source == "akshare"
+    time.sleep(0.05)  # 等待后台记录完成
+    assert tracker.get_stats()["tushare@default"]["state"] == "open"
+
+    calls = []
+    outcome = fetcher.fetch(["tushare", "akshare"], _scripted(script, calls))
+    assert calls == ["akshare"] and outcome.skipped == ["tushare"]
+
+    # 全部熔断时仍然按顺序尝试
+    assert fetcher.fetch(["tushare"], _scripted(script)).attempts[0]["status"] == "error"
+
+    # 冷却结束后放行一次试探，成功即恢复
+    time.sleep(0.25)
+    script["tushare"] = (0.0, "tushare-data")
+    assert fetcher.fetch(["tushare", "akshare"], _scripted(script)).source == "tushare"
+    time.sleep(0.05)
+    assert tracker.get_stats()["tushare@default"]["state"] == "closed"
+
+
+def _manager(tracker):
+    manager = DataSourceManager.__new__(DataSourceManager)
+    manager.current_source = ChinaDataSource.TUSHARE
+    manager.available_sources = [ChinaDataSource.TUSHARE, ChinaDataSource.AKSHARE, ChinaDataSource.BAOSTOCK]
+    manager.hedged_fetcher = HedgedFetcher(tracker=tracker)
+    manager._get_data_source_priority_order = lambda symbol=None: list(manager.available_sources)
+    return manager
+
+
+def test_data_source_manager_hedges_dataframe_and_text_paths():
+    manager = _manager(_tracker(default_delay=0.1))
+    manager.available_sources = [ChinaDataSource.TUSHARE, ChinaDataSource.BAOSTOCK, ChinaDataSource.AKSHARE]
+    frame = pd.DataFrame({"date": ["2024-06-03", "2024-06-04"], "close": [10.0, 10.5]})
+    delays = {ChinaDataSource.TUSHARE: 2.0, ChinaDataSource.AKSHARE: 0.02, ChinaDataSource.BAOSTOCK: 0.02}
+
+    def fetch_frame(source, symbol, start_date, end_date, period="daily"):
+        time.sleep(delays[source])
+        return frame
+
+    manager._fetch_source_dataframe = fetch_frame
+    start = time.perf_counter()
+    df = manager.get_stock_dataframe("000001", "2024-06-01", "2024-06-05")
+    assert time.perf_counter() - start < 1.0
+    assert df["pct_change"].round(1).tolist()[1] == 5.0
+
+    def get_source_data(source, symbol, start_date, end_date, period="daily"):
+        time.sleep(delays[source])
+        return f"## {source.value} {symbol}"
+
+    manager._get_source_data = get_source_data
+    start = time.perf_counter()
+    assert manager.get_stock_data("000001", "2024-06-01", "2024-06-05") == "## baostock 000001"
+    assert time.perf_counter() - start < 1.0
+
+    manager._get_source_data = lambda source, *args, **kwargs: "❌ 无数据"
+    assert manager._try_fallback_sources("000001", "2024-06-01", "2024-06-05") == (
+        "❌ 所有数据源都无法获取000001的daily数据", None)
@@ -0,0 +1,113 @@
+import json
+import threading
+import time
+
+import pandas as pd
+
+from tradingagents.dataflows.providers.hk import improved_hk
+from tradingagents.dataflows.providers.hk.hk_store import HKMetadataStore, SharedSnapshot, TokenBucket
+
+
+def _spot_frame():
+    return pd.DataFrame({"代码": ["00700", "01234"], "中文名称": ["腾讯控股", "中国利郎"], "最新价": [380.2, 3.1]})
+
+
+def test_store_ttl_lease_and_legacy_import(tmp_path):
+    legacy = tmp_path / "hk_stock_cache.json"
+    now = time.time()
+    legacy.write_text(json.dumps({
+        "name_1234.HK": {"data": "中国利郎", "timestamp": now - 60, "source": "akshare_sina"},
+        "name_9999.HK": {"data": "过期", "timestamp": now - 7200, "source": "default"},
+    }, ensure_ascii=False), encoding="utf-8")
+
+    store = HKMetadataStore(tmp_path / "hk.sqlite3")
+    assert store.import_json_cache(str(legacy), ttl=3600) == 1
+    assert store.get("name_1234.HK") == "中国利郎"
+    assert store.get("name_9999.HK") is None
+
+    store.set("financial_00700", {"eps_ttm": 20.5}, ttl=-1)
+    assert store.get("financial_00700") is None
+    assert store.get("financial_00700", allow_stale=True) == {"eps_ttm": 20.5}
+    assert store.purge_expired() == 1
+
+    assert store.acquire_lease("spot", "a", ttl=60)
+    assert not store.acquire_lease("spot", "b", ttl=60)
+    store.release_lease("spot", "a")
+    assert store.acquire_lease("spot", "b", ttl=60)
+    assert store.acquire_lease("expired", "a", ttl=-1) and store.acquire_lease("expired", "b", ttl=60)
+
+
+def test_token_bucket_never_blocks():
+    bucket = TokenBucket(rate=10, capacity=2)
+    start = time.perf_counter()
+    assert [bucket.try_acquire() for _ in range(3)] == [True, True, False]
+    assert time.perf_counter() - start < 0.05
+    assert 0 < bucket.wait_time() <= 0.1
+    assert bucket.acquire(timeout=0.2)
+    slow = TokenBucket(rate=0.01)
+    assert slow.try_acquire() and not slow.acquire(timeout=0.05)
+    assert bucket.get_stats()["rejected"] >= 1
+
+
+def test_snapshot_single_flight_and_stale_while_revalidate(tmp_path):
+    store = HKMetadataStore(tmp_path / "hk.sqlite3")
+    calls = []
+
+    def fetch():
+        calls.append(threading.current_thread().name)
+        time.sleep(0.2)
+        return _spot_frame()
+
+    snapshot = SharedSnapshot("stock_hk_spot", fetch, store, ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(snapshot.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert len(results) == 8 and all(len(df) == 2 for df in results)
+
+    # 另一个进程的实例直接读取共享存储中的快照
+    other = SharedSnapshot("stock_hk_spot", fetch, store, ttl=60)
+    assert other.get()["代码"].tolist() == ["00700", "01234"]
+    assert len(calls) == 1
+
+    # 快照过期：刷新期间其他调用方立即拿到旧快照
+    snapshot._expires_at = 0
+    store.set(snapshot.key, store.get(snapshot.key), ttl=-1)
+    leader = threading.Thread(target=snapshot.get)
+    leader.start()
+    time.sleep(0.05)
+    start = time.perf_counter()
+    assert len(snapshot.get()) == 2
+    assert time.perf_counter() - start < 0.1
+    leader.join()
+    assert len(calls) == 2
+    assert snapshot.get_stats()["stale_served"] >= 1
+
+
+def test_provider_uses_store_and_shared_snapshot(tmp_path, monkeypatch):
+    store = HKMetadataStore(tmp_path / "hk.sqlite3")
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return _spot_frame()
+
+    monkeypatch.setattr(improved_hk, "_hk_spot_snapshot", SharedSnapshot("stock_hk_spot", fetch, store, ttl=60))
+    provider = improved_hk.ImprovedHKStockProvider(store=store)
+    monkeypatch.setattr(improved_hk, "_improved_hk_provider", provider)
+
+    assert provider.get_company_name("1234.HK") == "中国利郎"
+    assert store.get_entry("name_1234.HK")["source"] == "akshare_sina"
+    assert provider.get_company_name("0700.HK") == "腾讯控股"
+    info = improved_hk.get_hk_stock_info_akshare("0700.HK")
+    assert info["price"] == 380.2 and info["source"] == "akshare_sina"
+    assert len(fetches) == 1
+
+    # 令牌耗尽时不调用统一接口，直接使用默认名称
+    provider.rate_limiter = TokenBucket(rate=0.001, capacity=1)
+    provider.rate_limiter.try_acquire()
+    assert provider.get_company_name("8888.HK") == "港股08888"
+    assert store.get_entry("name_8888.HK")["source"] == "default"
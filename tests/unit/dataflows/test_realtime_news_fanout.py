@@ -0,0 +1,118 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from tradingagents.dataflows.news import realtime_news
+from tradingagents.dataflows.news.realtime_news import NewsItem, RealtimeNewsAggregator
+
+DELAY = 0.2
+
+
+def make_item(title, minutes_ago, source):
+    return NewsItem(title=title, content="", source=source,
+                    publish_time=datetime.now(ZoneInfo("Asia/Shanghai")) - timedelta(minutes=minutes_ago),
+                    url="", urgency="low", relevance_score=1.0)
+
+
+def slow_source(delay, items):
+    def fetch(ticker, hours_back):
+        time.sleep(delay)
+        return list(items)
+    return fetch
+
+
+def blocked_source(release, items):
+    def fetch(ticker, hours_back):
+        release.wait(timeout=5)
+        return list(items)
+    return fetch
+
+
+def make_aggregator(monkeypatch, deadline, release):
+    monkeypatch.setenv("FINNHUB_API_KEY", "k")
+    monkeypatch.setenv("ALPHA_VANTAGE_API_KEY", "k")
+    monkeypatch.setenv("NEWSAPI_KEY", "k")
+    realtime_news._source_stats.reset()
+    agg = RealtimeNewsAggregator(deadline=deadline)
+    shared = make_item("000001 重大公告发布", 5, "FinnHub")
+    agg._get_finnhub_realtime_news = slow_source(DELAY, [shared])
+    agg._get_alpha_vantage_news = slow_source(DELAY, [make_item("000001 earnings beat", 10, "AV")])
+    agg._get_newsapi_news = slow_source(DELAY, [make_item("000001 重大公告发布", 1, "NewsAPI")])
+    agg._get_eastmoney_news = slow_source(DELAY, [make_item("000001 东方财富快讯消息", 2, "东方财富")])
+    agg._get_cls_rss_news = blocked_source(release, [make_item("来不及返回的新闻", 0, "财联社")])
+    return agg
+
+
+def test_sources_run_concurrently_and_deadline_drops_stragglers(monkeypatch):
+    release = threading.Event()
+    agg = make_aggregator(monkeypatch, deadline=1.0, release=release)
+
+    start = time.time()
+    try:
+        news = agg.get_realtime_stock_news("000001", hours_back=6, max_news=10)
+    finally:
+        release.set()
+    elapsed = time.time() - start
+
+    # 4 个 DELAY 源串行需要 0.8 秒，且慢源被截止时间截断
+    assert elapsed < 1.5
+    titles = [n.title for n in news]
+    assert "来不及返回的新闻" not in titles
+    # 合并后统一去重，保留优先级更高的 FinnHub 条目，并按时间倒序
+    assert titles.count("000001 重大公告发布") == 1
+    assert next(n for n in news if n.title == "000001 重大公告发布").source == "FinnHub"
+    assert [n.publish_time for n in news] == sorted((n.publish_time for n in news), reverse=True)
+
+    stats = agg.get_source_stats()
+    assert stats["FinnHub"]["hits"] == 1 and stats["FinnHub"]["last_latency"] >= DELAY * 0.9
+    assert stats["财联社RSS"]["timeouts"] == 1 and stats["财联社RSS"]["hits"] == 0
+
+
+def test_failing_source_is_counted_as_error(monkeypatch):
+    release = threading.Event()
+    release.set()
+    agg = make_aggregator(monkeypatch, deadline=1.0, release=release)
+
+    def boom(ticker, hours_back):
+        raise RuntimeError("down")
+
+    agg._get_alpha_vantage_news = boom
+    news = agg.get_realtime_stock_news("000001", max_news=10)
+    assert news
+    assert agg.get_source_stats()["Alpha Vantage"]["errors"] == 1
+
+
+def test_shared_session_is_reused():
+    assert realtime_news.get_news_http_session() is realtime_news.get_news_http_session()
+    assert RealtimeNewsAggregator().session is realtime_news.get_news_http_session()
+
+
+def test_hung_sources_do_not_starve_later_aggregations(monkeypatch):
+    release = threading.Event()
+    agg = make_aggregator(monkeypatch, deadline=0.1, release=release)
+    for name in ("_get_finnhub_realtime_news", "_get_alpha_vantage_news",
+                 "_get_newsapi_news", "_get_eastmoney_news"):
+        setattr(agg, name, slow_source(0, [make_item(f"000001 {name} 快讯", 1, name)]))
+    try:
+        # 挂起的线程数超过单个线程池的上限后，新一次聚合仍能拿到所有快速源
+        for _ in range(realtime_news.NEWS_MAX_WORKERS + 1):
+            agg.get_realtime_stock_news("000001", max_news=10)
+        assert len(agg.get_realtime_stock_news("000001", max_news=10)) == 4
+    finally:
+        release.set()
+
+
+def test_akshare_news_call_is_bounded_by_timeout():
+    release = threading.Event()
+
+    class HungProvider:
+        def get_stock_news_sync(self, symbol, limit):
+            release.wait(timeout=5)
+
+    start = time.time()
+    try:
+        assert realtime_news._get_akshare_news(HungProvider(), "000001", timeout=0.1) is None
+    finally:
+        release.set()
+    assert time.time() - start < 1.0
@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows.technical import stockstats as stockstats_module
+from tradingagents.dataflows.technical.stockstats import StockstatsUtils
+
+SYMBOL = "TEST"
+
+
+def write_csv(data_dir, days=400, offset=0.0):
+    dates = pd.bdate_range("2023-01-02", periods=days)
+    close = 100 + np.sin(np.arange(days) / 7.0) * 5 + offset
+    df = pd.DataFrame({"Date": dates.strftime("%Y-%m-%d"), "Open": close, "High": close + 1,
+                       "Low": close - 1, "Close": close, "Volume": 1000})
+    path = os.path.join(data_dir, f"{SYMBOL}-YFin-data-2015-01-01-2025-03-25.csv")
+    df.to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    stockstats_module.clear_indicator_cache()
+    write_csv(str(tmp_path))
+    return str(tmp_path)
+
+
+def test_window_matches_per_day_lookup_and_parses_once(data_dir, monkeypatch):
+    expected = {}
+    for day in pd.date_range("2024-03-01", "2024-03-31"):
+        expected[day.strftime("%Y-%m-%d")] = StockstatsUtils.get_stock_stats(SYMBOL, "rsi", day.strftime("%Y-%m-%d"), data_dir)
+
+    stockstats_module.clear_indicator_cache()
+    reads = []
+    real_read_csv = pd.read_csv
+    monkeypatch.setattr(stockstats_module.pd, "read_csv", lambda *a, **k: reads.append(a) or real_read_csv(*a, **k))
+
+    window = StockstatsUtils.get_stock_stats_window(SYMBOL, "rsi", "2024-03-31", 30, data_dir)
+    StockstatsUtils.get_stock_stats_window(SYMBOL, "rsi", "2024-03-20", 10, data_dir)
+    StockstatsUtils.get_stock_stats_window(SYMBOL, "macd", "2024-03-31", 30, data_dir)
+
+    assert len(reads) == 1
+    dates = [d for d, _ in window]
+    assert dates == sorted(dates, reverse=True) and dates[0] == "2024-03-29" and dates[-1] == "2024-03-01"
+    for date, value in window:
+        assert value == pytest.approx(expected[date])
+    # 非交易日不出现在窗口中
+    assert all(isinstance(expected[d], str) for d in expected if d not in dates)
+
+
+def test_cache_invalidates_when_csv_changes(data_dir):
+    before = dict(StockstatsUtils.get_stock_stats_window(SYMBOL, "close_10_ema", "2024-03-29", 5, data_dir))
+    path = write_csv(data_dir, offset=10.0)
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))
+    after = dict(StockstatsUtils.get_stock_stats_window(SYMBOL, "close_10_ema", "2024-03-29", 5, data_dir))
+    assert after["2024-03-29"] == pytest.approx(before["2024-03-29"] + 10.0)
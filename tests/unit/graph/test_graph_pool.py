@@ -0,0 +1,77 @@
+import threading
+import time
+
+from tradingagents.graph.graph_pool import TradingGraphPool, config_fingerprint
+
+BUILD_DELAY = 0.05
+
+
+class FakeGraph:
+    builds = 0
+
+    def __init__(self, selected_analysts, debug, config):
+        time.sleep(BUILD_DELAY)
+        FakeGraph.builds += 1
+        self.config = config
+        self.selected_analysts = selected_analysts
+        self.curr_state = None
+
+    def reset_run_state(self):
+        self.curr_state = None
+
+
+def make_config(**overrides):
+    config = {"llm_provider": "dashscope", "quick_think_llm": "qwen-turbo", "deep_think_llm": "qwen-plus",
+              "max_debate_rounds": 1, "selected_analysts": ["market", "fundamentals"]}
+    config.update(overrides)
+    return config
+
+
+def test_fingerprint_tracks_models_analysts_and_depth():
+    base = config_fingerprint(make_config(), ["market"])
+    assert base == config_fingerprint(make_config(), ["market"])
+    assert base != config_fingerprint(make_config(deep_think_llm="qwen-max"), ["market"])
+    assert base != config_fingerprint(make_config(max_debate_rounds=2), ["market"])
+    assert base != config_fingerprint(make_config(), ["market", "news"])
+
+
+def test_pool_reuses_instances_and_reports_saved_time():
+    FakeGraph.builds = 0
+    pool = TradingGraphPool(factory=FakeGraph)
+
+    with pool.lease(make_config()) as first:
+        first.graph.curr_state = {"ticker": "000001"}
+        assert not first.pool_hit and first.construction_time >= BUILD_DELAY
+
+    with pool.lease(make_config()) as second:
+        assert second.graph is first.graph
+        assert second.graph.curr_state is None  # 运行状态归还时已清空
+        metrics = second.metrics()
+        assert metrics["pool_hit"] and metrics["saved_time"] > 0
+
+    with pool.lease(make_config(quick_think_llm="qwen-max")) as other:
+        assert other.graph is not first.graph
+
+    assert FakeGraph.builds == 2
+    assert pool.stats()["hits"] == 1 and pool.stats()["misses"] == 2
+
+
+def test_concurrent_leases_get_distinct_instances():
+    pool = TradingGraphPool(factory=FakeGraph)
+    barrier = threading.Barrier(3)
+    graphs = []
+
+    def worker():
+        with pool.lease(make_config()) as lease:
+            graphs.append(lease.graph)
+            barrier.wait(timeout=5)
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(g) for g in graphs}) == 3
+    # 每个指纹最多保留 max_idle_per_key 个空闲实例
+    assert pool.stats()["idle"] == pool.max_idle_per_key
@@ -0,0 +1,116 @@
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+
+from tradingagents.graph import setup as graph_setup
+from tradingagents.graph.conditional_logic import ConditionalLogic
+from tradingagents.graph.propagation import Propagator
+from tradingagents.graph.trading_graph import TradingAgentsGraph
+
+DELAY = 0.3
+REPORT_KEYS = {
+    "market": "market_report",
+    "social": "sentiment_report",
+    "news": "news_report",
+    "fundamentals": "fundamentals_report",
+}
+
+
+def fake_analyst(analyst_type, seen):
+    report_key = REPORT_KEYS[analyst_type]
+    count_key = graph_setup.ANALYST_OUTPUT_KEYS[analyst_type][1]
+
+    def node(state):
+        seen.setdefault(analyst_type, []).append([m.content for m in state["messages"]])
+        time.sleep(DELAY)
+        # market 分析师先调用一次工具
+        if analyst_type == "market" and not state.get(count_key):
+            msg = AIMessage(content="market:call", tool_calls=[{"name": "t", "args": {}, "id": "c1"}])
+            return {"messages": [msg], count_key: 1, "sender": analyst_type}
+        return {"messages": [AIMessage(content=f"{analyst_type}:done")], report_key: f"{analyst_type} " * 40,
+                count_key: state.get(count_key, 0) + 1, "sender": analyst_type}
+
+    return node
+
+
+@pytest.fixture
+def patched_agents(monkeypatch):
+    seen = {}
+    monkeypatch.setattr(graph_setup, "create_market_analyst", lambda llm, tk: fake_analyst("market", seen), raising=False)
+    monkeypatch.setattr(graph_setup, "create_social_media_analyst", lambda llm, tk: fake_analyst("social", seen), raising=False)
+    monkeypatch.setattr(graph_setup, "create_news_analyst", lambda llm, tk: fake_analyst("news", seen), raising=False)
+    monkeypatch.setattr(graph_setup, "create_fundamentals_analyst", lambda llm, tk: fake_analyst("fundamentals", seen), raising=False)
+
+    def researcher(name):
+        return lambda *a: (lambda state: {"investment_debate_state": {
+            "count": 99, "current_response": name, "history": "", "bull_history": "", "bear_history": "",
+            "judge_decision": ""}})
+
+    def risk(name):
+        return lambda *a: (lambda state: {"risk_debate_state": {
+            "count": 99, "latest_speaker": name, "history": "", "risky_history": "", "safe_history": "",
+            "neutral_history": "", "current_risky_response": "", "current_safe_response": "",
+            "current_neutral_response": "", "judge_decision": ""}})
+
+    monkeypatch.setattr(graph_setup, "create_bull_researcher", researcher("Bull"), raising=False)
+    monkeypatch.setattr(graph_setup, "create_bear_researcher", researcher("Bear"), raising=False)
+    monkeypatch.setattr(graph_setup, "create_research_manager", lambda *a: (lambda s: {"investment_plan": "plan"}), raising=False)
+    monkeypatch.setattr(graph_setup, "create_trader", lambda *a: (lambda s: {"trader_investment_plan": "buy"}), raising=False)
+    monkeypatch.setattr(graph_setup, "create_risky_debator", risk("Risky"), raising=False)
+    monkeypatch.setattr(graph_setup, "create_safe_debator", risk("Safe"), raising=False)
+    monkeypatch.setattr(graph_setup, "create_neutral_debator", risk("Neutral"), raising=False)
+    monkeypatch.setattr(graph_setup, "create_risk_manager", lambda *a: (lambda s: {"final_trade_decision": "BUY"}), raising=False)
+    return seen
+
+
+def build_graph(parallel):
+    tool_node = lambda state: {"messages": [ToolMessage(content="tool result", tool_call_id="c1")]}
+    setup = graph_setup.GraphSetup(
+        None, None, None, {k: tool_node for k in REPORT_KEYS}, None, None, None, None, None,
+        ConditionalLogic(), config={},
+    )
+    return setup.setup_graph(list(REPORT_KEYS), parallel_analysts=parallel)
+
+
+def run(graph):
+    state = Propagator().create_initial_state("000001", "2024-06-03")
+    chunks = list(graph.stream(state, stream_mode="updates", config={"recursion_limit": 100}))
+    final = dict(state)
+    timings = {}
+    for chunk in chunks:
+        TradingAgentsGraph._collect_analyst_timings(chunk, timings)
+        for update in chunk.values():
+            final.update(update or {})
+    return chunks, final, timings
+
+
+def test_parallel_analysts_run_concurrently_with_isolated_messages(patched_agents):
+    start = time.time()
+    chunks, final, timings = run(build_graph(parallel=True))
+    elapsed = time.time() - start
+
+    # 4 个分析师（market 两次 LLM 调用）串行至少 5*DELAY
+    assert elapsed < 4 * DELAY
+    for analyst_type, key in REPORT_KEYS.items():
+        assert final[key].startswith(analyst_type)
+    assert final["final_trade_decision"] == "BUY"
+
+    # 每个分析师只看到自己的消息
+    for analyst_type, calls in patched_agents.items():
+        for contents in calls:
+            assert all(":" not in c or c.startswith(analyst_type) for c in contents)
+
+    # 分析师节点各自上报耗时，Bull Researcher 在全部分析师完成后只执行一次
+    assert timings["Market Analyst"] >= 2 * DELAY * 0.9
+    assert "tools_market" in timings and "Msg Clear News" in timings
+    assert sum("Bull Researcher" in c for c in chunks) == 1
+
+
+def test_sequential_mode_is_unchanged(patched_agents):
+    chunks, final, timings = run(build_graph(parallel=False))
+    order = [name for c in chunks for name in c]
+    assert order[:4] == ["Market Analyst", "tools_market", "Market Analyst", "Msg Clear Market"]
+    assert order.index("Msg Clear Fundamentals") < order.index("Bull Researcher")
+    assert timings == {}
+    assert final["final_trade_decision"] == "BUY"
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from tradingagents.tools.analysis.indicators import IndicatorSpec, compute_many, kdj
+from tradingagents.tools.analysis.panel_indicators import compute_many_arrays, compute_many_panel
+
+
+SPECS = [
+    IndicatorSpec('ma', {'n': 5}),
+    IndicatorSpec('ma', {'n': 20}),
+    IndicatorSpec('ema', {'n': 12}),
+    IndicatorSpec('ema', {'n': 26}),
+    IndicatorSpec('macd'),
+    IndicatorSpec('rsi', {'n': 14}),
+    IndicatorSpec('boll', {'n': 20, 'k': 2}),
+    IndicatorSpec('atr', {'n': 14}),
+    IndicatorSpec('kdj', {'n': 9, 'm1': 3, 'm2': 3}),
+]
+INDICATOR_COLS = ['ma5', 'ma20', 'ema12', 'ema26', 'dif', 'dea', 'macd_hist', 'rsi14',
+                  'boll_mid', 'boll_upper', 'boll_lower', 'atr14', 'kdj_k', 'kdj_d', 'kdj_j']
+
+
+def make_symbol_df(code, n, seed):
+    rng = np.random.default_rng(seed)
+    close = np.cumsum(rng.normal(0, 1, n)) + 100
+    return pd.DataFrame({
+        'code': code,
+        'trade_date': pd.date_range('2024-01-01', periods=n).strftime('%Y-%m-%d'),
+        'high': close + rng.uniform(0, 2, n),
+        'low': close - rng.uniform(0, 2, n),
+        'close': close,
+    })
+
+
+def test_panel_matches_compute_many_with_ragged_lengths():
+    frames = [make_symbol_df('000001', 80, 1), make_symbol_df('600519', 30, 2), make_symbol_df('300750', 5, 3)]
+    # 打乱顺序：引擎内部按 (code, trade_date) 排序
+    long_df = pd.concat(frames, ignore_index=True).sample(frac=1.0, random_state=0)
+    out = compute_many_panel(long_df, SPECS)
+
+    assert len(out) == len(long_df)
+    for frame in frames:
+        expected = compute_many(frame, SPECS)
+        got = out[out['code'] == frame['code'].iloc[0]]
+        for col in INDICATOR_COLS:
+            np.testing.assert_array_equal(got[col].to_numpy(), expected[col].to_numpy(), err_msg=col)
+
+
+def test_arrays_input_matches_compute_many():
+    frames = [make_symbol_df(str(i), 60, i) for i in range(4)]
+    out = compute_many_arrays(
+        SPECS,
+        close=np.stack([f['close'].to_numpy() for f in frames]),
+        high=np.stack([f['high'].to_numpy() for f in frames]),
+        low=np.stack([f['low'].to_numpy() for f in frames]),
+    )
+    for i, frame in enumerate(frames):
+        expected = compute_many(frame, SPECS)
+        for col in INDICATOR_COLS:
+            np.testing.assert_array_equal(out[col][i], expected[col].to_numpy(), err_msg=col)
+
+
+def test_kdj_matches_classic_recursion():
+    df = make_symbol_df('000001', 40, 7)
+    df.loc[15:17, ['high', 'low', 'close']] = 10.0  # 高低价相等 -> RSV 为 NaN
+    out = kdj(df['high'], df['low'], df['close'])
+
+    rsv = ((df['close'] - df['low'].rolling(9).min())
+           / (df['high'].rolling(9).max() - df['low'].rolling(9).min()) * 100).replace([np.inf, -np.inf], np.nan)
+    alpha = 1 / 3.0
+    last_k = last_d = 50.0
+    for i, rv in enumerate(rsv):
+        if np.isnan(rv):
+            assert np.isnan(out['kdj_k'].iloc[i])
+            continue
+        last_k = (1 - alpha) * last_k + alpha * rv
+        last_d = (1 - alpha) * last_d + alpha * last_k
+        assert out['kdj_k'].iloc[i] == last_k
+        assert out['kdj_d'].iloc[i] == last_d
@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.tools.analysis.indicators import compute_many
+from tradingagents.tools.analysis.streaming_indicators import DEFAULT_STREAMING_SPECS, StreamingIndicators
+
+
+def make_df(n=120, seed=3):
+    rng = np.random.default_rng(seed)
+    close = np.cumsum(rng.normal(0, 1, n)) + 100
+    return pd.DataFrame({
+        'trade_date': pd.date_range('2024-01-01', periods=n).strftime('%Y-%m-%d'),
+        'high': close + rng.uniform(0, 2, n),
+        'low': close - rng.uniform(0, 2, n),
+        'close': close,
+    })
+
+
+def assert_matches(values, expected_row):
+    for col, v in values.items():
+        exp = expected_row[col]
+        if pd.isna(exp):
+            assert v is None, col
+        else:
+            assert abs(v - exp) < 1e-9, col
+
+
+def test_streaming_matches_batch_for_every_bar():
+    df = make_df()
+    expected = compute_many(df, DEFAULT_STREAMING_SPECS)
+    state = StreamingIndicators()
+    for i, rec in enumerate(df.to_dict('records')):
+        assert_matches(state.update(rec), expected.iloc[i])
+
+
+def test_intraday_revision_replaces_last_bar():
+    df = make_df()
+    expected = compute_many(df, DEFAULT_STREAMING_SPECS)
+    state = StreamingIndicators.from_history(df.iloc[:-1])
+    last = df.iloc[-1].to_dict()
+    state.update({**last, 'close': last['close'] * 1.05, 'high': last['high'] * 1.05})
+    values = state.update(last)
+    assert state.bars == len(df)
+    assert_matches(values, expected.iloc[-1])
+
+
+def test_serialization_round_trip():
+    df = make_df()
+    state = StreamingIndicators.from_history(df.iloc[:100])
+    restored = StreamingIndicators.from_dict(json.loads(json.dumps(state.to_dict())))
+    for rec in df.iloc[100:].to_dict('records'):
+        assert restored.update(rec) == state.update(rec)
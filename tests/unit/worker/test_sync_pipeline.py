@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+
+from app.worker.sync_pipeline import SyncPipeline
+
+
+class _CountingLimiter:
+    def __init__(self):
+        self.calls = 0
+
+    async def acquire(self):
+        self.calls += 1
+
+
+def test_pipeline_overlaps_fetch_and_save_and_reports_outcomes():
+    saved = []
+
+    async def fetch(item):
+        await asyncio.sleep(0.02)
+        if item == "empty":
+            return pd.DataFrame()
+        if item == "bad":
+            raise RuntimeError("boom")
+        return [item]
+
+    async def save(item, data):
+        await asyncio.sleep(0.02)
+        if item == "unsavable":
+            raise RuntimeError("write failed")
+        saved.append(item)
+        return 2
+
+    items = [f"{i:06d}" for i in range(20)] + ["empty", "bad", "unsavable"]
+    limiter = _CountingLimiter()
+    reports = []
+
+    async def progress(percent, message):
+        reports.append((percent, message))
+
+    start = time.perf_counter()
+    result = asyncio.run(SyncPipeline(
+        "test", fetch, save, rate_limiter=limiter, fetch_workers=4, save_workers=2,
+        queue_size=2, progress=progress, progress_interval=0.05,
+    ).run(items))
+    elapsed = time.perf_counter() - start
+
+    assert limiter.calls == len(items)
+    assert result.saved == 20 and result.records == 40 and result.empty == 1
+    assert sorted(e["code"] for e in result.errors) == ["bad", "unsavable"]
+    assert {e["context"] for e in result.errors} == {"test.fetch", "test.save"}
+    assert result.stages["fetch"]["processed"] == 22
+    assert result.stages["save"]["peak_queue"] <= 2
+    assert reports[-1][0] == 100 and "队列" in reports[-1][1]
+    # 串行需要 23 * 0.02 + 21 * 0.02 ≈ 0.9 秒
+    assert elapsed < 0.6
+
+
+def test_pipeline_stops_on_signal_and_propagates_progress_errors():
+    async def fetch(item):
+        await asyncio.sleep(0.01)
+        return [item]
+
+    async def save(item, data):
+        return 1
+
+    stop_requested = False
+
+    async def should_stop():
+        return stop_requested
+
+    async def run_with_stop():
+        nonlocal stop_requested
+        pipeline = SyncPipeline("stop", fetch, save, fetch_workers=1, save_workers=1,
+                                queue_size=1, progress_interval=0.03, should_stop=should_stop)
+        task = asyncio.create_task(pipeline.run(range(1000)))
+        await asyncio.sleep(0.05)
+        stop_requested = True
+        return await task
+
+    result = asyncio.run(run_with_stop())
+    assert result.stopped
+    assert result.done < 1000
+
+    class Cancelled(Exception):
+        pass
+
+    async def progress(percent, message):
+        raise Cancelled()
+
+    with pytest.raises(Cancelled):
+        asyncio.run(SyncPipeline("cancel", fetch, save, progress=progress, progress_interval=0.02).run(range(1000)))
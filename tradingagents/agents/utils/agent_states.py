@@ -11,6 +11,11 @@ from tradingagents.utils.logging_init import get_logger
 logger = get_logger("default")
 
 
+def merge_timings(left: dict, right: dict) -> dict:
+    """Merge per-node timings reported by concurrently running analysts."""
+    return {**(left or {}), **(right or {})}
+
+
 # Researcher team state
 class InvestDebateState(TypedDict):
     bull_history: Annotated[
@@ -71,6 +76,9 @@ class AgentState(MessagesState):
     sentiment_tool_call_count: Annotated[int, "Social media analyst tool call counter"]
     fundamentals_tool_call_count: Annotated[int, "Fundamentals analyst tool call counter"]
 
+    # 并行分析师模式: 各分析师子图内部节点耗时
+    analyst_timings: Annotated[dict, merge_timings]
+
     # researcher team discussion step
     investment_debate_state: Annotated[
         InvestDebateState, "Current state of the debate on if to invest or not"
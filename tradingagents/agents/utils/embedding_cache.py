@@ -0,0 +1,201 @@
+"""
+进程级向量嵌入缓存
+
+同一次分析中，多个智能体会用相同的 curr_situation 文本调用
+FinancialSituationMemory.get_memories，每次都会请求一次嵌入API。
+这里按 (提供商, 模型, sha256(文本)) 做内容寻址缓存，所有记忆实例共享：
+- 内存LRU
+- 可选Redis二级缓存（EMBEDDING_CACHE_REDIS_ENABLED=true）
+- 相同文本的并发请求合并为一次API调用
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from tradingagents.utils.logging_init import get_logger
+logger = get_logger("agents.utils.embedding_cache")
+
+
+def embedding_cache_key(provider: str, model: str, text: str) -> str:
+    """内容寻址的缓存键"""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{provider}:{model}:{digest}"
+
+
+def _is_degraded(embedding: List[float]) -> bool:
+    """记忆功能降级时返回的零向量不应写入缓存"""
+    return not embedding or all(x == 0.0 for x in embedding)
+
+
+class EmbeddingCache:
+    """内容寻址的嵌入缓存，支持并发请求合并"""
+
+    REDIS_PREFIX = "embedding:"
+
+    def __init__(self, max_entries: int = 1024, redis_client=None, redis_ttl: int = 7 * 24 * 3600):
+        """
+        Args:
+            max_entries: 内存LRU容量
+            redis_client: 可选的Redis客户端，作为二级缓存
+            redis_ttl: Redis中缓存的过期时间（秒）
+        """
+        self.max_entries = max_entries
+        self.redis_client = redis_client
+        self.redis_ttl = redis_ttl
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "redis_hits": 0, "misses": 0, "inflight_waits": 0, "errors": 0}
+
+    def get_or_compute(self, provider: str, model: str, text: str,
+                       compute: Callable[[], List[float]]) -> List[float]:
+        """从缓存获取嵌入向量，未命中时调用compute，并发的相同请求只计算一次"""
+        key = embedding_cache_key(provider, model, text)
+
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return embedding
+
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self._stats["inflight_waits"] += 1
+
+        if not leader:
+            logger.debug(f"⏳ [嵌入缓存] 等待进行中的相同请求: {key[:48]}")
+            return future.result()
+
+        try:
+            embedding = self._redis_get(key)
+            if embedding is not None:
+                with self._lock:
+                    self._stats["redis_hits"] += 1
+            else:
+                with self._lock:
+                    self._stats["misses"] += 1
+                embedding = compute()
+                if not _is_degraded(embedding):
+                    self._redis_set(key, embedding)
+
+            if not _is_degraded(embedding):
+                with self._lock:
+                    self._store(key, embedding)
+            future.set_result(embedding)
+            return embedding
+        except BaseException as e:
+            with self._lock:
+                self._stats["errors"] += 1
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def get(self, provider: str, model: str, text: str) -> Optional[List[float]]:
+        """只查缓存（内存LRU、Redis），不触发计算"""
+        key = embedding_cache_key(provider, model, text)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return embedding
+        embedding = self._redis_get(key)
+        if embedding is not None:
+            with self._lock:
+                self._stats["redis_hits"] += 1
+                self._store(key, embedding)
+        return embedding
+
+    def put(self, provider: str, model: str, text: str, embedding: List[float]) -> None:
+        """写入批量计算得到的嵌入向量"""
+        if _is_degraded(embedding):
+            return
+        key = embedding_cache_key(provider, model, text)
+        with self._lock:
+            self._stats["misses"] += 1
+            self._store(key, embedding)
+        self._redis_set(key, embedding)
+
+    def _store(self, key: str, embedding: List[float]) -> None:
+        # 调用方需持有 self._lock
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _redis_get(self, key: str) -> Optional[List[float]]:
+        if self.redis_client is None:
+            return None
+        try:
+            raw = self.redis_client.get(self.REDIS_PREFIX + key)
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.warning(f"⚠️ [嵌入缓存] Redis读取失败: {e}")
+            return None
+
+    def _redis_set(self, key: str, embedding: List[float]) -> None:
+        if self.redis_client is None:
+            return
+        try:
+            self.redis_client.setex(self.REDIS_PREFIX + key, self.redis_ttl, json.dumps(embedding))
+        except Exception as e:
+            logger.warning(f"⚠️ [嵌入缓存] Redis写入失败: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["redis_hits"] + self._stats["misses"] + self._stats["inflight_waits"]
+            saved = lookups - self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "hit_rate": round(saved / lookups, 3) if lookups else 0.0,
+                "redis_enabled": self.redis_client is not None,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def _default_redis_client():
+    if os.getenv("EMBEDDING_CACHE_REDIS_ENABLED", "false").lower() != "true":
+        return None
+    try:
+        from tradingagents.config.database_manager import get_redis_client
+        client = get_redis_client()
+        if client is None:
+            logger.warning("⚠️ [嵌入缓存] Redis不可用，仅使用内存缓存")
+        return client
+    except Exception as e:
+        logger.warning(f"⚠️ [嵌入缓存] 获取Redis客户端失败: {e}")
+        return None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """获取进程级嵌入缓存"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache(
+                    max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", "1024")),
+                    redis_client=_default_redis_client(),
+                    redis_ttl=int(os.getenv("EMBEDDING_CACHE_TTL", str(7 * 24 * 3600))),
+                )
+    return _cache
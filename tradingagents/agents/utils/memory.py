@@ -6,8 +6,11 @@ from dashscope import TextEmbedding
 import os
 import threading
 import hashlib
-from typing import Dict, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 
+from .embedding_cache import get_embedding_cache
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
 logger = get_logger("agents.utils.memory")
@@ -96,7 +99,35 @@ class ChromaDBManager:
             return collection
 
 
+class _BatchRateBudget:
+    """限制嵌入批请求的发起速率（每秒最多 max_per_second 个批次）"""
+
+    def __init__(self, max_per_second: float):
+        self.interval = 1.0 / max_per_second if max_per_second and max_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def situation_id(situation: str, recommendation: str) -> str:
+    """按内容生成记忆ID，重复导入同一条记忆时幂等"""
+    return hashlib.sha256(f"{situation}\x00{recommendation}".encode("utf-8")).hexdigest()
+
+
 class FinancialSituationMemory:
+    # 单次请求可提交的文本数（DashScope text-embedding-v3 上限为10）
+    DASHSCOPE_BATCH_SIZE = 10
+    OPENAI_BATCH_SIZE = 256
+
     def __init__(self, name, config):
         self.config = config
         self.llm_provider = config.get("llm_provider", "openai").lower()
@@ -394,7 +425,46 @@ class FinancialSituationMemory:
         logger.warning(f"⚠️ 强制截断：保留首尾关键信息，{len(text)}字符截断为{len(truncated)}字符")
         return truncated, True
 
+    def _uses_dashscope(self):
+        """当前是否走阿里百炼嵌入接口"""
+        return (self.llm_provider == "dashscope" or
+                self.llm_provider == "alibaba" or
+                self.llm_provider == "qianfan" or
+                (self.llm_provider == "google" and self.client is None) or
+                (self.llm_provider == "deepseek" and self.client is None) or
+                (self.llm_provider == "openrouter" and self.client is None) or
+                (self.llm_provider == "mimo" and self.client is None))
+
+    def _embedding_backend(self):
+        """嵌入缓存键中的提供商部分：相同后端+模型的实例共享缓存"""
+        if self._uses_dashscope():
+            return "dashscope"
+        return str(getattr(self.client, "base_url", self.llm_provider))
+
     def get_embedding(self, text):
+        """Get embedding for a text, served from the process-wide embedding cache"""
+        if (self.client == "DISABLED" or not text or not isinstance(text, str) or
+                (self.enable_embedding_length_check and len(text) > self.max_embedding_length)):
+            return self._compute_embedding(text)
+        # 缓存命中时不会调用 _compute_embedding，在此记录本次文本信息
+        self._record_text_info(len(text))
+        return get_embedding_cache().get_or_compute(
+            self._embedding_backend(), self.embedding, text,
+            lambda: self._compute_embedding(text),
+        )
+
+    def _record_text_info(self, text_length):
+        """记录最近一次向量化的文本信息（供 get_last_text_info 与截断检查使用）"""
+        self._last_text_info = {
+            'original_length': text_length,
+            'processed_length': text_length,  # 不截断，保持原长度
+            'was_truncated': False,  # 永不截断
+            'was_skipped': False,
+            'provider': self.llm_provider,
+            'strategy': 'no_truncation_with_fallback'  # 标记策略
+        }
+
+    def _compute_embedding(self, text):
         """Get embedding for a text using the configured provider"""
 
         # 检查记忆功能是否被禁用
@@ -433,22 +503,9 @@ class FinancialSituationMemory:
             logger.info(f"📝 处理长文本: {text_length}字符，提供商: {self.llm_provider}")
         
         # 存储文本处理信息
-        self._last_text_info = {
-            'original_length': text_length,
-            'processed_length': text_length,  # 不截断，保持原长度
-            'was_truncated': False,  # 永不截断
-            'was_skipped': False,
-            'provider': self.llm_provider,
-            'strategy': 'no_truncation_with_fallback'  # 标记策略
-        }
+        self._record_text_info(text_length)
 
-        if (self.llm_provider == "dashscope" or
-            self.llm_provider == "alibaba" or
-            self.llm_provider == "qianfan" or
-            (self.llm_provider == "google" and self.client is None) or
-            (self.llm_provider == "deepseek" and self.client is None) or
-            (self.llm_provider == "openrouter" and self.client is None) or 
-            (self.llm_provider == "mimo" and self.client is None)):
+        if self._uses_dashscope():
             # 使用阿里百炼的嵌入模型
             try:
                 # 导入DashScope模块
@@ -605,26 +662,120 @@ class FinancialSituationMemory:
 
     def add_situations(self, situations_and_advice):
         """Add financial situations and their corresponding advice. Parameter is a list of tuples (situation, rec)"""
+        self.add_situations_bulk(situations_and_advice)
+
+    def add_situations_bulk(self, situations_and_advice, batch_size=None, max_concurrency=None,
+                            max_batches_per_second=None, write_chunk_size=500):
+        """
+        批量导入记忆（用于回填历史分析的反思结果）
+
+        嵌入按提供商允许的批大小成批请求，批次在速率预算内并发执行；
+        写入ChromaDB时分块upsert，ID由内容哈希生成，重复导入不会产生重复记录。
+
+        Args:
+            situations_and_advice: [(situation, recommendation), ...]
+            batch_size: 单次嵌入请求的文本数，默认按提供商上限
+            max_concurrency: 并发嵌入请求数，默认 EMBEDDING_BATCH_CONCURRENCY 或 4
+            max_batches_per_second: 每秒最多发起的批次数，默认 EMBEDDING_BATCHES_PER_SECOND 或不限
+            write_chunk_size: 每次写入ChromaDB的记录数
+
+        Returns:
+            int: 写入（或更新）的记录数
+        """
+        # 同一批内按内容去重，Chroma不允许单次写入重复ID
+        records = {}
+        for situation, recommendation in situations_and_advice:
+            records.setdefault(situation_id(situation, recommendation), (situation, recommendation))
+        if not records:
+            return 0
+
+        ids = list(records)
+        situations = [records[i][0] for i in ids]
+        embeddings = self.get_embeddings(situations, batch_size, max_concurrency, max_batches_per_second)
+
+        for start in range(0, len(ids), write_chunk_size):
+            end = start + write_chunk_size
+            self.situation_collection.upsert(
+                documents=situations[start:end],
+                metadatas=[{"recommendation": records[i][1]} for i in ids[start:end]],
+                embeddings=embeddings[start:end],
+                ids=ids[start:end],
+            )
 
-        situations = []
-        advice = []
-        ids = []
-        embeddings = []
-
-        offset = self.situation_collection.count()
+        logger.info(f"📚 [记忆导入] 写入 {len(ids)} 条记忆（输入 {len(situations_and_advice)} 条）")
+        return len(ids)
 
-        for i, (situation, recommendation) in enumerate(situations_and_advice):
-            situations.append(situation)
-            advice.append(recommendation)
-            ids.append(str(offset + i))
-            embeddings.append(self.get_embedding(situation))
+    def get_embeddings(self, texts, batch_size=None, max_concurrency=None, max_batches_per_second=None):
+        """批量获取嵌入向量，结果顺序与texts一致；已缓存的文本不再请求"""
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        if self.client == "DISABLED":
+            return [self._compute_embedding(text) for text in texts]
+
+        cache = get_embedding_cache()
+        backend = self._embedding_backend()
+        pending: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if (not text or not isinstance(text, str) or
+                    (self.enable_embedding_length_check and len(text) > self.max_embedding_length)):
+                results[i] = self._compute_embedding(text)
+                continue
+            cached = cache.get(backend, self.embedding, text)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(text, []).append(i)
+
+        unique_texts = list(pending)
+        if unique_texts:
+            if batch_size is None:
+                batch_size = int(os.getenv('EMBEDDING_BATCH_SIZE', '0')) or (
+                    self.DASHSCOPE_BATCH_SIZE if self._uses_dashscope() else self.OPENAI_BATCH_SIZE)
+            if max_concurrency is None:
+                max_concurrency = int(os.getenv('EMBEDDING_BATCH_CONCURRENCY', '4'))
+            if max_batches_per_second is None:
+                max_batches_per_second = float(os.getenv('EMBEDDING_BATCHES_PER_SECOND', '0'))
+            budget = _BatchRateBudget(max_batches_per_second)
+            batches = [unique_texts[i:i + batch_size] for i in range(0, len(unique_texts), batch_size)]
+
+            def run(batch):
+                budget.acquire()
+                return batch, self._embed_batch(batch)
+
+            start_time = time.time()
+            with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(batches)))) as executor:
+                for batch, vectors in executor.map(run, batches):
+                    for text, vector in zip(batch, vectors):
+                        cache.put(backend, self.embedding, text, vector)
+                        for i in pending[text]:
+                            results[i] = vector
+            logger.info(f"📦 [批量嵌入] {len(unique_texts)} 条文本，{len(batches)} 个批次，"
+                        f"耗时 {time.time() - start_time:.2f}秒")
+
+        return results
+
+    def _embed_batch(self, texts):
+        """一次请求获取多条文本的嵌入；批请求失败时逐条降级处理"""
+        try:
+            if self._uses_dashscope():
+                import dashscope
+                from dashscope import TextEmbedding
 
-        self.situation_collection.add(
-            documents=situations,
-            metadatas=[{"recommendation": rec} for rec in advice],
-            embeddings=embeddings,
-            ids=ids,
-        )
+                if not getattr(dashscope, 'api_key', None):
+                    raise RuntimeError("DashScope API密钥未设置")
+                response = TextEmbedding.call(model=self.embedding, input=texts)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{response.code} - {response.message}")
+                items = sorted(response.output['embeddings'], key=lambda x: x['text_index'])
+                vectors = [item['embedding'] for item in items]
+            else:
+                response = self.client.embeddings.create(model=self.embedding, input=texts)
+                vectors = [item.embedding for item in sorted(response.data, key=lambda x: x.index)]
+            if len(vectors) != len(texts):
+                raise RuntimeError(f"返回向量数量不匹配: {len(vectors)}/{len(texts)}")
+            return vectors
+        except Exception as e:
+            logger.warning(f"⚠️ [批量嵌入] 批请求失败，逐条处理 {len(texts)} 条文本: {e}")
+            return [self._compute_embedding(text) for text in texts]
 
     def get_memories(self, current_situation, n_matches=1):
         """Find matching recommendations using embeddings with smart truncation handling"""
@@ -692,7 +843,8 @@ class FinancialSituationMemory:
             'collection_count': self.situation_collection.count(),
             'client_status': 'enabled' if self.client != "DISABLED" else 'disabled',
             'embedding_model': self.embedding,
-            'provider': self.llm_provider
+            'provider': self.llm_provider,
+            'embedding_cache': get_embedding_cache().stats()
         }
         
         # 添加最后一次文本处理信息
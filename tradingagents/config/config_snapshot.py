@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+数据源配置快照（按配置版本失效）
+
+数据获取热路径（数据源优先级、启用状态、API Key）原先每次调用都查询 system_configs，
+一次分析要重复几十次相同的查询。这里在进程内缓存一份不可变的配置快照：
+
+- 快照按激活配置的 version 标识，读取时直接返回内存中的数据（零 I/O）
+- ConfigService 保存配置后失效本进程快照，并通过 Redis 频道广播新版本号，
+  其他进程/worker 的订阅线程收到后将快照标记为过期，下次读取时重新加载
+- Redis 不可用时退化为按间隔（TA_CONFIG_VERSION_CHECK_SECONDS）探测版本号，
+  只读取 version 字段，版本变化才重新加载
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, Mapping, Optional, Tuple
+
+from tradingagents.config.runtime_settings import get_bool, get_float
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+CONFIG_INVALIDATION_CHANNEL = "system:config:invalidate"
+
+
+def _freeze(value: Any) -> Any:
+    """递归转换为只读结构：dict -> MappingProxyType，list -> tuple"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """某一版本激活配置的不可变视图，派生结果按参数缓存在快照内"""
+
+    version: int
+    data_source_configs: Tuple[Mapping[str, Any], ...] = ()
+    loaded_at: float = 0.0
+    _views: Dict[Any, Any] = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def from_document(cls, doc: Optional[Mapping[str, Any]]) -> "ConfigSnapshot":
+        doc = doc or {}
+        configs = doc.get("data_source_configs") or []
+        return cls(
+            version=int(doc.get("version") or 0),
+            data_source_configs=tuple(_freeze(ds) for ds in configs if isinstance(ds, Mapping)),
+            loaded_at=time.time(),
+        )
+
+    def _view(self, key: Any, build: Callable[[], Any]) -> Any:
+        try:
+            return self._views[key]
+        except KeyError:
+            return self._views.setdefault(key, build())
+
+    def enabled_data_sources(self, *market_categories: str) -> Tuple[Mapping[str, Any], ...]:
+        """
+        已启用的数据源配置，按优先级降序（数字越大优先级越高）
+
+        Args:
+            market_categories: 市场分类标识（如 'a_shares'、'港股'、'hk_stocks'），
+                数据源配置了 market_categories 时需至少匹配其一；不传则不按市场过滤
+        """
+        wanted = frozenset(c for c in market_categories if c)
+
+        def build():
+            enabled = []
+            for ds in self.data_source_configs:
+                if not ds.get('enabled', True):
+                    continue
+                categories = ds.get('market_categories') or ()
+                if wanted and categories and not wanted.intersection(categories):
+                    continue
+                enabled.append(ds)
+            enabled.sort(key=lambda ds: ds.get('priority') or 0, reverse=True)
+            return tuple(enabled)
+
+        return self._view(("enabled", wanted), build)
+
+    def enabled_types(self) -> FrozenSet[str]:
+        """已启用数据源的 type（小写）"""
+        return self._view("enabled_types", lambda: frozenset(
+            ds.get('type', '').lower() for ds in self.enabled_data_sources() if ds.get('type')
+        ))
+
+    def credentials(self) -> Mapping[str, Mapping[str, Any]]:
+        """{数据源名称(小写): {api_key, api_secret, config_params}}"""
+        def build():
+            result = {}
+            for ds in self.data_source_configs:
+                result[ds.get('name', '').lower()] = MappingProxyType({
+                    'api_key': ds.get('api_key', ''),
+                    'api_secret': ds.get('api_secret', ''),
+                    'config_params': ds.get('config_params') or MappingProxyType({}),
+                })
+            return MappingProxyType(result)
+
+        return self._view("credentials", build)
+
+
+def _load_active_config() -> Optional[Mapping[str, Any]]:
+    from app.core.database import get_mongo_db_sync
+    db = get_mongo_db_sync()
+    return db.system_configs.find_one({"is_active": True}, sort=[("version", -1)])
+
+
+def _probe_active_version() -> Optional[int]:
+    from app.core.database import get_mongo_db_sync
+    db = get_mongo_db_sync()
+    doc = db.system_configs.find_one({"is_active": True}, {"version": 1}, sort=[("version", -1)])
+    return int(doc.get("version") or 0) if doc else None
+
+
+def _redis_url() -> Optional[str]:
+    try:
+        from app.core.config import settings
+        return settings.REDIS_URL
+    except Exception:
+        return os.getenv("REDIS_URL")
+
+
+def _default_subscriber_factory():
+    """返回 redis PubSub 对象；未安装 redis 或未配置地址时返回 None（仅按间隔探测版本）"""
+    url = _redis_url()
+    if not url:
+        return None
+    try:
+        import redis
+    except ImportError:
+        return None
+    client = redis.Redis.from_url(url, decode_responses=True, socket_keepalive=True, health_check_interval=30)
+    return client.pubsub(ignore_subscribe_messages=True)
+
+
+class ConfigSnapshotStore:
+    """进程内配置快照：读取走内存，写入方通过 invalidate()/Redis 广播失效"""
+
+    def __init__(self,
+                 loader: Optional[Callable[[], Optional[Mapping[str, Any]]]] = None,
+                 version_probe: Optional[Callable[[], Optional[int]]] = None,
+                 subscriber_factory: Optional[Callable[[], Any]] = None,
+                 check_interval: Optional[float] = None,
+                 channel: str = CONFIG_INVALIDATION_CHANNEL):
+        """
+        Args:
+            loader: 读取激活配置文档，默认查询 system_configs
+            version_probe: 只读取激活配置的版本号，推送不可用时按间隔调用
+            subscriber_factory: 创建 PubSub 对象（需支持 subscribe/listen/close），
+                默认按 REDIS_URL 创建；TA_CONFIG_PUSH_ENABLED=false 时不订阅
+            check_interval: 推送不可用或加载失败时的版本探测/重试间隔（秒）
+        """
+        self._loader = loader or _load_active_config
+        self._version_probe = version_probe or _probe_active_version
+        if subscriber_factory is None and get_bool("TA_CONFIG_PUSH_ENABLED", "ta_config_push_enabled", True):
+            subscriber_factory = _default_subscriber_factory
+        self._subscriber_factory = subscriber_factory
+        self.check_interval = check_interval if check_interval is not None else get_float(
+            "TA_CONFIG_VERSION_CHECK_SECONDS", "ta_config_version_check_seconds", 30.0)
+        self.channel = channel
+
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._stale = True
+        self._loaded_ok = False
+        self._next_check = 0.0
+        self._push_active = False
+        self._load_attempts = 0
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+        self._pubsub = None
+        self._stop = threading.Event()
+
+        self.loads = 0
+        self.load_errors = 0
+        self.probes = 0
+        self.invalidations = 0
+        self.push_messages = 0
+
+    def _is_fresh(self) -> bool:
+        if self._snapshot is None or self._stale:
+            return False
+        if self._push_active and self._loaded_ok:
+            return True
+        return time.monotonic() < self._next_check
+
+    def get(self) -> ConfigSnapshot:
+        """获取当前配置快照（快照有效时不产生任何 I/O）"""
+        if self._is_fresh():
+            return self._snapshot
+        return self._refresh()
+
+    def _refresh(self) -> ConfigSnapshot:
+        with self._lock:
+            if self._is_fresh():
+                return self._snapshot
+            self._start_listener()
+
+            current = self._snapshot
+            if current is not None and not self._stale and self._loaded_ok:
+                # 推送不可用：只探测版本号，版本未变则沿用快照
+                try:
+                    self.probes += 1
+                    if self._version_probe() == current.version:
+                        self._next_check = time.monotonic() + self.check_interval
+                        return current
+                except Exception as e:
+                    logger.debug(f"⚠️ [配置快照] 探测配置版本失败: {e}")
+                    self._next_check = time.monotonic() + self.check_interval
+                    return current
+
+            # 加载前清除过期标记：加载期间到达的失效通知会重新标记
+            self._stale = False
+            self._load_attempts += 1
+            try:
+                snapshot = ConfigSnapshot.from_document(self._loader())
+                self.loads += 1
+                self._loaded_ok = True
+                if current is None or current.version != snapshot.version:
+                    logger.info(f"🔄 [配置快照] 已加载配置版本 {snapshot.version}"
+                                f"（{len(snapshot.data_source_configs)} 个数据源）")
+            except Exception as e:
+                self.load_errors += 1
+                self._loaded_ok = False
+                snapshot = current or ConfigSnapshot(version=-1)
+                logger.warning(f"⚠️ [配置快照] 读取配置失败: {e}，"
+                               f"{self.check_interval:.0f}秒内沿用{'上一版本' if current else '默认配置'}")
+            self._snapshot = snapshot
+            self._next_check = time.monotonic() + self.check_interval
+            return snapshot
+
+    def invalidate(self, version: Optional[int] = None) -> bool:
+        """
+        标记快照过期，下次读取时重新加载
+
+        Args:
+            version: 新配置版本号；不大于当前快照版本时忽略（重复或过期的通知）
+        """
+        current = self._snapshot
+        if version is not None and current is not None and self._loaded_ok and current.version >= version:
+            return False
+        self._stale = True
+        self.invalidations += 1
+        return True
+
+    def _start_listener(self) -> None:
+        if self._listener is not None or self._subscriber_factory is None:
+            return
+        self._listener = threading.Thread(target=self._listen, name="config-snapshot-listener", daemon=True)
+        self._listener.start()
+
+    def _listen(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                pubsub = self._subscriber_factory()
+                if pubsub is None:
+                    return
+                self._pubsub = pubsub
+                pubsub.subscribe(self.channel)
+                if self._load_attempts:
+                    # 订阅生效前开始的加载可能错过了之后的变更通知（首次订阅或断线重连）
+                    self._stale = True
+                self._push_active = True
+                backoff = 1.0
+                logger.debug(f"📡 [配置快照] 已订阅配置变更频道: {self.channel}")
+                for message in pubsub.listen():
+                    if self._stop.is_set():
+                        break
+                    if message and message.get("type") == "message":
+                        self._on_message(message.get("data"))
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.warning(f"⚠️ [配置快照] 订阅配置变更失败: {e}，"
+                                   f"{backoff:.0f}秒后重试（期间按间隔探测配置版本）")
+            finally:
+                self._push_active = False
+                self._close_pubsub()
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, 60.0)
+
+    def _on_message(self, data: Any) -> None:
+        self.push_messages += 1
+        try:
+            version = int(data)
+        except (TypeError, ValueError):
+            version = None
+        if self.invalidate(version):
+            logger.info(f"📡 [配置快照] 收到配置变更通知（版本 {data}），快照已失效")
+
+    def _close_pubsub(self) -> None:
+        pubsub, self._pubsub = self._pubsub, None
+        if pubsub is not None:
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+
+    def close(self) -> None:
+        """停止订阅线程"""
+        self._stop.set()
+        self._close_pubsub()
+        if self._listener is not None:
+            self._listener.join(timeout=2)
+
+    def get_stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "stale": self._stale,
+            "push_active": self._push_active,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+            "probes": self.probes,
+            "invalidations": self.invalidations,
+            "push_messages": self.push_messages,
+        }
+
+
+_store: Optional[ConfigSnapshotStore] = None
+_store_lock = threading.Lock()
+
+
+def get_config_snapshot_store() -> ConfigSnapshotStore:
+    """获取全局配置快照存储（进程内共享）"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ConfigSnapshotStore()
+        return _store
+
+
+def get_config_snapshot() -> ConfigSnapshot:
+    """获取当前激活配置的快照"""
+    return get_config_snapshot_store().get()
+
+
+def invalidate_config_snapshot(version: Optional[int] = None) -> bool:
+    """失效本进程的配置快照（跨进程广播由 ConfigService 负责）"""
+    store = _store
+    if store is None:
+        return False
+    return store.invalidate(version)
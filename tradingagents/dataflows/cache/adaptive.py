@@ -15,6 +15,7 @@ from typing import Any, Dict, Optional, Union
 import pandas as pd
 
 from tradingagents.config.database_manager import get_database_manager
+from .serialization import decode_frame, decode_legacy, encode_frame, is_frame
 
 class AdaptiveCacheSystem:
     """自适应缓存系统"""
@@ -69,12 +70,26 @@ class AdaptiveCacheSystem:
         expiry_time = cache_time + timedelta(seconds=ttl_seconds)
         return datetime.now() < expiry_time
     
+    @staticmethod
+    def _pack_data(data: Any) -> Dict[str, Any]:
+        """DataFrame 转为二进制列式帧，其余数据原样保存"""
+        if isinstance(data, pd.DataFrame):
+            return {'data': encode_frame(data), 'data_format': 'frame'}
+        return {'data': data, 'data_format': 'raw'}
+
+    @staticmethod
+    def _unpack_data(cache_data: Dict) -> Dict:
+        """还原 _pack_data 保存的数据（旧缓存直接保存对象，无需处理）"""
+        if cache_data.get('data_format') == 'frame' and is_frame(cache_data.get('data')):
+            cache_data['data'] = decode_frame(cache_data['data'])
+        return cache_data
+
     def _save_to_file(self, cache_key: str, data: Any, metadata: Dict) -> bool:
         """保存到文件缓存"""
         try:
             cache_file = self.cache_dir / f"{cache_key}.pkl"
             cache_data = {
-                'data': data,
+                **self._pack_data(data),
                 'metadata': metadata,
                 'timestamp': datetime.now(),
                 'backend': 'file'
@@ -101,7 +116,7 @@ class AdaptiveCacheSystem:
                 cache_data = pickle.load(f)
             
             self.logger.debug(f"文件缓存加载成功: {cache_key}")
-            return cache_data
+            return self._unpack_data(cache_data)
             
         except Exception as e:
             self.logger.error(f"文件缓存加载失败: {e}")
@@ -115,7 +130,7 @@ class AdaptiveCacheSystem:
         
         try:
             cache_data = {
-                'data': data,
+                **self._pack_data(data),
                 'metadata': metadata,
                 'timestamp': datetime.now().isoformat(),
                 'backend': 'redis'
@@ -149,7 +164,7 @@ class AdaptiveCacheSystem:
                 cache_data['timestamp'] = datetime.fromisoformat(cache_data['timestamp'])
             
             self.logger.debug(f"Redis缓存加载成功: {cache_key}")
-            return cache_data
+            return self._unpack_data(cache_data)
             
         except Exception as e:
             self.logger.error(f"Redis缓存加载失败: {e}")
@@ -167,8 +182,8 @@ class AdaptiveCacheSystem:
             
             # 序列化数据
             if isinstance(data, pd.DataFrame):
-                serialized_data = data.to_json()
-                data_type = 'dataframe'
+                serialized_data = encode_frame(data)
+                data_type = 'frame'
             else:
                 serialized_data = pickle.dumps(data).hex()
                 data_type = 'pickle'
@@ -212,8 +227,11 @@ class AdaptiveCacheSystem:
                 return None
             
             # 反序列化数据
-            if doc['data_type'] == 'dataframe':
-                data = pd.read_json(doc['data'])
+            if doc['data_type'] == 'frame':
+                data = decode_frame(doc['data'])
+            elif doc['data_type'] == 'dataframe':
+                # 兼容旧版 JSON 格式
+                data = decode_legacy(doc['data'], 'dataframe')
             else:
                 data = pickle.loads(bytes.fromhex(doc['data']))
             
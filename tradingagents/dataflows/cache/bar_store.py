@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+区间感知的日线K线存储
+
+每个 (数据源, 周期, 股票) 一个只追加的帧文件，并记录已向数据源请求过的日期区间（覆盖区间）：
+- 任意日期范围的请求先由本地数据切片回答；
+- 按交易日历计算请求范围中未覆盖的部分（通常只是最新的一两根K线），只向数据源请求缺口；
+- 新数据与本地数据按日期合并去重后持久化。
+
+复权价格会在除权除息后整体变化：增量请求总是与本地最后一根K线重叠一天，
+若重叠K线的收盘价不一致，则丢弃本地数据重新拉取整个区间。
+
+数据源应答过（返回了 DataFrame）的缺口整体记为已覆盖，节假日、停牌日不会反复请求；
+但最后一根K线之后的尾部无法区分"停牌/节假日"与"数据源延迟"，只在 TTL 内视为已覆盖，
+过期后重新请求。拉取失败（返回 None）的缺口保持未覆盖。
+
+环境变量:
+    TA_BAR_STORE_ENABLED=false          关闭K线存储（默认开启）
+    TA_BAR_STORE_DIR=/path              存储目录，默认 data_cache/bars
+    TA_BAR_STORE_EMPTY_TTL_SECONDS=3600 尾部无K线区间的覆盖有效期（秒）
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.utils.logging_manager import get_logger
+from .serialization import read_frame_file, write_frame_file
+
+logger = get_logger('agents')
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+MARKET_TZ = ZoneInfo("Asia/Shanghai")
+
+# 日期列候选（按优先级）
+_DATE_COLUMNS = ("date", "trade_date", "日期", "Date")
+# 收盘价列候选，用于检测复权因子变化
+_CLOSE_COLUMNS = ("close", "收盘", "Close")
+
+BarFetcher = Callable[[str, str], Optional[pd.DataFrame]]
+
+
+class TradingCalendar:
+    """
+    交易日历：周一至周五，扣除节假日
+
+    仅用于跳过显然无交易日的区间；未登记的节假日由覆盖区间记录兜底。
+    """
+
+    def __init__(self, holidays: Optional[Iterable] = None):
+        self.holidays = pd.DatetimeIndex(pd.to_datetime(list(holidays or []))).normalize()
+
+    def trading_days(self, start, end) -> pd.DatetimeIndex:
+        """[start, end] 内的交易日"""
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        if start > end:
+            return pd.DatetimeIndex([])
+        days = pd.bdate_range(start, end)
+        return days.difference(self.holidays) if len(self.holidays) else days
+
+    def has_trading_day(self, start, end) -> bool:
+        return len(self.trading_days(start, end)) > 0
+
+
+def _to_date_str(ts: pd.Timestamp) -> str:
+    return ts.strftime("%Y-%m-%d")
+
+
+def _bar_dates(df: pd.DataFrame) -> pd.Series:
+    """提取每根K线的交易日（按行对齐，无法解析时为 NaT）"""
+    for col in _DATE_COLUMNS:
+        if col in df.columns:
+            values = df[col]
+            if values.dtype == object and values.astype(str).str.fullmatch(r"\d{8}").all():
+                dates = pd.to_datetime(values.astype(str), format="%Y%m%d", errors="coerce")
+            else:
+                dates = pd.to_datetime(values, errors="coerce")
+            if isinstance(dates.dtype, pd.DatetimeTZDtype):
+                dates = dates.dt.tz_localize(None)
+            return pd.Series(dates.dt.normalize().to_numpy(), index=df.index)
+    if isinstance(df.index, pd.DatetimeIndex):
+        index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+        return pd.Series(index.normalize(), index=df.index)
+    raise ValueError(f"无法识别K线日期列: {list(df.columns)}")
+
+
+def _close_column(df: pd.DataFrame) -> Optional[str]:
+    return next((c for c in _CLOSE_COLUMNS if c in df.columns), None)
+
+
+class BarStore:
+    """按股票保存日线K线，只向数据源请求缺失区间"""
+
+    def __init__(self, root_dir: Optional[str] = None, calendar: Optional[TradingCalendar] = None,
+                 settle_time: dt_time = dt_time(17, 0), now_fn: Optional[Callable[[], datetime]] = None,
+                 empty_ttl: Optional[float] = None):
+        """
+        Args:
+            root_dir: 存储目录，默认 tradingagents/dataflows/data_cache/bars
+            calendar: 交易日历，默认仅排除周末
+            settle_time: 当日K线视为最终数据的时间（北京时间），之前获取的当日K线下次会重新拉取
+            now_fn: 当前时间（测试用）
+            empty_ttl: 尾部无K线区间的覆盖有效期（秒），默认读取 TA_BAR_STORE_EMPTY_TTL_SECONDS
+        """
+        if root_dir is None:
+            root_dir = os.getenv("TA_BAR_STORE_DIR") or Path(__file__).parent / "data_cache" / "bars"
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.calendar = calendar or TradingCalendar()
+        self.settle_time = settle_time
+        self._now_fn = now_fn or (lambda: datetime.now(MARKET_TZ))
+        if empty_ttl is None:
+            empty_ttl = float(os.getenv("TA_BAR_STORE_EMPTY_TTL_SECONDS", "3600"))
+        self.empty_ttl = empty_ttl
+        self._locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # ---------- 路径与锁 ----------
+    def _paths(self, symbol: str, source: str, period: str) -> Tuple[Path, Path]:
+        base = self.root_dir / source / period
+        base.mkdir(parents=True, exist_ok=True)
+        safe = str(symbol).replace("/", "_").replace("\\", "_")
+        return base / f"{safe}.frame", base / f"{safe}.json"
+
+    @contextmanager
+    def _locked(self, symbol: str, source: str, period: str):
+        """同一股票的读-合并-写串行化（线程锁 + 跨进程文件锁）"""
+        key = (source, period, str(symbol))
+        with self._locks_guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            frame_path, _ = self._paths(symbol, source, period)
+            if fcntl is None:
+                yield
+                return
+            with open(frame_path.with_suffix(".lock"), "a") as fh:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    # ---------- 读写 ----------
+    def read(self, symbol: str, source: str = "default", period: str = "daily") -> Tuple[Optional[pd.DataFrame], Optional[Dict]]:
+        """读取本地K线与覆盖区间"""
+        frame_path, meta_path = self._paths(symbol, source, period)
+        if not frame_path.exists() or not meta_path.exists():
+            return None, None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            return read_frame_file(frame_path), meta
+        except Exception as e:
+            logger.warning(f"⚠️ [K线存储] 读取{symbol}失败，将重新拉取: {e}")
+            return None, None
+
+    def _write(self, symbol: str, source: str, period: str, df: pd.DataFrame,
+               meta: Dict) -> None:
+        frame_path, meta_path = self._paths(symbol, source, period)
+        write_frame_file(frame_path, df.reset_index(drop=True))
+        meta = {
+            "symbol": symbol,
+            "source": source,
+            "period": period,
+            **meta,
+            "rows": len(df),
+            "updated_at": self._now_fn().isoformat(),
+        }
+        tmp = meta_path.with_name(f".{meta_path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, meta_path)
+
+    def invalidate(self, symbol: str, source: str = "default", period: str = "daily") -> None:
+        """删除某只股票的本地K线"""
+        for path in self._paths(symbol, source, period):
+            path.unlink(missing_ok=True)
+
+    # ---------- 缺口计算 ----------
+    def _settled_until(self) -> pd.Timestamp:
+        """最后一个数据已定稿的日期：收盘数据发布前只到昨天"""
+        now = self._now_fn()
+        today = pd.Timestamp(now.date())
+        return today if now.time() >= self.settle_time else today - timedelta(days=1)
+
+    def _coverage(self, meta: Optional[Dict]) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+        """有效覆盖区间：尾部无K线部分超过 TTL 后不再计入"""
+        if not meta:
+            return None, None
+        covered_start = pd.Timestamp(meta["covered_start"])
+        covered_end = pd.Timestamp(meta["covered_end"])
+        provisional_from = meta.get("provisional_from")
+        checked_at = meta.get("checked_at")
+        if provisional_from:
+            expired = checked_at is None
+            if checked_at is not None:
+                checked = datetime.fromisoformat(checked_at)
+                now = self._now_fn()
+                if (checked.tzinfo is None) != (now.tzinfo is None):
+                    checked, now = checked.replace(tzinfo=None), now.replace(tzinfo=None)
+                expired = (now - checked).total_seconds() >= self.empty_ttl
+            if expired:
+                covered_end = min(covered_end, pd.Timestamp(provisional_from) - timedelta(days=1))
+        if covered_end < covered_start:
+            return None, None
+        return covered_start, covered_end
+
+    def missing_intervals(self, meta: Optional[Dict], start, end) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        请求范围内未被覆盖、且包含交易日的区间
+
+        缺口总是与已覆盖区间相接（必要时向外延伸到请求范围之外），保证覆盖区间连续。
+        """
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        covered_start, covered_end = self._coverage(meta)
+        if covered_start is None:
+            return [(start, end)] if self.calendar.has_trading_day(start, end) else []
+        gaps = []
+        if start < covered_start:
+            gaps.append((start, covered_start - timedelta(days=1)))
+        if end > covered_end:
+            gaps.append((covered_end + timedelta(days=1), end))
+        return [(s, e) for s, e in gaps if s <= e and self.calendar.has_trading_day(s, e)]
+
+    # ---------- 主入口 ----------
+    def get_range(self, symbol: str, start_date: str, end_date: str, fetcher: BarFetcher,
+                  source: str = "default", period: str = "daily") -> Optional[pd.DataFrame]:
+        """
+        获取 [start_date, end_date] 的K线，仅对缺失区间调用 fetcher
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            fetcher: fetcher(start, end) -> DataFrame，日期为 YYYY-MM-DD
+            source: 数据源名称（不同数据源的复权口径不同，分开保存）
+            period: 周期
+
+        Returns:
+            按日期升序的K线（列与数据源返回一致），数据源无数据时返回 None
+        """
+        start = pd.Timestamp(start_date).normalize()
+        end = pd.Timestamp(end_date).normalize()
+
+        with self._locked(symbol, source, period):
+            stored, meta = self.read(symbol, source, period)
+            if stored is None:
+                meta = None
+            gaps = self.missing_intervals(meta, start, end)
+
+            if gaps:
+                stored, meta = self._fill_gaps(symbol, source, period, stored, meta, gaps, fetcher)
+            else:
+                logger.debug(f"📦 [K线存储] {symbol} {start_date}~{end_date} 完全命中")
+
+        if stored is None or stored.empty:
+            return None
+        dates = _bar_dates(stored)
+        result = stored.loc[((dates >= start) & (dates <= end)).to_numpy()]
+        return result.reset_index(drop=True)
+
+    def _fill_gaps(self, symbol: str, source: str, period: str, stored: Optional[pd.DataFrame],
+                   meta: Optional[Dict], gaps: List[Tuple[pd.Timestamp, pd.Timestamp]],
+                   fetcher: BarFetcher) -> Tuple[Optional[pd.DataFrame], Optional[Dict]]:
+        """
+        拉取缺口、检测复权变化、合并并持久化
+
+        数据源返回了 DataFrame（即使缺口内没有K线）即视为已应答，整个缺口记为已覆盖：
+        上市前、停牌、未登记的节假日都不会反复请求。拉取失败（None）的缺口保持未覆盖。
+        最后一根K线之后仍有交易日的尾部记为 provisional_from，仅在 TTL 内有效，
+        以免数据源延迟时把尚未发布的K线永久记为空。
+        """
+        covered_start, covered_end = self._coverage(meta)
+        frames = [stored] if stored is not None and not stored.empty else []
+        # 最后一根已定稿的本地K线（未定稿的当日K线不参与复权比对）
+        last_stored = None
+        if frames and covered_end is not None:
+            settled = _bar_dates(stored)
+            settled = settled[settled <= covered_end]
+            last_stored = settled.max() if not settled.empty else None
+        tail_checked = False
+
+        for gap_start, gap_end in gaps:
+            fetch_start = gap_start
+            # 尾部缺口与最后一根本地K线重叠一天，用于检测复权因子变化
+            if last_stored is not None and gap_start > last_stored:
+                fetch_start = last_stored
+            logger.info(f"🔄 [K线存储] {symbol} 拉取缺口 {_to_date_str(fetch_start)}~{_to_date_str(gap_end)} ({source})")
+            fresh = fetcher(_to_date_str(fetch_start), _to_date_str(gap_end))
+            if fresh is None:
+                logger.warning(f"⚠️ [K线存储] {symbol} 缺口 {_to_date_str(gap_start)}~{_to_date_str(gap_end)} "
+                               f"拉取失败，保持未覆盖")
+                continue
+            if frames and last_stored is not None and not fresh.empty \
+                    and self._adjustment_changed(frames[0], fresh, until=last_stored):
+                logger.info(f"♻️ [K线存储] {symbol} 复权价格变化，重新拉取完整区间")
+                full_start = min(covered_start, gap_start)
+                full_end = max(covered_end, gap_end)
+                full = fetcher(_to_date_str(full_start), _to_date_str(full_end))
+                if full is None or full.empty:
+                    logger.warning(f"⚠️ [K线存储] {symbol} 重新拉取完整区间失败，保留本地数据")
+                    continue
+                frames = [full]
+                covered_start, covered_end = full_start, full_end
+                last_stored = None
+                tail_checked = True
+                continue
+            if not fresh.empty:
+                frames.append(fresh)
+            if covered_end is None or gap_end > covered_end:
+                tail_checked = True
+            covered_start = gap_start if covered_start is None else min(covered_start, gap_start)
+            covered_end = gap_end if covered_end is None else max(covered_end, gap_end)
+
+        if not frames or covered_start is None:
+            return None, meta
+
+        merged = self._merge(frames)
+        # 收盘数据定稿前获取的当日K线不计入覆盖区间，下次请求会重新拉取
+        covered_end = min(covered_end, max(self._settled_until(), covered_start))
+        new_meta = {"covered_start": _to_date_str(covered_start), "covered_end": _to_date_str(covered_end)}
+
+        # 最后一根K线之后仍有交易日：无法区分停牌/节假日与数据延迟，只在 TTL 内视为已覆盖
+        dates = _bar_dates(merged)
+        dates = dates[dates <= covered_end]
+        last_bar = dates.max() if not dates.empty else None
+        provisional_from = covered_start if last_bar is None else last_bar + timedelta(days=1)
+        if self.calendar.has_trading_day(provisional_from, covered_end):
+            new_meta["provisional_from"] = _to_date_str(provisional_from)
+            unchanged = meta and meta.get("provisional_from") == new_meta["provisional_from"]
+            if tail_checked or not unchanged or not meta.get("checked_at"):
+                new_meta["checked_at"] = self._now_fn().isoformat()
+            else:
+                new_meta["checked_at"] = meta["checked_at"]
+
+        try:
+            self._write(symbol, source, period, merged, new_meta)
+        except Exception as e:
+            logger.warning(f"⚠️ [K线存储] 保存{symbol}失败: {e}")
+        return merged, new_meta
+
+    @staticmethod
+    def _adjustment_changed(stored: pd.DataFrame, fresh: pd.DataFrame, until: pd.Timestamp,
+                            rtol: float = 1e-6) -> bool:
+        """重叠日期（不晚于 until）的收盘价不一致说明复权因子已变化"""
+        old_col, new_col = _close_column(stored), _close_column(fresh)
+        if old_col is None or new_col is None:
+            return False
+        old = pd.Series(stored[old_col].to_numpy(dtype=float), index=_bar_dates(stored).to_numpy())
+        new = pd.Series(fresh[new_col].to_numpy(dtype=float), index=_bar_dates(fresh).to_numpy())
+        common = old.index.intersection(new.index)
+        common = common[common <= until]
+        if common.empty:
+            return False
+        a = old[~old.index.duplicated(keep="last")].loc[common].to_numpy()
+        b = new[~new.index.duplicated(keep="last")].loc[common].to_numpy()
+        return not np.allclose(a, b, rtol=rtol, equal_nan=True)
+
+    @staticmethod
+    def _merge(frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """按日期合并去重（新数据覆盖旧数据），按日期升序"""
+        merged = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].reset_index(drop=True)
+        dates = _bar_dates(merged)
+        keep = ~dates.duplicated(keep="last") & dates.notna()
+        merged = merged.loc[keep.to_numpy()]
+        order = np.argsort(dates[keep].to_numpy(), kind="stable")
+        return merged.iloc[order].reset_index(drop=True)
+
+
+_bar_store: Optional[BarStore] = None
+_bar_store_lock = threading.Lock()
+
+
+def get_bar_store() -> Optional[BarStore]:
+    """获取全局K线存储；TA_BAR_STORE_ENABLED=false 时返回 None"""
+    global _bar_store
+    if os.getenv("TA_BAR_STORE_ENABLED", "true").lower() in ("false", "0", "no", "off"):
+        return None
+    if _bar_store is None:
+        with _bar_store_lock:
+            if _bar_store is None:
+                try:
+                    _bar_store = BarStore()
+                    logger.info(f"✅ K线存储已启用: {_bar_store.root_dir}")
+                except Exception as e:
+                    logger.warning(f"⚠️ K线存储初始化失败: {e}")
+                    return None
+    return _bar_store
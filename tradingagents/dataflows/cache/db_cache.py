@@ -7,6 +7,7 @@ MongoDB + Redis 数据库缓存管理器
 import os
 import json
 import pickle
+import base64
 import hashlib
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
@@ -15,6 +16,8 @@ from tradingagents.config.runtime_settings import get_timezone_name
 from typing import Optional, Dict, Any, List, Union
 import pandas as pd
 
+from .serialization import decode_frame, decode_legacy, encode_frame
+
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
@@ -226,10 +229,10 @@ class DatabaseCacheManager:
             "updated_at": datetime.now(ZoneInfo(get_timezone_name()))
         }
 
-        # 处理数据格式
+        # 处理数据格式（DataFrame 使用二进制列式帧，MongoDB 中以 Binary 保存）
         if isinstance(data, pd.DataFrame):
-            doc["data"] = data.to_json(orient='records', date_format='iso')
-            doc["data_format"] = "dataframe_json"
+            doc["data"] = encode_frame(data)
+            doc["data_format"] = "dataframe_frame"
         else:
             doc["data"] = str(data)
             doc["data_format"] = "text"
@@ -247,7 +250,7 @@ class DatabaseCacheManager:
         if self.redis_client:
             try:
                 redis_data = {
-                    "data": doc["data"],
+                    "data": self._to_redis_text(doc["data"]),
                     "data_format": doc["data_format"],
                     "symbol": symbol,
                     "data_source": data_source,
@@ -264,6 +267,24 @@ class DatabaseCacheManager:
 
         return cache_key
 
+    @staticmethod
+    def _to_redis_text(data: Any) -> str:
+        """Redis 客户端启用了 decode_responses，二进制帧以 base64 文本保存"""
+        if isinstance(data, (bytes, bytearray)):
+            return base64.b64encode(bytes(data)).decode("ascii")
+        return data
+
+    @staticmethod
+    def _decode_data(data: Any, data_format: str) -> Union[pd.DataFrame, str]:
+        """按 data_format 还原数据（兼容旧版 JSON 格式）"""
+        if data_format == "dataframe_frame":
+            if isinstance(data, str):
+                data = base64.b64decode(data)
+            return decode_frame(data)
+        if data_format == "dataframe_json":
+            return decode_legacy(data, data_format)
+        return data
+
     def load_stock_data(self, cache_key: str) -> Optional[Union[pd.DataFrame, str]]:
         """从Redis或MongoDB加载股票数据"""
 
@@ -275,10 +296,7 @@ class DatabaseCacheManager:
                     data_dict = json.loads(redis_data)
                     logger.info(f"⚡ 从Redis加载数据: {cache_key}")
 
-                    if data_dict["data_format"] == "dataframe_json":
-                        return pd.read_json(data_dict["data"], orient='records')
-                    else:
-                        return data_dict["data"]
+                    return self._decode_data(data_dict["data"], data_dict["data_format"])
             except Exception as e:
                 logger.error(f"⚠️ Redis加载失败: {e}")
 
@@ -295,7 +313,7 @@ class DatabaseCacheManager:
                     if self.redis_client:
                         try:
                             redis_data = {
-                                "data": doc["data"],
+                                "data": self._to_redis_text(doc["data"]),
                                 "data_format": doc["data_format"],
                                 "symbol": doc["symbol"],
                                 "data_source": doc["data_source"],
@@ -310,10 +328,7 @@ class DatabaseCacheManager:
                         except Exception as e:
                             logger.error(f"⚠️ Redis同步失败: {e}")
 
-                    if doc["data_format"] == "dataframe_json":
-                        return pd.read_json(doc["data"], orient='records')
-                    else:
-                        return doc["data"]
+                    return self._decode_data(doc["data"], doc["data_format"])
 
             except Exception as e:
                 logger.error(f"⚠️ MongoDB加载失败: {e}")
@@ -10,9 +10,12 @@ import pickle
 import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, Dict, Any, Union, List
+from typing import Optional, Dict, Any, Union, List, Iterator, Tuple
 import hashlib
 
+from .metadata_index import INDEX_FILENAME, CacheMetadataIndex
+from .serialization import read_frame_file, write_frame_file
+
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
@@ -92,11 +95,80 @@ class StockDataCache:
             'enable_length_check': os.getenv('ENABLE_CACHE_LENGTH_CHECK', 'false').lower() == 'true'  # 文件缓存默认不限制
         }
 
+        # 元数据索引（SQLite），不可用时退回逐个扫描 *_meta.json
+        self.metadata_index = self._init_metadata_index()
+
         logger.info(f"📁 缓存管理器初始化完成，缓存目录: {self.cache_dir}")
         logger.info(f"🗄️ 数据库缓存管理器初始化完成")
         logger.info(f"   美股数据: ✅ 已配置")
         logger.info(f"   A股数据: ✅ 已配置")
 
+    def _init_metadata_index(self) -> Optional[CacheMetadataIndex]:
+        """打开元数据索引，首次使用时导入已有的 *_meta.json"""
+        try:
+            index = CacheMetadataIndex(self.metadata_dir / INDEX_FILENAME)
+            if index.count() == 0:
+                imported = index.import_metadata_dir(self.metadata_dir)
+                if imported:
+                    logger.info(f"🗂️ 已将 {imported} 条缓存元数据导入索引")
+            return index
+        except Exception as e:
+            logger.warning(f"⚠️ 缓存元数据索引不可用，使用文件扫描: {e}")
+            return None
+
+    def _scan_metadata_files(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """逐个读取 *_meta.json（索引不可用时的兼容路径）"""
+        for metadata_file in self.metadata_dir.glob("*_meta.json"):
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    yield metadata_file.stem.replace('_meta', ''), json.load(f)
+            except Exception:
+                continue
+
+    def find_cache_keys(self, symbol: str, data_type: str, market_type: str = None,
+                        data_source: str = None, max_age_hours: float = None,
+                        start_date: str = None, end_date: str = None) -> List[str]:
+        """
+        按股票查找缓存键（按缓存时间从新到旧）
+
+        Args:
+            symbol: 股票代码
+            data_type: 数据类型 stock_data/news/fundamentals
+            market_type: 市场类型，None 表示不限
+            data_source: 数据源，None 表示不限
+            max_age_hours: 最大缓存时间（小时），None 表示不限
+            start_date: 要求缓存的起始日期不晚于该日期
+            end_date: 要求缓存的结束日期不早于该日期
+
+        Returns:
+            List[str]: 匹配的缓存键
+        """
+        if self.metadata_index is not None:
+            try:
+                return self.metadata_index.find(symbol, data_type, market_type, data_source,
+                                                max_age_hours, start_date, end_date)
+            except Exception as e:
+                logger.warning(f"⚠️ 缓存元数据索引查询失败，使用文件扫描: {e}")
+
+        cutoff = datetime.now() - timedelta(hours=max_age_hours) if max_age_hours is not None else None
+        matches = []
+        for cache_key, metadata in self._scan_metadata_files():
+            if (metadata.get('symbol') != symbol or metadata.get('data_type') != data_type or
+                    (market_type is not None and metadata.get('market_type') != market_type) or
+                    (data_source is not None and metadata.get('data_source') != data_source)):
+                continue
+            if start_date and not (metadata.get('start_date') and metadata['start_date'] <= start_date):
+                continue
+            if end_date and not (metadata.get('end_date') and metadata['end_date'] >= end_date):
+                continue
+            try:
+                cached_at = datetime.fromisoformat(metadata['cached_at'])
+            except Exception:
+                continue
+            if cutoff is None or cached_at >= cutoff:
+                matches.append((cached_at, cache_key))
+        return [k for _, k in sorted(matches, reverse=True)]
+
     def _determine_market_type(self, symbol: str) -> str:
         """根据股票代码确定市场类型"""
         import re
@@ -216,9 +288,23 @@ class StockDataCache:
         
         with open(metadata_path, 'w', encoding='utf-8') as f:
             json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+        if self.metadata_index is not None:
+            try:
+                self.metadata_index.upsert(cache_key, metadata)
+            except Exception as e:
+                logger.warning(f"⚠️ 写入缓存元数据索引失败: {e}")
     
     def _load_metadata(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """加载元数据"""
+        if self.metadata_index is not None:
+            try:
+                metadata = self.metadata_index.get(cache_key)
+                if metadata is not None:
+                    return metadata
+            except Exception as e:
+                logger.warning(f"⚠️ 读取缓存元数据索引失败: {e}")
+
         metadata_path = self._get_metadata_path(cache_key)
         if not metadata_path.exists():
             return None
@@ -300,11 +386,19 @@ class StockDataCache:
                                            source=data_source,
                                            market=market_type)
 
-        # 保存数据
+        # 保存数据（DataFrame 使用二进制列式帧，保留 dtype 与日期索引）
+        file_format = 'txt'
         if isinstance(data, pd.DataFrame):
-            cache_path = self._get_cache_path("stock_data", cache_key, "csv", symbol)
+            cache_path = self._get_cache_path("stock_data", cache_key, "frame", symbol)
             cache_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
-            data.to_csv(cache_path, index=True)
+            try:
+                write_frame_file(cache_path, data)
+                file_format = 'frame'
+            except Exception as e:
+                logger.warning(f"⚠️ 二进制序列化失败，改用CSV: {e}")
+                cache_path = self._get_cache_path("stock_data", cache_key, "csv", symbol)
+                data.to_csv(cache_path, index=True)
+                file_format = 'csv'
         else:
             cache_path = self._get_cache_path("stock_data", cache_key, "txt", symbol)
             cache_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
@@ -320,7 +414,7 @@ class StockDataCache:
             'end_date': end_date,
             'data_source': data_source,
             'file_path': str(cache_path),
-            'file_format': 'csv' if isinstance(data, pd.DataFrame) else 'txt',
+            'file_format': file_format,
             'content_length': len(content_to_check)
         }
         self._save_metadata(cache_key, metadata)
@@ -342,7 +436,10 @@ class StockDataCache:
             return None
         
         try:
-            if metadata['file_format'] == 'csv':
+            if metadata['file_format'] == 'frame':
+                return read_frame_file(cache_path)
+            elif metadata['file_format'] == 'csv':
+                # 兼容旧版 CSV 缓存
                 return pd.read_csv(cache_path, index_col=0)
             else:
                 with open(cache_path, 'r', encoding='utf-8') as f:
@@ -387,24 +484,18 @@ class StockDataCache:
             logger.info(f"🎯 找到精确匹配的{desc}: {symbol} -> {search_key}")
             return search_key
 
-        # 如果没有精确匹配，查找部分匹配（相同股票代码的其他缓存）
-        for metadata_file in self.metadata_dir.glob(f"*_meta.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-
-                if (metadata.get('symbol') == symbol and
-                    metadata.get('data_type') == 'stock_data' and
-                    metadata.get('market_type') == market_type and
-                    (data_source is None or metadata.get('data_source') == data_source)):
-
-                    cache_key = metadata_file.stem.replace('_meta', '')
-                    if self.is_cache_valid(cache_key, max_age_hours, symbol, 'stock_data'):
-                        desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
-                        logger.info(f"📋 找到部分匹配的{desc}: {symbol} -> {cache_key}")
-                        return cache_key
-            except Exception:
-                continue
+        # 如果没有精确匹配，查找部分匹配（相同股票代码的其他缓存），优先选择覆盖所需日期范围的缓存
+        desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
+        covering = self.find_cache_keys(symbol, 'stock_data', market_type, data_source, max_age_hours,
+                                        start_date=start_date, end_date=end_date)
+        if covering:
+            logger.info(f"📋 找到覆盖日期范围的{desc}: {symbol} -> {covering[0]}")
+            return covering[0]
+        if start_date or end_date:
+            partial = self.find_cache_keys(symbol, 'stock_data', market_type, data_source, max_age_hours)
+            if partial:
+                logger.info(f"📋 找到部分匹配的{desc}: {symbol} -> {partial[0]}")
+                return partial[0]
 
         desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
         logger.error(f"❌ 未找到有效的{desc}缓存: {symbol}")
@@ -529,23 +620,11 @@ class StockDataCache:
             max_age_hours = self.cache_config.get(cache_type, {}).get('ttl_hours', 24)
         
         # 查找匹配的缓存
-        for metadata_file in self.metadata_dir.glob(f"*_meta.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                if (metadata.get('symbol') == symbol and
-                    metadata.get('data_type') == 'fundamentals' and
-                    metadata.get('market_type') == market_type and
-                    (data_source is None or metadata.get('data_source') == data_source)):
-                    
-                    cache_key = metadata_file.stem.replace('_meta', '')
-                    if self.is_cache_valid(cache_key, max_age_hours, symbol, 'fundamentals'):
-                        desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
-                        logger.info(f"🎯 找到匹配的{desc}缓存: {symbol} ({data_source}) -> {cache_key}")
-                        return cache_key
-            except Exception:
-                continue
+        cache_keys = self.find_cache_keys(symbol, 'fundamentals', market_type, data_source, max_age_hours)
+        if cache_keys:
+            desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
+            logger.info(f"🎯 找到匹配的{desc}缓存: {symbol} ({data_source}) -> {cache_keys[0]}")
+            return cache_keys[0]
         
         desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
         logger.error(f"❌ 未找到有效的{desc}缓存: {symbol} ({data_source})")
@@ -555,7 +634,19 @@ class StockDataCache:
         """清理过期缓存"""
         cutoff_time = datetime.now() - timedelta(days=max_age_days)
         cleared_count = 0
-        
+
+        if self.metadata_index is not None:
+            try:
+                for cache_key, file_path in self.metadata_index.expire(cutoff_time):
+                    for path in (Path(file_path) if file_path else None, self._get_metadata_path(cache_key)):
+                        if path is not None and path.exists():
+                            path.unlink()
+                    cleared_count += 1
+                logger.info(f"🧹 已清理 {cleared_count} 个过期缓存文件")
+                return cleared_count
+            except Exception as e:
+                logger.warning(f"⚠️ 通过索引清理缓存失败，使用文件扫描: {e}")
+
         for metadata_file in self.metadata_dir.glob("*_meta.json"):
             try:
                 with open(metadata_file, 'r', encoding='utf-8') as f:
@@ -576,7 +667,8 @@ class StockDataCache:
                 logger.warning(f"⚠️ 清理缓存时出错: {e}")
         
         logger.info(f"🧹 已清理 {cleared_count} 个过期缓存文件")
-    
+        return cleared_count
+
     def get_cache_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
         stats = {
@@ -591,6 +683,23 @@ class StockDataCache:
 
         total_size_bytes = 0
 
+        # 优先使用元数据索引汇总
+        if self.metadata_index is not None:
+            try:
+                index_stats = self.metadata_index.stats()
+                by_type = index_stats['by_type']
+                if by_type:
+                    stats['stock_data_count'] = by_type.get('stock_data', 0)
+                    stats['news_count'] = by_type.get('news', 0)
+                    stats['fundamentals_count'] = by_type.get('fundamentals', 0)
+                    stats['total_files'] = sum(by_type.values())
+                    stats['skipped_count'] = index_stats['missing_files']
+                    stats['total_size'] = index_stats['total_size']
+                    stats['total_size_mb'] = round(index_stats['total_size'] / (1024 * 1024), 2)
+                    return stats
+            except Exception as e:
+                logger.warning(f"⚠️ 读取缓存元数据索引统计失败，使用文件扫描: {e}")
+
         # 统计有元数据的缓存文件
         metadata_files_count = 0
         for metadata_file in self.metadata_dir.glob("*_meta.json"):
@@ -8,7 +8,7 @@
 import os
 import logging
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 import pandas as pd
 
 # 导入统一日志系统
@@ -213,6 +213,13 @@ class IntegratedCacheManager:
         else:
             return self.legacy_cache.find_cached_fundamentals_data(symbol, data_source, max_age_hours)
 
+    def find_cache_keys(self, symbol: str, data_type: str, market_type: str = None,
+                        data_source: str = None, max_age_hours: float = None,
+                        start_date: str = None, end_date: str = None) -> List[str]:
+        """按股票查找文件缓存键（通过文件缓存的元数据索引）"""
+        return self.legacy_cache.find_cache_keys(symbol, data_type, market_type, data_source,
+                                                 max_age_hours, start_date, end_date)
+
     def is_fundamentals_cache_valid(self, symbol: str, data_source: str = None,
                                    max_age_hours: int = None) -> bool:
         """
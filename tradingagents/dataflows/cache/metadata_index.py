@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+文件缓存元数据索引
+
+用一个嵌入式 SQLite 数据库记录 StockDataCache 的全部元数据，
+按 (symbol, data_type, market_type, data_source, 日期范围, cached_at) 建索引：
+- 按股票查找缓存为索引查询，不再遍历并解析每个 *_meta.json；
+- 支持查找覆盖指定日期范围的缓存；
+- 过期清理、统计信息均为单条 SQL；
+- 使用 WAL 模式 + busy_timeout，多个工作进程可以同时读写。
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+INDEX_FILENAME = "cache_index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    cache_key      TEXT PRIMARY KEY,
+    symbol         TEXT,
+    data_type      TEXT,
+    market_type    TEXT,
+    data_source    TEXT,
+    start_date     TEXT,
+    end_date       TEXT,
+    file_path      TEXT,
+    file_format    TEXT,
+    file_size      INTEGER,
+    content_length INTEGER,
+    cached_at      REAL NOT NULL,
+    metadata       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cache_lookup
+    ON cache_entries (symbol, data_type, market_type, data_source, cached_at);
+CREATE INDEX IF NOT EXISTS idx_cache_cached_at ON cache_entries (cached_at);
+"""
+
+_COLUMNS = ("symbol", "data_type", "market_type", "data_source", "start_date", "end_date",
+            "file_path", "file_format", "content_length")
+
+
+def _to_timestamp(value: Any) -> float:
+    """cached_at（ISO 字符串或时间戳）转为时间戳"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+class CacheMetadataIndex:
+    """基于 SQLite 的缓存元数据索引（进程/线程安全）"""
+
+    def __init__(self, db_path: Path, busy_timeout_ms: int = 30000):
+        """
+        Args:
+            db_path: 索引文件路径
+            busy_timeout_ms: 其他进程持有写锁时的等待时间
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取当前线程（及进程）专用的连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and getattr(self._local, "pid", None) == os.getpid():
+            return conn
+        # isolation_level=None：每条语句自动提交，写锁持有时间最短
+        conn = sqlite3.connect(str(self.db_path), timeout=self.busy_timeout_ms / 1000,
+                               isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    # ---------- 写入 ----------
+    def upsert(self, cache_key: str, metadata: Dict[str, Any]) -> None:
+        """新增或覆盖一条元数据"""
+        self.upsert_many([(cache_key, metadata)])
+
+    def upsert_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """批量新增或覆盖元数据，返回写入条数"""
+        rows = []
+        for cache_key, metadata in items:
+            file_path = metadata.get("file_path")
+            file_size = None
+            if file_path:
+                try:
+                    file_size = os.path.getsize(file_path)
+                except OSError:
+                    file_size = None
+            rows.append((
+                cache_key,
+                *[metadata.get(c) for c in _COLUMNS],
+                file_size,
+                _to_timestamp(metadata.get("cached_at")),
+                json.dumps(metadata, ensure_ascii=False, default=str),
+            ))
+        if not rows:
+            return 0
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache_entries (cache_key, symbol, data_type, market_type, data_source, "
+                "start_date, end_date, file_path, file_format, content_length, file_size, cached_at, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def remove(self, cache_key: str) -> None:
+        self._connect().execute("DELETE FROM cache_entries WHERE cache_key = ?", (cache_key,))
+
+    # ---------- 查询 ----------
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """按缓存键读取元数据"""
+        row = self._connect().execute(
+            "SELECT metadata FROM cache_entries WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+        return json.loads(row["metadata"]) if row else None
+
+    def find(
+        self,
+        symbol: str,
+        data_type: str,
+        market_type: Optional[str] = None,
+        data_source: Optional[str] = None,
+        max_age_hours: Optional[float] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[str]:
+        """
+        查找匹配的缓存键（按缓存时间从新到旧）
+
+        Args:
+            symbol: 股票代码
+            data_type: 数据类型 stock_data/news/fundamentals
+            market_type: 市场类型，None 表示不限
+            data_source: 数据源，None 表示不限
+            max_age_hours: 最大缓存时间，None 表示不限
+            start_date: 只返回起始日期不晚于该日期的缓存（覆盖查询）
+            end_date: 只返回结束日期不早于该日期的缓存（覆盖查询）
+            limit: 最多返回条数
+        """
+        sql = ["SELECT cache_key FROM cache_entries WHERE symbol = ? AND data_type = ?"]
+        params: List[Any] = [symbol, data_type]
+        if market_type is not None:
+            sql.append("AND market_type = ?")
+            params.append(market_type)
+        if data_source is not None:
+            sql.append("AND data_source = ?")
+            params.append(data_source)
+        if max_age_hours is not None:
+            sql.append("AND cached_at >= ?")
+            params.append(time.time() - max_age_hours * 3600)
+        if start_date:
+            sql.append("AND start_date IS NOT NULL AND start_date <= ?")
+            params.append(start_date)
+        if end_date:
+            sql.append("AND end_date IS NOT NULL AND end_date >= ?")
+            params.append(end_date)
+        sql.append("ORDER BY cached_at DESC")
+        if limit:
+            sql.append("LIMIT ?")
+            params.append(int(limit))
+        return [r["cache_key"] for r in self._connect().execute(" ".join(sql), params)]
+
+    def list_entries(self, data_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """列出元数据（按缓存时间从新到旧）"""
+        if data_type:
+            cur = self._connect().execute(
+                "SELECT metadata FROM cache_entries WHERE data_type = ? ORDER BY cached_at DESC", (data_type,))
+        else:
+            cur = self._connect().execute("SELECT metadata FROM cache_entries ORDER BY cached_at DESC")
+        return [json.loads(r["metadata"]) for r in cur]
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """按数据类型汇总条数与文件大小"""
+        by_type: Dict[str, int] = {}
+        total_size = 0
+        missing = 0
+        for row in self._connect().execute(
+            "SELECT data_type, COUNT(*) AS n, COALESCE(SUM(file_size), 0) AS size, "
+            "SUM(CASE WHEN file_size IS NULL THEN 1 ELSE 0 END) AS missing "
+            "FROM cache_entries GROUP BY data_type"
+        ):
+            by_type[row["data_type"] or "unknown"] = row["n"]
+            total_size += row["size"]
+            missing += row["missing"]
+        return {"by_type": by_type, "total_size": total_size, "missing_files": missing}
+
+    # ---------- 过期清理 ----------
+    def expire(self, older_than: datetime) -> List[Tuple[str, Optional[str]]]:
+        """
+        删除早于 older_than 的元数据
+
+        Returns:
+            被删除的 [(cache_key, file_path)]，由调用方删除数据文件
+        """
+        cutoff = older_than.timestamp()
+        conn = self._connect()
+        with conn:
+            # BEGIN IMMEDIATE：查询与删除在同一写事务内，避免与并发写入交错
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT cache_key, file_path FROM cache_entries WHERE cached_at < ?", (cutoff,)
+            ).fetchall()
+            conn.execute("DELETE FROM cache_entries WHERE cached_at < ?", (cutoff,))
+        return [(r["cache_key"], r["file_path"]) for r in rows]
+
+    # ---------- 迁移 ----------
+    def import_metadata_dir(self, metadata_dir: Path) -> int:
+        """从旧版 *_meta.json 文件导入元数据，返回导入条数"""
+        items = []
+        for metadata_file in Path(metadata_dir).glob("*_meta.json"):
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    items.append((metadata_file.stem[:-len("_meta")], json.load(f)))
+            except Exception:
+                continue
+        return self.upsert_many(items)
@@ -14,6 +14,7 @@ logger = get_logger('agents')
 
 # 导入配置
 from tradingagents.config.runtime_settings import use_app_cache_enabled
+from tradingagents.config.config_snapshot import get_config_snapshot
 
 class MongoDBCacheAdapter:
     """MongoDB 缓存适配器（从 app 的 MongoDB 读取同步数据）"""
@@ -101,46 +102,18 @@ class MongoDBCacheAdapter:
             market_category = market_mapping.get(market)
             logger.info(f"📊 [数据源优先级] 股票代码: {symbol}, 市场分类: {market_category}")
 
-            # 2. 从数据库读取配置
+            # 2. 从配置快照读取（配置变更时才重新加载，热路径无数据库查询）
             if self.db is not None:
-                config_collection = self.db.system_configs
-                config_data = config_collection.find_one(
-                    {"is_active": True},
-                    sort=[("version", -1)]
-                )
+                snapshot = get_config_snapshot()
 
-                if config_data and config_data.get('data_source_configs'):
-                    configs = config_data['data_source_configs']
-                    logger.info(f"📊 [数据源优先级] 从数据库读取到 {len(configs)} 个数据源配置")
+                if snapshot.data_source_configs:
+                    logger.debug(f"📊 [数据源优先级] 配置版本 {snapshot.version}，共 {len(snapshot.data_source_configs)} 个数据源配置")
 
-                    # 3. 过滤启用的数据源
-                    enabled = []
-                    for ds in configs:
-                        ds_type = ds.get('type', '')
-                        ds_enabled = ds.get('enabled', True)
-                        ds_priority = ds.get('priority', 0)
-                        ds_categories = ds.get('market_categories', [])
+                    # 3. 过滤启用且支持该市场的数据源，按优先级排序（数字越大优先级越高）
+                    enabled = snapshot.enabled_data_sources(market_category)
+                    logger.debug(f"📊 [数据源优先级] 过滤后启用的数据源: {len(enabled)} 个")
 
-                        logger.info(f"📊 [数据源配置] 类型: {ds_type}, 启用: {ds_enabled}, 优先级: {ds_priority}, 市场: {ds_categories}")
-
-                        if not ds_enabled:
-                            logger.info(f"⚠️ [数据源优先级] {ds_type} 未启用，跳过")
-                            continue
-
-                        # 检查市场分类
-                        if ds_categories and market_category:
-                            if market_category not in ds_categories:
-                                logger.info(f"⚠️ [数据源优先级] {ds_type} 不支持市场 {market_category}，跳过")
-                                continue
-
-                        enabled.append(ds)
-
-                    logger.info(f"📊 [数据源优先级] 过滤后启用的数据源: {len(enabled)} 个")
-
-                    # 4. 按优先级排序（数字越大优先级越高）
-                    enabled.sort(key=lambda x: x.get('priority', 0), reverse=True)
-
-                    # 5. 返回数据源类型列表
+                    # 4. 返回数据源类型列表
                     result = [ds.get('type', '').lower() for ds in enabled if ds.get('type')]
                     if result:
                         logger.info(f"✅ [数据源优先级] {symbol} ({market_category}): {result}")
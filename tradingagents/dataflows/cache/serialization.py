@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+缓存 DataFrame 序列化层
+
+所有缓存后端（文件、Redis、MongoDB、AdaptiveCacheSystem）统一使用带版本头的二进制帧保存 DataFrame：
+
+    | magic(4) = b"TAFR" | version(1) | codec(1) | reserved(2) | payload |
+
+- codec=1 Arrow IPC（需要 pyarrow），保留 dtype、索引与时区；
+- codec=2 NumPy 列块（无额外依赖），数值/时间列按原始字节连续存放，读取时 np.frombuffer 直接映射。
+
+读取时按帧头选择解码器；不带帧头的旧 CSV/JSON 数据由 decode_legacy 兼容读取。
+通过环境变量 TA_CACHE_SERIALIZER=arrow|npy 选择写入格式，默认优先 arrow。
+"""
+
+import io
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    ARROW_AVAILABLE = False
+
+FRAME_MAGIC = b"TAFR"
+FRAME_VERSION = 1
+_HEADER = struct.Struct("<4sBBH")
+HEADER_SIZE = _HEADER.size
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+class FrameSerializer:
+    """DataFrame 序列化器基类"""
+
+    name: str = ""
+    codec_id: int = 0
+
+    def dumps(self, df: pd.DataFrame) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, payload: memoryview, zero_copy: bool = False) -> pd.DataFrame:
+        raise NotImplementedError
+
+
+class ArrowIPCSerializer(FrameSerializer):
+    """Arrow IPC 流格式"""
+
+    name = "arrow"
+    codec_id = 1
+
+    def dumps(self, df: pd.DataFrame) -> bytes:
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    def loads(self, payload: memoryview, zero_copy: bool = False) -> pd.DataFrame:
+        table = pa.ipc.open_stream(pa.py_buffer(payload)).read_all()
+        if zero_copy:
+            # split_blocks：按列生成 block，避免合并复制；数值列直接引用缓冲区（只读）
+            return table.to_pandas(split_blocks=True)
+        # 默认返回可写的独立内存，调用方可以原地修改
+        return table.to_pandas()
+
+
+class NumpyBlockSerializer(FrameSerializer):
+    """
+    NumPy 列块格式
+
+    payload = | 描述长度(4) | JSON 描述 | 8 字节对齐的列数据... |
+    数值/布尔/时间列保存原始字节；其余列（字符串、混合类型）以 JSON 列表保存。
+    """
+
+    name = "npy"
+    codec_id = 2
+    _ALIGN = 8
+
+    def _encode_column(self, values: pd.Series) -> Dict[str, Any]:
+        dtype = values.dtype
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            arr = values.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy()
+            return {"kind": "raw", "dtype": arr.dtype.str, "tz": str(dtype.tz), "data": np.ascontiguousarray(arr)}
+        if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+            return {"kind": "raw", "dtype": dtype.str, "data": np.ascontiguousarray(values.to_numpy())}
+        items = [None if pd.isna(v) else v for v in values.astype(object).tolist()]
+        blob = json.dumps(items, ensure_ascii=False, default=str).encode("utf-8")
+        return {"kind": "json", "dtype": str(dtype), "data": blob}
+
+    def dumps(self, df: pd.DataFrame) -> bytes:
+        flat = df.copy(deep=False)
+        flat.index = pd.RangeIndex(len(df))
+        range_index = None
+        if isinstance(df.index, pd.RangeIndex):
+            range_index = [df.index.start, df.index.stop, df.index.step, df.index.name]
+            index_frame = pd.DataFrame(index=flat.index)
+        else:
+            index_names = [n if n is not None else f"__index_level_{i}__" for i, n in enumerate(df.index.names)]
+            index_frame = pd.DataFrame(
+                {n: df.index.get_level_values(i) for i, n in enumerate(index_names)}
+            ).set_axis(flat.index)
+
+        columns: List[Dict[str, Any]] = []
+        blobs: List[bytes] = []
+        offset = 0
+        for role, frame in (("index", index_frame), ("column", flat)):
+            for i, name in enumerate(frame.columns):
+                enc = self._encode_column(frame.iloc[:, i])
+                data = enc.pop("data")
+                raw = data.tobytes() if isinstance(data, np.ndarray) else data
+                pad = (-offset) % self._ALIGN
+                if pad:
+                    blobs.append(b"\0" * pad)
+                    offset += pad
+                columns.append({"name": name, "role": role, "offset": offset, "nbytes": len(raw), **enc})
+                blobs.append(raw)
+                offset += len(raw)
+
+        meta = json.dumps({
+            "rows": len(df),
+            "columns": columns,
+            "column_names": list(df.columns),
+            "column_index_name": df.columns.name,
+            "range_index": range_index,
+        }, ensure_ascii=False, default=str).encode("utf-8")
+        head = struct.pack("<I", len(meta)) + meta
+        # 数据区相对整个 payload 对齐
+        lead_pad = (-len(head)) % self._ALIGN
+        return head + b"\0" * lead_pad + b"".join(blobs)
+
+    def loads(self, payload: memoryview, zero_copy: bool = False) -> pd.DataFrame:
+        (meta_len,) = struct.unpack_from("<I", payload, 0)
+        meta = json.loads(bytes(payload[4:4 + meta_len]).decode("utf-8"))
+        base = 4 + meta_len
+        base += (-base) % self._ALIGN
+        rows = meta["rows"]
+
+        index_cols: Dict[str, Any] = {}
+        data_cols: List[Any] = []
+        for col in meta["columns"]:
+            start = base + col["offset"]
+            if col["kind"] == "raw":
+                dtype = np.dtype(col["dtype"])
+                values = np.frombuffer(payload, dtype=dtype, count=rows, offset=start)
+                if not zero_copy:
+                    values = values.copy()
+                if col.get("tz"):
+                    values = pd.DatetimeIndex(values).tz_localize("UTC").tz_convert(col["tz"])
+            else:
+                items = json.loads(bytes(payload[start:start + col["nbytes"]]).decode("utf-8"))
+                values = pd.array(items, dtype=object)
+                if col["dtype"] not in ("object", "mixed"):
+                    try:
+                        values = pd.array(items).astype(col["dtype"])
+                    except (TypeError, ValueError):
+                        pass
+            if col["role"] == "index":
+                index_cols[col["name"]] = values
+            else:
+                data_cols.append(values)
+
+        df = pd.DataFrame(dict(zip(range(len(data_cols)), data_cols)), index=pd.RangeIndex(rows), copy=False)
+        df.columns = pd.Index(meta["column_names"], name=meta.get("column_index_name"))
+        if meta.get("range_index"):
+            start, stop, step, name = meta["range_index"]
+            df.index = pd.RangeIndex(start, stop, step, name=name)
+        elif len(index_cols) == 1:
+            (name, values), = index_cols.items()
+            df.index = pd.Index(values, name=None if name.startswith("__index_level_") else name)
+        elif index_cols:
+            df.index = pd.MultiIndex.from_arrays(
+                list(index_cols.values()),
+                names=[None if n.startswith("__index_level_") else n for n in index_cols],
+            )
+        return df
+
+
+_SERIALIZERS: Dict[Any, FrameSerializer] = {}
+
+
+def register_serializer(serializer: FrameSerializer) -> None:
+    """注册序列化器（按名称与 codec 编号索引）"""
+    _SERIALIZERS[serializer.name] = serializer
+    _SERIALIZERS[serializer.codec_id] = serializer
+
+
+register_serializer(NumpyBlockSerializer())
+if ARROW_AVAILABLE:
+    register_serializer(ArrowIPCSerializer())
+
+
+def get_serializer(name: Optional[str] = None) -> FrameSerializer:
+    """
+    获取序列化器
+
+    Args:
+        name: arrow/npy，None 时读取 TA_CACHE_SERIALIZER，默认优先 arrow
+    """
+    name = (name or os.getenv("TA_CACHE_SERIALIZER") or ("arrow" if ARROW_AVAILABLE else "npy")).lower()
+    serializer = _SERIALIZERS.get(name)
+    if serializer is None:
+        logger.warning(f"⚠️ 缓存序列化器 {name} 不可用，使用 npy")
+        serializer = _SERIALIZERS["npy"]
+    return serializer
+
+
+def encode_frame(df: pd.DataFrame, serializer: Optional[str] = None) -> bytes:
+    """DataFrame 编码为带版本头的二进制帧（Arrow 无法处理的列类型自动退回 npy）"""
+    ser = get_serializer(serializer)
+    try:
+        payload = ser.dumps(df)
+    except Exception as e:
+        if ser.name == "npy":
+            raise
+        logger.debug(f"{ser.name} 序列化失败，改用 npy: {e}")
+        ser = _SERIALIZERS["npy"]
+        payload = ser.dumps(df)
+    return _HEADER.pack(FRAME_MAGIC, FRAME_VERSION, ser.codec_id, 0) + payload
+
+
+def is_frame(data: Any) -> bool:
+    """是否为 encode_frame 生成的二进制帧"""
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:4]) == FRAME_MAGIC
+
+
+def decode_frame(data: BytesLike, zero_copy: bool = False) -> pd.DataFrame:
+    """
+    解码二进制帧
+
+    Args:
+        data: encode_frame 的输出（bytes/memoryview/mmap）
+        zero_copy: True 时数值列直接引用 data 的内存（只读），调用方需保证 data 存活
+    """
+    view = memoryview(data)
+    magic, version, codec, _ = _HEADER.unpack_from(view, 0)
+    if magic != FRAME_MAGIC:
+        raise ValueError("不是有效的缓存数据帧")
+    if version > FRAME_VERSION:
+        raise ValueError(f"不支持的缓存数据帧版本: {version}")
+    serializer = _SERIALIZERS.get(codec)
+    if serializer is None:
+        raise ValueError(f"缓存数据帧编码 {codec} 不可用（Arrow 帧需要安装 pyarrow）")
+    return serializer.loads(view[HEADER_SIZE:], zero_copy=zero_copy)
+
+
+def write_frame_file(path: Union[str, Path], df: pd.DataFrame, serializer: Optional[str] = None) -> int:
+    """将 DataFrame 写入帧文件（先写临时文件再原子替换），返回字节数"""
+    path = Path(path)
+    data = encode_frame(df, serializer)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+def read_frame_file(path: Union[str, Path], zero_copy: bool = False) -> pd.DataFrame:
+    """读取帧文件；zero_copy 时通过 mmap 映射文件，数值列不复制"""
+    with open(path, "rb") as f:
+        if not zero_copy:
+            return decode_frame(f.read())
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    # 返回的 DataFrame 引用 mmap，映射随对象回收一起释放
+    return decode_frame(mm, zero_copy=True)
+
+
+def decode_legacy(data: Union[str, bytes], data_format: str) -> pd.DataFrame:
+    """
+    读取旧格式的缓存数据
+
+    Args:
+        data: 文本内容
+        data_format: csv / dataframe_json（records）/ dataframe（to_json 默认 columns）
+    """
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode("utf-8")
+    if data_format == "csv":
+        return pd.read_csv(io.StringIO(data), index_col=0)
+    if data_format == "dataframe_json":
+        return pd.read_json(io.StringIO(data), orient="records")
+    return pd.read_json(io.StringIO(data))
@@ -6,6 +6,7 @@
 
 import os
 import time
+from datetime import datetime
 from typing import Dict, List, Optional, Any
 from enum import Enum
 import warnings
@@ -24,6 +25,10 @@ logger = setup_dataflow_logging()
 # 导入统一数据源编码
 from tradingagents.constants import DataSourceCode
 
+from tradingagents.config.config_snapshot import get_config_snapshot
+from tradingagents.utils.async_bridge import run_coroutine_sync
+from .hedged_fetch import HedgedFetcher
+
 
 class ChinaDataSource(Enum):
     """
@@ -77,6 +82,17 @@ class DataSourceManager:
         except Exception as e:
             logger.warning(f"⚠️ 统一缓存管理器初始化失败: {e}")
 
+        # 区间感知的日线K线存储（只拉取缺失区间）
+        self.bar_store = None
+        try:
+            from .cache.bar_store import get_bar_store
+            self.bar_store = get_bar_store()
+        except Exception as e:
+            logger.warning(f"⚠️ K线存储初始化失败: {e}")
+
+        # 多数据源对冲获取（主数据源超过 p95 未返回时启动下一个，失败过多的数据源熔断）
+        self.hedged_fetcher = HedgedFetcher()
+
         logger.info(f"📊 数据源管理器初始化完成")
         logger.info(f"   MongoDB缓存: {'✅ 已启用' if self.use_mongodb_cache else '❌ 未启用'}")
         logger.info(f"   统一缓存: {'✅ 已启用' if self.cache_enabled else '❌ 未启用'}")
@@ -102,37 +118,12 @@ class DataSourceManager:
         market_category = self._identify_market_category(symbol)
 
         try:
-            # 🔥 从数据库读取数据源配置（使用同步客户端）
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-            config_collection = db.system_configs
-
-            # 获取最新的激活配置
-            config_data = config_collection.find_one(
-                {"is_active": True},
-                sort=[("version", -1)]
-            )
+            # 🔥 从配置快照读取数据源配置（配置变更时才重新加载，热路径无数据库查询）
+            snapshot = get_config_snapshot()
 
-            if config_data and config_data.get('data_source_configs'):
-                data_source_configs = config_data.get('data_source_configs', [])
-
-                # 🔥 过滤出启用的数据源，并按市场分类过滤
-                enabled_sources = []
-                for ds in data_source_configs:
-                    if not ds.get('enabled', True):
-                        continue
-
-                    # 检查数据源是否属于当前市场分类
-                    market_categories = ds.get('market_categories', [])
-                    if market_categories and market_category:
-                        # 如果数据源配置了市场分类，只选择匹配的数据源
-                        if market_category not in market_categories:
-                            continue
-
-                    enabled_sources.append(ds)
-
-                # 按优先级排序（数字越大优先级越高）
-                enabled_sources.sort(key=lambda x: x.get('priority', 0), reverse=True)
+            if snapshot.data_source_configs:
+                # 🔥 启用的数据源，按市场分类过滤并按优先级排序（数字越大优先级越高）
+                enabled_sources = snapshot.enabled_data_sources(market_category)
 
                 # 转换为 ChinaDataSource 枚举（使用统一编码）
                 source_mapping = {
@@ -412,27 +403,14 @@ class DataSourceManager:
         """
         available = []
 
-        # 🔥 从数据库读取数据源配置，获取启用状态
+        # 🔥 从配置快照读取数据源配置，获取启用状态
         enabled_sources_in_db = set()
         try:
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-            config_collection = db.system_configs
-
-            # 获取最新的激活配置
-            config_data = config_collection.find_one(
-                {"is_active": True},
-                sort=[("version", -1)]
-            )
-
-            if config_data and config_data.get('data_source_configs'):
-                data_source_configs = config_data.get('data_source_configs', [])
+            snapshot = get_config_snapshot()
 
+            if snapshot.data_source_configs:
                 # 提取已启用的数据源类型
-                for ds in data_source_configs:
-                    if ds.get('enabled', True):
-                        ds_type = ds.get('type', '').lower()
-                        enabled_sources_in_db.add(ds_type)
+                enabled_sources_in_db = set(snapshot.enabled_types())
 
                 logger.info(f"✅ [数据源配置] 从数据库读取到已启用的数据源: {enabled_sources_in_db}")
             else:
@@ -507,30 +485,10 @@ class DataSourceManager:
         return available
 
     def _get_datasource_configs_from_db(self) -> dict:
-        """从数据库读取数据源配置（包括 API Key）"""
+        """从配置快照读取数据源配置（包括 API Key）"""
         try:
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-
-            # 从 system_configs 集合读取激活的配置
-            config = db.system_configs.find_one({"is_active": True})
-            if not config:
-                return {}
-
-            # 提取数据源配置
-            datasource_configs = config.get('data_source_configs', [])
-
             # 构建配置字典 {数据源名称: {api_key, api_secret, ...}}
-            result = {}
-            for ds_config in datasource_configs:
-                name = ds_config.get('name', '').lower()
-                result[name] = {
-                    'api_key': ds_config.get('api_key', ''),
-                    'api_secret': ds_config.get('api_secret', ''),
-                    'config_params': ds_config.get('config_params', {})
-                }
-
-            return result
+            return dict(get_config_snapshot().credentials())
         except Exception as e:
             logger.warning(f"⚠️ 从数据库读取数据源配置失败: {e}")
             return {}
@@ -659,6 +617,32 @@ class DataSourceManager:
         except Exception as e:
             logger.warning(f"⚠️ 保存数据到缓存失败: {e}")
 
+    def _load_bars(self, source: str, symbol: str, start_date: str, end_date: str, period: str,
+                   fetcher) -> Optional[pd.DataFrame]:
+        """
+        通过K线存储获取日线数据，只对本地缺失的区间调用 fetcher
+
+        Args:
+            source: 数据源名称（tushare/akshare/baostock）
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            period: 数据周期，仅 daily 使用K线存储
+            fetcher: fetcher(start_date, end_date) -> DataFrame
+
+        Returns:
+            DataFrame: K线数据，获取失败返回None
+        """
+        if self.bar_store is None or period != "daily" or not start_date:
+            return fetcher(start_date, end_date)
+
+        end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+        try:
+            return self.bar_store.get_range(symbol, start_date, end_date, fetcher, source=source, period=period)
+        except Exception as e:
+            logger.warning(f"⚠️ [K线存储] {symbol} 读取失败，直接请求数据源: {e}")
+            return fetcher(start_date, end_date)
+
     def _get_volume_safely(self, data: pd.DataFrame) -> float:
         """
         安全获取成交量数据
@@ -924,66 +908,61 @@ class DataSourceManager:
         logger.info(f"📊 [DataFrame接口] 获取股票数据: {symbol} ({start_date} 到 {end_date})")
 
         try:
-            # 尝试当前数据源
-            df = None
-            if self.current_source == ChinaDataSource.MONGODB:
-                from tradingagents.dataflows.cache.mongodb_cache_adapter import get_mongodb_cache_adapter
-                adapter = get_mongodb_cache_adapter()
-                df = adapter.get_historical_data(symbol, start_date, end_date, period=period)
-            elif self.current_source == ChinaDataSource.TUSHARE:
-                from .providers.china.tushare import get_tushare_provider
-                provider = get_tushare_provider()
-                df = provider.get_daily_data(symbol, start_date, end_date)
-            elif self.current_source == ChinaDataSource.AKSHARE:
-                from .providers.china.akshare import get_akshare_provider
-                provider = get_akshare_provider()
-                df = provider.get_stock_data(symbol, start_date, end_date)
-            elif self.current_source == ChinaDataSource.BAOSTOCK:
-                from .providers.china.baostock import get_baostock_provider
-                provider = get_baostock_provider()
-                df = provider.get_stock_data(symbol, start_date, end_date)
+            # 当前数据源优先；它失败或超过 p95 未返回时启动下一个数据源，先返回非空数据者胜出
+            sources = [self.current_source] + [s for s in self.available_sources if s != self.current_source]
+            outcome = self.hedged_fetcher.fetch(
+                sources,
+                lambda source: self._fetch_source_dataframe(source, symbol, start_date, end_date, period),
+                market=self._identify_market_category(symbol) or "default",
+                label=f"DataFrame {symbol}",
+                timeout=self.hedged_fetcher.default_timeout,
+            )
 
-            if df is not None and not df.empty:
-                logger.info(f"✅ [DataFrame接口] 从 {self.current_source.value} 获取成功: {len(df)}条")
-                return self._standardize_dataframe(df)
+            if outcome.ok:
+                logger.info(f"✅ [DataFrame接口] 从 {outcome.source.value} 获取成功: {len(outcome.result)}条")
+                return self._standardize_dataframe(outcome.result)
 
-            # 降级到其他数据源
-            logger.warning(f"⚠️ [DataFrame接口] {self.current_source.value} 失败，尝试降级")
-            for source in self.available_sources:
-                if source == self.current_source:
-                    continue
-                try:
-                    if source == ChinaDataSource.MONGODB:
-                        from tradingagents.dataflows.cache.mongodb_cache_adapter import get_mongodb_cache_adapter
-                        adapter = get_mongodb_cache_adapter()
-                        df = adapter.get_historical_data(symbol, start_date, end_date, period=period)
-                    elif source == ChinaDataSource.TUSHARE:
-                        from .providers.china.tushare import get_tushare_provider
-                        provider = get_tushare_provider()
-                        df = provider.get_daily_data(symbol, start_date, end_date)
-                    elif source == ChinaDataSource.AKSHARE:
-                        from .providers.china.akshare import get_akshare_provider
-                        provider = get_akshare_provider()
-                        df = provider.get_stock_data(symbol, start_date, end_date)
-                    elif source == ChinaDataSource.BAOSTOCK:
-                        from .providers.china.baostock import get_baostock_provider
-                        provider = get_baostock_provider()
-                        df = provider.get_stock_data(symbol, start_date, end_date)
-
-                    if df is not None and not df.empty:
-                        logger.info(f"✅ [DataFrame接口] 降级到 {source.value} 成功: {len(df)}条")
-                        return self._standardize_dataframe(df)
-                except Exception as e:
-                    logger.warning(f"⚠️ [DataFrame接口] {source.value} 失败: {e}")
-                    continue
-
-            logger.error(f"❌ [DataFrame接口] 所有数据源都失败: {symbol}")
+            logger.error(f"❌ [DataFrame接口] 所有数据源都失败: {symbol} {outcome.attempts}")
             return pd.DataFrame()
 
         except Exception as e:
             logger.error(f"❌ [DataFrame接口] 获取失败: {e}", exc_info=True)
             return pd.DataFrame()
 
+    def _provider_bar_fetcher(self, source: ChinaDataSource, symbol: str, period: str = "daily"):
+        """
+        构造外部数据源的K线获取函数 fetch(start_date, end_date) -> DataFrame
+
+        Returns:
+            tuple: (provider, fetch)，数据源不支持时返回 (None, None)
+        """
+        if source == ChinaDataSource.TUSHARE:
+            provider = self._get_tushare_adapter()
+            if not provider:
+                return None, None
+            return provider, lambda s, e: self._run_async_blocking(provider.get_historical_data(symbol, s, e))
+        if source == ChinaDataSource.AKSHARE:
+            from .providers.china.akshare import get_akshare_provider
+            provider = get_akshare_provider()
+        elif source == ChinaDataSource.BAOSTOCK:
+            from .providers.china.baostock import get_baostock_provider
+            provider = get_baostock_provider()
+        else:
+            return None, None
+        return provider, lambda s, e: self._run_async_blocking(provider.get_historical_data(symbol, s, e, period))
+
+    def _fetch_source_dataframe(self, source: ChinaDataSource, symbol: str, start_date: str, end_date: str,
+                                period: str = "daily") -> Optional[pd.DataFrame]:
+        """从指定数据源获取原始K线 DataFrame（外部数据源经K线存储只拉取缺失区间）"""
+        if source == ChinaDataSource.MONGODB:
+            from tradingagents.dataflows.cache.mongodb_cache_adapter import get_mongodb_cache_adapter
+            adapter = get_mongodb_cache_adapter()
+            return adapter.get_historical_data(symbol, start_date, end_date, period=period)
+        provider, fetch = self._provider_bar_fetcher(source, symbol, period)
+        if fetch is None:
+            return None
+        return self._load_bars(source.value, symbol, start_date, end_date, period, fetch)
+
     def _standardize_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         标准化 DataFrame 列名和格式
@@ -1064,18 +1043,18 @@ class DataSourceManager:
             # 根据数据源调用相应的获取方法
             actual_source = None  # 实际使用的数据源
 
+            fallback_done = False  # 对冲获取已经尝试过全部备用数据源
+
             if self.current_source == ChinaDataSource.MONGODB:
                 result, actual_source = self._get_mongodb_data(symbol, start_date, end_date, period)
-            elif self.current_source == ChinaDataSource.TUSHARE:
-                logger.info(f"🔍 [股票代码追踪] 调用 Tushare 数据源，传入参数: symbol='{symbol}', period='{period}'")
-                result = self._get_tushare_data(symbol, start_date, end_date, period)
-                actual_source = "tushare"
-            elif self.current_source == ChinaDataSource.AKSHARE:
-                result = self._get_akshare_data(symbol, start_date, end_date, period)
-                actual_source = "akshare"
-            elif self.current_source == ChinaDataSource.BAOSTOCK:
-                result = self._get_baostock_data(symbol, start_date, end_date, period)
-                actual_source = "baostock"
+            elif self.current_source in (ChinaDataSource.TUSHARE, ChinaDataSource.AKSHARE, ChinaDataSource.BAOSTOCK):
+                # 当前数据源优先，它失败或超过 p95 未返回时对冲到备用数据源
+                logger.info(f"🔍 [股票代码追踪] 调用 {self.current_source.value} 数据源，传入参数: symbol='{symbol}', period='{period}'")
+                result, actual_source = self._fetch_stock_data_hedged(
+                    [self.current_source] + self._fallback_source_order(symbol), symbol, start_date, end_date, period)
+                fallback_done = True
+                if result is None:
+                    result = f"❌ 所有数据源都无法获取{symbol}的{period}数据"
             # TDX 已移除
             else:
                 result = f"❌ 不支持的数据源: {self.current_source.value}"
@@ -1118,7 +1097,9 @@ class DataSourceManager:
                               })
 
                 # 数据质量异常时也尝试降级到其他数据源
-                fallback_result = self._try_fallback_sources(symbol, start_date, end_date)
+                fallback_result = None
+                if not fallback_done:
+                    fallback_result, _ = self._try_fallback_sources(symbol, start_date, end_date, period)
                 if fallback_result and "❌" not in fallback_result and "错误" not in fallback_result:
                     logger.info(f"✅ [数据来源: 备用数据源] 降级成功获取数据: {symbol}")
                     return fallback_result
@@ -1138,7 +1119,7 @@ class DataSourceManager:
                             'error': str(e),
                             'event_type': 'data_fetch_exception'
                         }, exc_info=True)
-            return self._try_fallback_sources(symbol, start_date, end_date)
+            return self._try_fallback_sources(symbol, start_date, end_date, period)[0]
 
     def _get_mongodb_data(self, symbol: str, start_date: str, end_date: str, period: str = "daily") -> tuple[str, str | None]:
         """
@@ -1181,30 +1162,8 @@ class DataSourceManager:
             return self._try_fallback_sources(symbol, start_date, end_date, period)
 
     def _run_async_blocking(self, coro):
-        import asyncio
-
-        try:
-            asyncio.get_running_loop()
-        except RuntimeError:
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_closed():
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-
-            return loop.run_until_complete(coro)
-
-        import concurrent.futures
-
-        def _runner():
-            import asyncio as _asyncio
-            return _asyncio.run(coro)
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            return executor.submit(_runner).result()
+        """在进程共享的后台事件循环中运行 provider 协程（复用事件循环和连接池）"""
+        return run_coroutine_sync(coro)
 
     def _get_tushare_data(self, symbol: str, start_date: str, end_date: str, period: str = "daily") -> str:
         """使用Tushare获取多周期数据 - 使用provider + 统一缓存"""
@@ -1219,41 +1178,38 @@ class DataSourceManager:
 
         start_time = time.time()
         try:
-            # 1. 先尝试从缓存获取
-            cached_data = self._get_cached_data(symbol, start_date, end_date, max_age_hours=24)
-            if cached_data is not None and not cached_data.empty:
-                logger.info(f"✅ [缓存命中] 从缓存获取{symbol}数据")
-                # 获取股票基本信息
-                provider = self._get_tushare_adapter()
-                if provider:
-                    stock_info = self._run_async_blocking(provider.get_stock_basic_info(symbol))
-                    stock_name = stock_info.get('name', f'股票{symbol}') if stock_info else f'股票{symbol}'
-                else:
-                    stock_name = f'股票{symbol}'
+            # 1. 未启用K线存储时，先尝试从缓存获取
+            if self.bar_store is None:
+                cached_data = self._get_cached_data(symbol, start_date, end_date, max_age_hours=24)
+                if cached_data is not None and not cached_data.empty:
+                    logger.info(f"✅ [缓存命中] 从缓存获取{symbol}数据")
+                    # 获取股票基本信息
+                    provider = self._get_tushare_adapter()
+                    if provider:
+                        stock_info = self._run_async_blocking(provider.get_stock_basic_info(symbol))
+                        stock_name = stock_info.get('name', f'股票{symbol}') if stock_info else f'股票{symbol}'
+                    else:
+                        stock_name = f'股票{symbol}'
 
-                # 格式化返回
-                return self._format_stock_data_response(cached_data, symbol, stock_name, start_date, end_date)
+                    # 格式化返回
+                    return self._format_stock_data_response(cached_data, symbol, stock_name, start_date, end_date)
 
-            # 2. 缓存未命中，从provider获取
+            # 2. 从provider获取（K线存储只拉取本地缺失的区间）
             logger.info(f"🔍 [股票代码追踪] 调用 tushare_provider，传入参数: symbol='{symbol}'")
             logger.info(f"🔍 [DataSourceManager详细日志] 开始调用tushare_provider...")
 
-            provider = self._get_tushare_adapter()
+            provider, fetch = self._provider_bar_fetcher(ChinaDataSource.TUSHARE, symbol, period)
             if not provider:
                 return f"❌ Tushare提供器不可用"
 
-            async def _fetch_tushare():
-                hist = await provider.get_historical_data(symbol, start_date, end_date)
-                if hist is None or hist.empty:
-                    return hist, None
-                info = await provider.get_stock_basic_info(symbol)
-                return hist, info
-
-            data, stock_info = self._run_async_blocking(_fetch_tushare())
+            data = self._load_bars("tushare", symbol, start_date, end_date, period, fetch)
+            stock_info = None
+            if data is not None and not data.empty:
+                stock_info = self._run_async_blocking(provider.get_stock_basic_info(symbol))
 
             if data is not None and not data.empty:
-                # 保存到缓存
-                self._save_to_cache(symbol, data, start_date, end_date)
+                if self.bar_store is None:
+                    self._save_to_cache(symbol, data, start_date, end_date)
 
                 stock_name = stock_info.get('name', f'股票{symbol}') if stock_info else f'股票{symbol}'
 
@@ -1286,18 +1242,12 @@ class DataSourceManager:
 
         start_time = time.time()
         try:
-            # 使用AKShare的统一接口
-            from .providers.china.akshare import get_akshare_provider
-            provider = get_akshare_provider()
-
-            async def _fetch_akshare():
-                hist = await provider.get_historical_data(symbol, start_date, end_date, period)
-                if hist is None or hist.empty:
-                    return hist, None
-                info = await provider.get_stock_basic_info(symbol)
-                return hist, info
-
-            data, stock_info = self._run_async_blocking(_fetch_akshare())
+            # 使用AKShare的统一接口（K线存储只拉取本地缺失的区间）
+            provider, fetch = self._provider_bar_fetcher(ChinaDataSource.AKSHARE, symbol, period)
+            data = self._load_bars("akshare", symbol, start_date, end_date, period, fetch)
+            stock_info = None
+            if data is not None and not data.empty:
+                stock_info = self._run_async_blocking(provider.get_stock_basic_info(symbol))
 
             duration = time.time() - start_time
 
@@ -1324,18 +1274,12 @@ class DataSourceManager:
 
     def _get_baostock_data(self, symbol: str, start_date: str, end_date: str, period: str = "daily") -> str:
         """使用BaoStock获取多周期数据 - 包含技术指标计算"""
-        # 使用BaoStock的统一接口
-        from .providers.china.baostock import get_baostock_provider
-        provider = get_baostock_provider()
-
-        async def _fetch_baostock():
-            hist = await provider.get_historical_data(symbol, start_date, end_date, period)
-            if hist is None or hist.empty:
-                return hist, None
-            info = await provider.get_stock_basic_info(symbol)
-            return hist, info
-
-        data, stock_info = self._run_async_blocking(_fetch_baostock())
+        # 使用BaoStock的统一接口（K线存储只拉取本地缺失的区间）
+        provider, fetch = self._provider_bar_fetcher(ChinaDataSource.BAOSTOCK, symbol, period)
+        data = self._load_bars("baostock", symbol, start_date, end_date, period, fetch)
+        stock_info = None
+        if data is not None and not data.empty:
+            stock_info = self._run_async_blocking(provider.get_stock_basic_info(symbol))
 
         if data is not None and not data.empty:
             # 🔧 修复：使用统一的格式化方法，包含技术指标计算
@@ -1384,39 +1328,63 @@ class DataSourceManager:
         """
         logger.info(f"🔄 [{self.current_source.value}] 失败，尝试备用数据源获取{period}数据: {symbol}")
 
-        # 🔥 从数据库获取数据源优先级顺序（根据股票代码识别市场）
-        # 注意：不包含MongoDB，因为MongoDB是最高优先级，如果失败了就不再尝试
-        fallback_order = self._get_data_source_priority_order(symbol)
+        result, actual_source = self._fetch_stock_data_hedged(
+            self._fallback_source_order(symbol), symbol, start_date, end_date, period)
+        if actual_source:
+            logger.info(f"✅ [备用数据源-{actual_source}] 成功获取{period}数据: {symbol}")
+            return result, actual_source  # 返回结果和实际使用的数据源
 
-        for source in fallback_order:
-            if source != self.current_source and source in self.available_sources:
-                try:
-                    logger.info(f"🔄 [备用数据源] 尝试 {source.value} 获取{period}数据: {symbol}")
+        logger.error(f"❌ [所有数据源失败] 无法获取{period}数据: {symbol}")
+        return f"❌ 所有数据源都无法获取{symbol}的{period}数据", None
 
-                    # 直接调用具体的数据源方法，避免递归
-                    if source == ChinaDataSource.TUSHARE:
-                        result = self._get_tushare_data(symbol, start_date, end_date, period)
-                    elif source == ChinaDataSource.AKSHARE:
-                        result = self._get_akshare_data(symbol, start_date, end_date, period)
-                    elif source == ChinaDataSource.BAOSTOCK:
-                        result = self._get_baostock_data(symbol, start_date, end_date, period)
-                    # TDX 已移除
-                    else:
-                        logger.warning(f"⚠️ 未知数据源: {source.value}")
-                        continue
+    def _fallback_source_order(self, symbol: str) -> List[ChinaDataSource]:
+        """
+        备用数据源顺序（不含当前数据源）
 
-                    if "❌" not in result:
-                        logger.info(f"✅ [备用数据源-{source.value}] 成功获取{period}数据: {symbol}")
-                        return result, source.value  # 返回结果和实际使用的数据源
-                    else:
-                        logger.warning(f"⚠️ [备用数据源-{source.value}] 返回错误结果: {symbol}")
+        🔥 从数据库获取数据源优先级顺序（根据股票代码识别市场）
+        注意：不包含MongoDB，因为MongoDB是最高优先级，如果失败了就不再尝试
+        """
+        return [
+            source for source in self._get_data_source_priority_order(symbol)
+            if source != self.current_source and source in self.available_sources
+            and source != ChinaDataSource.MONGODB
+        ]
 
-                except Exception as e:
-                    logger.error(f"❌ [备用数据源-{source.value}] 获取失败: {symbol}, 错误: {e}")
-                    continue
+    def _get_source_data(self, source: ChinaDataSource, symbol: str, start_date: str, end_date: str,
+                         period: str = "daily") -> str:
+        """直接调用具体的数据源方法（避免递归）"""
+        if source == ChinaDataSource.TUSHARE:
+            return self._get_tushare_data(symbol, start_date, end_date, period)
+        if source == ChinaDataSource.AKSHARE:
+            return self._get_akshare_data(symbol, start_date, end_date, period)
+        if source == ChinaDataSource.BAOSTOCK:
+            return self._get_baostock_data(symbol, start_date, end_date, period)
+        # TDX 已移除
+        raise ValueError(f"未知数据源: {source.value}")
 
-        logger.error(f"❌ [所有数据源失败] 无法获取{period}数据: {symbol}")
-        return f"❌ 所有数据源都无法获取{symbol}的{period}数据", None
+    def _fetch_stock_data_hedged(self, sources: List[ChinaDataSource], symbol: str, start_date: str,
+                                 end_date: str, period: str = "daily") -> tuple[str | None, str | None]:
+        """
+        按优先级对冲获取格式化的股票数据
+
+        Returns:
+            tuple[str | None, str | None]: (结果字符串, 实际使用的数据源名称)；全部失败时数据源为 None，
+            结果为第一个数据源返回的错误信息（可能为 None）
+        """
+        if not sources:
+            return None, None
+        outcome = self.hedged_fetcher.fetch(
+            sources,
+            lambda source: self._get_source_data(source, symbol, start_date, end_date, period),
+            market=self._identify_market_category(symbol) or "default",
+            label=f"{symbol} {period}",
+            timeout=self.hedged_fetcher.default_timeout,
+        )
+        if outcome.ok:
+            return outcome.result, outcome.source.value
+        for attempt in outcome.attempts:
+            logger.warning(f"⚠️ [备用数据源-{attempt['source']}] {attempt['status']}: {symbol} {attempt.get('error', '')}")
+        return outcome.result, None
 
     def get_stock_info(self, symbol: str) -> Dict:
         """
@@ -1744,7 +1712,7 @@ class DataSourceManager:
     def _get_baostock_stock_info(self, symbol: str) -> Dict:
         """使用BaoStock获取股票基本信息"""
         try:
-            import baostock as bs
+            from .providers.china.baostock_session import BaoStockError, get_baostock_session
 
             # 转换股票代码格式
             if symbol.startswith('6'):
@@ -1752,27 +1720,13 @@ class DataSourceManager:
             else:
                 bs_code = f"sz.{symbol}"
 
-            # 登录BaoStock
-            lg = bs.login()
-            if lg.error_code != '0':
-                logger.error(f"❌ [股票信息] BaoStock登录失败: {lg.error_msg}")
-                return {'symbol': symbol, 'name': f'股票{symbol}', 'source': 'baostock'}
-
-            # 查询股票基本信息
-            rs = bs.query_stock_basic(code=bs_code)
-            if rs.error_code != '0':
-                bs.logout()
-                logger.error(f"❌ [股票信息] BaoStock查询失败: {rs.error_msg}")
+            # 查询股票基本信息（复用进程内共享的BaoStock会话）
+            try:
+                data_list, _ = get_baostock_session().query("query_stock_basic", code=bs_code)
+            except BaoStockError as e:
+                logger.error(f"❌ [股票信息] BaoStock查询失败: {e}")
                 return {'symbol': symbol, 'name': f'股票{symbol}', 'source': 'baostock'}
 
-            # 解析结果
-            data_list = []
-            while (rs.error_code == '0') & rs.next():
-                data_list.append(rs.get_row_data())
-
-            # 登出
-            bs.logout()
-
             if data_list:
                 # BaoStock返回格式: [code, code_name, ipoDate, outDate, type, status]
                 info = {'symbol': symbol, 'source': 'baostock'}
@@ -2456,30 +2410,10 @@ class USDataSourceManager:
             return ['yfinance', 'alpha_vantage', 'finnhub']
 
     def _get_datasource_configs_from_db(self) -> dict:
-        """从数据库读取数据源配置（包括 API Key）"""
+        """从配置快照读取数据源配置（包括 API Key）"""
         try:
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-
-            # 从 system_configs 集合读取激活的配置
-            config = db.system_configs.find_one({"is_active": True})
-            if not config:
-                return {}
-
-            # 提取数据源配置
-            datasource_configs = config.get('data_source_configs', [])
-
             # 构建配置字典 {数据源名称: {api_key, api_secret, ...}}
-            result = {}
-            for ds_config in datasource_configs:
-                name = ds_config.get('name', '').lower()
-                result[name] = {
-                    'api_key': ds_config.get('api_key', ''),
-                    'api_secret': ds_config.get('api_secret', ''),
-                    'config_params': ds_config.get('config_params', {})
-                }
-
-            return result
+            return dict(get_config_snapshot().credentials())
         except Exception as e:
             logger.warning(f"⚠️ 从数据库读取数据源配置失败: {e}")
             return {}
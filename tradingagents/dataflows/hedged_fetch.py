@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+多数据源对冲获取
+
+原先各数据源严格串行尝试（Tushare -> AKShare -> BaoStock），主数据源变慢或挂起时，
+每个请求都要等它超时后才开始降级。这里按 (数据源, 市场) 统计滚动延迟与错误率：
+
+- 主数据源超过自身 p95 延迟仍未返回时，投机地启动后续第一个允许对冲的数据源
+  （TA_HEDGE_SOURCES，默认 baostock），先返回有效结果者胜出；Tushare/AKShare 等有调用配额的
+  数据源不会被投机启动，只在前面的数据源失败后按优先级调用
+- 整体超时（TA_HEDGE_TIMEOUT，默认 30 秒）后返回，挂起的数据源不会无限阻塞调用方；
+  超时未返回计为一次失败，持续挂起的数据源会被熔断，不再占用线程池
+- 数据源失败（异常或无效结果）时立即启动下一个，不再等待
+- 连续失败或错误率过高的数据源熔断一段时间，之后放行一次试探请求（半开）
+- 胜出后取消尚未开始执行的请求；已在执行的落后请求在后台继续完成，其耗时和结果仍计入统计
+"""
+
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from tradingagents.config.runtime_settings import get_float, get_int
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 默认允许投机启动的数据源：没有调用配额限制，重复请求不会挤占限额
+DEFAULT_HEDGE_SOURCES = "baostock"
+
+
+def _source_key(source: Any) -> str:
+    """数据源枚举取 value（ChinaDataSource 的 value 仍是 DataSourceCode 枚举，逐层展开），其余转为字符串"""
+    while isinstance(source, Enum):
+        source = source.value
+    return str(source)
+
+
+def _default_is_valid(result: Any) -> bool:
+    if result is None:
+        return False
+    empty = getattr(result, "empty", None)
+    if isinstance(empty, bool):
+        return not empty
+    if isinstance(result, str):
+        return bool(result) and "❌" not in result
+    if isinstance(result, (list, dict, tuple)):
+        return bool(result)
+    return True
+
+
+class SourceHealth:
+    """单个 (数据源, 市场) 的滚动延迟、错误率与熔断状态（由 SourceHealthTracker 加锁访问）"""
+
+    def __init__(self, window: int = 50, failure_threshold: int = 5, error_rate_threshold: float = 0.5,
+                 min_samples: int = 10, cooldown: float = 30.0):
+        self.latencies: deque = deque(maxlen=window)  # 成功请求的耗时
+        self.outcomes: deque = deque(maxlen=window)   # True 成功 / False 失败
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.open_until = 0.0
+        self.trial_inflight = False
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+
+    def p95(self, min_samples: int = 5) -> Optional[float]:
+        if len(self.latencies) < min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+
+    def error_rate(self) -> float:
+        return (self.outcomes.count(False) / len(self.outcomes)) if self.outcomes else 0.0
+
+    def is_open(self, now: float) -> bool:
+        """熔断中且冷却未结束（只查询，不占用半开试探名额）"""
+        return self.state == OPEN and now < self.open_until
+
+    def allow(self, now: float) -> bool:
+        """是否允许请求；熔断冷却结束后只放行一个试探请求"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and now >= self.open_until:
+            self.state = HALF_OPEN
+            self.trial_inflight = False
+        if self.state == HALF_OPEN and not self.trial_inflight:
+            self.trial_inflight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def release_trial(self):
+        """放行的试探请求未执行（被取消）时归还试探名额"""
+        if self.state == HALF_OPEN:
+            self.trial_inflight = False
+
+    def record(self, latency: float, ok: bool, now: float) -> Optional[str]:
+        """记录一次结果，返回熔断状态变化（opened/closed）"""
+        self.calls += 1
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                self.state = CLOSED
+                self.trial_inflight = False
+                return "closed"
+            return None
+
+        self.failures += 1
+        self.consecutive_failures += 1
+        tripped = (
+            self.state == HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+            or (len(self.outcomes) >= self.min_samples and self.error_rate() >= self.error_rate_threshold)
+        )
+        if tripped and self.state != OPEN:
+            self.state = OPEN
+            self.open_until = now + self.cooldown
+            self.trial_inflight = False
+            return "opened"
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        p95 = self.p95()
+        return {
+            "state": self.state,
+            "calls": self.calls,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "error_rate": round(self.error_rate(), 3),
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class SourceHealthTracker:
+    """按 (数据源, 市场) 汇总健康度，决定熔断与对冲等待时间"""
+
+    def __init__(self, default_delay: Optional[float] = None, min_delay: Optional[float] = None,
+                 max_delay: Optional[float] = None, **health_options):
+        """
+        Args:
+            default_delay: 样本不足时的对冲等待时间（秒）
+            min_delay / max_delay: 对冲等待时间（p95）的上下限
+            health_options: 传给 SourceHealth（window/failure_threshold/error_rate_threshold/min_samples/cooldown）
+        """
+        self.default_delay = default_delay if default_delay is not None else get_float(
+            "TA_HEDGE_DEFAULT_DELAY_SECONDS", "ta_hedge_default_delay_seconds", 3.0)
+        self.min_delay = min_delay if min_delay is not None else get_float(
+            "TA_HEDGE_MIN_DELAY_SECONDS", "ta_hedge_min_delay_seconds", 0.2)
+        self.max_delay = max_delay if max_delay is not None else get_float(
+            "TA_HEDGE_MAX_DELAY_SECONDS", "ta_hedge_max_delay_seconds", 10.0)
+        health_options.setdefault("cooldown", get_float(
+            "TA_SOURCE_BREAKER_COOLDOWN_SECONDS", "ta_source_breaker_cooldown_seconds", 30.0))
+        health_options.setdefault("failure_threshold", get_int(
+            "TA_SOURCE_BREAKER_FAILURES", "ta_source_breaker_failures", 5))
+        self.health_options = health_options
+        self._lock = threading.Lock()
+        self._health: Dict[Tuple[str, str], SourceHealth] = {}
+
+    def _get(self, source: Any, market: str) -> SourceHealth:
+        key = (_source_key(source), market)
+        health = self._health.get(key)
+        if health is None:
+            health = self._health[key] = SourceHealth(**self.health_options)
+        return health
+
+    def is_open(self, source: Any, market: str = "default") -> bool:
+        with self._lock:
+            return self._get(source, market).is_open(time.monotonic())
+
+    def allow(self, source: Any, market: str = "default") -> bool:
+        with self._lock:
+            return self._get(source, market).allow(time.monotonic())
+
+    def release_trial(self, source: Any, market: str = "default"):
+        with self._lock:
+            self._get(source, market).release_trial()
+
+    def record(self, source: Any, market: str, latency: float, ok: bool):
+        with self._lock:
+            change = self._get(source, market).record(latency, ok, time.monotonic())
+        if change == "opened":
+            logger.warning(f"🔌 [数据源熔断] {_source_key(source)}@{market} 失败过多，暂停使用")
+        elif change == "closed":
+            logger.info(f"🔌 [数据源熔断] {_source_key(source)}@{market} 已恢复")
+
+    def hedge_delay(self, source: Any, market: str = "default") -> float:
+        """启动对冲请求前等待的时间：该数据源的 p95 延迟（样本不足时使用默认值）"""
+        with self._lock:
+            p95 = self._get(source, market).p95()
+        delay = self.default_delay if p95 is None else p95
+        return min(self.max_delay, max(self.min_delay, delay))
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {f"{source}@{market}": h.snapshot() for (source, market), h in self._health.items()}
+
+
+@dataclass
+class FetchOutcome:
+    """对冲获取结果"""
+    result: Any = None
+    source: Any = None                      # 胜出的数据源，全部失败时为 None
+    attempts: List[Dict[str, Any]] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)  # 熔断跳过的数据源
+    hedged: bool = False                    # 是否启动过投机请求
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.source is not None
+
+
+class HedgedFetcher:
+    """按优先级对冲获取：先返回有效结果的数据源胜出"""
+
+    def __init__(self, tracker: Optional[SourceHealthTracker] = None, max_parallel: Optional[int] = None,
+                 executor: Optional[ThreadPoolExecutor] = None, hedge_sources: Optional[Iterable[Any]] = None):
+        """
+        Args:
+            tracker: 健康度统计（默认使用全局实例）
+            max_parallel: 同时进行的请求数上限（含主请求）
+            executor: 执行请求的线程池（默认使用全局线程池）
+            hedge_sources: 允许投机启动的数据源，默认读取 TA_HEDGE_SOURCES（逗号分隔）；
+                其余数据源只在前一个数据源失败后才调用
+        """
+        # 调用方传给 fetch() 的整体超时（秒）
+        self.default_timeout = get_float("TA_HEDGE_TIMEOUT", "ta_hedge_timeout", 30.0)
+        # 已计入统计的请求（超时时先计为失败，之后完成时不再重复记录）
+        self._recorded: "weakref.WeakSet" = weakref.WeakSet()
+        self._recorded_lock = threading.Lock()
+        self.tracker = tracker if tracker is not None else get_source_health_tracker()
+        self.max_parallel = max(1, max_parallel or get_int("TA_HEDGE_MAX_PARALLEL", "ta_hedge_max_parallel", 2))
+        self._executor = executor
+        if hedge_sources is None:
+            hedge_sources = os.getenv("TA_HEDGE_SOURCES", DEFAULT_HEDGE_SOURCES).split(",")
+        self.hedge_sources: FrozenSet[str] = frozenset(
+            _source_key(s).strip().lower() for s in hedge_sources if _source_key(s).strip())
+
+    def can_hedge_to(self, source: Any) -> bool:
+        """该数据源是否允许被投机启动"""
+        return _source_key(source).lower() in self.hedge_sources
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        return self._executor if self._executor is not None else _get_executor()
+
+    def fetch(self, sources: Iterable[Any], fn: Callable[[Any], Any],
+              is_valid: Callable[[Any], bool] = _default_is_valid, market: str = "default",
+              label: str = "", timeout: Optional[float] = None) -> FetchOutcome:
+        """
+        Args:
+            sources: 按优先级排列的数据源
+            fn: fn(source) -> 结果，在线程池中执行
+            is_valid: 判断结果是否有效（无效结果视为失败并继续下一个数据源）
+            market: 统计维度（如 a_shares）
+            label: 日志标签
+            timeout: 整体超时（秒），None 表示等到所有数据源都结束
+        """
+        started = time.monotonic()
+        outcome = FetchOutcome()
+        sources = list(dict.fromkeys(sources))
+        # 全部熔断时仍按优先级尝试，避免完全不可用
+        force = all(self.tracker.is_open(s, market) for s in sources)
+        queue = deque(sources)
+        pending: Dict[Any, Tuple[Any, float]] = {}
+        deadline = started + timeout if timeout is not None else None
+        last_launch: Tuple[Any, float] = (None, started)
+
+        def next_source(speculative: bool = False):
+            """
+            取下一个可用数据源（在真正启动前才占用半开试探名额）
+
+            投机启动时跳过不允许对冲的数据源，它们按原顺序留在队列中，供失败降级时使用
+            """
+            kept = []
+            try:
+                while queue:
+                    source = queue.popleft()
+                    if speculative and not self.can_hedge_to(source):
+                        kept.append(source)
+                        continue
+                    if force or self.tracker.allow(source, market):
+                        return source
+                    outcome.skipped.append(_source_key(source))
+                    logger.info(f"🔌 [对冲获取] {label} 跳过熔断中的数据源: {_source_key(source)}")
+                return None
+            finally:
+                queue.extendleft(reversed(kept))
+
+        def launch(speculative: bool = False) -> bool:
+            nonlocal last_launch
+            source = next_source(speculative)
+            if source is None:
+                return False
+            began = time.monotonic()
+            future = self.executor.submit(fn, source)
+            future.add_done_callback(lambda f, s=source, b=began: self._record(s, market, b, f, is_valid))
+            pending[future] = (source, began)
+            last_launch = (source, began)
+            return True
+
+        def abandon_pending(timed_out: bool = False):
+            """
+            取消尚未开始执行的请求（不占用数据源配额），已在执行的请求在后台完成
+
+            超时时仍在执行的请求立即计为失败，挂起的数据源累计失败后被熔断
+            """
+            for future, (source, began) in pending.items():
+                if future.cancel():
+                    status = "cancelled"
+                else:
+                    status = "abandoned"
+                    if timed_out and self._claim(future):
+                        self.tracker.record(source, market, time.monotonic() - began, False)
+                outcome.attempts.append({"source": _source_key(source), "status": status})
+
+        launch()
+        while pending:
+            now = time.monotonic()
+            wait_timeout = None
+            can_hedge = len(pending) < self.max_parallel and any(self.can_hedge_to(s) for s in queue)
+            if can_hedge:
+                wait_timeout = max(0.0, last_launch[1] + self.tracker.hedge_delay(last_launch[0], market) - now)
+            if deadline is not None:
+                remaining = max(0.0, deadline - now)
+                wait_timeout = remaining if wait_timeout is None else min(wait_timeout, remaining)
+
+            done, _ = wait(list(pending), timeout=wait_timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                source, began = pending.pop(future)
+                attempt = {"source": _source_key(source), "seconds": round(time.monotonic() - began, 3)}
+                try:
+                    result = future.result()
+                except Exception as e:
+                    outcome.attempts.append({**attempt, "status": "error", "error": str(e)})
+                    logger.warning(f"⚠️ [对冲获取] {label} {_source_key(source)} 失败: {e}")
+                    continue
+                if is_valid(result):
+                    outcome.attempts.append({**attempt, "status": "ok"})
+                    outcome.result, outcome.source = result, source
+                    abandon_pending()
+                    outcome.elapsed = time.monotonic() - started
+                    if outcome.hedged or len(outcome.attempts) > 1:
+                        logger.info(f"🏁 [对冲获取] {label} 由 {_source_key(source)} 胜出，耗时 {outcome.elapsed:.2f}秒")
+                    return outcome
+                outcome.attempts.append({**attempt, "status": "invalid"})
+                if outcome.result is None:
+                    outcome.result = result  # 全部失败时返回第一个无效结果（通常带错误信息）
+
+            if deadline is not None and time.monotonic() >= deadline:
+                logger.warning(f"⏰ [对冲获取] {label} 超时（{timeout}秒）")
+                break
+            if not queue or len(pending) >= self.max_parallel:
+                continue
+            if not done:
+                # 当前请求超过 p95 仍未返回：投机启动下一个数据源
+                slow = last_launch[0]
+                if launch(speculative=True):
+                    outcome.hedged = True
+                    logger.info(f"🔀 [对冲获取] {label} {_source_key(slow)} 超过 "
+                                f"{self.tracker.hedge_delay(slow, market):.2f}秒未返回，"
+                                f"启动 {_source_key(last_launch[0])}")
+            else:
+                # 有请求失败：立即启动下一个数据源
+                launch()
+
+        abandon_pending(timed_out=deadline is not None and time.monotonic() >= deadline)
+        outcome.elapsed = time.monotonic() - started
+        return outcome
+
+    def _claim(self, future) -> bool:
+        """每个请求只计入统计一次"""
+        with self._recorded_lock:
+            if future in self._recorded:
+                return False
+            self._recorded.add(future)
+            return True
+
+    def _record(self, source, market, began, future, is_valid):
+        if future.cancelled():
+            # 请求未执行：不计入统计，归还可能占用的半开试探名额
+            self.tracker.release_trial(source, market)
+            return
+        if not self._claim(future):
+            return
+        try:
+            ok = future.exception() is None and is_valid(future.result())
+        except Exception:
+            ok = False
+        self.tracker.record(source, market, time.monotonic() - began, ok)
+
+
+_tracker: Optional[SourceHealthTracker] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_init_lock = threading.Lock()
+
+
+def get_source_health_tracker() -> SourceHealthTracker:
+    """获取全局数据源健康度统计（进程内共享）"""
+    global _tracker
+    with _init_lock:
+        if _tracker is None:
+            _tracker = SourceHealthTracker()
+        return _tracker
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _init_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_int("TA_HEDGE_MAX_WORKERS", "ta_hedge_max_workers", 16),
+                thread_name_prefix="hedged-fetch",
+            )
+        return _executor
@@ -18,6 +18,9 @@ from .news.chinese_finance import get_chinese_social_sentiment
 
 from .providers.us import get_data_in_range
 
+# 数据源配置快照
+from tradingagents.config.config_snapshot import get_config_snapshot
+
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import setup_dataflow_logging
@@ -60,44 +63,19 @@ def _get_enabled_hk_data_sources() -> list:
         list: 按优先级排序的数据源列表，如 ['akshare', 'yfinance']
     """
     try:
-        # 尝试从数据库读取配置
-        from app.core.database import get_mongo_db_sync
-        db = get_mongo_db_sync()
-
-        # 获取最新的激活配置
-        config_data = db.system_configs.find_one(
-            {"is_active": True},
-            sort=[("version", -1)]
-        )
-
-        if config_data and config_data.get('data_source_configs'):
-            data_source_configs = config_data.get('data_source_configs', [])
+        # 从配置快照读取（配置变更时才重新加载，热路径无数据库查询）
+        snapshot = get_config_snapshot()
 
-            # 过滤出启用的港股数据源
-            enabled_sources = []
-            for ds in data_source_configs:
-                if not ds.get('enabled', True):
-                    continue
+        if snapshot.data_source_configs:
+            # 启用且支持港股市场（支持中英文标识）的数据源，已按优先级排序（数字越大优先级越高）
+            enabled_sources = snapshot.enabled_data_sources('港股', 'hk_stocks')
 
-                # 检查是否支持港股市场（支持中英文标识）
-                market_categories = ds.get('market_categories', [])
-                if market_categories:
-                    # 支持 '港股' 或 'hk_stocks'
-                    if '港股' not in market_categories and 'hk_stocks' not in market_categories:
-                        continue
-
-                # 映射数据源类型
+            # 映射数据源类型
+            result = []
+            for ds in enabled_sources:
                 ds_type = ds.get('type', '').lower()
                 if ds_type in ['akshare', 'yfinance', 'finnhub']:
-                    enabled_sources.append({
-                        'type': ds_type,
-                        'priority': ds.get('priority', 0)
-                    })
-
-            # 按优先级排序（数字越大优先级越高）
-            enabled_sources.sort(key=lambda x: x['priority'], reverse=True)
-
-            result = [s['type'] for s in enabled_sources]
+                    result.append(ds_type)
             if result:
                 logger.info(f"✅ [港股数据源] 从数据库读取: {result}")
                 return result
@@ -120,44 +98,19 @@ def _get_enabled_us_data_sources() -> list:
         list: 按优先级排序的数据源列表，如 ['yfinance', 'finnhub']
     """
     try:
-        # 尝试从数据库读取配置
-        from app.core.database import get_mongo_db_sync
-        db = get_mongo_db_sync()
-
-        # 获取最新的激活配置
-        config_data = db.system_configs.find_one(
-            {"is_active": True},
-            sort=[("version", -1)]
-        )
-
-        if config_data and config_data.get('data_source_configs'):
-            data_source_configs = config_data.get('data_source_configs', [])
-
-            # 过滤出启用的美股数据源
-            enabled_sources = []
-            for ds in data_source_configs:
-                if not ds.get('enabled', True):
-                    continue
+        # 从配置快照读取（配置变更时才重新加载，热路径无数据库查询）
+        snapshot = get_config_snapshot()
 
-                # 检查是否支持美股市场（支持中英文标识）
-                market_categories = ds.get('market_categories', [])
-                if market_categories:
-                    # 支持 '美股' 或 'us_stocks'
-                    if '美股' not in market_categories and 'us_stocks' not in market_categories:
-                        continue
+        if snapshot.data_source_configs:
+            # 启用且支持美股市场（支持中英文标识）的数据源，已按优先级排序（数字越大优先级越高）
+            enabled_sources = snapshot.enabled_data_sources('美股', 'us_stocks')
 
-                # 映射数据源类型
+            # 映射数据源类型
+            result = []
+            for ds in enabled_sources:
                 ds_type = ds.get('type', '').lower()
                 if ds_type in ['yfinance', 'finnhub']:
-                    enabled_sources.append({
-                        'type': ds_type,
-                        'priority': ds.get('priority', 0)
-                    })
-
-            # 按优先级排序（数字越大优先级越高）
-            enabled_sources.sort(key=lambda x: x['priority'], reverse=True)
-
-            result = [s['type'] for s in enabled_sources]
+                    result.append(ds_type)
             if result:
                 logger.info(f"✅ [美股数据源] 从数据库读取: {result}")
                 return result
@@ -742,39 +695,23 @@ def get_stock_stats_indicators_window(
     curr_date = datetime.strptime(curr_date, "%Y-%m-%d")
     before = curr_date - relativedelta(days=look_back_days)
 
-    if not online:
-        # read from YFin data
-        data = pd.read_csv(
-            os.path.join(
-                DATA_DIR,
-                f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-            )
+    # 行情只读取一次，指标在整段序列上计算一次，再切出窗口内的交易日
+    try:
+        window = StockstatsUtils.get_stock_stats_window(
+            symbol,
+            indicator,
+            end_date,
+            look_back_days,
+            os.path.join(DATA_DIR, "market_data", "price_data"),
+            online=online,
         )
-        data["Date"] = pd.to_datetime(data["Date"], utc=True)
-        dates_in_df = data["Date"].astype(str).str[:10]
-
-        ind_string = ""
-        while curr_date >= before:
-            # only do the trading dates
-            if curr_date.strftime("%Y-%m-%d") in dates_in_df.values:
-                indicator_value = get_stockstats_indicator(
-                    symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
-                )
-
-                ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
-
-            curr_date = curr_date - relativedelta(days=1)
-    else:
-        # online gathering
-        ind_string = ""
-        while curr_date >= before:
-            indicator_value = get_stockstats_indicator(
-                symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
-            )
-
-            ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
+    except Exception as e:
+        print(
+            f"Error getting stockstats indicator window for indicator {indicator} on {end_date}: {e}"
+        )
+        window = []
 
-            curr_date = curr_date - relativedelta(days=1)
+    ind_string = "".join(f"{date}: {value}\n" for date, value in window)
 
     result_str = (
         f"## {indicator} values from {before.strftime('%Y-%m-%d')} to {end_date}:\n\n"
@@ -6,13 +6,16 @@
 
 import requests
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
-from typing import List, Dict, Optional
+from typing import Any, Callable, List, Dict, Optional, Tuple
 import time
 import os
 from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
 
 # 导入日志模块
 from tradingagents.config.runtime_settings import get_timezone_name
@@ -34,13 +37,125 @@ class NewsItem:
     relevance_score: float
 
 
+# 并发聚合配置
+DEFAULT_NEWS_DEADLINE = float(os.getenv('NEWS_AGGREGATOR_DEADLINE', '8'))
+NEWS_CONNECT_TIMEOUT = 3.05
+NEWS_MAX_WORKERS = 8
+
+_session: Optional[requests.Session] = None
+_shared_lock = threading.Lock()
+
+
+def get_news_http_session() -> requests.Session:
+    """
+    获取进程内共享的HTTP会话
+
+    urllib3按主机维护连接池，复用同一会话即可在多次聚合之间保持keep-alive连接，
+    避免每次请求重新握手。
+    """
+    global _session
+    if _session is None:
+        with _shared_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=16, pool_maxsize=NEWS_MAX_WORKERS)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+def _get_akshare_news(provider, symbol: str, limit: int = 10, timeout: float = DEFAULT_NEWS_DEADLINE):
+    """
+    带超时获取AKShare个股新闻
+
+    AKShare 接口本身不接受超时参数（内部还有重试与退避），在独立线程中执行并最多等待 timeout 秒；
+    超时后放弃等待，挂起的调用只占用这一个线程。
+
+    Returns:
+        新闻 DataFrame，失败或超时返回 None
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="news-akshare")
+    try:
+        return executor.submit(provider.get_stock_news_sync, symbol=symbol, limit=limit).result(timeout=timeout)
+    except FutureTimeoutError:
+        logger.warning(f"[新闻分析] ⏱️ AKShare新闻 {symbol} 超过 {timeout}秒 未返回，放弃等待")
+        return None
+    finally:
+        executor.shutdown(wait=False)
+
+
+class NewsSourceStats:
+    """各新闻源的调用次数、命中率与延迟统计（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def _entry(self, source: str) -> Dict[str, Any]:
+        return self._stats.setdefault(source, {
+            'calls': 0, 'hits': 0, 'items': 0, 'errors': 0, 'timeouts': 0,
+            'total_latency': 0.0, 'last_latency': 0.0,
+        })
+
+    def record(self, source: str, latency: float, items: int = 0, error: bool = False) -> None:
+        with self._lock:
+            entry = self._entry(source)
+            entry['calls'] += 1
+            entry['items'] += items
+            entry['hits'] += 1 if items else 0
+            entry['errors'] += 1 if error else 0
+            entry['total_latency'] += latency
+            entry['last_latency'] = latency
+
+    def record_timeout(self, source: str) -> None:
+        with self._lock:
+            entry = self._entry(source)
+            entry['calls'] += 1
+            entry['timeouts'] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            result = {}
+            for source, entry in self._stats.items():
+                finished = entry['calls'] - entry['timeouts']
+                result[source] = {
+                    **entry,
+                    'total_latency': round(entry['total_latency'], 3),
+                    'last_latency': round(entry['last_latency'], 3),
+                    'avg_latency': round(entry['total_latency'] / finished, 3) if finished else 0.0,
+                    'hit_rate': round(entry['hits'] / entry['calls'], 3) if entry['calls'] else 0.0,
+                }
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+_source_stats = NewsSourceStats()
+
+
+def get_news_source_stats() -> Dict[str, Dict[str, Any]]:
+    """获取新闻源延迟与命中统计"""
+    return _source_stats.snapshot()
+
+
 class RealtimeNewsAggregator:
     """实时新闻聚合器"""
 
-    def __init__(self):
+    def __init__(self, deadline: Optional[float] = None, session: Optional[requests.Session] = None):
+        """
+        Args:
+            deadline: 单次聚合的全局截止时间（秒），超时未返回的新闻源将被忽略
+            session: HTTP会话，默认使用进程内共享的连接池会话
+        """
         self.headers = {
             'User-Agent': 'TradingAgents-CN/1.0'
         }
+        self.deadline = DEFAULT_NEWS_DEADLINE if deadline is None else deadline
+        self.request_timeout = (NEWS_CONNECT_TIMEOUT, self.deadline)
+        self.session = session or get_news_http_session()
 
         # API密钥配置
         self.finnhub_key = os.getenv('FINNHUB_API_KEY')
@@ -50,73 +165,20 @@ class RealtimeNewsAggregator:
     def get_realtime_stock_news(self, ticker: str, hours_back: int = 6, max_news: int = 10) -> List[NewsItem]:
         """
         获取实时股票新闻
-        优先级：专业API > 新闻API > 搜索引擎
+        各新闻源并发请求，在全局截止时间内返回已完成的结果
 
         Args:
             ticker: 股票代码
             hours_back: 回溯小时数
             max_news: 最大新闻数量，默认10条
         """
-        logger.info(f"[新闻聚合器] 开始获取 {ticker} 的实时新闻，回溯时间: {hours_back}小时")
+        logger.info(f"[新闻聚合器] 开始获取 {ticker} 的实时新闻，回溯时间: {hours_back}小时，截止时间: {self.deadline}秒")
         start_time = datetime.now(ZoneInfo(get_timezone_name()))
-        all_news = []
-
-        # 1. FinnHub实时新闻 (最高优先级)
-        logger.info(f"[新闻聚合器] 尝试从 FinnHub 获取 {ticker} 的新闻")
-        finnhub_start = datetime.now(ZoneInfo(get_timezone_name()))
-        finnhub_news = self._get_finnhub_realtime_news(ticker, hours_back)
-        finnhub_time = (datetime.now(ZoneInfo(get_timezone_name())) - finnhub_start).total_seconds()
-
-        if finnhub_news:
-            logger.info(f"[新闻聚合器] 成功从 FinnHub 获取 {len(finnhub_news)} 条新闻，耗时: {finnhub_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] FinnHub 未返回新闻，耗时: {finnhub_time:.2f}秒")
-
-        all_news.extend(finnhub_news)
-
-        # 2. Alpha Vantage新闻
-        logger.info(f"[新闻聚合器] 尝试从 Alpha Vantage 获取 {ticker} 的新闻")
-        av_start = datetime.now(ZoneInfo(get_timezone_name()))
-        av_news = self._get_alpha_vantage_news(ticker, hours_back)
-        av_time = (datetime.now(ZoneInfo(get_timezone_name())) - av_start).total_seconds()
-
-        if av_news:
-            logger.info(f"[新闻聚合器] 成功从 Alpha Vantage 获取 {len(av_news)} 条新闻，耗时: {av_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] Alpha Vantage 未返回新闻，耗时: {av_time:.2f}秒")
-
-        all_news.extend(av_news)
 
-        # 3. NewsAPI (如果配置了)
-        if self.newsapi_key:
-            logger.info(f"[新闻聚合器] 尝试从 NewsAPI 获取 {ticker} 的新闻")
-            newsapi_start = datetime.now(ZoneInfo(get_timezone_name()))
-            newsapi_news = self._get_newsapi_news(ticker, hours_back)
-            newsapi_time = (datetime.now(ZoneInfo(get_timezone_name())) - newsapi_start).total_seconds()
-
-            if newsapi_news:
-                logger.info(f"[新闻聚合器] 成功从 NewsAPI 获取 {len(newsapi_news)} 条新闻，耗时: {newsapi_time:.2f}秒")
-            else:
-                logger.info(f"[新闻聚合器] NewsAPI 未返回新闻，耗时: {newsapi_time:.2f}秒")
-
-            all_news.extend(newsapi_news)
-        else:
-            logger.info(f"[新闻聚合器] NewsAPI 密钥未配置，跳过此新闻源")
-
-        # 4. 中文财经新闻源
-        logger.info(f"[新闻聚合器] 尝试获取 {ticker} 的中文财经新闻")
-        chinese_start = datetime.now(ZoneInfo(get_timezone_name()))
-        chinese_news = self._get_chinese_finance_news(ticker, hours_back)
-        chinese_time = (datetime.now(ZoneInfo(get_timezone_name())) - chinese_start).total_seconds()
-
-        if chinese_news:
-            logger.info(f"[新闻聚合器] 成功获取 {len(chinese_news)} 条中文财经新闻，耗时: {chinese_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] 未获取到中文财经新闻，耗时: {chinese_time:.2f}秒")
+        # 1. 并发请求各新闻源
+        all_news = self._fetch_sources_concurrently(self._build_source_tasks(ticker, hours_back))
 
-        all_news.extend(chinese_news)
-
-        # 去重和排序
+        # 2. 合并后统一去重和排序
         logger.info(f"[新闻聚合器] 开始对 {len(all_news)} 条新闻进行去重和排序")
         dedup_start = datetime.now(ZoneInfo(get_timezone_name()))
         unique_news = self._deduplicate_news(all_news)
@@ -144,6 +206,63 @@ class RealtimeNewsAggregator:
 
         return sorted_news
 
+    def _build_source_tasks(self, ticker: str, hours_back: int) -> List[Tuple[str, Callable[[], List[NewsItem]]]]:
+        """构建本次需要请求的新闻源列表，未配置密钥的源直接跳过"""
+        tasks = []
+        if self.finnhub_key:
+            tasks.append(('FinnHub', lambda: self._get_finnhub_realtime_news(ticker, hours_back)))
+        if self.alpha_vantage_key:
+            tasks.append(('Alpha Vantage', lambda: self._get_alpha_vantage_news(ticker, hours_back)))
+        if self.newsapi_key:
+            tasks.append(('NewsAPI', lambda: self._get_newsapi_news(ticker, hours_back)))
+        else:
+            logger.info(f"[新闻聚合器] NewsAPI 密钥未配置，跳过此新闻源")
+        tasks.append(('东方财富', lambda: self._get_eastmoney_news(ticker, hours_back)))
+        tasks.append(('财联社RSS', lambda: self._get_cls_rss_news(ticker, hours_back)))
+        return tasks
+
+    def _fetch_sources_concurrently(self, tasks: List[Tuple[str, Callable[[], List[NewsItem]]]]) -> List[NewsItem]:
+        """并发执行新闻源请求，只收集截止时间内完成的结果"""
+        def run(name: str, fetch: Callable[[], List[NewsItem]]) -> List[NewsItem]:
+            source_start = time.monotonic()
+            try:
+                items = fetch() or []
+            except Exception as e:
+                _source_stats.record(name, time.monotonic() - source_start, error=True)
+                logger.error(f"[新闻聚合器] {name} 新闻获取失败: {e}")
+                return []
+            latency = time.monotonic() - source_start
+            _source_stats.record(name, latency, items=len(items))
+            if items:
+                logger.info(f"[新闻聚合器] 成功从 {name} 获取 {len(items)} 条新闻，耗时: {latency:.2f}秒")
+            else:
+                logger.info(f"[新闻聚合器] {name} 未返回新闻，耗时: {latency:.2f}秒")
+            return items
+
+        # 每次聚合使用独立线程池：AKShare 等阻塞调用无法取消，
+        # 超时未返回的请求只占用本次聚合的线程，不会拖住后续聚合
+        executor = ThreadPoolExecutor(max_workers=max(1, min(len(tasks), NEWS_MAX_WORKERS)),
+                                      thread_name_prefix="news-source")
+        try:
+            futures = {executor.submit(run, name, fetch): name for name, fetch in tasks}
+            done, not_done = wait(futures, timeout=self.deadline)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        all_news = []
+        # 按新闻源优先级顺序合并，保证去重时保留高优先级来源
+        for future, name in futures.items():
+            if future in done:
+                all_news.extend(future.result())
+            else:
+                _source_stats.record_timeout(name)
+                logger.warning(f"[新闻聚合器] ⏱️ {name} 超过截止时间 {self.deadline}秒 未返回，忽略该新闻源")
+        return all_news
+
+    def get_source_stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取各新闻源的延迟与命中统计"""
+        return get_news_source_stats()
+
     def _get_finnhub_realtime_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
         """获取FinnHub实时新闻"""
         if not self.finnhub_key:
@@ -163,7 +282,7 @@ class RealtimeNewsAggregator:
                 'token': self.finnhub_key
             }
 
-            response = requests.get(url, params=params, headers=self.headers)
+            response = self.session.get(url, params=params, headers=self.headers, timeout=self.request_timeout)
             response.raise_for_status()
 
             news_data = response.json()
@@ -208,7 +327,7 @@ class RealtimeNewsAggregator:
                 'limit': 50
             }
 
-            response = requests.get(url, params=params, headers=self.headers)
+            response = self.session.get(url, params=params, headers=self.headers, timeout=self.request_timeout)
             response.raise_for_status()
 
             data = response.json()
@@ -268,7 +387,7 @@ class RealtimeNewsAggregator:
                 'apiKey': self.newsapi_key
             }
 
-            response = requests.get(url, params=params, headers=self.headers)
+            response = self.session.get(url, params=params, headers=self.headers, timeout=self.request_timeout)
             response.raise_for_status()
 
             data = response.json()
@@ -300,136 +419,128 @@ class RealtimeNewsAggregator:
             logger.error(f"NewsAPI新闻获取失败: {e}")
             return []
 
-    def _get_chinese_finance_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
-        """获取中文财经新闻"""
-        # 集成中文财经新闻API：财联社、东方财富等
-        logger.info(f"[中文财经新闻] 开始获取 {ticker} 的中文财经新闻，回溯时间: {hours_back}小时")
-        start_time = datetime.now(ZoneInfo(get_timezone_name()))
+    def _get_eastmoney_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
+        """通过AKShare获取东方财富个股新闻"""
+        news_items = []
 
+        # 1. 尝试使用AKShare获取东方财富个股新闻
         try:
-            news_items = []
+            logger.info(f"[中文财经新闻] 尝试通过 AKShare Provider 获取新闻")
+            from tradingagents.dataflows.providers.china.akshare import AKShareProvider
 
-            # 1. 尝试使用AKShare获取东方财富个股新闻
-            try:
-                logger.info(f"[中文财经新闻] 尝试通过 AKShare Provider 获取新闻")
-                from tradingagents.dataflows.providers.china.akshare import AKShareProvider
+            provider = AKShareProvider()
 
-                provider = AKShareProvider()
+            # 处理股票代码格式
+            # 如果是美股代码，不使用东方财富新闻
+            if '.' in ticker and any(suffix in ticker for suffix in ['.US', '.N', '.O', '.NYSE', '.NASDAQ']):
+                logger.info(f"[中文财经新闻] 检测到美股代码 {ticker}，跳过东方财富新闻获取")
+            else:
+                # 处理A股和港股代码
+                clean_ticker = ticker.replace('.SH', '').replace('.SZ', '').replace('.SS', '')\
+                                .replace('.HK', '').replace('.XSHE', '').replace('.XSHG', '')
 
-                # 处理股票代码格式
-                # 如果是美股代码，不使用东方财富新闻
-                if '.' in ticker and any(suffix in ticker for suffix in ['.US', '.N', '.O', '.NYSE', '.NASDAQ']):
-                    logger.info(f"[中文财经新闻] 检测到美股代码 {ticker}，跳过东方财富新闻获取")
-                else:
-                    # 处理A股和港股代码
-                    clean_ticker = ticker.replace('.SH', '').replace('.SZ', '').replace('.SS', '')\
-                                    .replace('.HK', '').replace('.XSHE', '').replace('.XSHG', '')
-
-                    # 获取东方财富新闻
-                    logger.info(f"[中文财经新闻] 开始获取 {clean_ticker} 的东方财富新闻")
-                    em_start_time = datetime.now(ZoneInfo(get_timezone_name()))
-                    news_df = provider.get_stock_news_sync(symbol=clean_ticker)
-
-                    if not news_df.empty:
-                        logger.info(f"[中文财经新闻] 东方财富返回 {len(news_df)} 条新闻数据，开始处理")
-                        processed_count = 0
-                        skipped_count = 0
-                        error_count = 0
-
-                        # 转换为NewsItem格式
-                        for _, row in news_df.iterrows():
-                            try:
-                                # 解析时间
-                                time_str = row.get('时间', '')
-                                if time_str:
-                                    # 尝试解析时间格式，可能是'2023-01-01 12:34:56'格式
+                # 获取东方财富新闻
+                logger.info(f"[中文财经新闻] 开始获取 {clean_ticker} 的东方财富新闻")
+                em_start_time = datetime.now(ZoneInfo(get_timezone_name()))
+                news_df = provider.get_stock_news_sync(symbol=clean_ticker)
+
+                if not news_df.empty:
+                    logger.info(f"[中文财经新闻] 东方财富返回 {len(news_df)} 条新闻数据，开始处理")
+                    processed_count = 0
+                    skipped_count = 0
+                    error_count = 0
+
+                    # 转换为NewsItem格式
+                    for _, row in news_df.iterrows():
+                        try:
+                            # 解析时间
+                            time_str = row.get('时间', '')
+                            if time_str:
+                                # 尝试解析时间格式，可能是'2023-01-01 12:34:56'格式
+                                try:
+                                    publish_time = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S').replace(tzinfo=ZoneInfo(get_timezone_name()))
+                                except:
+                                    # 尝试其他可能的格式
                                     try:
-                                        publish_time = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S').replace(tzinfo=ZoneInfo(get_timezone_name()))
+                                        publish_time = datetime.strptime(time_str, '%Y-%m-%d').replace(tzinfo=ZoneInfo(get_timezone_name()))
                                     except:
-                                        # 尝试其他可能的格式
-                                        try:
-                                            publish_time = datetime.strptime(time_str, '%Y-%m-%d').replace(tzinfo=ZoneInfo(get_timezone_name()))
-                                        except:
-                                            logger.warning(f"[中文财经新闻] 无法解析时间格式: {time_str}，使用当前时间")
-                                            publish_time = datetime.now(ZoneInfo(get_timezone_name()))
-                                else:
-                                    logger.warning(f"[中文财经新闻] 新闻时间为空，使用当前时间")
-                                    publish_time = datetime.now(ZoneInfo(get_timezone_name()))
-
-                                # 检查时效性
-                                if publish_time < datetime.now(ZoneInfo(get_timezone_name())) - timedelta(hours=hours_back):
-                                    skipped_count += 1
-                                    continue
-
-                                # 评估紧急程度
-                                title = row.get('标题', '')
-                                content = row.get('内容', '')
-                                urgency = self._assess_news_urgency(title, content)
-
-                                news_items.append(NewsItem(
-                                    title=title,
-                                    content=content,
-                                    source='东方财富',
-                                    publish_time=publish_time,
-                                    url=row.get('链接', ''),
-                                    urgency=urgency,
-                                    relevance_score=self._calculate_relevance(title, ticker)
-                                ))
-                                processed_count += 1
-                            except Exception as item_e:
-                                logger.error(f"[中文财经新闻] 处理东方财富新闻项目失败: {item_e}")
-                                error_count += 1
+                                        logger.warning(f"[中文财经新闻] 无法解析时间格式: {time_str}，使用当前时间")
+                                        publish_time = datetime.now(ZoneInfo(get_timezone_name()))
+                            else:
+                                logger.warning(f"[中文财经新闻] 新闻时间为空，使用当前时间")
+                                publish_time = datetime.now(ZoneInfo(get_timezone_name()))
+
+                            # 检查时效性
+                            if publish_time < datetime.now(ZoneInfo(get_timezone_name())) - timedelta(hours=hours_back):
+                                skipped_count += 1
                                 continue
 
-                        em_time = (datetime.now(ZoneInfo(get_timezone_name())) - em_start_time).total_seconds()
-                        logger.info(f"[中文财经新闻] 东方财富新闻处理完成，成功: {processed_count}条，跳过: {skipped_count}条，错误: {error_count}条，耗时: {em_time:.2f}秒")
-            except Exception as ak_e:
-                logger.error(f"[中文财经新闻] 获取东方财富新闻失败: {ak_e}")
-
-            # 2. 财联社RSS (如果可用)
-            logger.info(f"[中文财经新闻] 开始获取财联社RSS新闻")
-            rss_start_time = datetime.now(ZoneInfo(get_timezone_name()))
-            rss_sources = [
-                "https://www.cls.cn/api/sw?app=CailianpressWeb&os=web&sv=7.7.5",
-                # 可以添加更多RSS源
-            ]
-
-            rss_success_count = 0
-            rss_error_count = 0
-            total_rss_items = 0
-
-            for rss_url in rss_sources:
-                try:
-                    logger.info(f"[中文财经新闻] 尝试解析RSS源: {rss_url}")
-                    rss_item_start = datetime.now(ZoneInfo(get_timezone_name()))
-                    items = self._parse_rss_feed(rss_url, ticker, hours_back)
-                    rss_item_time = (datetime.now(ZoneInfo(get_timezone_name())) - rss_item_start).total_seconds()
-
-                    if items:
-                        logger.info(f"[中文财经新闻] 成功从RSS源获取 {len(items)} 条新闻，耗时: {rss_item_time:.2f}秒")
-                        news_items.extend(items)
-                        total_rss_items += len(items)
-                        rss_success_count += 1
-                    else:
-                        logger.info(f"[中文财经新闻] RSS源未返回相关新闻，耗时: {rss_item_time:.2f}秒")
-                except Exception as rss_e:
-                    logger.error(f"[中文财经新闻] 解析RSS源失败: {rss_e}")
-                    rss_error_count += 1
-                    continue
+                            # 评估紧急程度
+                            title = row.get('标题', '')
+                            content = row.get('内容', '')
+                            urgency = self._assess_news_urgency(title, content)
+
+                            news_items.append(NewsItem(
+                                title=title,
+                                content=content,
+                                source='东方财富',
+                                publish_time=publish_time,
+                                url=row.get('链接', ''),
+                                urgency=urgency,
+                                relevance_score=self._calculate_relevance(title, ticker)
+                            ))
+                            processed_count += 1
+                        except Exception as item_e:
+                            logger.error(f"[中文财经新闻] 处理东方财富新闻项目失败: {item_e}")
+                            error_count += 1
+                            continue
+
+                    em_time = (datetime.now(ZoneInfo(get_timezone_name())) - em_start_time).total_seconds()
+                    logger.info(f"[中文财经新闻] 东方财富新闻处理完成，成功: {processed_count}条，跳过: {skipped_count}条，错误: {error_count}条，耗时: {em_time:.2f}秒")
+        except Exception as ak_e:
+            logger.error(f"[中文财经新闻] 获取东方财富新闻失败: {ak_e}")
+
+        return news_items
+
+    def _get_cls_rss_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
+        """获取财联社RSS新闻"""
+        news_items = []
+
+        logger.info(f"[中文财经新闻] 开始获取财联社RSS新闻")
+        rss_start_time = datetime.now(ZoneInfo(get_timezone_name()))
+        rss_sources = [
+            "https://www.cls.cn/api/sw?app=CailianpressWeb&os=web&sv=7.7.5",
+            # 可以添加更多RSS源
+        ]
 
-            # 记录RSS获取总结
-            rss_total_time = (datetime.now(ZoneInfo(get_timezone_name())) - rss_start_time).total_seconds()
-            logger.info(f"[中文财经新闻] RSS新闻获取完成，成功源: {rss_success_count}个，失败源: {rss_error_count}个，获取新闻: {total_rss_items}条，总耗时: {rss_total_time:.2f}秒")
+        rss_success_count = 0
+        rss_error_count = 0
+        total_rss_items = 0
 
-            # 记录中文财经新闻获取总结
-            total_time = (datetime.now(ZoneInfo(get_timezone_name())) - start_time).total_seconds()
-            logger.info(f"[中文财经新闻] {ticker} 的中文财经新闻获取完成，总共获取 {len(news_items)} 条新闻，总耗时: {total_time:.2f}秒")
+        for rss_url in rss_sources:
+            try:
+                logger.info(f"[中文财经新闻] 尝试解析RSS源: {rss_url}")
+                rss_item_start = datetime.now(ZoneInfo(get_timezone_name()))
+                items = self._parse_rss_feed(rss_url, ticker, hours_back)
+                rss_item_time = (datetime.now(ZoneInfo(get_timezone_name())) - rss_item_start).total_seconds()
+
+                if items:
+                    logger.info(f"[中文财经新闻] 成功从RSS源获取 {len(items)} 条新闻，耗时: {rss_item_time:.2f}秒")
+                    news_items.extend(items)
+                    total_rss_items += len(items)
+                    rss_success_count += 1
+                else:
+                    logger.info(f"[中文财经新闻] RSS源未返回相关新闻，耗时: {rss_item_time:.2f}秒")
+            except Exception as rss_e:
+                logger.error(f"[中文财经新闻] 解析RSS源失败: {rss_e}")
+                rss_error_count += 1
+                continue
 
-            return news_items
+        # 记录RSS获取总结
+        rss_total_time = (datetime.now(ZoneInfo(get_timezone_name())) - rss_start_time).total_seconds()
+        logger.info(f"[中文财经新闻] RSS新闻获取完成，成功源: {rss_success_count}个，失败源: {rss_error_count}个，获取新闻: {total_rss_items}条，总耗时: {rss_total_time:.2f}秒")
 
-        except Exception as e:
-            logger.error(f"[中文财经新闻] 中文财经新闻获取失败: {e}")
-            return []
+        return news_items
 
     def _parse_rss_feed(self, rss_url: str, ticker: str, hours_back: int) -> List[NewsItem]:
         """解析RSS源"""
@@ -442,7 +553,10 @@ class RealtimeNewsAggregator:
             import feedparser
 
             logger.info(f"[RSS解析] 尝试获取RSS源内容")
-            feed = feedparser.parse(rss_url)
+            # 通过共享会话获取内容（带超时），再交给feedparser解析
+            response = self.session.get(rss_url, headers=self.headers, timeout=self.request_timeout)
+            response.raise_for_status()
+            feed = feedparser.parse(response.content)
 
             if not feed or not feed.entries:
                 logger.warning(f"[RSS解析] RSS源未返回有效内容")
@@ -755,7 +869,7 @@ def get_realtime_stock_news(ticker: str, curr_date: str, hours_back: int = 6) ->
             start_time = datetime.now(ZoneInfo(get_timezone_name()))
             logger.info(f"[新闻分析] 东方财富API调用开始时间: {start_time.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}")
 
-            news_df = provider.get_stock_news_sync(symbol=clean_ticker, limit=10)
+            news_df = _get_akshare_news(provider, clean_ticker, limit=10)
 
             end_time = datetime.now(ZoneInfo(get_timezone_name()))
             time_taken = (end_time - start_time).total_seconds()
@@ -771,7 +885,7 @@ def get_realtime_stock_news(ticker: str, curr_date: str, hours_back: int = 6) ->
             else:
                 logger.info(f"[新闻分析] 东方财富API返回数据: {news_df}")
 
-            if not news_df.empty:
+            if news_df is not None and not news_df.empty:
                 # 构建简单的新闻报告
                 news_count = len(news_df)
                 logger.info(f"[新闻分析] 成功获取 {news_count} 条东方财富新闻，耗时 {time_taken:.2f} 秒")
@@ -870,11 +984,11 @@ def get_realtime_stock_news(ticker: str, curr_date: str, hours_back: int = 6) ->
 
             logger.info(f"[新闻分析] 开始从东方财富获取港股 {clean_ticker} 的新闻数据")
             start_time = datetime.now(ZoneInfo(get_timezone_name()))
-            news_df = provider.get_stock_news_sync(symbol=clean_ticker, limit=10)
+            news_df = _get_akshare_news(provider, clean_ticker, limit=10)
             end_time = datetime.now(ZoneInfo(get_timezone_name()))
             time_taken = (end_time - start_time).total_seconds()
 
-            if not news_df.empty:
+            if news_df is not None and not news_df.empty:
                 # 构建简单的新闻报告
                 news_count = len(news_df)
                 logger.info(f"[新闻分析] 成功获取 {news_count} 条东方财富港股新闻，耗时 {time_taken:.2f} 秒")
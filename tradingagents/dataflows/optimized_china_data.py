@@ -16,6 +16,7 @@ from tradingagents.config.config_manager import config_manager
 
 from tradingagents.config.runtime_settings import get_float, get_timezone_name
 # 导入日志模块
+from tradingagents.utils.async_bridge import run_coroutine_sync
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
@@ -220,25 +221,16 @@ class OptimizedChinaDataProvider:
 
         # 2. 检查文件缓存（除非强制刷新）
         if not force_refresh:
-            # 查找基本面数据缓存
-            for metadata_file in self.cache.metadata_dir.glob(f"*_meta.json"):
-                try:
-                    import json
-                    with open(metadata_file, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
-
-                    if (metadata.get('symbol') == symbol and
-                        metadata.get('data_type') == 'fundamentals' and
-                        metadata.get('market_type') == 'china'):
-
-                        cache_key = metadata_file.stem.replace('_meta', '')
-                        if self.cache.is_cache_valid(cache_key, symbol=symbol, data_type='fundamentals'):
-                            cached_data = self.cache.load_stock_data(cache_key)
-                            if cached_data:
-                                logger.info(f"⚡ [数据来源: 文件缓存] 从缓存加载A股基本面数据: {symbol}")
-                                return cached_data
-                except Exception:
-                    continue
+            # 查找基本面数据缓存（通过元数据索引，TTL 按智能配置）
+            try:
+                cache_key = self.cache.find_cached_fundamentals_data(symbol)
+                if cache_key:
+                    cached_data = self.cache.load_stock_data(cache_key)
+                    if cached_data:
+                        logger.info(f"⚡ [数据来源: 文件缓存] 从缓存加载A股基本面数据: {symbol}")
+                        return cached_data
+            except Exception:
+                pass
 
         # 缓存未命中，生成基本面分析
         logger.debug(f"🔍 [数据来源: 生成分析] 生成A股基本面分析: {symbol}")
@@ -863,30 +855,8 @@ class OptimizedChinaDataProvider:
         raise ValueError(error_msg)
 
     def _run_async_blocking(self, coro):
-        import asyncio
-
-        try:
-            asyncio.get_running_loop()
-        except RuntimeError:
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_closed():
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-
-            return loop.run_until_complete(coro)
-
-        import concurrent.futures
-
-        def _runner():
-            import asyncio as _asyncio
-            return _asyncio.run(coro)
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            return executor.submit(_runner).result()
+        """在进程共享的后台事件循环中运行 provider 协程（复用事件循环和连接池）"""
+        return run_coroutine_sync(coro)
 
     def _get_real_financial_metrics(self, symbol: str, price_value: float) -> dict:
         """获取真实财务指标 - 优先使用数据库缓存，再使用API"""
@@ -2269,21 +2239,11 @@ class OptimizedChinaDataProvider:
         """尝试获取过期的缓存数据作为备用"""
         try:
             # 查找任何相关的缓存，不考虑TTL
-            for metadata_file in self.cache.metadata_dir.glob(f"*_meta.json"):
+            for cache_key in self.cache.find_cache_keys(symbol, 'stock_data', market_type='china'):
                 try:
-                    import json
-
-                    with open(metadata_file, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
-
-                    if (metadata.get('symbol') == symbol and
-                        metadata.get('data_type') == 'stock_data' and
-                        metadata.get('market_type') == 'china'):
-
-                        cache_key = metadata_file.stem.replace('_meta', '')
-                        cached_data = self.cache.load_stock_data(cache_key)
-                        if cached_data:
-                            return cached_data + "\n\n⚠️ 注意: 使用的是过期缓存数据"
+                    cached_data = self.cache.load_stock_data(cache_key)
+                    if cached_data:
+                        return cached_data + "\n\n⚠️ 注意: 使用的是过期缓存数据"
                 except Exception:
                     continue
         except Exception:
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+BaoStock 长连接会话
+
+baostock 客户端是模块级全局状态（一个 socket + 一个登录会话），且不是线程安全的。
+原先每次查询都 login -> query -> logout，批量同步时每只股票、每类数据都要完整握手一次，
+登录往往比查询本身还慢。
+
+BaoStockSession:
+- 每个进程只登录一次，之后的查询复用同一会话
+- 所有访问（包括逐页读取结果集）通过一把锁串行化
+- 会话失效（未登录、网络错误、空闲过久）时透明地重新登录并重试一次
+- 记录登录次数、查询次数、行数、锁等待和查询耗时
+"""
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# baostock 错误码：10001001 用户未登录；10002xxx 网络/连接错误
+NOT_LOGGED_IN_CODE = "10001001"
+NETWORK_ERROR_PREFIX = "10002"
+DEFAULT_IDLE_TIMEOUT = 600.0  # 空闲超过该时间（秒）后服务端可能已断开，使用前先重新登录
+
+
+class BaoStockError(Exception):
+    """BaoStock 查询失败"""
+
+    def __init__(self, error_code: Any, error_msg: str):
+        super().__init__(f"{error_msg} (error_code={error_code})")
+        self.error_code = str(error_code)
+        self.error_msg = error_msg
+
+
+class BaoStockSessionError(BaoStockError):
+    """会话失效，需要重新登录"""
+
+
+def is_session_error(error_code: Any) -> bool:
+    code = str(error_code)
+    return code == NOT_LOGGED_IN_CODE or code.startswith(NETWORK_ERROR_PREFIX)
+
+
+class BaoStockSession:
+    """进程内共享的 BaoStock 登录会话"""
+
+    def __init__(self, bs, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        """
+        Args:
+            bs: baostock 模块
+            idle_timeout: 空闲超过该秒数后，下次使用前重新登录
+        """
+        self.bs = bs
+        self.idle_timeout = idle_timeout
+        self._lock = threading.RLock()
+        self._logged_in = False
+        self._last_used = 0.0
+        self._started = time.monotonic()
+
+        # 统计信息
+        self.logins = 0
+        self.relogins = 0
+        self.queries = 0
+        self.rows = 0
+        self.errors = 0
+        self.query_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.last_error: Optional[str] = None
+
+    def _login(self):
+        lg = self.bs.login()
+        if str(lg.error_code) != '0':
+            raise BaoStockSessionError(lg.error_code, f"登录失败: {lg.error_msg}")
+        self.logins += 1
+        self._logged_in = True
+        self._last_used = time.monotonic()
+        logger.info(f"🔐 BaoStock会话已登录（累计 {self.logins} 次）")
+
+    def _invalidate(self):
+        if self._logged_in:
+            try:
+                self.bs.logout()
+            except Exception:
+                pass
+        self._logged_in = False
+
+    def _ensure_login(self):
+        if self._logged_in and time.monotonic() - self._last_used > self.idle_timeout:
+            logger.info(f"🔄 BaoStock会话空闲超过 {self.idle_timeout:.0f} 秒，重新登录")
+            self.relogins += 1
+            self._invalidate()
+        if not self._logged_in:
+            self._login()
+
+    def run(self, fn: Callable[[Any], Any]) -> Any:
+        """
+        在已登录的会话中执行 fn(bs)，执行期间独占客户端
+
+        fn 抛出 BaoStockSessionError 或网络异常时重新登录并重试一次。
+        """
+        waited = time.perf_counter()
+        with self._lock:
+            self.wait_seconds += time.perf_counter() - waited
+            for attempt in (1, 2):
+                self._ensure_login()
+                began = time.perf_counter()
+                try:
+                    return fn(self.bs)
+                except (BaoStockSessionError, OSError) as e:
+                    self.errors += 1
+                    if attempt == 2:
+                        raise
+                    logger.warning(f"🔄 BaoStock会话失效，重新登录后重试: {e}")
+                    self.relogins += 1
+                    self._invalidate()
+                except BaoStockError:
+                    self.errors += 1
+                    raise
+                finally:
+                    self.query_seconds += time.perf_counter() - began
+                    self._last_used = time.monotonic()
+
+    def query(self, method: str, *args, **kwargs) -> Tuple[List[List[str]], List[str]]:
+        """
+        执行 bs.<method>(...) 并读取全部结果行
+
+        Returns:
+            (数据行列表, 字段列表)
+
+        Raises:
+            BaoStockError: 查询返回错误码
+        """
+        def fetch(bs):
+            rs = getattr(bs, method)(*args, **kwargs)
+            rows = []
+            while (rs.error_code == '0') & rs.next():
+                rows.append(rs.get_row_data())
+            if rs.error_code != '0':
+                error_type = BaoStockSessionError if is_session_error(rs.error_code) else BaoStockError
+                raise error_type(rs.error_code, rs.error_msg)
+            return rows, rs.fields
+
+        rows, fields = self.run(fetch)
+        self.queries += 1
+        self.rows += len(rows)
+        return rows, fields
+
+    def health_check(self) -> bool:
+        """查询当天交易日历验证会话可用（失效时会自动重新登录），失败原因记录在 last_error"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        try:
+            self.query("query_trade_dates", start_date=today, end_date=today)
+            self.last_error = None
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            logger.warning(f"⚠️ BaoStock会话检查失败: {e}")
+            return False
+
+    def close(self):
+        """登出（进程退出时调用）"""
+        with self._lock:
+            self._invalidate()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        elapsed = time.monotonic() - self._started
+        return {
+            "logged_in": self._logged_in,
+            "logins": self.logins,
+            "relogins": self.relogins,
+            "queries": self.queries,
+            "rows": self.rows,
+            "errors": self.errors,
+            "query_seconds": round(self.query_seconds, 3),
+            "wait_seconds": round(self.wait_seconds, 3),
+            "avg_query_ms": round(self.query_seconds / self.queries * 1000, 2) if self.queries else 0,
+            "queries_per_second": round(self.queries / elapsed, 2) if elapsed > 0 else 0,
+        }
+
+
+_session: Optional[BaoStockSession] = None
+_session_lock = threading.Lock()
+
+
+def get_baostock_session(bs=None) -> BaoStockSession:
+    """获取进程内共享的 BaoStock 会话（单例）"""
+    global _session
+    if bs is None:
+        import baostock as bs
+    with _session_lock:
+        if _session is None or _session.bs is not bs:
+            _session = BaoStockSession(bs)
+            atexit.register(_session.close)
+        return _session
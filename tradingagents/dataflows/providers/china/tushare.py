@@ -674,6 +674,77 @@ class TushareProvider(BaseStockDataProvider):
             )
             return None
     
+    async def get_trade_dates(self, start_date: Union[str, date], end_date: Union[str, date]) -> Optional[List[str]]:
+        """获取区间内的交易日（YYYY-MM-DD，升序）"""
+        if not self.is_available():
+            return None
+
+        try:
+            df = await asyncio.to_thread(
+                self.api.trade_cal,
+                exchange='SSE',
+                start_date=self._format_date(start_date),
+                end_date=self._format_date(end_date),
+                is_open='1'
+            )
+            if df is None or df.empty:
+                return []
+            dates = sorted(str(d) for d in df['cal_date'])
+            return [f"{d[:4]}-{d[4:6]}-{d[6:8]}" for d in dates]
+
+        except Exception as e:
+            if self._is_rate_limit_error(str(e)):
+                raise
+            self.logger.error(f"❌ 获取交易日历失败 {start_date}~{end_date}: {e}")
+            return None
+
+    async def get_daily_by_date(self, trade_date: Union[str, date]) -> Optional[pd.DataFrame]:
+        """
+        按交易日获取全市场日线（未复权，daily 接口单次最多返回 6000 条）
+
+        Returns:
+            标准化后的 DataFrame，附加 6 位代码列 symbol
+        """
+        if not self.is_available():
+            return None
+
+        try:
+            date_str = self._format_date(trade_date)
+            df = await asyncio.to_thread(self.api.daily, trade_date=date_str)
+            if df is None or df.empty:
+                self.logger.warning(f"⚠️ {date_str} 全市场日线为空")
+                return None
+
+            df = self._standardize_historical_data(df)
+            df['symbol'] = df['ts_code'].str.split('.').str[0]
+            self.logger.info(f"✅ 获取全市场日线: {date_str} {len(df)}条记录")
+            return df
+
+        except Exception as e:
+            if self._is_rate_limit_error(str(e)):
+                raise
+            self.logger.error(f"❌ 获取全市场日线失败 trade_date={trade_date}: {e}")
+            return None
+
+    async def get_adj_factor_by_date(self, trade_date: Union[str, date]) -> Optional[pd.DataFrame]:
+        """按交易日获取全市场复权因子，返回 ts_code/trade_date/adj_factor"""
+        if not self.is_available():
+            return None
+
+        try:
+            date_str = self._format_date(trade_date)
+            df = await asyncio.to_thread(self.api.adj_factor, ts_code='', trade_date=date_str)
+            if df is None or df.empty:
+                self.logger.warning(f"⚠️ {date_str} 复权因子为空")
+                return None
+            return df
+
+        except Exception as e:
+            if self._is_rate_limit_error(str(e)):
+                raise
+            self.logger.error(f"❌ 获取复权因子失败 trade_date={trade_date}: {e}")
+            return None
+
     # ==================== 扩展接口 ====================
     
     async def get_daily_basic(self, symbol: str, trade_date: Optional[str] = None) -> Optional[Dict[str, Any]]:
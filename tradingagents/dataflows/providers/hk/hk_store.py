@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+港股元数据存储与限流工具
+
+原先 ImprovedHKStockProvider 把名称/财务指标缓存放在一个 JSON 文件里，每写一条就重写整个文件；
+限流用 time.sleep 阻塞调用线程；全市场行情快照靠一把最长等待 60 秒的全局锁串行化。
+
+- HKMetadataStore: 嵌入式 SQLite 键值存储（WAL + busy_timeout），每个键独立 TTL，
+  写入只影响单行，多个进程/线程共享同一个文件
+- TokenBucket: 非阻塞令牌桶，拿不到令牌立即返回 False，由调用方决定降级方式
+- SharedSnapshot: 全量快照（如 ak.stock_hk_spot）的单飞刷新：同一时刻只有一个调用方
+  （跨进程通过存储中的租约协调）真正请求接口，其余调用方直接使用旧快照或等待这一次刷新
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+from tradingagents.utils.logging_init import get_logger
+logger = get_logger("default")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    key        TEXT PRIMARY KEY,
+    value      TEXT NOT NULL,
+    source     TEXT,
+    expires_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_kv_expires_at ON kv (expires_at);
+CREATE TABLE IF NOT EXISTS leases (
+    name       TEXT PRIMARY KEY,
+    owner      TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class HKMetadataStore:
+    """基于 SQLite 的带 TTL 键值存储（进程/线程安全）"""
+
+    def __init__(self, db_path: Path, busy_timeout_ms: int = 30000):
+        """
+        Args:
+            db_path: 数据库文件路径
+            busy_timeout_ms: 其他进程持有写锁时的等待时间
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取当前线程（及进程）专用的连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and getattr(self._local, "pid", None) == os.getpid():
+            return conn
+        conn = sqlite3.connect(str(self.db_path), timeout=self.busy_timeout_ms / 1000,
+                               isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    # ---------- 键值 ----------
+    def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取一条记录（包括已过期的），返回 value/source/expires_at/updated_at/expired"""
+        row = self._connect().execute(
+            "SELECT value, source, expires_at, updated_at FROM kv WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "value": json.loads(row["value"]),
+            "source": row["source"],
+            "expires_at": row["expires_at"],
+            "updated_at": row["updated_at"],
+            "expired": row["expires_at"] <= time.time(),
+        }
+
+    def get(self, key: str, default: Any = None, allow_stale: bool = False) -> Any:
+        """读取未过期的值；allow_stale=True 时过期的值也返回"""
+        entry = self.get_entry(key)
+        if entry is None or (entry["expired"] and not allow_stale):
+            return default
+        return entry["value"]
+
+    def set(self, key: str, value: Any, ttl: float, source: Optional[str] = None) -> None:
+        """写入一条记录，ttl 秒后过期"""
+        now = time.time()
+        self._connect().execute(
+            "INSERT OR REPLACE INTO kv (key, value, source, expires_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False, default=str), source, now + ttl, now),
+        )
+
+    def delete(self, key: str) -> None:
+        self._connect().execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        """删除已过期的记录，返回删除条数"""
+        return self._connect().execute("DELETE FROM kv WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM kv").fetchone()[0]
+
+    # ---------- 租约（跨进程单飞） ----------
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """获取租约：无人持有或已过期时成功；ttl 秒后自动失效（持有者崩溃时不会死锁）"""
+        now = time.time()
+        cur = self._connect().execute(
+            "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at <= ? OR leases.owner = excluded.owner",
+            (name, owner, now + ttl, now),
+        )
+        return cur.rowcount == 1
+
+    def release_lease(self, name: str, owner: str) -> None:
+        self._connect().execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+    # ---------- 迁移 ----------
+    def import_json_cache(self, json_file: str, ttl: float) -> int:
+        """
+        导入旧版 hk_stock_cache.json（{key: {data, timestamp, source}}），保留原缓存时间
+
+        Returns:
+            导入条数
+        """
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            logger.debug(f"📊 [港股存储] 读取旧缓存失败: {e}")
+            return 0
+
+        now = time.time()
+        rows = []
+        for key, item in legacy.items():
+            if not isinstance(item, dict) or 'data' not in item:
+                continue
+            timestamp = float(item.get('timestamp') or 0)
+            if timestamp + ttl <= now:
+                continue
+            rows.append((key, json.dumps(item['data'], ensure_ascii=False, default=str),
+                         item.get('source'), timestamp + ttl, timestamp))
+        if rows:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO kv (key, value, source, expires_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+
+class TokenBucket:
+    """
+    非阻塞令牌桶
+
+    以 rate 个/秒的速度补充令牌，最多积累 capacity 个（允许短时突发）。
+    try_acquire() 从不等待；acquire(timeout) 最多等待 timeout 秒。
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = max(1.0, float(capacity))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.granted = 0
+        self.rejected = 0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """有足够令牌时立即扣除并返回 True，否则返回 False"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                self.granted += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """距离可以拿到令牌还需要的秒数"""
+        with self._lock:
+            self._refill(time.monotonic())
+            missing = tokens - self._tokens
+            return 0.0 if missing <= 0 else missing / self.rate if self.rate > 0 else float("inf")
+
+    def acquire(self, tokens: float = 1, timeout: float = 0) -> bool:
+        """最多等待 timeout 秒获取令牌"""
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.try_acquire(tokens):
+                return True
+            wait = self.wait_time(tokens)
+            remaining = deadline - time.monotonic()
+            if wait > remaining:
+                return False
+            time.sleep(wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"rate": self.rate, "capacity": self.capacity, "tokens": round(self._tokens, 2),
+                "granted": self.granted, "rejected": self.rejected}
+
+
+class SharedSnapshot:
+    """
+    全量快照的单飞刷新（stale-while-revalidate）
+
+    - 快照新鲜：直接返回（进程内副本，其次是共享存储）
+    - 快照过期：只有一个调用方刷新；其余调用方有旧快照就直接用旧快照，没有时等待这一次刷新
+    - 跨进程：刷新前在存储中获取租约，其他进程看到租约被占用时同样使用旧快照或等待存储中出现新快照
+    """
+
+    def __init__(self, name: str, fetch: Callable[[], Optional[pd.DataFrame]], store: HKMetadataStore,
+                 ttl: float = 600, wait_timeout: float = 60, poll_interval: float = 0.2):
+        """
+        Args:
+            name: 快照名称（存储键为 snapshot:<name>）
+            fetch: 获取全量快照的函数
+            store: 共享存储
+            ttl: 快照有效期（秒）
+            wait_timeout: 没有旧快照时等待他人刷新的最长时间
+        """
+        self.name = name
+        self.key = f"snapshot:{name}"
+        self.fetch = fetch
+        self.store = store
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._inflight: Optional[threading.Event] = None
+        self._data: Optional[pd.DataFrame] = None
+        self._expires_at = 0.0
+
+        # 统计信息
+        self.hits = 0
+        self.refreshes = 0
+        self.stale_served = 0
+        self.shared_waits = 0
+        self.errors = 0
+
+    def _fresh(self) -> bool:
+        return self._data is not None and time.time() < self._expires_at
+
+    def _load_from_store(self) -> bool:
+        """从共享存储加载快照（可能已被其他进程刷新），返回是否新鲜"""
+        entry = self.store.get_entry(self.key)
+        if entry is None:
+            return False
+        if entry["expires_at"] > self._expires_at or self._data is None:
+            value = entry["value"]
+            self._data = pd.DataFrame(value["data"], columns=value["columns"])
+            self._expires_at = entry["expires_at"]
+        return not entry["expired"]
+
+    def _save_to_store(self, df: pd.DataFrame):
+        self.store.set(self.key, {"columns": list(df.columns), "data": df.values.tolist()},
+                       ttl=self.ttl, source=self.name)
+
+    def get(self) -> Optional[pd.DataFrame]:
+        """获取快照；刷新失败且没有旧快照时返回 None"""
+        if self._fresh():
+            self.hits += 1
+            return self._data
+
+        with self._lock:
+            if self._fresh() or self._load_from_store():
+                self.hits += 1
+                return self._data
+            event = self._inflight
+            leader = event is None
+            if leader:
+                event = self._inflight = threading.Event()
+
+        if not leader:
+            if self._data is not None:
+                self.stale_served += 1
+                return self._data
+            self.shared_waits += 1
+            event.wait(self.wait_timeout)
+            return self._data
+
+        try:
+            self._refresh()
+        finally:
+            with self._lock:
+                self._inflight = None
+            event.set()
+        return self._data
+
+    def _refresh(self):
+        if not self.store.acquire_lease(self.key, self._owner, self.wait_timeout):
+            # 其他进程正在刷新
+            if self._data is not None:
+                self.stale_served += 1
+                return
+            self.shared_waits += 1
+            deadline = time.monotonic() + self.wait_timeout
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                if self._load_from_store():
+                    return
+            logger.warning(f"⏰ [{self.name}] 等待其他进程刷新快照超时")
+            return
+
+        try:
+            started = time.perf_counter()
+            df = self.fetch()
+            if df is None or df.empty:
+                raise ValueError("接口返回空数据")
+            self._save_to_store(df)
+            self._data = df
+            self._expires_at = time.time() + self.ttl
+            self.refreshes += 1
+            logger.info(f"✅ [{self.name}] 快照已刷新: {len(df)} 条，耗时 {time.perf_counter() - started:.2f}秒")
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️ [{self.name}] 快照刷新失败{'，继续使用旧快照' if self._data is not None else ''}: {e}")
+        finally:
+            self.store.release_lease(self.key, self._owner)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "rows": 0 if self._data is None else len(self._data),
+            "fresh": self._fresh(),
+            "hits": self.hits,
+            "refreshes": self.refreshes,
+            "stale_served": self.stale_served,
+            "shared_waits": self.shared_waits,
+            "errors": self.errors,
+        }
@@ -4,14 +4,14 @@
 解决API速率限制和数据获取问题
 """
 
-import time
-import json
 import os
+import threading
 import pandas as pd
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 
 from tradingagents.config.runtime_settings import get_int
+from .hk_store import HKMetadataStore, SharedSnapshot, TokenBucket
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
 logger = get_logger("default")
@@ -30,20 +30,75 @@ except Exception:
         return base
 
 
+HK_STORE_FILENAME = 'hk_metadata.sqlite3'
+LEGACY_CACHE_FILENAME = 'hk_stock_cache.json'
+DEFAULT_NAME_TTL = 3600  # 默认名称（港股xxxxx）只缓存1小时
+
+_hk_store: Optional[HKMetadataStore] = None
+_hk_spot_snapshot: Optional[SharedSnapshot] = None
+_hk_shared_lock = threading.Lock()
+
+
+def get_hk_metadata_store() -> HKMetadataStore:
+    """
+    获取进程内共享的港股元数据存储（SQLite，多个进程共用同一文件）
+
+    首次创建且存储为空时导入旧版 hk_stock_cache.json。
+    """
+    global _hk_store
+    with _hk_shared_lock:
+        if _hk_store is None:
+            hk_cache_dir = str(get_cache_dir('hk'))
+            store = HKMetadataStore(os.path.join(hk_cache_dir, HK_STORE_FILENAME))
+            legacy_file = os.path.join(hk_cache_dir, LEGACY_CACHE_FILENAME)
+            if store.count() == 0 and os.path.exists(legacy_file):
+                ttl = get_int("TA_HK_CACHE_TTL_SECONDS", "ta_hk_cache_ttl_seconds", 3600 * 24)
+                imported = store.import_json_cache(legacy_file, ttl)
+                logger.info(f"📦 [港股存储] 已导入旧版JSON缓存 {imported} 条")
+            _hk_store = store
+        return _hk_store
+
+
+def _fetch_hk_spot() -> pd.DataFrame:
+    import akshare as ak
+    return ak.stock_hk_spot()
+
+
+def get_hk_spot_snapshot() -> SharedSnapshot:
+    """获取全市场港股行情快照（ak.stock_hk_spot，新浪接口）的单飞缓存"""
+    global _hk_spot_snapshot
+    if _hk_spot_snapshot is not None:
+        return _hk_spot_snapshot
+    store = get_hk_metadata_store()
+    with _hk_shared_lock:
+        if _hk_spot_snapshot is None:
+            _hk_spot_snapshot = SharedSnapshot(
+                "stock_hk_spot",
+                _fetch_hk_spot,
+                store,
+                # 缓存 10 分钟（参考美股实时行情缓存时长）
+                ttl=get_int("TA_HK_SPOT_CACHE_TTL_SECONDS", "ta_hk_spot_cache_ttl_seconds", 600),
+            )
+        return _hk_spot_snapshot
+
+
 class ImprovedHKStockProvider:
     """改进的港股数据提供器"""
     
-    def __init__(self):
-        # 将缓存文件写入到统一的数据缓存目录下，避免污染项目根目录
-        hk_cache_dir = get_cache_dir('hk')
-        if hasattr(hk_cache_dir, 'joinpath'):  # Path
-            self.cache_file = str(hk_cache_dir.joinpath('hk_stock_cache.json'))
-        else:  # str
-            self.cache_file = os.path.join(hk_cache_dir, 'hk_stock_cache.json')
+    def __init__(self, store: Optional[HKMetadataStore] = None):
+        """
+        Args:
+            store: 元数据存储，默认使用进程内共享的 SQLite 存储
+        """
+        self.store = store if store is not None else get_hk_metadata_store()
 
         self.cache_ttl = get_int("TA_HK_CACHE_TTL_SECONDS", "ta_hk_cache_ttl_seconds", 3600 * 24)
         self.rate_limit_wait = get_int("TA_HK_RATE_LIMIT_WAIT_SECONDS", "ta_hk_rate_limit_wait_seconds", 5)
-        self.last_request_time = 0
+        # 平均每 rate_limit_wait 秒一次请求，允许少量突发
+        self.rate_limiter = TokenBucket(
+            rate=1.0 / max(self.rate_limit_wait, 0.001),
+            capacity=get_int("TA_HK_RATE_LIMIT_BURST", "ta_hk_rate_limit_burst", 3),
+        )
 
         # 内置港股名称映射（避免API调用）
         self.hk_stock_names = {
@@ -103,50 +158,28 @@ class ImprovedHKStockProvider:
             '0902.HK': '华能国际', '0902': '华能国际', '00902': '华能国际',
             '0991.HK': '大唐发电', '0991': '大唐发电', '00991': '大唐发电'
         }
-        
-        self._load_cache()
     
-    def _load_cache(self):
-        """加载缓存"""
+    def _cache_get(self, key: str, allow_stale: bool = False) -> Any:
+        """读取缓存（未命中或已过期返回 None）"""
         try:
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    self.cache = json.load(f)
-            else:
-                self.cache = {}
+            return self.store.get(key, allow_stale=allow_stale)
         except Exception as e:
-            logger.debug(f"📊 [港股缓存] 加载缓存失败: {e}")
-            self.cache = {}
-    
-    def _save_cache(self):
-        """保存缓存"""
+            logger.debug(f"📊 [港股缓存] 读取缓存失败: {e}")
+            return None
+
+    def _cache_set(self, key: str, data: Any, source: Optional[str] = None, ttl: Optional[float] = None):
+        """写入缓存（只写这一个键）"""
         try:
-            # 确保目录存在
-            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
+            self.store.set(key, data, ttl=self.cache_ttl if ttl is None else ttl, source=source)
         except Exception as e:
             logger.debug(f"📊 [港股缓存] 保存缓存失败: {e}")
-    
-    def _is_cache_valid(self, key: str) -> bool:
-        """检查缓存是否有效"""
-        if key not in self.cache:
-            return False
-
-        cache_time = self.cache[key].get('timestamp', 0)
-        return (time.time() - cache_time) < self.cache_ttl
-
-    def _rate_limit(self):
-        """速率限制：确保两次请求之间有足够的间隔"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-
-        if time_since_last_request < self.rate_limit_wait:
-            wait_time = self.rate_limit_wait - time_since_last_request
-            logger.debug(f"⏱️ [速率限制] 等待 {wait_time:.2f} 秒")
-            time.sleep(wait_time)
 
-        self.last_request_time = time.time()
+    def _rate_limit(self) -> bool:
+        """速率限制（非阻塞）：有令牌返回 True，否则立即返回 False"""
+        if self.rate_limiter.try_acquire():
+            return True
+        logger.debug(f"⏱️ [速率限制] 令牌不足，约 {self.rate_limiter.wait_time():.2f} 秒后可用")
+        return False
 
     def _normalize_hk_symbol(self, symbol: str) -> str:
         """标准化港股代码"""
@@ -178,8 +211,8 @@ class ImprovedHKStockProvider:
         try:
             # 检查缓存
             cache_key = f"name_{symbol}"
-            if self._is_cache_valid(cache_key):
-                cached_name = self.cache[cache_key]['data']
+            cached_name = self._cache_get(cache_key)
+            if cached_name:
                 logger.debug(f"📊 [港股缓存] 从缓存获取公司名称: {symbol} -> {cached_name}")
                 return cached_name
             
@@ -190,97 +223,47 @@ class ImprovedHKStockProvider:
             for format_symbol in [symbol, normalized_symbol, f"{normalized_symbol}.HK"]:
                 if format_symbol in self.hk_stock_names:
                     company_name = self.hk_stock_names[format_symbol]
-                    
-                    # 缓存结果
-                    self.cache[cache_key] = {
-                        'data': company_name,
-                        'timestamp': time.time(),
-                        'source': 'builtin_mapping'
-                    }
-                    self._save_cache()
-                    
                     logger.debug(f"📊 [港股映射] 获取公司名称: {symbol} -> {company_name}")
                     return company_name
             
-            # 方案2：优先尝试AKShare API获取（有速率限制保护）
+            # 方案2：优先从AKShare全市场行情快照中查找（单飞刷新，多个调用方共享同一次请求）
             try:
-                # 速率限制保护
-                current_time = time.time()
-                if current_time - self.last_request_time < self.rate_limit_wait:
-                    wait_time = self.rate_limit_wait - (current_time - self.last_request_time)
-                    logger.debug(f"📊 [港股API] 速率限制保护，等待 {wait_time:.1f} 秒")
-                    time.sleep(wait_time)
+                logger.debug(f"📊 [港股API] 优先使用AKShare获取: {symbol}")
+                df = get_hk_spot_snapshot().get()
+                if df is not None and not df.empty:
+                    # 查找匹配的股票
+                    matched = df[df['代码'] == normalized_symbol]
+                    if not matched.empty:
+                        # 新浪接口返回的列名是 '中文名称'
+                        akshare_name = matched.iloc[0]['中文名称']
+                        if akshare_name and not str(akshare_name).startswith('港股'):
+                            self._cache_set(cache_key, akshare_name, source='akshare_sina')
+                            logger.debug(f"📊 [港股AKShare-新浪] 获取公司名称: {symbol} -> {akshare_name}")
+                            return akshare_name
+            except Exception as e:
+                logger.debug(f"📊 [港股AKShare-新浪] 获取实时行情失败: {e}")
 
-                self.last_request_time = time.time()
+            # 备用：尝试从统一接口获取（包含Yahoo Finance），令牌不足时直接使用默认名称
+            try:
+                if self._rate_limit():
+                    from tradingagents.dataflows.interface import get_hk_stock_info_unified
+                    hk_info = get_hk_stock_info_unified(symbol)
 
-                # 优先尝试AKShare获取
-                try:
-                    # 直接使用 akshare 库获取，避免循环调用
-                    logger.debug(f"📊 [港股API] 优先使用AKShare获取: {symbol}")
-
-                    import akshare as ak
-                    # 标准化代码格式（akshare 需要 5 位数字格式）
-                    normalized_symbol = self._normalize_hk_symbol(symbol)
-
-                    # 尝试获取港股实时行情（包含名称）
-                    try:
-                        # 使用新浪财经接口（更稳定）
-                        df = ak.stock_hk_spot()
-                        if df is not None and not df.empty:
-                            # 查找匹配的股票
-                            matched = df[df['代码'] == normalized_symbol]
-                            if not matched.empty:
-                                # 新浪接口返回的列名是 '中文名称'
-                                akshare_name = matched.iloc[0]['中文名称']
-                                if akshare_name and not str(akshare_name).startswith('港股'):
-                                    # 缓存AKShare结果
-                                    self.cache[cache_key] = {
-                                        'data': akshare_name,
-                                        'timestamp': time.time(),
-                                        'source': 'akshare_sina'
-                                    }
-                                    self._save_cache()
-
-                                    logger.debug(f"📊 [港股AKShare-新浪] 获取公司名称: {symbol} -> {akshare_name}")
-                                    return akshare_name
-                    except Exception as e:
-                        logger.debug(f"📊 [港股AKShare-新浪] 获取实时行情失败: {e}")
-
-                except Exception as e:
-                    logger.debug(f"📊 [港股AKShare] AKShare获取失败: {e}")
-
-                # 备用：尝试从统一接口获取（包含Yahoo Finance）
-                from tradingagents.dataflows.interface import get_hk_stock_info_unified
-                hk_info = get_hk_stock_info_unified(symbol)
-
-                if hk_info and isinstance(hk_info, dict) and 'name' in hk_info:
-                    api_name = hk_info['name']
-                    if not api_name.startswith('港股'):
-                        # 缓存API结果
-                        self.cache[cache_key] = {
-                            'data': api_name,
-                            'timestamp': time.time(),
-                            'source': 'unified_api'
-                        }
-                        self._save_cache()
-
-                        logger.debug(f"📊 [港股统一API] 获取公司名称: {symbol} -> {api_name}")
-                        return api_name
+                    if hk_info and isinstance(hk_info, dict) and 'name' in hk_info:
+                        api_name = hk_info['name']
+                        if not api_name.startswith('港股'):
+                            self._cache_set(cache_key, api_name, source='unified_api')
+                            logger.debug(f"📊 [港股统一API] 获取公司名称: {symbol} -> {api_name}")
+                            return api_name
 
             except Exception as e:
                 logger.debug(f"📊 [港股API] API获取失败: {e}")
             
             # 方案3：生成友好的默认名称
-            clean_symbol = self._normalize_hk_symbol(symbol)
-            default_name = f"港股{clean_symbol}"
+            default_name = f"港股{normalized_symbol}"
             
             # 缓存默认结果（较短的TTL）
-            self.cache[cache_key] = {
-                'data': default_name,
-                'timestamp': time.time() - self.cache_ttl + 3600,  # 1小时后过期
-                'source': 'default'
-            }
-            self._save_cache()
+            self._cache_set(cache_key, default_name, source='default', ttl=min(DEFAULT_NAME_TTL, self.cache_ttl))
             
             logger.debug(f"📊 [港股默认] 使用默认名称: {symbol} -> {default_name}")
             return default_name
@@ -311,12 +294,20 @@ class ImprovedHKStockProvider:
 
             # 检查缓存
             cache_key = f"financial_{normalized_symbol}"
-            if self._is_cache_valid(cache_key):
+            cached = self._cache_get(cache_key)
+            if cached:
                 logger.debug(f"📊 [港股财务指标] 使用缓存: {normalized_symbol}")
-                return self.cache[cache_key]['data']
-
-            # 速率限制
-            self._rate_limit()
+                return cached
+
+            # 速率限制：令牌不足时优先使用过期缓存；没有旧数据时最多等待一个请求间隔
+            if not self._rate_limit():
+                stale = self._cache_get(cache_key, allow_stale=True)
+                if stale:
+                    logger.debug(f"📊 [港股财务指标] 限流中，使用过期缓存: {normalized_symbol}")
+                    return stale
+                if not self.rate_limiter.acquire(timeout=self.rate_limit_wait):
+                    logger.warning(f"⏱️ [港股财务指标] 限流中，暂不获取: {normalized_symbol}")
+                    return {}
 
             logger.info(f"📊 [港股财务指标] 获取财务指标: {normalized_symbol}")
 
@@ -373,11 +364,7 @@ class ImprovedHKStockProvider:
             }
 
             # 缓存数据
-            self.cache[cache_key] = {
-                'data': indicators,
-                'timestamp': time.time()
-            }
-            self._save_cache()
+            self._cache_set(cache_key, indicators, source='akshare_eastmoney')
 
             logger.info(f"✅ [港股财务指标] 成功获取: {normalized_symbol}, 报告期: {indicators['report_date']}")
             return indicators
@@ -654,22 +641,10 @@ def get_hk_stock_data_akshare(symbol: str, start_date: str = None, end_date: str
         return f"❌ 港股{symbol}历史数据获取失败: {str(e)}"
 
 
-# 🔥 全局缓存：缓存 AKShare 的所有港股数据
-_akshare_hk_spot_cache = {
-    'data': None,
-    'timestamp': None,
-    'ttl': 600  # 缓存 10 分钟（参考美股实时行情缓存时长）
-}
-
-# 🔥 线程锁：防止多个线程同时调用 AKShare API
-import threading
-_akshare_hk_spot_lock = threading.Lock()
-
-
 def get_hk_stock_info_akshare(symbol: str) -> Dict[str, Any]:
     """
     兼容性函数：直接使用 akshare 获取港股信息（避免循环调用）
-    🔥 使用全局缓存 + 线程锁，避免重复调用 ak.stock_hk_spot()
+    🔥 使用共享的行情快照（单飞刷新），避免重复调用 ak.stock_hk_spot()
 
     Args:
         symbol: 港股代码
@@ -678,64 +653,14 @@ def get_hk_stock_info_akshare(symbol: str) -> Dict[str, Any]:
         Dict: 港股信息
     """
     try:
-        import akshare as ak
-        from datetime import datetime
-
         # 标准化代码
         provider = get_improved_hk_provider()
         normalized_symbol = provider._normalize_hk_symbol(symbol)
 
         # 尝试从 akshare 获取实时行情
         try:
-            # 🔥 使用互斥锁保护 AKShare API 调用（防止并发导致被封禁）
-            # 策略：
-            # 1. 尝试获取锁（最多等待 60 秒）
-            # 2. 获取锁后，先检查缓存是否已被其他线程更新
-            # 3. 如果缓存有效，直接使用；否则调用 API
-
-            thread_id = threading.current_thread().name
-            logger.info(f"🔒 [AKShare锁-{thread_id}] 尝试获取锁...")
-
-            # 尝试获取锁，最多等待 60 秒
-            lock_acquired = _akshare_hk_spot_lock.acquire(timeout=60)
-
-            if not lock_acquired:
-                # 超时，返回错误
-                logger.error(f"⏰ [AKShare锁-{thread_id}] 获取锁超时（60秒），放弃")
-                raise Exception("AKShare API 调用超时（其他线程占用）")
-
-            try:
-                logger.info(f"✅ [AKShare锁-{thread_id}] 已获取锁")
-
-                # 获取锁后，检查缓存是否已被其他线程更新
-                now = datetime.now()
-                cache = _akshare_hk_spot_cache
-
-                if cache['data'] is not None and cache['timestamp'] is not None:
-                    elapsed = (now - cache['timestamp']).total_seconds()
-                    if elapsed <= cache['ttl']:
-                        # 缓存有效（可能是其他线程刚更新的）
-                        logger.info(f"⚡ [AKShare缓存-{thread_id}] 使用缓存数据（{elapsed:.1f}秒前，可能由其他线程更新）")
-                        df = cache['data']
-                    else:
-                        # 缓存过期，需要调用 API
-                        logger.info(f"🔄 [AKShare缓存-{thread_id}] 缓存过期（{elapsed:.1f}秒前），调用 API 刷新")
-                        df = ak.stock_hk_spot()
-                        cache['data'] = df
-                        cache['timestamp'] = now
-                        logger.info(f"✅ [AKShare缓存-{thread_id}] 已缓存 {len(df)} 只港股数据")
-                else:
-                    # 缓存为空，首次调用
-                    logger.info(f"🔄 [AKShare缓存-{thread_id}] 首次获取港股数据")
-                    df = ak.stock_hk_spot()
-                    cache['data'] = df
-                    cache['timestamp'] = now
-                    logger.info(f"✅ [AKShare缓存-{thread_id}] 已缓存 {len(df)} 只港股数据")
-
-            finally:
-                # 释放锁
-                _akshare_hk_spot_lock.release()
-                logger.info(f"🔓 [AKShare锁-{thread_id}] 已释放锁")
+            # 快照过期时只有一个调用方请求接口，其余调用方使用旧快照或等待这一次刷新
+            df = get_hk_spot_snapshot().get()
 
             # 从缓存的数据中查找目标股票
             if df is not None and not df.empty:
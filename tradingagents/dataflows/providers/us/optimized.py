@@ -324,20 +324,11 @@ class OptimizedUSDataProvider:
         """尝试获取过期的缓存数据作为备用"""
         try:
             # 查找任何相关的缓存，不考虑TTL
-            for metadata_file in self.cache.metadata_dir.glob(f"*_meta.json"):
+            for cache_key in self.cache.find_cache_keys(symbol, 'stock_data', market_type='us'):
                 try:
-                    import json
-                    with open(metadata_file, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
-
-                    if (metadata.get('symbol') == symbol and
-                        metadata.get('data_type') == 'stock_data' and
-                        metadata.get('market_type') == 'us'):
-
-                        cache_key = metadata_file.stem.replace('_meta', '')
-                        cached_data = self.cache.load_stock_data(cache_key)
-                        if cached_data:
-                            return cached_data + "\n\n⚠️ 注意: 使用的是过期缓存数据"
+                    cached_data = self.cache.load_stock_data(cache_key)
+                    if cached_data:
+                        return cached_data + "\n\n⚠️ 注意: 使用的是过期缓存数据"
                 except Exception:
                     continue
         except Exception:
@@ -3,11 +3,35 @@
 基于实时行情和财务数据计算PE/PB等指标
 """
 import logging
-from typing import Optional, Dict, Any
-from datetime import datetime
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+from datetime import datetime, time as dtime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+_TZ = ZoneInfo("Asia/Shanghai")
+_sync_client = None
+
+
+def _as_sync_client(db_client):
+    """
+    Motor 异步客户端无法在同步代码中使用，转换为进程内共享的同步 MongoClient
+    （原先每次调用都新建 MongoClient，连接池随调用次数增长）
+    """
+    global _sync_client
+    client_type = type(db_client).__name__
+    if 'AsyncIOMotorClient' not in client_type and 'Motor' not in client_type:
+        return db_client
+    if _sync_client is None:
+        from pymongo import MongoClient
+        from app.core.config import settings
+        logger.debug(f"检测到异步客户端 {client_type}，创建共享同步客户端")
+        _sync_client = MongoClient(settings.MONGO_URI)
+    return _sync_client
+
 
 def calculate_realtime_pe_pb(
     symbol: str,
@@ -50,15 +74,8 @@ def calculate_realtime_pe_pb(
                 return None
             db_client = db_manager.get_mongodb_client()
 
-        # 检查是否是异步客户端（AsyncIOMotorClient）
-        # 如果是异步客户端，需要转换为同步客户端
-        client_type = type(db_client).__name__
-        if 'AsyncIOMotorClient' in client_type or 'Motor' in client_type:
-            # 这是异步客户端，创建同步客户端
-            from pymongo import MongoClient
-            from app.core.config import settings
-            logger.debug(f"检测到异步客户端 {client_type}，转换为同步客户端")
-            db_client = MongoClient(settings.MONGO_URI)
+        # 检查是否是异步客户端（AsyncIOMotorClient），如果是则使用共享的同步客户端
+        db_client = _as_sync_client(db_client)
 
         db = db_client['tradingagents']
         code6 = str(symbol).zfill(6)
@@ -123,9 +140,6 @@ def calculate_realtime_pe_pb(
 
         # 🔥 3. 判断是否需要重新计算市值
         # 如果 stock_basic_info 的更新时间在今天收盘后（15:00之后），说明数据已经是最新的
-        from datetime import datetime, time as dtime
-        from zoneinfo import ZoneInfo
-
         need_recalculate = True
         if basic_info_updated_at:
             # 确保时间带有时区信息
@@ -296,25 +310,28 @@ def calculate_realtime_pe_pb(
         return None
 
 
-def validate_pe_pb(pe: Optional[float], pb: Optional[float]) -> bool:
+def validate_pe_pb(pe: Optional[float], pb: Optional[float], log: bool = True) -> bool:
     """
     验证PE/PB是否在合理范围内
     
     Args:
         pe: 市盈率
         pb: 市净率
+        log: 是否记录异常日志（批量校验时关闭）
     
     Returns:
         bool: 是否合理
     """
     # PE合理范围：-100 到 1000（允许负值，因为亏损企业PE为负）
     if pe is not None and (pe < -100 or pe > 1000):
-        logger.warning(f"PE异常: {pe}")
+        if log:
+            logger.warning(f"PE异常: {pe}")
         return False
     
     # PB合理范围：0.1 到 100
     if pb is not None and (pb < 0.1 or pb > 100):
-        logger.warning(f"PB异常: {pb}")
+        if log:
+            logger.warning(f"PB异常: {pb}")
         return False
     
     return True
@@ -365,12 +382,7 @@ def get_pe_pb_with_fallback(
             db_client = db_manager.get_mongodb_client()
 
         # 检查是否是异步客户端
-        client_type = type(db_client).__name__
-        if 'AsyncIOMotorClient' in client_type or 'Motor' in client_type:
-            from pymongo import MongoClient
-            from app.core.config import settings
-            logger.debug(f"检测到异步客户端 {client_type}，转换为同步客户端")
-            db_client = MongoClient(settings.MONGO_URI)
+        db_client = _as_sync_client(db_client)
 
     except Exception as e:
         logger.error(f"❌ [PE智能策略-失败] 数据库连接失败: {e}")
@@ -437,3 +449,199 @@ def get_pe_pb_with_fallback(
     logger.error(f"❌ [PE智能策略-全部失败] 无法获取股票 {symbol} 的PE/PB")
     return {}
 
+
+# ==================== 全市场批量计算 ====================
+# 与 calculate_realtime_pe_pb 逐只计算的口径一致：三个集合各读取一次，
+# 按代码对齐成列数组后向量化计算，适用于筛选、列表等成千上万行的场景。
+
+REALTIME_QUOTE_PROJECTION = {"_id": 0, "code": 1, "close": 1, "pre_close": 1, "updated_at": 1}
+REALTIME_BASIC_PROJECTION = {
+    "_id": 0, "code": 1, "pe": 1, "pe_ttm": 1, "pb": 1,
+    "total_mv": 1, "total_share": 1, "updated_at": 1,
+}
+_QUOTE_COLUMNS = ["code", "close", "pre_close", "updated_at"]
+_BASIC_COLUMNS = ["code", "pe", "pe_ttm", "pb", "total_mv", "total_share", "updated_at"]
+_FINANCIAL_COLUMNS = ["code", "total_equity"]
+
+
+def _code_filter(codes: Optional[Iterable[str]]) -> Dict[str, Any]:
+    if codes is None:
+        return {}
+    return {"code": {"$in": [str(c).zfill(6) for c in codes]}}
+
+
+def realtime_basic_query(codes: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """stock_basic_info 查询条件（只有 Tushare 数据包含 pe_ttm、total_share 等字段）"""
+    return {**_code_filter(codes), "source": "tushare"}
+
+
+def latest_equity_pipeline(codes: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """stock_financial_data 聚合：每只股票最新一期的净资产"""
+    return [
+        {"$match": _code_filter(codes)},
+        {"$sort": {"code": 1, "report_period": -1}},
+        {"$group": {"_id": "$code", "total_equity": {"$first": "$total_equity"}}},
+        {"$project": {"_id": 0, "code": "$_id", "total_equity": 1}},
+    ]
+
+
+def documents_to_frames(
+    quotes: List[Dict[str, Any]],
+    basic_info: List[Dict[str, Any]],
+    financial: List[Dict[str, Any]],
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """三个集合的查询结果 -> compute_realtime_pe_pb_batch 的输入"""
+    return (
+        pd.DataFrame(quotes, columns=_QUOTE_COLUMNS),
+        pd.DataFrame(basic_info, columns=_BASIC_COLUMNS),
+        pd.DataFrame(financial, columns=_FINANCIAL_COLUMNS),
+    )
+
+
+def _updated_after_close(value: Any, today) -> bool:
+    """stock_basic_info 是否在今天收盘（15:00）后更新"""
+    if not isinstance(value, datetime) or pd.isna(value):
+        return False
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=_TZ)
+    return value.date() == today and value.time() >= dtime(15, 0)
+
+
+def _numeric(frame: pd.DataFrame, column: str) -> np.ndarray:
+    return pd.to_numeric(frame[column], errors="coerce").to_numpy(dtype=float)
+
+
+def compute_realtime_pe_pb_batch(
+    quotes: pd.DataFrame,
+    basic_info: pd.DataFrame,
+    financial: Optional[pd.DataFrame] = None,
+    now: Optional[datetime] = None,
+) -> pd.DataFrame:
+    """
+    向量化计算全市场动态 PE/PB（口径同 calculate_realtime_pe_pb）
+
+    Args:
+        quotes: market_quotes（code, close, pre_close, updated_at）
+        basic_info: Tushare 的 stock_basic_info（code, pe, pe_ttm, pb, total_mv, total_share, updated_at）
+        financial: 每只股票最新一期财务数据（code, total_equity）
+        now: 当前时间（判断 stock_basic_info 是否已在今天收盘后更新）
+
+    Returns:
+        以 code 为索引的 DataFrame，列与 calculate_realtime_pe_pb 返回的字段一致；无法计算的股票不在结果中
+    """
+    quotes = quotes.assign(code=quotes["code"].astype(str).str.zfill(6)).drop_duplicates("code", keep="last")
+    basic_info = basic_info.assign(code=basic_info["code"].astype(str).str.zfill(6)).drop_duplicates("code", keep="last")
+    df = quotes.set_index("code").join(
+        basic_info.set_index("code").rename(columns={"updated_at": "basic_updated_at"}), how="inner"
+    )
+    if financial is not None and not financial.empty:
+        equity = financial.assign(code=financial["code"].astype(str).str.zfill(6)).drop_duplicates("code")
+        df = df.join(equity.set_index("code")[["total_equity"]], how="left")
+        has_financial = df.index.isin(equity["code"])
+    else:
+        df["total_equity"] = np.nan
+        has_financial = np.zeros(len(df), dtype=bool)
+
+    price = _numeric(df, "close")
+    pre_close = _numeric(df, "pre_close")
+    pe_t, pe_ttm_t, pb_t = _numeric(df, "pe"), _numeric(df, "pe_ttm"), _numeric(df, "pb")
+    total_mv = _numeric(df, "total_mv")
+    total_share = _numeric(df, "total_share")
+    total_equity = _numeric(df, "total_equity")
+
+    today = (now or datetime.now(_TZ)).date()
+    latest = np.fromiter((_updated_after_close(v, today) for v in df["basic_updated_at"]), dtype=bool, count=len(df))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        valid_price = price > 0
+        has_share, has_pre, has_mv = total_share > 0, pre_close > 0, total_mv > 0
+
+        # 总股本（万股）：优先 total_share，其次用昨收或实时价从总市值反推
+        shares = np.where(has_share, total_share,
+                          np.where(has_pre & has_mv, total_mv * 10000 / pre_close,
+                                   np.where(has_mv, total_mv * 10000 / price, np.nan)))
+        # 昨日市值（亿元）
+        yesterday_mv = np.where(has_share & has_pre, total_share * pre_close / 10000,
+                                np.where(has_mv, total_mv, np.nan))
+
+        computable = valid_price & ~latest & (pe_ttm_t > 0) & (yesterday_mv > 0) & np.isfinite(shares)
+        ttm_net_profit = yesterday_mv / pe_ttm_t
+        market_cap = price * shares / 10000
+        dynamic_pe = market_cap / ttm_net_profit
+
+        # PB：有财务数据时用实时市值 / 净资产，没有财务数据时降级到 Tushare PB
+        pb = np.where(has_financial,
+                      np.where(total_equity > 0, market_cap / (total_equity / 1e8), np.nan),
+                      np.where(pb_t != 0, pb_t, np.nan))
+
+    static = valid_price & latest
+    keep = computable | static
+    result = pd.DataFrame({
+        "pe": np.where(static, pe_t, dynamic_pe),
+        "pb": np.where(static, pb_t, pb),
+        "pe_ttm": np.where(static, pe_ttm_t, dynamic_pe),
+        "price": price,
+        "market_cap": np.where(static, total_mv, market_cap),
+        "ttm_net_profit": np.where(static, np.nan, ttm_net_profit),
+        "total_shares": np.where(static, np.nan, shares),
+        "yesterday_close": np.where(static | ~has_pre, np.nan, pre_close),
+        "tushare_pe_ttm": np.where(static, np.nan, pe_ttm_t),
+        "tushare_pe": np.where(static, np.nan, pe_t),
+    }, index=df.index)
+    # 与逐只计算一致：0 视为缺失，保留两位小数
+    result = result.replace(0.0, np.nan).round(2)
+    result["updated_at"] = df["updated_at"].to_numpy()
+    result["is_realtime"] = ~static
+    result["source"] = np.where(static, "stock_basic_info_latest", "realtime_calculated_from_market_quotes")
+    return result[keep]
+
+
+def metrics_frame_to_dict(frame: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """批量结果 -> {code: calculate_realtime_pe_pb 格式的字典}"""
+    notes = {
+        "stock_basic_info_latest": "使用stock_basic_info收盘后最新数据",
+        "realtime_calculated_from_market_quotes": "基于market_quotes实时股价和pre_close计算",
+    }
+    records = frame.astype(object).where(frame.notna(), None).to_dict("index")
+    for metrics in records.values():
+        metrics["is_realtime"] = bool(metrics["is_realtime"])
+        metrics["note"] = notes[metrics["source"]]
+    return records
+
+
+def calculate_realtime_pe_pb_batch(
+    codes: Optional[Iterable[str]] = None,
+    db_client=None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    批量计算动态 PE/PB（同步版本）
+
+    Args:
+        codes: 6位股票代码列表，为空时计算全市场
+        db_client: MongoDB客户端（可选）
+
+    Returns:
+        {code: 与 calculate_realtime_pe_pb 相同格式的结果}，无法计算的股票不在结果中
+    """
+    try:
+        if db_client is None:
+            from tradingagents.config.database_manager import get_database_manager
+            db_manager = get_database_manager()
+            if not db_manager.is_mongodb_available():
+                logger.debug("MongoDB不可用，无法批量计算实时PE/PB")
+                return {}
+            db_client = db_manager.get_mongodb_client()
+        db = _as_sync_client(db_client)['tradingagents']
+
+        codes = list(codes) if codes is not None else None
+        frames = documents_to_frames(
+            list(db.market_quotes.find(_code_filter(codes), REALTIME_QUOTE_PROJECTION)),
+            list(db.stock_basic_info.find(realtime_basic_query(codes), REALTIME_BASIC_PROJECTION)),
+            list(db.stock_financial_data.aggregate(latest_equity_pipeline(codes), allowDiskUse=True)),
+        )
+        metrics = metrics_frame_to_dict(compute_realtime_pe_pb_batch(*frames))
+        logger.info(f"✅ [批量实时PE计算] 完成 {len(metrics)}/{len(frames[0])} 只股票")
+        return metrics
+    except Exception as e:
+        logger.error(f"批量计算实时PE/PB失败: {e}", exc_info=True)
+        return {}
@@ -1,8 +1,11 @@
 import pandas as pd
 import yfinance as yf
 from stockstats import wrap
-from typing import Annotated
+from typing import Annotated, List, Tuple
 import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from tradingagents.config.config_manager import config_manager
 
 def get_config():
@@ -10,6 +13,44 @@ def get_config():
     return config_manager.load_settings()
 
 
+# 指标序列缓存：(symbol, 数据文件, 指标) -> (文件签名, 按日期索引的指标序列)
+# 文件签名为 (mtime_ns, size)，CSV被重新下载或改写后自动失效
+_MAX_CACHED_FRAMES = 8
+_MAX_CACHED_SERIES = 128
+_frame_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_series_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _file_signature(path: str) -> tuple:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _lru_get(cache: OrderedDict, key, signature):
+    with _cache_lock:
+        entry = cache.get(key)
+        if entry is None or entry[0] != signature:
+            return None
+        cache.move_to_end(key)
+        return entry[1]
+
+
+def _lru_put(cache: OrderedDict, key, signature, value, max_size: int):
+    with _cache_lock:
+        cache[key] = (signature, value)
+        cache.move_to_end(key)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+
+
+def clear_indicator_cache():
+    """清空指标缓存"""
+    with _cache_lock:
+        _frame_cache.clear()
+        _series_cache.clear()
+
+
 class StockstatsUtils:
     @staticmethod
     def get_stock_stats(
@@ -29,63 +70,110 @@ class StockstatsUtils:
             "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
         ] = False,
     ):
-        df = None
-        data = None
+        if online:
+            curr_date = pd.to_datetime(curr_date).strftime("%Y-%m-%d")
+        series = StockstatsUtils.get_indicator_series(symbol, indicator, data_dir, online=online)
+        matching = series[series.index.str.startswith(curr_date)]
 
-        if not online:
-            try:
-                data = pd.read_csv(
-                    os.path.join(
-                        data_dir,
-                        f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-                    )
-                )
-                df = wrap(data)
-            except FileNotFoundError:
-                raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
+        if not matching.empty:
+            indicator_value = matching.values[0]
+            return indicator_value
         else:
-            # Get today's date as YYYY-mm-dd to add to cache
-            today_date = pd.Timestamp.today()
-            curr_date = pd.to_datetime(curr_date)
+            return "N/A: Not a trading day (weekend or holiday)"
 
-            end_date = today_date
-            start_date = today_date - pd.DateOffset(years=15)
-            start_date = start_date.strftime("%Y-%m-%d")
-            end_date = end_date.strftime("%Y-%m-%d")
+    @staticmethod
+    def get_stock_stats_window(
+        symbol: Annotated[str, "ticker symbol for the company"],
+        indicator: Annotated[str, "stockstats indicator name"],
+        curr_date: Annotated[str, "end date of the window, YYYY-mm-dd"],
+        look_back_days: Annotated[int, "how many calendar days to look back"],
+        data_dir: Annotated[str, "directory where the stock data is stored."],
+        online: Annotated[bool, "whether to fetch data online"] = False,
+    ) -> List[Tuple[str, object]]:
+        """
+        一次性获取窗口内每个交易日的指标值（按日期倒序）
 
-            # Get config and ensure cache directory exists
-            config = get_config()
-            os.makedirs(config["data_cache_dir"], exist_ok=True)
+        数据只读取一次、指标在整段序列上只计算一次，再按交易日切片。
+        """
+        end = datetime.strptime(curr_date, "%Y-%m-%d").strftime("%Y-%m-%d")
+        start = (datetime.strptime(curr_date, "%Y-%m-%d") - timedelta(days=look_back_days)).strftime("%Y-%m-%d")
+        series = StockstatsUtils.get_indicator_series(symbol, indicator, data_dir, online=online)
+        window = series[(series.index >= start) & (series.index <= end)]
+        window = window[~window.index.duplicated(keep="first")].sort_index(ascending=False)
+        return list(window.items())
 
+    @staticmethod
+    def get_indicator_series(
+        symbol: Annotated[str, "ticker symbol for the company"],
+        indicator: Annotated[str, "stockstats indicator name"],
+        data_dir: Annotated[str, "directory where the stock data is stored."],
+        online: Annotated[bool, "whether to fetch data online"] = False,
+    ) -> pd.Series:
+        """指标在整段行情上的序列，索引为 YYYY-mm-dd 日期字符串；按数据文件签名缓存"""
+        data_file = StockstatsUtils._resolve_data_file(symbol, data_dir, online)
+        signature = _file_signature(data_file)
+        key = (symbol, data_file, indicator)
+
+        series = _lru_get(_series_cache, key, signature)
+        if series is not None:
+            return series
+
+        df = _lru_get(_frame_cache, data_file, signature)
+        if df is None:
+            data = pd.read_csv(data_file)
+            if online:
+                data["Date"] = pd.to_datetime(data["Date"])
+            df = wrap(data)
+            if online:
+                df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
+            _lru_put(_frame_cache, data_file, signature, df, _MAX_CACHED_FRAMES)
+
+        with _cache_lock:
+            # stockstats 在同一个 DataFrame 上追加指标列，需串行
+            values = df[indicator]  # trigger stockstats to calculate the indicator
+            series = pd.Series(values.values, index=df["Date"].astype(str).str[:10].values, name=indicator)
+        _lru_put(_series_cache, key, signature, series, _MAX_CACHED_SERIES)
+        return series
+
+    @staticmethod
+    def _resolve_data_file(symbol: str, data_dir: str, online: bool) -> str:
+        """定位行情CSV；在线模式下按需从Yahoo Finance下载"""
+        if not online:
             data_file = os.path.join(
-                config["data_cache_dir"],
-                f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
+                data_dir,
+                f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
             )
+            if not os.path.exists(data_file):
+                raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
+            return data_file
 
-            if os.path.exists(data_file):
-                data = pd.read_csv(data_file)
-                data["Date"] = pd.to_datetime(data["Date"])
-            else:
-                data = yf.download(
-                    symbol,
-                    start=start_date,
-                    end=end_date,
-                    multi_level_index=False,
-                    progress=False,
-                    auto_adjust=True,
-                )
-                data = data.reset_index()
-                data.to_csv(data_file, index=False)
+        # Get today's date as YYYY-mm-dd to add to cache
+        today_date = pd.Timestamp.today()
 
-            df = wrap(data)
-            df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
-            curr_date = curr_date.strftime("%Y-%m-%d")
+        end_date = today_date
+        start_date = today_date - pd.DateOffset(years=15)
+        start_date = start_date.strftime("%Y-%m-%d")
+        end_date = end_date.strftime("%Y-%m-%d")
 
-        df[indicator]  # trigger stockstats to calculate the indicator
-        matching_rows = df[df["Date"].str.startswith(curr_date)]
+        # Get config and ensure cache directory exists
+        config = get_config()
+        os.makedirs(config["data_cache_dir"], exist_ok=True)
 
-        if not matching_rows.empty:
-            indicator_value = matching_rows[indicator].values[0]
-            return indicator_value
-        else:
-            return "N/A: Not a trading day (weekend or holiday)"
+        data_file = os.path.join(
+            config["data_cache_dir"],
+            f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
+        )
+
+        if not os.path.exists(data_file):
+            data = yf.download(
+                symbol,
+                start=start_date,
+                end=end_date,
+                multi_level_index=False,
+                progress=False,
+                auto_adjust=True,
+            )
+            data = data.reset_index()
+            data.to_csv(data_file, index=False)
+
+        return data_file
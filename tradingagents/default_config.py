@@ -17,6 +17,8 @@ DEFAULT_CONFIG = {
     "max_debate_rounds": 1,
     "max_risk_discuss_rounds": 1,
     "max_recur_limit": 100,
+    # Run the selected analysts concurrently (each in its own subgraph) before the debate
+    "parallel_analysts": os.getenv("PARALLEL_ANALYSTS_ENABLED", "false").lower() == "true",
     # Tool settings - 从环境变量读取，提供默认值
     "online_tools": os.getenv("ONLINE_TOOLS_ENABLED", "false").lower() == "true",
     "online_news": os.getenv("ONLINE_NEWS_ENABLED", "true").lower() == "true", 
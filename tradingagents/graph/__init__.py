@@ -6,6 +6,7 @@ from .setup import GraphSetup
 from .propagation import Propagator
 from .reflection import Reflector
 from .signal_processing import SignalProcessor
+from .graph_pool import TradingGraphPool, get_trading_graph_pool
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
@@ -18,4 +19,6 @@ __all__ = [
     "Propagator",
     "Reflector",
     "SignalProcessor",
+    "TradingGraphPool",
+    "get_trading_graph_pool",
 ]
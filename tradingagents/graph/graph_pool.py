@@ -0,0 +1,160 @@
+# TradingAgents/graph/graph_pool.py
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# 导入统一日志系统
+from tradingagents.utils.logging_init import get_logger
+logger = get_logger("default")
+
+
+def config_fingerprint(config: Dict[str, Any], selected_analysts: List[str], debug: bool = False) -> str:
+    """Fingerprint of everything that shapes a TradingAgentsGraph instance.
+
+    The analysis config already carries provider, models, backend URLs, debate
+    rounds (research depth) and memory switches, so the whole config is hashed
+    together with the analyst list and debug flag.
+    """
+    payload = json.dumps(
+        {"config": config, "analysts": list(selected_analysts), "debug": bool(debug)},
+        sort_keys=True, default=str, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class GraphLease:
+    """A graph checked out from the pool for one analysis run."""
+
+    graph: Any
+    fingerprint: str
+    pool_hit: bool
+    construction_time: float  # 构建该实例实际花费的时间（秒）
+    acquire_time: float  # 本次获取耗时（命中时接近 0）
+
+    def metrics(self) -> Dict[str, Any]:
+        """Construction metrics merged into performance_metrics."""
+        return {
+            "pool_hit": self.pool_hit,
+            "construction_time": round(self.construction_time, 3),
+            "acquire_time": round(self.acquire_time, 3),
+            "saved_time": round(max(self.construction_time - self.acquire_time, 0.0), 3) if self.pool_hit else 0.0,
+        }
+
+
+class TradingGraphPool:
+    """Pool of constructed TradingAgentsGraph instances keyed by config fingerprint.
+
+    LLM clients, Toolkit, tool nodes, ChromaDB-backed memories and the compiled
+    LangGraph are built once per fingerprint and reused. An instance is checked
+    out exclusively for one run and returned afterwards, so concurrent tasks
+    with the same config get separate instances.
+    """
+
+    def __init__(self, max_idle_per_key: int = 2, max_keys: int = 8, factory=None):
+        """
+        Args:
+            max_idle_per_key: idle instances kept for one fingerprint
+            max_keys: fingerprints kept; least recently used ones are dropped
+            factory: callable(selected_analysts, debug, config) -> graph, defaults to TradingAgentsGraph
+        """
+        self.max_idle_per_key = max_idle_per_key
+        self.max_keys = max_keys
+        self._factory = factory
+        self._idle: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "saved_time": 0.0}
+
+    def _build(self, config: Dict[str, Any], selected_analysts: List[str], debug: bool):
+        factory = self._factory
+        if factory is None:
+            from .trading_graph import TradingAgentsGraph
+            factory = TradingAgentsGraph
+        start = time.time()
+        graph = factory(selected_analysts=selected_analysts, debug=debug, config=config)
+        elapsed = time.time() - start
+        if getattr(graph, "construction_time", None) is None:
+            graph.construction_time = elapsed
+        return graph
+
+    def acquire(self, config: Dict[str, Any], selected_analysts: Optional[List[str]] = None,
+                debug: Optional[bool] = None) -> GraphLease:
+        """Check out an instance for the given config, constructing one on a miss."""
+        selected_analysts = selected_analysts or config.get("selected_analysts", ["market", "fundamentals"])
+        debug = config.get("debug", False) if debug is None else debug
+        key = config_fingerprint(config, selected_analysts, debug)
+
+        start = time.time()
+        with self._lock:
+            idle = self._idle.get(key)
+            graph = idle.pop() if idle else None
+            if idle is not None:
+                self._idle.move_to_end(key)
+
+        if graph is not None:
+            acquire_time = time.time() - start
+            with self._lock:
+                self._stats["hits"] += 1
+                self._stats["saved_time"] += max(graph.construction_time - acquire_time, 0.0)
+            logger.info(f"♻️ [图实例池] 复用TradingAgents实例 (节省构建 {graph.construction_time:.2f}秒)")
+            return GraphLease(graph, key, True, graph.construction_time, acquire_time)
+
+        graph = self._build(config, selected_analysts, debug)
+        with self._lock:
+            self._stats["misses"] += 1
+        logger.info(f"🔧 [图实例池] 新建TradingAgents实例 (构建耗时 {graph.construction_time:.2f}秒)")
+        return GraphLease(graph, key, False, graph.construction_time, time.time() - start)
+
+    def release(self, lease: GraphLease) -> None:
+        """Return an instance to the pool once its run has finished."""
+        lease.graph.reset_run_state()
+        with self._lock:
+            idle = self._idle.setdefault(lease.fingerprint, [])
+            self._idle.move_to_end(lease.fingerprint)
+            if len(idle) < self.max_idle_per_key:
+                idle.append(lease.graph)
+            while len(self._idle) > self.max_keys:
+                self._idle.popitem(last=False)
+
+    @contextmanager
+    def lease(self, config: Dict[str, Any], selected_analysts: Optional[List[str]] = None,
+              debug: Optional[bool] = None):
+        """``with pool.lease(config) as lease: lease.graph.propagate(...)``"""
+        lease = self.acquire(config, selected_analysts, debug)
+        try:
+            yield lease
+        finally:
+            self.release(lease)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "saved_time": round(self._stats["saved_time"], 3),
+                "keys": len(self._idle),
+                "idle": sum(len(v) for v in self._idle.values()),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._idle.clear()
+
+
+_pool: Optional[TradingGraphPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_trading_graph_pool() -> TradingGraphPool:
+    """Process-wide TradingAgentsGraph pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = TradingGraphPool()
+    return _pool
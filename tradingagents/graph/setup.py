@@ -1,6 +1,8 @@
 # TradingAgents/graph/setup.py
 
+import time
 from typing import Dict, Any
+from langchain_core.runnables import RunnableConfig
 from langchain_openai import ChatOpenAI
 from langgraph.graph import END, StateGraph, START
 from langgraph.prebuilt import ToolNode
@@ -16,6 +18,15 @@ from tradingagents.utils.logging_init import get_logger
 logger = get_logger("default")
 
 
+# 并行模式下各分析师子图写回主图的状态字段
+ANALYST_OUTPUT_KEYS = {
+    "market": ("market_report", "market_tool_call_count"),
+    "social": ("sentiment_report", "sentiment_tool_call_count"),
+    "news": ("news_report", "news_tool_call_count"),
+    "fundamentals": ("fundamentals_report", "fundamentals_tool_call_count"),
+}
+
+
 class GraphSetup:
     """Handles the setup and configuration of the agent graph."""
 
@@ -48,8 +59,69 @@ class GraphSetup:
         self.config = config or {}
         self.react_llm = react_llm
 
+    def _add_analyst_loop(self, workflow: StateGraph, analyst_type: str, analyst_node, delete_node, tool_node):
+        """Add one analyst's Analyst -> tools -> Msg Clear loop to a workflow."""
+        current_analyst = f"{analyst_type.capitalize()} Analyst"
+        current_tools = f"tools_{analyst_type}"
+        current_clear = f"Msg Clear {analyst_type.capitalize()}"
+
+        workflow.add_node(current_analyst, analyst_node)
+        workflow.add_node(current_clear, delete_node)
+        workflow.add_node(current_tools, tool_node)
+
+        workflow.add_conditional_edges(
+            current_analyst,
+            getattr(self.conditional_logic, f"should_continue_{analyst_type}"),
+            [current_tools, current_clear],
+        )
+        workflow.add_edge(current_tools, current_analyst)
+        return current_analyst, current_clear
+
+    def _create_parallel_analyst_node(self, analyst_type: str, analyst_node, delete_node, tool_node):
+        """Wrap an analyst loop as an isolated subgraph node for parallel fan-out.
+
+        The subgraph has its own ``messages`` channel, so tool messages and the
+        ``Msg Clear`` removal of one analyst never touch its siblings. Only the
+        analyst's report fields are written back, together with per-node timings
+        measured inside the subgraph.
+        """
+        subgraph = StateGraph(AgentState)
+        entry, clear = self._add_analyst_loop(subgraph, analyst_type, analyst_node, delete_node, tool_node)
+        subgraph.add_edge(START, entry)
+        subgraph.add_edge(clear, END)
+        compiled = subgraph.compile()
+        output_keys = ANALYST_OUTPUT_KEYS[analyst_type]
+
+        def run_analyst(state, config: RunnableConfig):
+            # 子图使用独立的消息通道，只带入初始请求消息
+            sub_state = {k: v for k, v in state.items() if k != "messages"}
+            sub_state["messages"] = list(state.get("messages", []))
+
+            timings: Dict[str, float] = {}
+            result: Dict[str, Any] = {}
+            last = time.time()
+            for chunk in compiled.stream(sub_state, config, stream_mode="updates"):
+                now = time.time()
+                for node_name, update in chunk.items():
+                    if node_name.startswith("__"):
+                        continue
+                    # 子图内部串行执行，两次更新之间的时间即该节点耗时（多次进入累加）
+                    timings[node_name] = timings.get(node_name, 0.0) + (now - last)
+                    if isinstance(update, dict):
+                        result.update({k: v for k, v in update.items() if k in output_keys})
+                last = now
+
+            logger.info(
+                f"⏱️ [并行分析师] {analyst_type} 完成: "
+                + ", ".join(f"{k}={v:.2f}s" for k, v in timings.items())
+            )
+            result["analyst_timings"] = timings
+            return result
+
+        return run_analyst
+
     def setup_graph(
-        self, selected_analysts=["market", "social", "news", "fundamentals"]
+        self, selected_analysts=["market", "social", "news", "fundamentals"], parallel_analysts: bool = None
     ):
         """Set up and compile the agent workflow graph.
 
@@ -59,9 +131,14 @@ class GraphSetup:
                 - "social": Social media analyst
                 - "news": News analyst
                 - "fundamentals": Fundamentals analyst
+            parallel_analysts (bool): Run the analysts concurrently, each in its own
+                subgraph, and join before "Bull Researcher". Defaults to
+                config["parallel_analysts"].
         """
         if len(selected_analysts) == 0:
             raise ValueError("Trading Agents Graph Setup Error: no analysts selected!")
+        if parallel_analysts is None:
+            parallel_analysts = self.config.get("parallel_analysts", False)
 
         # Create analyst nodes
         analyst_nodes = {}
@@ -159,14 +236,6 @@ class GraphSetup:
         # Create workflow
         workflow = StateGraph(AgentState)
 
-        # Add analyst nodes to the graph
-        for analyst_type, node in analyst_nodes.items():
-            workflow.add_node(f"{analyst_type.capitalize()} Analyst", node)
-            workflow.add_node(
-                f"Msg Clear {analyst_type.capitalize()}", delete_nodes[analyst_type]
-            )
-            workflow.add_node(f"tools_{analyst_type}", tool_nodes[analyst_type])
-
         # Add other nodes
         workflow.add_node("Bull Researcher", bull_researcher_node)
         workflow.add_node("Bear Researcher", bear_researcher_node)
@@ -178,30 +247,30 @@ class GraphSetup:
         workflow.add_node("Risk Judge", risk_manager_node)
 
         # Define edges
-        # Start with the first analyst
-        first_analyst = selected_analysts[0]
-        workflow.add_edge(START, f"{first_analyst.capitalize()} Analyst")
-
-        # Connect analysts in sequence
-        for i, analyst_type in enumerate(selected_analysts):
-            current_analyst = f"{analyst_type.capitalize()} Analyst"
-            current_tools = f"tools_{analyst_type}"
-            current_clear = f"Msg Clear {analyst_type.capitalize()}"
-
-            # Add conditional edges for current analyst
-            workflow.add_conditional_edges(
-                current_analyst,
-                getattr(self.conditional_logic, f"should_continue_{analyst_type}"),
-                [current_tools, current_clear],
-            )
-            workflow.add_edge(current_tools, current_analyst)
-
-            # Connect to next analyst or to Bull Researcher if this is the last analyst
-            if i < len(selected_analysts) - 1:
-                next_analyst = f"{selected_analysts[i+1].capitalize()} Analyst"
-                workflow.add_edge(current_clear, next_analyst)
-            else:
-                workflow.add_edge(current_clear, "Bull Researcher")
+        if parallel_analysts:
+            # Fan out: every analyst runs in its own subgraph, join before Bull Researcher
+            logger.info(f"🚀 [并行分析师] 启用并行模式: {selected_analysts}")
+            parallel_nodes = []
+            for analyst_type in selected_analysts:
+                node_name = f"{analyst_type.capitalize()} Analyst"
+                workflow.add_node(node_name, self._create_parallel_analyst_node(
+                    analyst_type, analyst_nodes[analyst_type],
+                    delete_nodes[analyst_type], tool_nodes[analyst_type],
+                ))
+                workflow.add_edge(START, node_name)
+                parallel_nodes.append(node_name)
+            workflow.add_edge(parallel_nodes, "Bull Researcher")
+        else:
+            # Add analyst loops and connect them in sequence
+            previous_clear = None
+            for analyst_type in selected_analysts:
+                current_analyst, current_clear = self._add_analyst_loop(
+                    workflow, analyst_type, analyst_nodes[analyst_type],
+                    delete_nodes[analyst_type], tool_nodes[analyst_type],
+                )
+                workflow.add_edge(previous_clear or START, current_analyst)
+                previous_clear = current_clear
+            workflow.add_edge(previous_clear, "Bull Researcher")
 
         # Add remaining edges
         workflow.add_conditional_edges(
@@ -219,6 +219,7 @@ class TradingAgentsGraph:
             debug: Whether to run in debug mode
             config: Configuration dictionary. If None, uses default config
         """
+        construction_start = time.time()
         self.debug = debug
         self.config = config or DEFAULT_CONFIG
 
@@ -899,6 +900,16 @@ class TradingAgentsGraph:
         # Set up the graph
         self.graph = self.graph_setup.setup_graph(selected_analysts)
 
+        # 构建耗时（LLM客户端、记忆库、工具节点、图编译），实例池复用时据此统计节省的时间
+        self.construction_time = time.time() - construction_start
+
+    def reset_run_state(self):
+        """Drop per-run state so a pooled instance can be reused for another task."""
+        self.curr_state = None
+        self.ticker = None
+        self.log_states_dict = {}
+        self._current_task_id = None
+
     def _create_tool_nodes(self) -> Dict[str, ToolNode]:
         """Create tool nodes for different data sources.
 
@@ -973,8 +984,10 @@ class TradingAgentsGraph:
         logger.debug(f"🔍 [GRAPH DEBUG] 接收到的trade_date: '{trade_date}' (类型: {type(trade_date)})")
         logger.debug(f"🔍 [GRAPH DEBUG] 接收到的task_id: '{task_id}'")
 
-        self.ticker = company_name
-        logger.debug(f"🔍 [GRAPH DEBUG] 设置self.ticker: '{self.ticker}'")
+        # 运行期间只使用局部状态；实例可能来自实例池，全局配置按本实例重新应用
+        ticker = company_name
+        set_config(self.config)
+        self.toolkit.update_config(self.config)
 
         # Initialize state
         logger.debug(f"🔍 [GRAPH DEBUG] 创建初始状态，传递参数: company_name='{company_name}', trade_date='{trade_date}'")
@@ -989,9 +1002,7 @@ class TradingAgentsGraph:
         total_start_time = time.time()  # 总体开始时间
         current_node_start = None  # 当前节点开始时间
         current_node_name = None  # 当前节点名称
-
-        # 保存task_id用于后续保存性能数据
-        self._current_task_id = task_id
+        analyst_timings = {}  # 并行分析师模式下各子图上报的节点耗时
 
         # 根据是否有进度回调选择不同的stream_mode
         args = self.propagator.get_graph_args(use_progress_callback=bool(progress_callback))
@@ -1001,6 +1012,7 @@ class TradingAgentsGraph:
             trace = []
             final_state = None
             for chunk in self.graph.stream(init_agent_state, **args):
+                self._collect_analyst_timings(chunk, analyst_timings)
                 # 记录节点计时
                 for node_name in chunk.keys():
                     if not node_name.startswith('__'):
@@ -1045,6 +1057,7 @@ class TradingAgentsGraph:
                 trace = []
                 final_state = None
                 for chunk in self.graph.stream(init_agent_state, **args):
+                    self._collect_analyst_timings(chunk, analyst_timings)
                     # 记录节点计时
                     for node_name in chunk.keys():
                         if not node_name.startswith('__'):
@@ -1075,6 +1088,7 @@ class TradingAgentsGraph:
                 trace = []
                 final_state = None
                 for chunk in self.graph.stream(init_agent_state, **args):
+                    self._collect_analyst_timings(chunk, analyst_timings)
                     # 记录节点计时
                     for node_name in chunk.keys():
                         if not node_name.startswith('__'):
@@ -1102,6 +1116,11 @@ class TradingAgentsGraph:
             node_timings[current_node_name] = elapsed
             logger.info(f"⏱️ [{current_node_name}] 耗时: {elapsed:.2f}秒")
 
+        # 并行分析师模式：分析师节点同时运行，按 chunk 到达顺序推算的耗时不准确，
+        # 使用子图内部测得的各节点耗时
+        if analyst_timings:
+            node_timings.update(analyst_timings)
+
         # 计算总时间
         total_elapsed = time.time() - total_start_time
 
@@ -1122,10 +1141,12 @@ class TradingAgentsGraph:
         final_state['performance_metrics'] = performance_data
 
         # Store current state for reflection
+        self.ticker = ticker
         self.curr_state = final_state
+        self._current_task_id = task_id
 
         # Log state
-        self._log_state(trade_date, final_state)
+        self._log_state(trade_date, final_state, ticker)
 
         # 获取模型信息
         model_info = ""
@@ -1144,6 +1165,15 @@ class TradingAgentsGraph:
         # Return decision and processed signal
         return final_state, decision
 
+    @staticmethod
+    def _collect_analyst_timings(chunk, analyst_timings: Dict[str, float]):
+        """收集并行分析师子图上报的节点耗时（兼容 updates / values 两种 stream_mode）"""
+        if not isinstance(chunk, dict):
+            return
+        for update in [chunk, *chunk.values()]:
+            if isinstance(update, dict) and isinstance(update.get("analyst_timings"), dict):
+                analyst_timings.update(update["analyst_timings"])
+
     def _send_progress_update(self, chunk, progress_callback):
         """发送进度更新到回调函数
 
@@ -1420,8 +1450,9 @@ class TradingAgentsGraph:
         logger.info(f"  • 快速思考模型: {self.config.get('quick_think_llm', 'unknown')}")
         logger.info("=" * 80)
 
-    def _log_state(self, trade_date, final_state):
+    def _log_state(self, trade_date, final_state, ticker=None):
         """Log the final state to a JSON file."""
+        ticker = ticker or self.ticker
         self.log_states_dict[str(trade_date)] = {
             "company_of_interest": final_state["company_of_interest"],
             "trade_date": final_state["trade_date"],
@@ -1453,11 +1484,11 @@ class TradingAgentsGraph:
         }
 
         # Save to file
-        directory = Path(f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/")
+        directory = Path(f"eval_results/{ticker}/TradingAgentsStrategy_logs/")
         directory.mkdir(parents=True, exist_ok=True)
 
         with open(
-            f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/full_states_log.json",
+            f"eval_results/{ticker}/TradingAgentsStrategy_logs/full_states_log.json",
             "w",
         ) as f:
             json.dump(self.log_states_dict, f, indent=4)
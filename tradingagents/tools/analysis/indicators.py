@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -156,6 +156,38 @@ def atr(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 14) -> pd.Se
     return tr.rolling(window=int(n), min_periods=int(n)).mean()
 
 
+def _kdj_recursive(rsv: np.ndarray, m1: int = 3, m2: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    KDJ 的 K/D 递推（初始化 50），RSV 为 NaN 的位置输出 NaN 且不推进状态。
+
+    Args:
+        rsv: 一维 (T,) 或二维 (T, S) 的 RSV 数组，第一维为时间
+        m1: K 平滑周期
+        m2: D 平滑周期
+
+    Returns:
+        (k, d) 与 rsv 同形状的数组
+    """
+    rsv = np.asarray(rsv, dtype=float)
+    k = np.full(rsv.shape, np.nan)
+    d = np.full(rsv.shape, np.nan)
+    alpha_k = 1 / float(m1)
+    alpha_d = 1 / float(m2)
+    last_k = np.full(rsv.shape[1:], 50.0)
+    last_d = np.full(rsv.shape[1:], 50.0)
+    # 只在时间维循环，截面（多只股票）上一次性向量化计算
+    for i in range(rsv.shape[0]):
+        rv = rsv[i]
+        valid = ~np.isnan(rv)
+        curr_k = (1 - alpha_k) * last_k + alpha_k * rv
+        curr_d = (1 - alpha_d) * last_d + alpha_d * curr_k
+        k[i] = np.where(valid, curr_k, np.nan)
+        d[i] = np.where(valid, curr_d, np.nan)
+        last_k = np.where(valid, curr_k, last_k)
+        last_d = np.where(valid, curr_d, last_d)
+    return k, d
+
+
 def kdj(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 9, m1: int = 3, m2: int = 3) -> pd.DataFrame:
     lowest_low = low.rolling(window=int(n), min_periods=int(n)).min()
     highest_high = high.rolling(window=int(n), min_periods=int(n)).max()
@@ -164,43 +196,27 @@ def kdj(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 9, m1: int =
     rsv = rsv.replace([np.inf, -np.inf], np.nan)
 
     # 按经典公式递推（初始化 50）
-    k = pd.Series(np.nan, index=close.index)
-    d = pd.Series(np.nan, index=close.index)
-    alpha_k = 1 / float(m1)
-    alpha_d = 1 / float(m2)
-    last_k = 50.0
-    last_d = 50.0
-    for i in range(len(close)):
-        rv = rsv.iloc[i]
-        if np.isnan(rv):
-            k.iloc[i] = np.nan
-            d.iloc[i] = np.nan
-            continue
-        curr_k = (1 - alpha_k) * last_k + alpha_k * rv
-        curr_d = (1 - alpha_d) * last_d + alpha_d * curr_k
-        k.iloc[i] = curr_k
-        d.iloc[i] = curr_d
-        last_k, last_d = curr_k, curr_d
+    k_arr, d_arr = _kdj_recursive(rsv.to_numpy(dtype=float), m1, m2)
+    k = pd.Series(k_arr, index=close.index)
+    d = pd.Series(d_arr, index=close.index)
     j = 3 * k - 2 * d
     return pd.DataFrame({"kdj_k": k, "kdj_d": d, "kdj_j": j})
 
 
-def compute_indicator(df: pd.DataFrame, spec: IndicatorSpec) -> pd.DataFrame:
+def _indicator_columns(df: pd.DataFrame, spec: IndicatorSpec) -> Dict[str, pd.Series]:
+    """计算单个指标，返回 {列名: 序列}，不复制输入 DataFrame"""
     name = spec.name.lower()
     params = spec.params or {}
-    out = df.copy()
 
     if name == "ma":
         _require_cols(df, ["close"])
         n = int(params.get("n", params.get("period", 20)))
-        out[f"ma{n}"] = ma(df["close"], n)
-        return out
+        return {f"ma{n}": ma(df["close"], n)}
 
     if name == "ema":
         _require_cols(df, ["close"])
         n = int(params.get("n", params.get("period", 20)))
-        out[f"ema{n}"] = ema(df["close"], n)
-        return out
+        return {f"ema{n}": ema(df["close"], n)}
 
     if name == "macd":
         _require_cols(df, ["close"])
@@ -208,30 +224,24 @@ def compute_indicator(df: pd.DataFrame, spec: IndicatorSpec) -> pd.DataFrame:
         slow = int(params.get("slow", 26))
         signal = int(params.get("signal", 9))
         macd_df = macd(df["close"], fast=fast, slow=slow, signal=signal)
-        for c in macd_df.columns:
-            out[c] = macd_df[c]
-        return out
+        return {c: macd_df[c] for c in macd_df.columns}
 
     if name == "rsi":
         _require_cols(df, ["close"])
         n = int(params.get("n", params.get("period", 14)))
-        out[f"rsi{n}"] = rsi(df["close"], n)
-        return out
+        return {f"rsi{n}": rsi(df["close"], n)}
 
     if name == "boll":
         _require_cols(df, ["close"])
         n = int(params.get("n", 20))
         k = float(params.get("k", 2.0))
         boll_df = boll(df["close"], n=n, k=k)
-        for c in boll_df.columns:
-            out[c] = boll_df[c]
-        return out
+        return {c: boll_df[c] for c in boll_df.columns}
 
     if name == "atr":
         _require_cols(df, ["high", "low", "close"])
         n = int(params.get("n", 14))
-        out[f"atr{n}"] = atr(df["high"], df["low"], df["close"], n=n)
-        return out
+        return {f"atr{n}": atr(df["high"], df["low"], df["close"], n=n)}
 
     if name == "kdj":
         _require_cols(df, ["high", "low", "close"])
@@ -239,17 +249,20 @@ def compute_indicator(df: pd.DataFrame, spec: IndicatorSpec) -> pd.DataFrame:
         m1 = int(params.get("m1", 3))
         m2 = int(params.get("m2", 3))
         kdj_df = kdj(df["high"], df["low"], df["close"], n=n, m1=m1, m2=m2)
-        for c in kdj_df.columns:
-            out[c] = kdj_df[c]
-        return out
+        return {c: kdj_df[c] for c in kdj_df.columns}
 
     raise ValueError(f"不支持的指标: {name}")
 
 
-def compute_many(df: pd.DataFrame, specs: List[IndicatorSpec]) -> pd.DataFrame:
-    if not specs:
-        return df.copy()
-    # 粗略去重（按 name+sorted(params)）
+def compute_indicator(df: pd.DataFrame, spec: IndicatorSpec) -> pd.DataFrame:
+    out = df.copy()
+    for c, v in _indicator_columns(df, spec).items():
+        out[c] = v
+    return out
+
+
+def _dedupe_specs(specs: List[IndicatorSpec]) -> List[IndicatorSpec]:
+    """粗略去重（按 name+sorted(params)），保持原顺序"""
     def key(s: IndicatorSpec):
         p = s.params or {}
         items = tuple(sorted(p.items()))
@@ -262,10 +275,18 @@ def compute_many(df: pd.DataFrame, specs: List[IndicatorSpec]) -> pd.DataFrame:
         if k not in seen:
             seen.add(k)
             unique_specs.append(s)
+    return unique_specs
+
+
+def compute_many(df: pd.DataFrame, specs: List[IndicatorSpec]) -> pd.DataFrame:
+    if not specs:
+        return df.copy()
 
+    # 只复制一次输入，各指标列直接写入结果
     out = df.copy()
-    for s in unique_specs:
-        out = compute_indicator(out, s)
+    for s in _dedupe_specs(specs):
+        for c, v in _indicator_columns(df, s).items():
+            out[c] = v
     return out
 
 
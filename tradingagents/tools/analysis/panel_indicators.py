@@ -0,0 +1,261 @@
+"""
+多股票（面板）技术指标批量计算引擎
+
+与 indicators.compute_many 逐只股票、逐个指标计算不同，这里先把长表
+(code, trade_date, OHLCV) 或二维 NumPy 数组整理成 (时间 × 股票) 的宽表，
+再对整张宽表一次性计算 MA/EMA/MACD/RSI/BOLL/ATR/KDJ：
+
+- 不按指标复制 DataFrame；
+- 同一次计算内共享中间结果（如 ema12/ema26 同时用于 ema 与 macd，ma20 同时用于 ma 与 boll）；
+- 每只股票的数据按位置左对齐，末尾用 NaN 补齐，因此每只股票的结果
+  与对其单独调用 compute_many 得到的数值一致。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.tools.analysis.indicators import (
+    IndicatorSpec,
+    _dedupe_specs,
+    _kdj_recursive,
+    ema,
+    ma,
+    rsi,
+)
+
+
+PANEL_FIELDS = ("open", "high", "low", "close", "vol", "amount")
+
+
+@dataclass
+class IndicatorPanel:
+    """
+    宽表形式的行情面板
+
+    Attributes:
+        symbols: 股票代码列表，对应宽表的列
+        lengths: 每只股票的有效K线数量
+        fields: {字段名: (T, S) 数组}，第 t 行为该股票的第 t 根K线（左对齐，末尾补 NaN）
+    """
+    symbols: List[str]
+    lengths: np.ndarray
+    fields: Dict[str, np.ndarray]
+
+    @property
+    def n_bars(self) -> int:
+        return int(self.lengths.max()) if len(self.lengths) else 0
+
+    def frame(self, field: str) -> pd.DataFrame:
+        return pd.DataFrame(self.fields[field], columns=self.symbols, copy=False)
+
+
+def panel_from_long(
+    df: pd.DataFrame,
+    symbol_col: str = "code",
+    date_col: str = "trade_date",
+    fields: Sequence[str] = PANEL_FIELDS,
+) -> Tuple[IndicatorPanel, np.ndarray, np.ndarray]:
+    """
+    将长表转换为面板
+
+    Args:
+        df: 长表，每行一根K线；需已按 (symbol_col, date_col) 排序
+        symbol_col: 股票代码列名
+        date_col: 日期列名
+        fields: 需要放入面板的字段（不存在的列会被忽略）
+
+    Returns:
+        (panel, pos, col)：pos/col 为每一行在宽表中的行号/列号，便于把结果散回长表
+    """
+    codes, symbols = pd.factorize(df[symbol_col], sort=False)
+    pos = df.groupby(codes, sort=False).cumcount().to_numpy()
+    n_symbols = len(symbols)
+    lengths = np.bincount(codes, minlength=n_symbols)
+    n_bars = int(lengths.max()) if n_symbols else 0
+
+    arrays: Dict[str, np.ndarray] = {}
+    for f in fields:
+        if f not in df.columns:
+            continue
+        arr = np.full((n_bars, n_symbols), np.nan)
+        arr[pos, codes] = pd.to_numeric(df[f], errors="coerce").to_numpy(dtype=float)
+        arrays[f] = arr
+    return IndicatorPanel(symbols=[str(s) for s in symbols], lengths=lengths, fields=arrays), pos, codes
+
+
+class _PanelContext:
+    """单次面板计算的上下文，缓存可共享的中间结果"""
+
+    def __init__(self, panel: IndicatorPanel):
+        self.panel = panel
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._cache: Dict[tuple, pd.DataFrame] = {}
+
+    def field(self, name: str) -> pd.DataFrame:
+        if name not in self.panel.fields:
+            raise ValueError(f"面板缺少必要字段: {name}, 现有字段: {list(self.panel.fields)}")
+        if name not in self._frames:
+            self._frames[name] = self.panel.frame(name)
+        return self._frames[name]
+
+    def cached(self, key: tuple, fn: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        if key not in self._cache:
+            self._cache[key] = fn()
+        return self._cache[key]
+
+    # --- 可共享的基础量 ---
+    def ma(self, n: int) -> pd.DataFrame:
+        return self.cached(("ma", n), lambda: ma(self.field("close"), n))
+
+    def std(self, n: int) -> pd.DataFrame:
+        return self.cached(("std", n), lambda: self.field("close").rolling(window=n, min_periods=1).std())
+
+    def ema(self, n: int) -> pd.DataFrame:
+        return self.cached(("ema", n), lambda: ema(self.field("close"), n))
+
+    def true_range(self) -> pd.DataFrame:
+        def _tr():
+            high, low, close = self.field("high"), self.field("low"), self.field("close")
+            prev_close = close.shift(1)
+            # 与 atr() 中 concat(...).max(axis=1) 一致：忽略 NaN 取最大值
+            return np.fmax(np.fmax((high - low).abs(), (high - prev_close).abs()), (low - prev_close).abs())
+        return self.cached(("tr",), _tr)
+
+
+def _spec_columns(ctx: _PanelContext, spec: IndicatorSpec) -> Dict[str, pd.DataFrame]:
+    """计算单个指标的宽表结果，列名规则与 indicators.compute_indicator 保持一致"""
+    name = spec.name.lower()
+    params = spec.params or {}
+
+    if name == "ma":
+        n = int(params.get("n", params.get("period", 20)))
+        return {f"ma{n}": ctx.ma(n)}
+
+    if name == "ema":
+        n = int(params.get("n", params.get("period", 20)))
+        return {f"ema{n}": ctx.ema(n)}
+
+    if name == "macd":
+        fast = int(params.get("fast", 12))
+        slow = int(params.get("slow", 26))
+        signal = int(params.get("signal", 9))
+        dif = ctx.ema(fast) - ctx.ema(slow)
+        dea = dif.ewm(span=signal, adjust=False).mean()
+        return {"dif": dif, "dea": dea, "macd_hist": dif - dea}
+
+    if name == "rsi":
+        n = int(params.get("n", params.get("period", 14)))
+        return {f"rsi{n}": ctx.cached(("rsi", n), lambda: rsi(ctx.field("close"), n))}
+
+    if name == "boll":
+        n = int(params.get("n", 20))
+        k = float(params.get("k", 2.0))
+        mid = ctx.ma(n)
+        std = ctx.std(n)
+        return {"boll_mid": mid, "boll_upper": mid + k * std, "boll_lower": mid - k * std}
+
+    if name == "atr":
+        n = int(params.get("n", 14))
+        return {f"atr{n}": ctx.true_range().rolling(window=n, min_periods=n).mean()}
+
+    if name == "kdj":
+        n = int(params.get("n", 9))
+        m1 = int(params.get("m1", 3))
+        m2 = int(params.get("m2", 3))
+        high, low, close = ctx.field("high"), ctx.field("low"), ctx.field("close")
+        lowest_low = low.rolling(window=n, min_periods=n).min()
+        highest_high = high.rolling(window=n, min_periods=n).max()
+        rsv = (close - lowest_low) / (highest_high - lowest_low) * 100
+        rsv = rsv.replace([np.inf, -np.inf], np.nan)
+        k_arr, d_arr = _kdj_recursive(rsv.to_numpy(dtype=float), m1, m2)
+        k = pd.DataFrame(k_arr, columns=close.columns, copy=False)
+        d = pd.DataFrame(d_arr, columns=close.columns, copy=False)
+        return {"kdj_k": k, "kdj_d": d, "kdj_j": 3 * k - 2 * d}
+
+    raise ValueError(f"不支持的指标: {name}")
+
+
+def compute_panel(panel: IndicatorPanel, specs: List[IndicatorSpec]) -> Dict[str, np.ndarray]:
+    """
+    对面板一次性计算全部指标
+
+    Args:
+        panel: 行情面板
+        specs: 指标列表（与 compute_many 相同的规格，自动去重）
+
+    Returns:
+        {指标列名: (T, S) 数组}
+    """
+    ctx = _PanelContext(panel)
+    out: Dict[str, np.ndarray] = {}
+    for spec in _dedupe_specs(specs):
+        for c, v in _spec_columns(ctx, spec).items():
+            out[c] = v.to_numpy(dtype=float)
+    return out
+
+
+def compute_many_arrays(
+    specs: List[IndicatorSpec],
+    close: np.ndarray,
+    high: Optional[np.ndarray] = None,
+    low: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    对堆叠的二维数组批量计算指标
+
+    Args:
+        specs: 指标列表
+        close: (S, T) 收盘价数组，每行一只股票、按时间升序
+        high: (S, T) 最高价数组（ATR/KDJ 需要）
+        low: (S, T) 最低价数组（ATR/KDJ 需要）
+
+    Returns:
+        {指标列名: (S, T) 数组}
+    """
+    close = np.atleast_2d(np.asarray(close, dtype=float))
+    n_symbols, n_bars = close.shape
+    fields = {"close": close.T}
+    if high is not None:
+        fields["high"] = np.atleast_2d(np.asarray(high, dtype=float)).T
+    if low is not None:
+        fields["low"] = np.atleast_2d(np.asarray(low, dtype=float)).T
+    panel = IndicatorPanel(
+        symbols=[str(i) for i in range(n_symbols)],
+        lengths=np.full(n_symbols, n_bars),
+        fields=fields,
+    )
+    return {c: arr.T for c, arr in compute_panel(panel, specs).items()}
+
+
+def compute_many_panel(
+    df: pd.DataFrame,
+    specs: List[IndicatorSpec],
+    symbol_col: str = "code",
+    date_col: str = "trade_date",
+) -> pd.DataFrame:
+    """
+    长表版本的 compute_many：一次计算所有股票的指标
+
+    Args:
+        df: 长表，至少包含 symbol_col、date_col 与 close（ATR/KDJ 还需 high/low）
+        specs: 指标列表
+        symbol_col: 股票代码列名
+        date_col: 日期列名
+
+    Returns:
+        按 (symbol_col, date_col) 排序后的新 DataFrame，附加指标列（不修改输入）
+    """
+    out = df.sort_values([symbol_col, date_col], kind="mergesort")
+    if not specs or out.empty:
+        return out.copy()
+
+    panel, pos, col = panel_from_long(out, symbol_col=symbol_col, date_col=date_col)
+    results = compute_panel(panel, specs)
+    # sort_values 已返回新对象，直接写入指标列，避免再整体拼接复制
+    for c, arr in results.items():
+        out[c] = arr[pos, col]
+    return out
@@ -0,0 +1,326 @@
+"""
+增量（流式）技术指标状态
+
+为单只股票保存 EMA/RSI/MACD/KDJ 的递推状态以及 MA/BOLL/ATR 的滚动窗口缓冲区，
+新到一根K线时 O(1) 更新，无需从第一根K线重新计算。
+
+- 指标规格与列名与 indicators.compute_many 保持一致；
+- 同一交易日的多次更新（盘中快照）视为对最后一根K线的修正，而不是追加新K线；
+- to_dict()/from_dict() 输出纯 JSON 结构，可直接存入 Redis/MongoDB。
+
+示例：
+    >>> state = StreamingIndicators.from_history(df)          # 用历史K线初始化
+    >>> values = state.update({"trade_date": "2025-01-02", "high": 10.5, "low": 9.8, "close": 10.2})
+    >>> values["ma20"], values["rsi14"], values["kdj_k"]
+"""
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import pandas as pd
+
+from tradingagents.tools.analysis.indicators import IndicatorSpec, _dedupe_specs
+
+
+STATE_VERSION = 1
+
+# 与选股服务 TECH_FIELDS 对应的默认指标集合
+DEFAULT_STREAMING_SPECS: List[IndicatorSpec] = [
+    IndicatorSpec("ma", {"n": 5}),
+    IndicatorSpec("ma", {"n": 10}),
+    IndicatorSpec("ma", {"n": 20}),
+    IndicatorSpec("ma", {"n": 60}),
+    IndicatorSpec("ema", {"n": 12}),
+    IndicatorSpec("ema", {"n": 26}),
+    IndicatorSpec("macd"),
+    IndicatorSpec("rsi", {"n": 14}),
+    IndicatorSpec("boll", {"n": 20, "k": 2}),
+    IndicatorSpec("atr", {"n": 14}),
+    IndicatorSpec("kdj", {"n": 9, "m1": 3, "m2": 3}),
+]
+
+
+def _to_float(v: Any) -> Optional[float]:
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(f) else f
+
+
+def _ewm_step(last: Optional[float], x: float, alpha: float) -> float:
+    """ewm(adjust=False) 的单步递推，首个观测值直接作为初值"""
+    if last is None:
+        return x
+    return (1 - alpha) * last + alpha * x
+
+
+class _State:
+    """单个指标的增量状态"""
+
+    def update(self, bar: Dict[str, float], prev_close: Optional[float]) -> Dict[str, Optional[float]]:
+        raise NotImplementedError
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: (list(v) if isinstance(v, deque) else v) for k, v in self.__dict__.items()}
+
+    def load(self, data: Mapping[str, Any]) -> None:
+        for k, v in data.items():
+            cur = getattr(self, k, None)
+            setattr(self, k, deque(v, maxlen=cur.maxlen) if isinstance(cur, deque) else v)
+
+
+class _MAState(_State):
+    def __init__(self, n: int):
+        self.n = n
+        self.buf = deque(maxlen=n)
+
+    def update(self, bar, prev_close):
+        self.buf.append(bar["close"])
+        return {f"ma{self.n}": math.fsum(self.buf) / len(self.buf)}
+
+
+class _EMAState(_State):
+    def __init__(self, n: int):
+        self.n = n
+        self.value: Optional[float] = None
+
+    def update(self, bar, prev_close):
+        self.value = _ewm_step(self.value, bar["close"], 2 / (self.n + 1.0))
+        return {f"ema{self.n}": self.value}
+
+
+class _MACDState(_State):
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast, self.slow, self.signal = fast, slow, signal
+        self.ema_fast: Optional[float] = None
+        self.ema_slow: Optional[float] = None
+        self.dea: Optional[float] = None
+
+    def update(self, bar, prev_close):
+        close = bar["close"]
+        self.ema_fast = _ewm_step(self.ema_fast, close, 2 / (self.fast + 1.0))
+        self.ema_slow = _ewm_step(self.ema_slow, close, 2 / (self.slow + 1.0))
+        dif = self.ema_fast - self.ema_slow
+        self.dea = _ewm_step(self.dea, dif, 2 / (self.signal + 1.0))
+        return {"dif": dif, "dea": self.dea, "macd_hist": dif - self.dea}
+
+
+class _RSIState(_State):
+    """Wilder RSI（与 rsi(method='ema') 一致）"""
+
+    def __init__(self, n: int = 14):
+        self.n = n
+        self.avg_gain: Optional[float] = None
+        self.avg_loss: Optional[float] = None
+
+    def update(self, bar, prev_close):
+        delta = 0.0 if prev_close is None else bar["close"] - prev_close
+        alpha = 1 / float(self.n)
+        self.avg_gain = _ewm_step(self.avg_gain, max(delta, 0.0), alpha)
+        self.avg_loss = _ewm_step(self.avg_loss, max(-delta, 0.0), alpha)
+        if self.avg_loss == 0:
+            return {f"rsi{self.n}": None}
+        rs = self.avg_gain / self.avg_loss
+        return {f"rsi{self.n}": 100 - (100 / (1 + rs))}
+
+
+class _BollState(_State):
+    def __init__(self, n: int = 20, k: float = 2.0):
+        self.n, self.k = n, k
+        self.buf = deque(maxlen=n)
+
+    def update(self, bar, prev_close):
+        self.buf.append(bar["close"])
+        cnt = len(self.buf)
+        mid = math.fsum(self.buf) / cnt
+        if cnt < 2:
+            return {"boll_mid": mid, "boll_upper": None, "boll_lower": None}
+        std = math.sqrt(math.fsum((x - mid) ** 2 for x in self.buf) / (cnt - 1))
+        return {"boll_mid": mid, "boll_upper": mid + self.k * std, "boll_lower": mid - self.k * std}
+
+
+class _ATRState(_State):
+    def __init__(self, n: int = 14):
+        self.n = n
+        self.buf = deque(maxlen=n)
+
+    def update(self, bar, prev_close):
+        high, low = bar.get("high"), bar.get("low")
+        if high is None or low is None:
+            return {f"atr{self.n}": None}
+        tr = abs(high - low)
+        if prev_close is not None:
+            tr = max(tr, abs(high - prev_close), abs(low - prev_close))
+        self.buf.append(tr)
+        if len(self.buf) < self.n:
+            return {f"atr{self.n}": None}
+        return {f"atr{self.n}": math.fsum(self.buf) / self.n}
+
+
+class _KDJState(_State):
+    def __init__(self, n: int = 9, m1: int = 3, m2: int = 3):
+        self.n, self.m1, self.m2 = n, m1, m2
+        self.highs = deque(maxlen=n)
+        self.lows = deque(maxlen=n)
+        self.k = 50.0
+        self.d = 50.0
+
+    def update(self, bar, prev_close):
+        empty = {"kdj_k": None, "kdj_d": None, "kdj_j": None}
+        high, low = bar.get("high"), bar.get("low")
+        if high is None or low is None:
+            return empty
+        self.highs.append(high)
+        self.lows.append(low)
+        if len(self.highs) < self.n:
+            return empty
+        lowest, highest = min(self.lows), max(self.highs)
+        if highest == lowest:
+            # RSV 无法计算：与批量实现一致，输出 NaN 且不推进 K/D
+            return empty
+        rsv = (bar["close"] - lowest) / (highest - lowest) * 100
+        alpha_k, alpha_d = 1 / float(self.m1), 1 / float(self.m2)
+        self.k = (1 - alpha_k) * self.k + alpha_k * rsv
+        self.d = (1 - alpha_d) * self.d + alpha_d * self.k
+        return {"kdj_k": self.k, "kdj_d": self.d, "kdj_j": 3 * self.k - 2 * self.d}
+
+
+def _build_state(spec: IndicatorSpec) -> _State:
+    name = spec.name.lower()
+    params = spec.params or {}
+    if name == "ma":
+        return _MAState(int(params.get("n", params.get("period", 20))))
+    if name == "ema":
+        return _EMAState(int(params.get("n", params.get("period", 20))))
+    if name == "macd":
+        return _MACDState(int(params.get("fast", 12)), int(params.get("slow", 26)), int(params.get("signal", 9)))
+    if name == "rsi":
+        return _RSIState(int(params.get("n", params.get("period", 14))))
+    if name == "boll":
+        return _BollState(int(params.get("n", 20)), float(params.get("k", 2.0)))
+    if name == "atr":
+        return _ATRState(int(params.get("n", 14)))
+    if name == "kdj":
+        return _KDJState(int(params.get("n", 9)), int(params.get("m1", 3)), int(params.get("m2", 3)))
+    raise ValueError(f"不支持的指标: {name}")
+
+
+def _spec_id(spec: IndicatorSpec) -> str:
+    params = spec.params or {}
+    return spec.name.lower() + "".join(f"|{k}={params[k]}" for k in sorted(params))
+
+
+class StreamingIndicators:
+    """
+    单只股票的增量指标计算器
+
+    Args:
+        specs: 指标规格列表，默认 DEFAULT_STREAMING_SPECS
+    """
+
+    def __init__(self, specs: Optional[List[IndicatorSpec]] = None):
+        self.specs = _dedupe_specs(list(specs or DEFAULT_STREAMING_SPECS))
+        self._states: Dict[str, _State] = {_spec_id(s): _build_state(s) for s in self.specs}
+        self.last_date: Optional[str] = None
+        self.last_close: Optional[float] = None
+        self.bars = 0
+        self._values: Dict[str, Optional[float]] = {}
+        # 最后一根K线之前的状态快照，用于同一交易日的盘中修正
+        self._checkpoint: Optional[Dict[str, Any]] = None
+
+    # --- 更新 ---
+    def update(self, bar: Mapping[str, Any]) -> Dict[str, Optional[float]]:
+        """
+        推入一根K线并返回最新指标值
+
+        Args:
+            bar: 至少包含 close；ATR/KDJ 需要 high/low；trade_date（或 date）用于识别盘中修正
+
+        Returns:
+            {指标列名: 数值或 None}
+        """
+        close = _to_float(bar.get("close"))
+        if close is None:
+            return dict(self._values)
+        trade_date = bar.get("trade_date") or bar.get("date")
+        trade_date = str(trade_date) if trade_date is not None else None
+
+        if trade_date is not None and trade_date == self.last_date and self._checkpoint is not None:
+            # 同一交易日：回滚到该K线之前的状态再重新计算
+            self._restore(self._checkpoint)
+        else:
+            self._checkpoint = self._snapshot()
+
+        clean = {"close": close, "high": _to_float(bar.get("high")), "low": _to_float(bar.get("low"))}
+        values: Dict[str, Optional[float]] = {}
+        for state in self._states.values():
+            values.update(state.update(clean, self.last_close))
+
+        self.last_close = close
+        self.last_date = trade_date
+        self.bars += 1
+        self._values = values
+        return dict(values)
+
+    def update_many(self, bars: Iterable[Mapping[str, Any]]) -> Dict[str, Optional[float]]:
+        for bar in bars:
+            self.update(bar)
+        return self.values()
+
+    def values(self) -> Dict[str, Optional[float]]:
+        return dict(self._values)
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, specs: Optional[List[IndicatorSpec]] = None) -> "StreamingIndicators":
+        """
+        用历史K线初始化状态
+
+        Args:
+            df: 按时间升序的K线 DataFrame（列：close，可选 high/low/trade_date）
+            specs: 指标规格列表
+        """
+        state = cls(specs)
+        cols = [c for c in ("trade_date", "date", "high", "low", "close") if c in df.columns]
+        for rec in df[cols].to_dict("records"):
+            state.update(rec)
+        return state
+
+    # --- 序列化 ---
+    def _snapshot(self) -> Dict[str, Any]:
+        return {
+            "last_date": self.last_date,
+            "last_close": self.last_close,
+            "bars": self.bars,
+            "values": dict(self._values),
+            "states": {k: s.to_dict() for k, s in self._states.items()},
+        }
+
+    def _restore(self, snap: Mapping[str, Any]) -> None:
+        self.last_date = snap.get("last_date")
+        self.last_close = snap.get("last_close")
+        self.bars = int(snap.get("bars") or 0)
+        self._values = dict(snap.get("values") or {})
+        for k, data in (snap.get("states") or {}).items():
+            if k in self._states:
+                self._states[k].load(data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出为可 JSON 序列化的字典（用于 Redis/MongoDB 持久化）"""
+        data = self._snapshot()
+        data["version"] = STATE_VERSION
+        data["specs"] = [{"name": s.name, "params": s.params} for s in self.specs]
+        data["checkpoint"] = self._checkpoint
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "StreamingIndicators":
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"不支持的指标状态版本: {data.get('version')}")
+        specs = [IndicatorSpec(s["name"], s.get("params")) for s in data.get("specs") or []]
+        state = cls(specs or None)
+        state._restore(data)
+        state._checkpoint = data.get("checkpoint")
+        return state
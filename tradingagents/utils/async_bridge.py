@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+同步 -> 异步桥接：进程内共享的后台事件循环
+
+同步代码调用异步 provider 时，原先每次调用都新建事件循环（在运行中的事件循环里调用时
+还要额外新建一个线程池），线程和事件循环反复创建销毁，绑定在事件循环上的
+aiohttp/Motor 连接池也随之丢弃。这里改为一个常驻的事件循环线程：
+
+- run_coroutine_sync(coro, timeout) 把协程提交到后台事件循环并阻塞等待结果
+- 超时或调用方被中断时取消协程，不会遗留后台任务
+- 所有同步调用方共用同一个事件循环，异步客户端的连接池在多次调用之间保持可用
+- fork 后的子进程首次调用时自动重建事件循环线程
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import os
+import threading
+from typing import Any, Awaitable, Dict, Optional
+
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+class AsyncBridge:
+    """在专用线程中常驻一个事件循环，供同步代码提交协程"""
+
+    def __init__(self, name: str = "async-bridge"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.errors = 0
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        loop = self._loop
+        if loop is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return loop
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return self._loop
+            ready = threading.Event()
+            loop = asyncio.new_event_loop()
+
+            def _run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                try:
+                    loop.run_forever()
+                finally:
+                    loop.close()
+
+            thread = threading.Thread(target=_run, name=self.name, daemon=True)
+            thread.start()
+            ready.wait()
+            self._loop, self._thread, self._pid = loop, thread, os.getpid()
+            logger.debug(f"🔁 [异步桥接] 后台事件循环已启动: {self.name}")
+            return loop
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """后台事件循环（首次访问时启动）"""
+        return self._ensure_loop()
+
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Awaitable[Any]) -> concurrent.futures.Future:
+        """提交协程到后台事件循环，立即返回 concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """
+        在后台事件循环中运行协程并阻塞等待结果
+
+        Args:
+            coro: 协程对象
+            timeout: 超时（秒），None 表示一直等待；超时后取消协程
+
+        Raises:
+            concurrent.futures.TimeoutError: 超时
+            RuntimeError: 在后台事件循环线程内调用（同步等待会死锁）
+        """
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("不能在异步桥接的事件循环线程内同步等待协程，请直接 await")
+
+        self.calls += 1
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            self.timeouts += 1
+            future.cancel()
+            raise
+        except concurrent.futures.CancelledError:
+            self.cancelled += 1
+            raise
+        except BaseException:
+            if future.done():
+                self.errors += 1
+            else:
+                # 调用方被中断（KeyboardInterrupt 等）时取消后台协程
+                self.cancelled += 1
+                future.cancel()
+            raise
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """取消未完成的任务并停止事件循环"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = self._pid = None
+        if loop is None or thread is None or not thread.is_alive() or loop.is_closed():
+            return
+
+        async def _cancel_pending():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(_cancel_pending(), loop).result(timeout)
+        except Exception as e:
+            logger.debug(f"⚠️ [异步桥接] 取消未完成任务失败: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "errors": self.errors,
+        }
+
+
+_bridge: Optional[AsyncBridge] = None
+_bridge_lock = threading.Lock()
+
+
+def get_async_bridge() -> AsyncBridge:
+    """获取全局异步桥接（进程内共享一个后台事件循环）"""
+    global _bridge
+    with _bridge_lock:
+        if _bridge is None:
+            _bridge = AsyncBridge()
+            atexit.register(_bridge.shutdown)
+        return _bridge
+
+
+def run_coroutine_sync(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """在共享后台事件循环中运行协程，供同步代码调用（可在运行中的事件循环内安全调用）"""
+    return get_async_bridge().run(coro, timeout=timeout)